@@ -0,0 +1,230 @@
+"""
+Flow analytics
+Loads issue snapshots into arrays and computes lead/cycle time percentiles, WIP aging and weekly
+throughput with vectorized operations (NumPy when installed, plain Python otherwise)
+"""
+
+import bisect
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional 'analytics' extra; the same results are computed in plain Python, only slower
+    np = None
+
+
+# Percentiles reported for lead and cycle times
+PERCENTILES = (50, 85, 95)
+
+# WIP aging histogram bucket edges (days); the last bucket is open-ended
+AGING_BUCKETS = (0, 1, 3, 7, 14, 30, 60, 90)
+
+# Most issues whose journals are read for status transitions (one request each); beyond it cycle
+# time is skipped and the count reported, so a large scope cannot turn into thousands of requests
+MAX_TRANSITION_ISSUES = 200
+
+# Journal requests in flight while reading status transitions
+TRANSITION_CONCURRENCY = 8
+
+DAY = 86400.0
+WEEK = 7 * DAY
+
+
+def epoch(value: Optional[str]) -> float:
+    """Seconds since the epoch of a Redmine timestamp; NaN when missing"""
+    if not value:
+        return math.nan
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def first_transition(journals: Iterable[Dict[str, Any]]) -> float:
+    """Time of the first status change in an issue's journals (work started); NaN if none"""
+    for journal in journals:
+        if any(detail.get('property', 'attr') == 'attr' and detail.get('name') == 'status_id'
+               for detail in journal.get('details') or ()):
+            return epoch(journal.get('created_on'))
+    return math.nan
+
+
+@dataclass
+class FlowSnapshot:
+    """Issue timestamps as parallel columns (seconds since the epoch, NaN when missing)
+
+    `started` is the first status change; NaN when journals were not read or the status never
+    changed. `transitions_skipped` is the issue count when journals were requested but skipped for
+    exceeding MAX_TRANSITION_ISSUES. Columns are NumPy float arrays when NumPy is installed, else
+    lists of floats.
+    """
+    ids: Sequence[int]
+    created: Sequence[float]
+    started: Sequence[float]
+    closed: Sequence[float]
+    is_closed: Sequence[bool]
+    transitions_read: bool = False
+    transitions_skipped: int = 0
+
+    @classmethod
+    def from_issues(cls, open_issues: List[Dict[str, Any]], closed_issues: List[Dict[str, Any]],
+                    started: Optional[Dict[int, float]] = None) -> 'FlowSnapshot':
+        started = started or {}
+        issues = open_issues + closed_issues
+        columns = dict(
+            ids=[issue['id'] for issue in issues],
+            created=[epoch(issue.get('created_on')) for issue in issues],
+            started=[started.get(issue['id'], math.nan) for issue in issues],
+            closed=[epoch(issue.get('closed_on')) for issue in issues],
+            is_closed=[False] * len(open_issues) + [True] * len(closed_issues),
+        )
+        if np is not None:
+            columns = {name: np.asarray(values, dtype=np.int64 if name == 'ids' else
+                                        bool if name == 'is_closed' else np.float64)
+                       for name, values in columns.items()}
+        return cls(**columns, transitions_read=bool(started))
+
+
+def load_snapshot(client: Any, project_id: Optional[int] = None, since: Optional[str] = None,
+                  transitions: bool = False, max_workers: int = TRANSITION_CONCURRENCY) -> FlowSnapshot:
+    """
+    Read the issues flow metrics need: all open ones and those closed on or after `since`
+
+    Issues are streamed page by page (iter_issue_pages); with `transitions`, the journals of
+    those issues (at most MAX_TRANSITION_ISSUES) are then read concurrently for the first
+    status change. Above the limit no journals are read and the snapshot records how many issues
+    were skipped.
+    """
+    filters = {'project_id': project_id} if project_id is not None else {}
+    open_issues = [issue for page in client.iter_issue_pages(status_id='o', **filters) for issue in page]
+    if since:
+        filters['closed_on'] = f'>={since}'
+    closed_issues = [issue for page in client.iter_issue_pages(status_id='c', **filters) for issue in page]
+
+    issues = open_issues + closed_issues
+    started: Dict[int, float] = {}
+    if transitions and len(issues) > MAX_TRANSITION_ISSUES:
+        snapshot = FlowSnapshot.from_issues(open_issues, closed_issues)
+        snapshot.transitions_skipped = len(issues)
+        return snapshot
+    if transitions and issues:
+        workers = min(max(max_workers, 1), len(issues))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-flow') as executor:
+            histories = executor.map(lambda issue: client.get_issue_raw(issue['id'], include=['journals']), issues)
+            for issue, history in zip(issues, histories):
+                started[issue['id']] = first_transition(history.get('journals') or ())
+    return FlowSnapshot.from_issues(open_issues, closed_issues, started)
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = PERCENTILES) -> Dict[str, float]:
+    """Linear-interpolated percentiles (as numpy.percentile) of non-NaN values"""
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {}
+        return {f'p{point}': float(value) for point, value in zip(points, np.percentile(values, points))}
+    values = sorted(value for value in values if not math.isnan(value))
+    if not values:
+        return {}
+    result = {}
+    for point in points:
+        rank = (len(values) - 1) * point / 100
+        low = math.floor(rank)
+        high = min(low + 1, len(values) - 1)
+        result[f'p{point}'] = values[low] + (values[high] - values[low]) * (rank - low)
+    return result
+
+
+def histogram(values: Sequence[float], edges: Sequence[float]) -> List[int]:
+    """Counts of non-NaN values per [edge, next edge) bucket, the last bucket open-ended"""
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positions = np.searchsorted(np.asarray(edges, dtype=np.float64), values, side='right') - 1
+        return np.bincount(np.clip(positions, 0, None), minlength=len(edges))[:len(edges)].tolist()
+    counts = [0] * len(edges)
+    for value in values:
+        if not math.isnan(value):
+            counts[max(bisect.bisect_right(edges, value) - 1, 0)] += 1
+    return counts
+
+
+def window_start(weeks: int, now: Optional[datetime] = None) -> datetime:
+    """Monday 00:00 UTC starting a window of `weeks` whole weeks that ends with the current week"""
+    now = now or datetime.now(timezone.utc)
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return monday - timedelta(weeks=weeks - 1)
+
+
+@dataclass
+class FlowReport:
+    """Flow metrics over a window of whole weeks ending now"""
+    week_starts: List[str]
+    throughput: List[int]
+    lead_time: Dict[str, float]
+    cycle_time: Dict[str, float]
+    closed: int
+    cycle_time_issues: int
+    wip: int
+    aging: List[int]
+    aging_buckets: List[str] = field(default_factory=list)
+    transitions_read: bool = False
+    transitions_skipped: int = 0
+
+
+def flow_report(snapshot: FlowSnapshot, weeks: int = 12, now: Optional[datetime] = None) -> FlowReport:
+    """
+    Lead time (created -> closed) and cycle time (first status change -> closed) percentiles of
+    issues closed in the last `weeks` weeks, their weekly throughput, and the age of open issues
+    (since work started, or since creation when it has not)
+    """
+    now = now or datetime.now(timezone.utc)
+    first_week = window_start(weeks, now)
+    start = first_week.timestamp()
+    labels = [(first_week + timedelta(weeks=i)).strftime('%Y-%m-%d') for i in range(weeks)]
+    buckets = [f"{low}-{high}d" for low, high in zip(AGING_BUCKETS, AGING_BUCKETS[1:])] + [f"{AGING_BUCKETS[-1]}d+"]
+
+    if np is not None:
+        closed = snapshot.closed
+        in_window = snapshot.is_closed & (closed >= start)
+        lead = (closed - snapshot.created)[in_window] / DAY
+        cycle = (closed - snapshot.started)[in_window] / DAY
+        week_index = ((closed[in_window] - start) // WEEK).astype(np.int64)
+        throughput = np.bincount(week_index[week_index < weeks], minlength=weeks).tolist()
+        wip = ~snapshot.is_closed
+        began = np.where(np.isnan(snapshot.started), snapshot.created, snapshot.started)[wip]
+        ages = (now.timestamp() - began) / DAY
+        closed_count = int(in_window.sum())
+        cycle_count = int(np.count_nonzero(~np.isnan(cycle)))
+        wip_count = int(wip.sum())
+    else:
+        rows = list(zip(snapshot.created, snapshot.started, snapshot.closed, snapshot.is_closed))
+        done = [(created, started, closed) for created, started, closed, is_closed in rows
+                if is_closed and closed >= start]
+        lead = [(closed - created) / DAY for created, _, closed in done]
+        cycle = [(closed - started) / DAY for _, started, closed in done]
+        throughput = [0] * weeks
+        for _, _, closed in done:
+            index = int((closed - start) // WEEK)
+            if index < weeks:
+                throughput[index] += 1
+        ages = [(now.timestamp() - (created if math.isnan(started) else started)) / DAY
+                for created, started, _, is_closed in rows if not is_closed]
+        closed_count = len(done)
+        cycle_count = sum(1 for value in cycle if not math.isnan(value))
+        wip_count = len(ages)
+
+    return FlowReport(
+        week_starts=labels, throughput=throughput,
+        lead_time={key: round(value, 2) for key, value in percentiles(lead).items()},
+        cycle_time={key: round(value, 2) for key, value in percentiles(cycle).items()},
+        closed=closed_count, cycle_time_issues=cycle_count,
+        wip=wip_count, aging=histogram(ages, AGING_BUCKETS), aging_buckets=buckets,
+        transitions_read=snapshot.transitions_read, transitions_skipped=snapshot.transitions_skipped,
+    )
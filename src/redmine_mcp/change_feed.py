@@ -0,0 +1,201 @@
+"""
+Change feed
+Polls Redmine's Atom feeds and invalidates only the cached issues and projects that changed,
+and keeps the per-session cursors of the changes_since tool
+"""
+
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+# Atom feeds polled for changes, with the query that sorts each newest first. issues.atom is
+# not one of them: its entries are dated by issue creation, so edits never move past the mark
+FEEDS = {
+    'activity': {},
+}
+
+# Changed issues are probed on /issues.json with updated_on>=mark, newest first; more changes
+# than this since the last poll are treated like a feed that scrolled past its mark
+ISSUE_PROBE_LIMIT = 500
+
+# Every source the poller keeps a high-water mark for
+SOURCES = ('issues',) + tuple(FEEDS)
+
+# Sessions whose changes_since cursor is remembered; the least recently used is dropped first
+MAX_CURSORS = 256
+
+_ISSUE_LINK = re.compile(r'/issues/(\d+)')
+_PROJECT_LINK = re.compile(r'/projects/([^/?#]+)')
+
+
+@dataclass
+class FeedEntry:
+    """One Atom feed entry"""
+    id: str
+    updated: str
+    link: str
+
+    @property
+    def issue_id(self) -> Optional[int]:
+        match = _ISSUE_LINK.search(self.link or self.id)
+        return int(match.group(1)) if match else None
+
+    @property
+    def project_identifier(self) -> Optional[str]:
+        match = _PROJECT_LINK.search(self.link or self.id)
+        return match.group(1) if match else None
+
+
+def parse_atom_entries(stream: BinaryIO) -> Iterator[FeedEntry]:
+    """Stream entries from an Atom document, releasing each element once it is read"""
+    for _, element in ElementTree.iterparse(stream, events=('end',)):
+        if element.tag != f'{ATOM_NS}entry':
+            continue
+        link = element.find(f'{ATOM_NS}link')
+        yield FeedEntry(
+            id=(element.findtext(f'{ATOM_NS}id') or '').strip(),
+            updated=(element.findtext(f'{ATOM_NS}updated') or '').strip(),
+            link=link.get('href', '') if link is not None else '',
+        )
+        element.clear()
+
+
+class ChangeFeedPoller:
+    """Polls for changed issues and the activity feed and invalidates client caches for what changed
+
+    Issues are probed with updated_on>=mark on /issues.json (so edits to old issues are seen,
+    not only new issues); projects come from the activity feed. Each source keeps a high-water
+    mark: the newest timestamp seen (and the entries at that timestamp, which are not reported
+    twice). Entries are read newest first and reading stops at the first entry older than the
+    mark. When every entry is newer than the mark and the source may have more (the feed
+    length or ISSUE_PROBE_LIMIT was reached), changes may have been missed, so all cached
+    issues and the project index are invalidated instead.
+    """
+
+    def __init__(self, client: Any, interval: float):
+        self.client = client
+        self.interval = interval
+        self.high_water: Dict[str, Optional[str]] = {name: None for name in SOURCES}
+        self._at_mark: Dict[str, Set[str]] = {name: set() for name in SOURCES}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _entries(self, name: str, mark: Optional[str]) -> Iterator[FeedEntry]:
+        """Entries of a source, newest first (changed issues as entries linking to the issue)"""
+        if name in FEEDS:
+            return self.client.iter_feed(name, FEEDS[name])
+        filters = {'updated_on': f'>={mark}'} if mark else {}
+        # A stale response would show no changes made during an outage; fail and retry instead
+        issues = self.client.iter_issues(max_items=1 if mark is None else ISSUE_PROBE_LIMIT, status_id='*',
+                                         sort='updated_on:desc', fields=('updated_on',), stale_ok=False,
+                                         **filters)
+        return (FeedEntry(id=f'issue-{issue.id}', updated=issue.updated_on or '', link=f'/issues/{issue.id}')
+                for issue in issues)
+
+    def poll_once(self) -> Dict[str, Any]:
+        """Read new feed entries and invalidate caches; returns what was invalidated"""
+        issue_ids: Set[int] = set()
+        projects: Set[str] = set()
+        overflow = False
+
+        for name in SOURCES:
+            mark = self.high_water[name]
+            newest = None
+            at_newest: Set[str] = set()
+            reached_mark = False
+            count = 0
+            for entry in self._entries(name, mark):
+                count += 1
+                newest = newest or entry.updated
+                if mark is not None and entry.updated < mark:
+                    reached_mark = True
+                    break
+                if entry.updated == newest:
+                    at_newest.add(entry.id)
+                if mark is not None and entry.updated == mark and entry.id in self._at_mark[name]:
+                    reached_mark = True
+                    continue
+                if mark is not None:
+                    if entry.issue_id is not None:
+                        issue_ids.add(entry.issue_id)
+                    if entry.project_identifier:
+                        projects.add(entry.project_identifier)
+            if name not in FEEDS and count < ISSUE_PROBE_LIMIT:
+                # The probe returned every issue changed since the mark
+                reached_mark = True
+
+            if mark is None:
+                # First poll only establishes where the feed stands
+                self.high_water[name] = newest or ''
+                self._at_mark[name] = at_newest
+            elif newest is not None and newest > mark:
+                self.high_water[name] = newest
+                self._at_mark[name] = at_newest
+                # An empty feed had nothing to scroll past
+                overflow = overflow or (bool(mark) and not reached_mark)
+            elif newest == mark:
+                self._at_mark[name] |= at_newest
+
+        if overflow:
+            self.client.invalidate(everything=True)
+        elif issue_ids or projects:
+            self.client.invalidate(issue_ids=issue_ids, project_identifiers=projects)
+        return {'issues': sorted(issue_ids), 'projects': sorted(projects), 'overflow': overflow}
+
+    def _run(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception as e:
+                # Caches still expire by TTL; try again on the next tick
+                print(f"Change feed poll failed: {str(e)}", file=sys.stderr)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        """Poll in a background daemon thread, first right away and then every `interval` seconds"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='redmine-change-feed', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class ChangeCursors:
+    """Where each session's changes_since left off
+
+    A cursor is the updated_on timestamp of the newest change reported, with the IDs of the
+    issues reported at exactly that timestamp: the next query asks for updated_on>=cursor,
+    so changes made later in the same second are still found and those issues are skipped.
+    """
+
+    def __init__(self, max_sessions: int = MAX_CURSORS):
+        self.max_sessions = max_sessions
+        self._cursors: 'OrderedDict[str, Tuple[str, Tuple[int, ...]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session: str) -> Optional[Tuple[str, Tuple[int, ...]]]:
+        """The session's (timestamp, issue IDs at it), or None before its first call"""
+        with self._lock:
+            cursor = self._cursors.get(session)
+            if cursor is not None:
+                self._cursors.move_to_end(session)
+            return cursor
+
+    def set(self, session: str, timestamp: str, seen: Iterable[int] = ()):
+        with self._lock:
+            self._cursors[session] = (timestamp, tuple(sorted(seen)))
+            self._cursors.move_to_end(session)
+            while len(self._cursors) > self.max_sessions:
+                self._cursors.popitem(last=False)
@@ -4,6 +4,7 @@ Responsible for loading and validating environment variable configuration
 """
 
 import os
+from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -22,6 +23,41 @@ class RedmineConfig:
         # Optional configuration - use project-specific prefix to avoid conflicts with other projects
         self.redmine_timeout = int(os.getenv("REDMINE_MCP_TIMEOUT") or os.getenv("REDMINE_TIMEOUT") or "30")
         
+        # Directory for enumeration cache files
+        self.cache_dir = Path(os.getenv("REDMINE_MCP_CACHE_DIR") or Path.home() / ".redmine_mcp").expanduser()
+        
+        # Lifetime in seconds of cached issue views (0 disables the cache)
+        self.issue_cache_ttl = float(os.getenv("REDMINE_MCP_ISSUE_CACHE_TTL") or "60")
+        
+        # Request throttling shared by all Redmine calls (0 requests/second disables the rate limit)
+        self.max_rps = float(os.getenv("REDMINE_MCP_MAX_RPS") or "10")
+        self.max_concurrency = int(os.getenv("REDMINE_MCP_MAX_CONCURRENCY") or "8")
+        
+        # Change feed polling interval in seconds (0 disables) and the Atom access key used for feeds
+        self.change_feed_interval = float(os.getenv("REDMINE_MCP_CHANGE_FEED_INTERVAL") or "0")
+        self.feed_key = os.getenv("REDMINE_MCP_FEED_KEY") or None
+        
+        # Spool directory and size cap (MB) for attachment downloads
+        self.attachment_dir = Path(os.getenv("REDMINE_MCP_ATTACHMENT_DIR") or self.cache_dir / "attachments").expanduser()
+        self.max_download_mb = float(os.getenv("REDMINE_MCP_MAX_DOWNLOAD_MB") or "100")
+        
+        # Directory local files may be uploaded from (attach_files, create_new_issue); unset disables uploads
+        upload_dir = os.getenv("REDMINE_MCP_UPLOAD_DIR")
+        self.upload_dir = Path(upload_dir).expanduser() if upload_dir else None
+        
+        # Default tool output format when a call does not pass `format` ("text" or "json")
+        self.output_format = (os.getenv("REDMINE_MCP_OUTPUT_FORMAT") or "text").lower()
+        
+        # Optional warm-up phase before serving the first request
+        self.warmup_enabled = self._get_bool_env("REDMINE_MCP_WARMUP")
+        self.warmup_connections = int(os.getenv("REDMINE_MCP_WARMUP_CONNECTIONS") or "4")
+        self.warmup_timeout = float(os.getenv("REDMINE_MCP_WARMUP_TIMEOUT") or "5")
+        self.warmup_prefetch_issues = self._get_bool_env("REDMINE_MCP_WARMUP_PREFETCH_ISSUES")
+        
+        # Transport and HTTP-mode options
+        self.transport = (os.getenv("REDMINE_MCP_TRANSPORT") or "stdio").lower()
+        self.metrics_endpoint = self._get_bool_env("REDMINE_MCP_METRICS_ENDPOINT")
+        
         # Log level management strategy:
         # 1. Prefer REDMINE_MCP_LOG_LEVEL (project-specific variable)
         # 2. Then use LOG_LEVEL (backward compatibility)
@@ -55,6 +91,13 @@ class RedmineConfig:
             raise ValueError(f"Required environment variable {key} is not set")
         return value
     
+    def _get_bool_env(self, key: str, default: bool = False) -> bool:
+        """Get boolean environment variable (1/true/yes/on)"""
+        value = os.getenv(key)
+        if value is None or not value.strip():
+            return default
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    
     def _validate_config(self) -> None:
         """Validate configuration values"""
         # Validate domain format
@@ -72,6 +115,33 @@ class RedmineConfig:
         if self.redmine_timeout <= 0:
             raise ValueError("REDMINE_TIMEOUT must be greater than 0")
         
+        if self.issue_cache_ttl < 0:
+            raise ValueError("REDMINE_MCP_ISSUE_CACHE_TTL cannot be negative")
+        
+        if self.max_rps < 0:
+            raise ValueError("REDMINE_MCP_MAX_RPS cannot be negative")
+        if self.max_concurrency <= 0:
+            raise ValueError("REDMINE_MCP_MAX_CONCURRENCY must be greater than 0")
+        if self.max_download_mb <= 0:
+            raise ValueError("REDMINE_MCP_MAX_DOWNLOAD_MB must be greater than 0")
+        if self.change_feed_interval < 0:
+            raise ValueError("REDMINE_MCP_CHANGE_FEED_INTERVAL cannot be negative")
+        
+        valid_formats = ['text', 'json']
+        if self.output_format not in valid_formats:
+            raise ValueError(f"REDMINE_MCP_OUTPUT_FORMAT must be one of: {', '.join(valid_formats)} (current: {self.output_format})")
+        
+        # Validate warm-up settings
+        if self.warmup_connections <= 0:
+            raise ValueError("REDMINE_MCP_WARMUP_CONNECTIONS must be greater than 0")
+        if self.warmup_timeout <= 0:
+            raise ValueError("REDMINE_MCP_WARMUP_TIMEOUT must be greater than 0")
+        
+        # Validate transport value
+        valid_transports = ['stdio', 'sse', 'streamable-http']
+        if self.transport not in valid_transports:
+            raise ValueError(f"REDMINE_MCP_TRANSPORT must be one of: {', '.join(valid_transports)} (current: {self.transport})")
+        
         # Validate log_level value
         valid_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
         if self.log_level not in valid_levels:
@@ -87,7 +157,7 @@ class RedmineConfig:
     
     def __repr__(self) -> str:
         """Debug string representation, hides sensitive info"""
-        return f"RedmineConfig(domain='{self.redmine_domain}', timeout={self.redmine_timeout}, log_level='{self.log_level}', fastmcp_log_level='{self.fastmcp_log_level}', debug={self.debug_mode})"
+        return f"RedmineConfig(domain='{self.redmine_domain}', timeout={self.redmine_timeout}, cache_dir='{self.cache_dir}', log_level='{self.log_level}', fastmcp_log_level='{self.fastmcp_log_level}', debug={self.debug_mode})"
 
 
 # Global config instance
@@ -0,0 +1,272 @@
+"""
+Issue export
+Streams issue pages into CSV, Parquet or Arrow files one page at a time, flattening nested
+fields and custom fields into columns
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+# Output formats by file suffix
+EXPORT_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow'}
+
+# Rows buffered per Parquet row group / Arrow record batch; bounds memory on the writer side
+ROW_GROUP_SIZE = 10_000
+
+# Prefix of custom field columns, followed by the field name
+CUSTOM_FIELD_PREFIX = 'cf.'
+
+
+def _ref_id(key: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda issue: (issue.get(key) or {}).get('id')
+
+
+def _ref_name(key: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda issue: (issue.get(key) or {}).get('name')
+
+
+# Exported columns, as column name -> (Arrow type, getter on the raw issue data)
+EXPORT_FIELDS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    'id': ('int64', lambda issue: issue.get('id')),
+    'project_id': ('int64', _ref_id('project')),
+    'project': ('string', _ref_name('project')),
+    'tracker_id': ('int64', _ref_id('tracker')),
+    'tracker': ('string', _ref_name('tracker')),
+    'status_id': ('int64', _ref_id('status')),
+    'status': ('string', _ref_name('status')),
+    'priority_id': ('int64', _ref_id('priority')),
+    'priority': ('string', _ref_name('priority')),
+    'author_id': ('int64', _ref_id('author')),
+    'author': ('string', _ref_name('author')),
+    'assigned_to_id': ('int64', _ref_id('assigned_to')),
+    'assigned_to': ('string', _ref_name('assigned_to')),
+    'parent_id': ('int64', _ref_id('parent')),
+    'subject': ('string', lambda issue: issue.get('subject')),
+    'description': ('string', lambda issue: issue.get('description')),
+    'start_date': ('string', lambda issue: issue.get('start_date')),
+    'due_date': ('string', lambda issue: issue.get('due_date')),
+    'done_ratio': ('int64', lambda issue: issue.get('done_ratio')),
+    'estimated_hours': ('float64', lambda issue: issue.get('estimated_hours')),
+    'is_private': ('bool', lambda issue: issue.get('is_private')),
+    'created_on': ('string', lambda issue: issue.get('created_on')),
+    'updated_on': ('string', lambda issue: issue.get('updated_on')),
+    'closed_on': ('string', lambda issue: issue.get('closed_on')),
+}
+
+
+def export_format(path: Union[str, Path], format: Optional[str] = None) -> str:
+    """Output format given explicitly or by the file suffix"""
+    if format:
+        if format not in EXPORT_FORMATS.values():
+            raise ValueError(f"Unsupported export format: {format}. Use one of: {', '.join(EXPORT_FORMATS.values())}")
+        return format
+    suffix = Path(path).suffix.lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(f"Cannot tell the export format from '{suffix or path}'; "
+                         f"use {', '.join(EXPORT_FORMATS)} or pass a format")
+    return EXPORT_FORMATS[suffix]
+
+
+def custom_field_value(value: Any) -> Optional[str]:
+    """Custom field value as text (multiple values joined with commas)"""
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value) or None
+    return None if value in (None, '') else str(value)
+
+
+class IssueRows:
+    """Turns raw issue pages into flat rows
+
+    Custom field columns are fixed before the first row is written: the given names, or
+    those found on the first page. Fields that only show up later are not added (the file
+    layout is already set) and are listed in `skipped_custom_fields`.
+    """
+
+    def __init__(self, columns: Optional[Iterable[str]] = None, custom_fields: Optional[Iterable[str]] = None):
+        self.columns = list(columns or EXPORT_FIELDS)
+        unknown = [name for name in self.columns if name not in EXPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown export column(s): {', '.join(unknown)}")
+        self.custom_fields: Optional[List[str]] = list(custom_fields) if custom_fields is not None else None
+        self.skipped_custom_fields: set = set()
+        self._getters = [EXPORT_FIELDS[name][1] for name in self.columns]
+
+    def start(self, first_page: List[Dict[str, Any]]):
+        """Fix the custom field columns from the first page, unless they were given"""
+        if self.custom_fields is None:
+            names = {}
+            for issue in first_page:
+                for field in issue.get('custom_fields') or ():
+                    names.setdefault(field.get('name'), None)
+            self.custom_fields = [name for name in names if name]
+
+    @property
+    def header(self) -> List[str]:
+        return self.columns + [CUSTOM_FIELD_PREFIX + name for name in self.custom_fields or ()]
+
+    @property
+    def types(self) -> List[str]:
+        return [EXPORT_FIELDS[name][0] for name in self.columns] + ['string'] * len(self.custom_fields or ())
+
+    def rows(self, page: List[Dict[str, Any]]) -> List[List[Any]]:
+        wanted = {name: position for position, name in enumerate(self.custom_fields or ())}
+        rows = []
+        for issue in page:
+            values = [None] * len(wanted)
+            for field in issue.get('custom_fields') or ():
+                position = wanted.get(field.get('name'))
+                if position is None:
+                    self.skipped_custom_fields.add(field.get('name'))
+                else:
+                    values[position] = custom_field_value(field.get('value'))
+            rows.append([getter(issue) for getter in self._getters] + values)
+        return rows
+
+
+class _CsvWriter:
+    """Writes rows to a CSV file as they come"""
+
+    def __init__(self, path: Path, header: List[str], types: List[str]):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write(self, rows: List[List[Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+    """Buffers rows into Arrow record batches of ROW_GROUP_SIZE and writes them to Parquet or an Arrow file"""
+
+    def __init__(self, path: Path, header: List[str], types: List[str], format: str):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError(f"{format.capitalize()} export requires pyarrow: "
+                              "pip install 'redmine-mcp[parquet]'") from e
+        self._pa = pa
+        self.schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in zip(header, types)])
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+        else:
+            import pyarrow.ipc as ipc
+            self._writer = ipc.new_file(str(path), self.schema)
+        self._buffer: List[List[Any]] = []
+
+    def write(self, rows: List[List[Any]]):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            columns = [self._pa.array(values, type=field.type)
+                       for values, field in zip(zip(*self._buffer), self.schema)]
+            self._writer.write_batch(self._pa.RecordBatch.from_arrays(columns, schema=self.schema))
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def write_issues(pages: Iterable[List[Dict[str, Any]]], path: Union[str, Path], format: Optional[str] = None,
+                 columns: Optional[Iterable[str]] = None,
+                 custom_fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Write issue pages to a CSV, Parquet or Arrow file, one page at a time
+    
+    Only the current page (plus one Parquet row group or Arrow batch) is held in memory.
+    The file is written next to `path` and renamed into place once complete.
+    
+    Args:
+        pages: Raw issue data, page by page
+        path: Output file
+        format: "csv", "parquet" or "arrow" (default from the file suffix)
+        columns: EXPORT_FIELDS columns to write (default all)
+        custom_fields: Custom field names to write as columns (default those on the first page)
+        
+    Returns:
+        Dict with 'path', 'format', 'rows', 'columns' and 'skipped_custom_fields'
+    """
+    path = Path(path)
+    format = export_format(path, format)
+    issue_rows = IssueRows(columns, custom_fields)
+    pages = iter(pages)
+    first = next(pages, [])
+    issue_rows.start(first)
+    
+    partial = path.with_name(path.name + '.part')
+    if format == 'csv':
+        writer = _CsvWriter(partial, issue_rows.header, issue_rows.types)
+    else:
+        writer = _ArrowWriter(partial, issue_rows.header, issue_rows.types, format)
+    count = 0
+    try:
+        for page in itertools.chain([first], pages):
+            rows = issue_rows.rows(page)
+            writer.write(rows)
+            count += len(rows)
+    except BaseException:
+        writer.close()
+        partial.unlink(missing_ok=True)
+        raise
+    writer.close()
+    os.replace(partial, path)
+    
+    return {'path': str(path), 'format': format, 'rows': count, 'columns': issue_rows.header,
+            'skipped_custom_fields': sorted(issue_rows.skipped_custom_fields)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: export issues matching the filters to a file"""
+    parser = argparse.ArgumentParser(prog="redmine-mcp-export",
+                                     description="Export Redmine issues to CSV, Parquet or Arrow")
+    parser.add_argument("path", help="Output file (.csv, .parquet or .arrow)")
+    parser.add_argument("--format", choices=sorted(set(EXPORT_FORMATS.values())),
+                        help="Output format (default: from the file suffix)")
+    parser.add_argument("--project", help="Only this project (ID, identifier or name) and its subprojects")
+    parser.add_argument("--status", default="*",
+                        help="o (open), c (closed), * (all, default) or a status ID")
+    parser.add_argument("--updated-since", help="Only issues updated on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--columns", help=f"Comma-separated columns (default all: {', '.join(EXPORT_FIELDS)})")
+    parser.add_argument("--custom-field", action="append", dest="custom_fields",
+                        help="Custom field to export, repeatable (default: those on the first page)")
+    args = parser.parse_args(argv)
+    
+    from .redmine_client import RedmineAPIError, get_client
+    
+    try:
+        client = get_client()
+        filters = {'status_id': int(args.status) if args.status.isdigit() else args.status}
+        if args.project:
+            filters['project_id'] = client.resolve_project(args.project).id
+        if args.updated_since:
+            filters['updated_on'] = f">={args.updated_since}"
+        result = client.export_issues(args.path, format=args.format,
+                                      columns=args.columns.split(',') if args.columns else None,
+                                      custom_fields=args.custom_fields, **filters)
+    except (RedmineAPIError, ValueError, ImportError) as e:
+        print(f"Export failed: {str(e)}", file=sys.stderr)
+        return 1
+    
+    print(f"Exported {result['rows']} issues to {result['path']} ({result['format']}, "
+          f"{len(result['columns'])} columns)", file=sys.stderr)
+    if result['skipped_custom_fields']:
+        print(f"Custom fields not on the first page were skipped: {', '.join(result['skipped_custom_fields'])}; "
+              "name them with --custom-field to export them", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,545 @@
+"""
+Text renderers for MCP tool output
+Each renderer collects lines in a list and joins once, so output size is linear in the input
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .redmine_client import RedmineIssue
+
+
+def _format_file_size(file_size: int) -> str:
+    """Human-readable attachment size"""
+    file_size_mb = file_size / (1024 * 1024) if file_size > 0 else 0
+    return f"{file_size_mb:.2f} MB" if file_size_mb >= 1 else f"{file_size} bytes"
+
+
+def _truncate(text: str, width: int) -> str:
+    """Truncate text to a column width, marking the cut with an ellipsis"""
+    return text[:width - 3] + "..." if len(text) > width else text
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date or ISO 8601 timestamp; naive values are taken as UTC"""
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _render_attachments(attachments: List[Dict[str, Any]], domain: str) -> List[str]:
+    lines = [f"Attachments ({len(attachments)}):"]
+    for attachment in attachments:
+        lines.append(f"- Filename: {attachment.get('filename', 'N/A')}")
+        lines.append(f"  Size: {_format_file_size(attachment.get('filesize', 0))}")
+        lines.append(f"  Type: {attachment.get('content_type', 'N/A')}")
+        lines.append(f"  Uploaded by: {attachment.get('author', {}).get('name', 'N/A')}")
+        lines.append(f"  Uploaded on: {attachment.get('created_on', 'N/A')}")
+        lines.append(f"  Download link: {domain}/attachments/download/"
+                     f"{attachment.get('id', '')}/{attachment.get('filename', '')}")
+    return lines
+
+
+def _render_children(children: List[Dict[str, Any]]) -> List[str]:
+    lines = [f"Subtasks ({len(children)}):"]
+    for child in children:
+        tracker = child.get('tracker', {}).get('name', 'N/A')
+        lines.append(f"- #{child.get('id')} [{tracker}] {child.get('subject', '')}")
+    return lines
+
+
+def _render_relations(relations: List[Dict[str, Any]], issue_id: int) -> List[str]:
+    lines = [f"Relations ({len(relations)}):"]
+    for relation in relations:
+        other = relation.get('issue_to_id') if relation.get('issue_id') == issue_id else relation.get('issue_id')
+        delay = f" (delay {relation['delay']} days)" if relation.get('delay') else ""
+        lines.append(f"- {relation.get('relation_type', 'relates')} #{other}{delay}")
+    return lines
+
+
+def _render_changesets(changesets: List[Dict[str, Any]]) -> List[str]:
+    lines = [f"Changesets ({len(changesets)}):"]
+    for changeset in changesets:
+        comment = (changeset.get('comments') or '').strip().split("\n")[0]
+        author = changeset.get('user', {}).get('name', 'N/A')
+        lines.append(f"- r{changeset.get('revision', '?')} by {author} "
+                     f"({changeset.get('committed_on', 'N/A')}): {comment}")
+    return lines
+
+
+def _render_watchers(watchers: List[Dict[str, Any]]) -> List[str]:
+    return [f"Watchers ({len(watchers)}):"] + [f"- {watcher.get('name', 'N/A')}" for watcher in watchers]
+
+
+def _select_journals(issue_data: Dict[str, Any], since: Optional[datetime]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Journals with note content, numbered by position among all notes and filtered by since"""
+    notes_journals = [j for j in issue_data.get('journals') or [] if j.get('notes', '').strip()]
+    numbered = list(enumerate(notes_journals, 1))
+    if since is not None:
+        numbered = [(i, j) for i, j in numbered
+                    if j.get('created_on') and parse_timestamp(j['created_on']) >= since]
+    return numbered
+
+
+def _journal_window(numbered: List[Tuple[int, Dict[str, Any]]], offset: int,
+                    limit: Optional[int]) -> List[Tuple[int, Dict[str, Any]]]:
+    end = len(numbered) if limit is None else min(len(numbered), offset + limit)
+    return numbered[offset:end]
+
+
+def _fits(used: int, size: int, max_chars: Optional[int], shown: List[Any]) -> bool:
+    """Whether another note fits the budget; the first note always fits so continuations make progress"""
+    return max_chars is None or not shown or used + size <= max_chars
+
+
+def format_issue(issue_data: Dict[str, Any], domain: str, include_details: bool = True,
+                 journal_offset: int = 0, journal_limit: Optional[int] = None,
+                 since: Optional[datetime] = None, max_chars: Optional[int] = None) -> str:
+    """
+    Render a raw issue payload (as returned by get_issue_raw) as readable text
+
+    Every include section present in the payload is rendered. Notes are numbered by their
+    position among all notes; journal_offset/journal_limit/since select a window of them and
+    max_chars stops adding notes once the output would exceed the budget, ending with the
+    journal_offset to continue from.
+    """
+    parent = issue_data.get('parent')
+    parent_info = f"#{parent['id']} - {parent.get('subject', 'N/A')}" if parent else "No parent issue"
+    assigned_to = issue_data.get('assigned_to')
+
+    lines = [
+        f"Issue #{issue_data['id']}: {issue_data['subject']}",
+        "",
+        "Basic Info:",
+        f"- Project: {issue_data['project'].get('name', 'N/A')} (ID: {issue_data['project'].get('id', 'N/A')})",
+        f"- Tracker: {issue_data['tracker'].get('name', 'N/A')}",
+        f"- Status: {issue_data['status'].get('name', 'N/A')}",
+        f"- Priority: {issue_data['priority'].get('name', 'N/A')}",
+        f"- Author: {issue_data['author'].get('name', 'N/A')}",
+        f"- Assigned to: {assigned_to.get('name', 'Unassigned') if assigned_to else 'Unassigned'}",
+        f"- Parent issue: {parent_info}",
+        f"- Done ratio: {issue_data.get('done_ratio', 0)}%",
+        f"- Start date: {issue_data.get('start_date', 'Not set')}",
+        f"- Due date: {issue_data.get('due_date', 'Not set')}",
+        f"- Estimated hours: {issue_data.get('estimated_hours', 'Not set')} hours",
+        f"- Created on: {issue_data.get('created_on', 'N/A')}",
+        f"- Updated on: {issue_data.get('updated_on', 'N/A')}",
+        "",
+        "Description:",
+        f"{issue_data.get('description', 'No description')}",
+    ]
+    if not include_details:
+        return "\n".join(lines)
+
+    sections = [
+        ('attachments', lambda items: _render_attachments(items, domain)),
+        ('children', _render_children),
+        ('relations', lambda items: _render_relations(items, issue_data['id'])),
+        ('changesets', _render_changesets),
+        ('watchers', _render_watchers),
+    ]
+    for key, render in sections:
+        if issue_data.get(key):
+            lines.append("")
+            lines.extend(render(issue_data[key]))
+
+    numbered = _select_journals(issue_data, since)
+    if not numbered:
+        return "\n".join(lines)
+
+    blocks = []
+    used = sum(len(line) + 1 for line in lines) + 128  # room for the section header and continuation line
+    for i, journal in _journal_window(numbered, journal_offset, journal_limit):
+        block = ["", f"#{i} - {journal.get('user', {}).get('name', 'N/A')} ({journal.get('created_on', 'N/A')}):",
+                 journal.get('notes', '').strip()]
+        block_chars = sum(len(line) + 1 for line in block)
+        if not _fits(used, block_chars, max_chars, blocks):
+            break
+        blocks.append(block)
+        used += block_chars
+
+    shown = len(blocks)
+    scope = f" since {since.astimezone(timezone.utc):%Y-%m-%dT%H:%M:%SZ}" if since is not None else ""
+    lines.append("")
+    if shown == len(numbered):
+        lines.append(f"Notes/History{scope} ({shown}):")
+    elif shown:
+        lines.append(f"Notes/History{scope} ({journal_offset + 1}-{journal_offset + shown} of {len(numbered)}):")
+    else:
+        lines.append(f"Notes/History{scope} (0 of {len(numbered)} after offset {journal_offset})")
+    for block in blocks:
+        lines.extend(block)
+
+    next_offset = journal_offset + shown
+    if shown and next_offset < len(numbered):
+        lines.append("")
+        lines.append(f"... {len(numbered) - next_offset} more notes. "
+                     f"Continue with journal_offset={next_offset}")
+
+    return "\n".join(lines)
+
+
+def format_project_issues(project_name: str, status_filter: str, issues: List[RedmineIssue]) -> str:
+    """Render a project's issue list as a table"""
+    lines = [
+        f"Project: {project_name}",
+        f"Status filter: {status_filter}",
+        f"Found {len(issues)} issues:",
+        "",
+        f"{'ID':<8} {'Title':<40} {'Status':<12} {'Assigned To':<15} {'Updated':<10}",
+        f"{'-'*8} {'-'*40} {'-'*12} {'-'*15} {'-'*10}",
+    ]
+    for issue in issues:
+        title = _truncate(issue.subject, 40)
+        status = issue.status.get('name', 'N/A')[:10]
+        assignee = issue.assigned_to.get('name', 'Unassigned')[:13] if issue.assigned_to else 'Unassigned'
+        updated = issue.updated_on[:10] if issue.updated_on else 'N/A'
+        lines.append(f"{issue.id:<8} {title:<40} {status:<12} {assignee:<15} {updated:<10}")
+    return "\n".join(lines)
+
+
+def format_my_issues(user_name: str, status_filter: str, issues: List[RedmineIssue]) -> str:
+    """Render the current user's issue list as a table"""
+    lines = [
+        f"Issues assigned to {user_name}:",
+        f"Status filter: {status_filter}",
+        f"Found {len(issues)} issues:",
+        "",
+        f"{'ID':<8} {'Title':<35} {'Project':<15} {'Status':<12} {'Updated':<10}",
+        f"{'-'*8} {'-'*35} {'-'*15} {'-'*12} {'-'*10}",
+    ]
+    for issue in issues:
+        title = _truncate(issue.subject, 35)
+        project_name = issue.project.get('name', 'N/A')[:13]
+        status = issue.status.get('name', 'N/A')[:10]
+        updated = issue.updated_on[:10] if issue.updated_on else 'N/A'
+        lines.append(f"{issue.id:<8} {title:<35} {project_name:<15} {status:<12} {updated:<10}")
+    return "\n".join(lines)
+
+
+def format_search_results(query: str, issues: List[RedmineIssue], project_id: Optional[int] = None) -> str:
+    """Render issue search results as a table"""
+    lines = [f"Search keyword: '{query}'"]
+    if project_id:
+        lines.append(f"Search scope: Project {project_id}")
+    lines.append(f"Found {len(issues)} related issues:")
+    lines.append("")
+    lines.append(f"{'ID':<8} {'Title':<35} {'Status':<12} {'Project':<15}")
+    lines.append(f"{'-'*8} {'-'*35} {'-'*12} {'-'*15}")
+    for issue in issues:
+        title = _truncate(issue.subject, 35)
+        status = issue.status.get('name', 'N/A')[:10]
+        project_name = issue.project.get('name', 'N/A')[:13]
+        lines.append(f"{issue.id:<8} {title:<35} {status:<12} {project_name:<15}")
+    return "\n".join(lines) + "\n"
+
+
+def format_issue_counts(scope: str, total: int, row_label: str, column_names: List[str],
+                        rows: List[Tuple[str, List[int]]]) -> str:
+    """Render an issue count matrix, sizing columns to their contents"""
+    name_width = max([len(row_label)] + [len(name) for name, _ in rows])
+    widths = [max(len(name), 5) for name in column_names]
+    lines = [
+        f"Issue counts {scope}",
+        f"Total: {total}",
+        "",
+        " ".join([f"{row_label:<{name_width}}"] + [f"{name:>{width}}" for name, width in zip(column_names, widths)]),
+        " ".join(['-' * name_width] + ['-' * width for width in widths]),
+    ]
+    for name, counts in rows:
+        lines.append(" ".join([f"{name:<{name_width}}"] +
+                              [f"{count:>{width}}" for count, width in zip(counts, widths)]))
+    return "\n".join(lines)
+
+
+def format_time_report(scope: str, group_labels: List[str], rows: List[Tuple[Tuple[str, ...], float, int]]) -> str:
+    """Render hours per group, largest first, with a total line"""
+    widths = [max([len(label)] + [len(key[i]) for key, _, _ in rows]) for i, label in enumerate(group_labels)]
+    total_hours = sum(hours for _, hours, _ in rows)
+    total_entries = sum(count for _, _, count in rows)
+    lines = [
+        f"Time report {scope}",
+        f"Total: {total_hours:.2f} hours in {total_entries} entries",
+        "",
+        " ".join([f"{label:<{width}}" for label, width in zip(group_labels, widths)] + [f"{'Hours':>8}", "Entries"]),
+        " ".join(['-' * width for width in widths] + ['-' * 8, '-' * 7]),
+    ]
+    for key, hours, count in rows:
+        lines.append(" ".join([f"{part:<{width}}" for part, width in zip(key, widths)] +
+                              [f"{hours:>8.2f}", f"{count:>7}"]))
+    return "\n".join(lines)
+
+
+def format_issue_graph(roots: List[int], graph: Dict[str, Any]) -> str:
+    """Render an issue graph as one line per issue followed by its outgoing links"""
+    nodes = graph['nodes']
+    outgoing: Dict[int, List[str]] = {}
+    for source, kind, target in graph['edges']:
+        outgoing.setdefault(source, []).append(f"{kind} #{target}")
+    max_depth = max(graph['depth'].values(), default=0)
+    lines = [
+        f"Issue graph from {', '.join(f'#{root}' for root in roots)} "
+        f"({len(nodes)} issues, depth {max_depth}, {graph['requests']} requests)",
+        "",
+    ]
+    for issue_id, data in nodes.items():
+        tracker = data.get('tracker', {}).get('name', 'N/A')
+        status = data.get('status', {}).get('name', 'N/A')
+        indent = "  " * graph['depth'][issue_id]
+        lines.append(f"{indent}#{issue_id} [{tracker}] {data.get('subject', '')} ({status})")
+        if issue_id in outgoing:
+            lines.append(f"{indent}  -> {', '.join(outgoing[issue_id])}")
+    if graph['truncated']:
+        lines.append("")
+        lines.append("Graph truncated by depth or node limit; some linked issues are not shown")
+    return "\n".join(lines)
+
+
+def format_flow_report(scope: str, report: Any) -> str:
+    """Render flow metrics: lead/cycle time percentiles, weekly throughput and WIP aging"""
+    def spread(times: Dict[str, float]) -> str:
+        return ", ".join(f"{key} {value:.1f}d" for key, value in times.items()) or "N/A"
+    
+    lines = [
+        f"Flow metrics {scope}, last {len(report.week_starts)} weeks",
+        "",
+        f"Closed: {report.closed} issues",
+        f"Lead time (created -> closed): {spread(report.lead_time)}",
+    ]
+    if report.transitions_read:
+        lines.append(f"Cycle time (first status change -> closed, {report.cycle_time_issues} issues): "
+                     f"{spread(report.cycle_time)}")
+    elif report.transitions_skipped:
+        lines.append(f"Cycle time: skipped, {report.transitions_skipped} issues exceed the status history limit "
+                     f"(narrow project_id or weeks)")
+    else:
+        lines.append("Cycle time: not computed (status history not read)")
+    lines.append("")
+    lines.append("Weekly throughput:")
+    peak = max(report.throughput, default=0)
+    for week, count in zip(report.week_starts, report.throughput):
+        bar = "#" * round(count * 30 / peak) if peak else ""
+        lines.append(f"  {week} {count:>5} {bar}")
+    lines.append("")
+    # Without status history, ages are measured from creation
+    since = "work started" if report.transitions_read else "created"
+    lines.append(f"Work in progress: {report.wip} open issues, age since {since}:")
+    width = max(len(bucket) for bucket in report.aging_buckets)
+    for bucket, count in zip(report.aging_buckets, report.aging):
+        lines.append(f"  {bucket:<{width}} {count:>5}")
+    return "\n".join(lines)
+
+
+def journal_changes(journal: Dict[str, Any]) -> List[List[Any]]:
+    """A journal's field changes as [field, old, new] rows"""
+    changes = []
+    for detail in journal.get('details') or ():
+        name = detail.get('name')
+        if detail.get('property', 'attr') != 'attr':
+            name = f"{detail.get('property')} {name}"
+        changes.append([name, detail.get('old_value'), detail.get('new_value')])
+    return changes
+
+
+def format_changes(since: str, result: Dict[str, Any], note_width: int = 200) -> str:
+    """Render changed issues with the journals written since the cursor, oldest first"""
+    issues = result['issues']
+    lines = [f"Changes since {since}: {len(issues)} issues (cursor {result['cursor']})"]
+    if not issues:
+        lines.append("")
+        lines.append("No changes")
+    for issue in issues:
+        tracker = issue.get('tracker', {}).get('name', 'N/A')
+        status = issue.get('status', {}).get('name', 'N/A')
+        created = " [new]" if (issue.get('created_on') or '') >= since else ""
+        lines.append("")
+        lines.append(f"#{issue['id']} [{tracker}] {issue.get('subject', '')} ({status}), "
+                     f"updated {issue.get('updated_on', 'N/A')}{created}")
+        for journal in issue.get('journals') or ():
+            parts = [f"{name} {old} -> {new}" for name, old, new in journal_changes(journal)]
+            notes = (journal.get('notes') or '').strip()
+            if notes:
+                parts.append(f'note: "{_truncate(" ".join(notes.split()), note_width)}"')
+            lines.append(f"  {journal.get('created_on', 'N/A')} {_name(journal.get('user')) or 'N/A'}: "
+                         f"{'; '.join(parts) or 'updated'}")
+    if result['more']:
+        lines.append("")
+        lines.append("More changes are waiting; call again to continue from the cursor")
+    return "\n".join(lines)
+
+
+# -- Structured (JSON) output ------------------------------------------------
+
+def to_json(data: Any) -> str:
+    """Serialize tool output as compact JSON"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def project_fields(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested keys of a record ("id" is always kept)"""
+    if not fields:
+        return record
+    return {key: record[key] for key in dict.fromkeys(('id', *fields)) if key in record}
+
+
+def _name(ref: Optional[Dict[str, Any]]) -> Optional[str]:
+    return ref.get('name') if ref else None
+
+
+def _compact(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty values to keep responses small"""
+    return {key: value for key, value in record.items() if value is not None and value != []}
+
+
+Getters = Dict[str, Callable[[Any], Any]]
+
+# Structured fields of list items, as field name -> getter on the client object
+ISSUE_FIELDS: Getters = {
+    'id': lambda issue: issue.id,
+    'subject': lambda issue: issue.subject,
+    'project': lambda issue: _name(issue.project),
+    'tracker': lambda issue: _name(issue.tracker),
+    'status': lambda issue: _name(issue.status),
+    'priority': lambda issue: _name(issue.priority),
+    'author': lambda issue: _name(issue.author),
+    'assigned_to': lambda issue: _name(issue.assigned_to),
+    'done_ratio': lambda issue: issue.done_ratio,
+    'created_on': lambda issue: issue.created_on,
+    'updated_on': lambda issue: issue.updated_on,
+}
+
+PROJECT_FIELDS: Getters = {
+    'id': lambda project: project.id,
+    'identifier': lambda project: project.identifier,
+    'name': lambda project: project.name,
+    'description': lambda project: project.description or None,
+    'status': lambda project: 'active' if project.status == 1 else 'archived',
+    'parent_id': lambda project: project.parent_id,
+    'created_on': lambda project: project.created_on,
+    'updated_on': lambda project: project.updated_on,
+}
+
+USER_FIELDS: Getters = {
+    'id': lambda user: user.id,
+    'login': lambda user: user.login,
+    'name': lambda user: f"{user.firstname} {user.lastname}".strip() or user.login,
+    'mail': lambda user: user.mail or None,
+    'status': lambda user: 'enabled' if user.status == 1 else 'disabled',
+    'created_on': lambda user: user.created_on,
+    'last_login_on': lambda user: user.last_login_on,
+}
+
+
+def table(items: Iterable[Any], getters: Getters, fields: Optional[List[str]],
+          default_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Columnar form of a list: {"columns": [...], "rows": [[...], ...]}; keys are not repeated
+    per row, and only the requested (or default) columns are computed. Unknown fields are ignored."""
+    columns = [column for column in dict.fromkeys(('id', *(fields or default_fields))) if column in getters]
+    row_getters = [getters[column] for column in columns]
+    return {'columns': columns, 'rows': [[get(item) for get in row_getters] for item in items]}
+
+
+def issue_record(issue: RedmineIssue) -> Dict[str, Any]:
+    """Compact structured summary of an issue"""
+    return _compact({key: get(issue) for key, get in ISSUE_FIELDS.items()})
+
+
+# Columns of the notes table in get_issue's JSON output ("n" is the note's number in the issue)
+NOTE_COLUMNS = ('n', 'user', 'created_on', 'notes')
+
+
+def issue_detail_record(issue_data: Dict[str, Any], domain: str, journal_offset: int = 0,
+                        journal_limit: Optional[int] = None, since: Optional[datetime] = None,
+                        max_chars: Optional[int] = None) -> Dict[str, Any]:
+    """Structured counterpart of format_issue, with the same note selection and budget"""
+    parent = issue_data.get('parent')
+    record = _compact({
+        'id': issue_data['id'],
+        'subject': issue_data.get('subject'),
+        'project': _name(issue_data.get('project')),
+        'project_id': (issue_data.get('project') or {}).get('id'),
+        'tracker': _name(issue_data.get('tracker')),
+        'status': _name(issue_data.get('status')),
+        'priority': _name(issue_data.get('priority')),
+        'author': _name(issue_data.get('author')),
+        'assigned_to': _name(issue_data.get('assigned_to')),
+        'parent_id': parent['id'] if parent else None,
+        'done_ratio': issue_data.get('done_ratio'),
+        'start_date': issue_data.get('start_date'),
+        'due_date': issue_data.get('due_date'),
+        'estimated_hours': issue_data.get('estimated_hours'),
+        'created_on': issue_data.get('created_on'),
+        'updated_on': issue_data.get('updated_on'),
+        'closed_on': issue_data.get('closed_on'),
+        'description': issue_data.get('description') or None,
+    })
+
+    if issue_data.get('attachments'):
+        record['attachments'] = [_compact({
+            'id': a.get('id'), 'filename': a.get('filename'), 'filesize': a.get('filesize'),
+            'content_type': a.get('content_type'), 'author': _name(a.get('author')),
+            'created_on': a.get('created_on'),
+            'url': f"{domain}/attachments/download/{a.get('id', '')}/{a.get('filename', '')}",
+        }) for a in issue_data['attachments']]
+    if issue_data.get('children'):
+        record['children'] = [_compact({'id': c.get('id'), 'tracker': _name(c.get('tracker')),
+                                         'subject': c.get('subject')}) for c in issue_data['children']]
+    if issue_data.get('relations'):
+        record['relations'] = [_compact({
+            'type': r.get('relation_type'),
+            'issue_id': r.get('issue_to_id') if r.get('issue_id') == issue_data['id'] else r.get('issue_id'),
+            'delay': r.get('delay'),
+        }) for r in issue_data['relations']]
+    if issue_data.get('changesets'):
+        record['changesets'] = [_compact({
+            'revision': c.get('revision'), 'user': _name(c.get('user')),
+            'committed_on': c.get('committed_on'), 'comments': c.get('comments'),
+        }) for c in issue_data['changesets']]
+    if issue_data.get('watchers'):
+        record['watchers'] = [_name(w) for w in issue_data['watchers']]
+
+    numbered = _select_journals(issue_data, since)
+    if numbered:
+        rows = []
+        private = []
+        used = len(to_json(record)) + 128 if max_chars is not None else 0
+        for i, journal in _journal_window(numbered, journal_offset, journal_limit):
+            row = [i, _name(journal.get('user')), journal.get('created_on'), journal.get('notes', '').strip()]
+            # Only serialize notes for sizing when a budget applies
+            size = len(to_json(row)) + 1 if max_chars is not None else 0
+            if not _fits(used, size, max_chars, rows):
+                break
+            rows.append(row)
+            used += size
+            if journal.get('private_notes'):
+                private.append(i)
+        record['notes'] = {'columns': list(NOTE_COLUMNS), 'rows': rows}
+        if private:
+            record['private_notes'] = private
+        record['notes_total'] = len(numbered)
+        next_offset = journal_offset + len(rows)
+        if rows and next_offset < len(numbered):
+            record['next_journal_offset'] = next_offset
+
+    return record
+
+
+# Default columns of list tools in JSON mode (the same columns as their text tables)
+ISSUE_COLUMNS = ('subject', 'status', 'assigned_to', 'updated_on')
+MY_ISSUE_COLUMNS = ('subject', 'project', 'status', 'updated_on')
+SEARCH_COLUMNS = ('subject', 'status', 'project')
+PROJECT_COLUMNS = ('identifier', 'name', 'status', 'parent_id')
+USER_COLUMNS = ('login', 'name', 'mail', 'status')
+
+
+def enumeration_record(item: Dict[str, Any], *flags: str) -> Dict[str, Any]:
+    """Compact record of an enumeration value (status, tracker, priority, ...)"""
+    record = {'id': item['id'], 'name': item['name']}
+    for flag in flags:
+        if item.get(flag):
+            record[flag] = True
+    if item.get('default_status'):
+        record['default_status'] = _name(item['default_status'])
+    return record
+
+
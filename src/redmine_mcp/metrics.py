@@ -0,0 +1,298 @@
+"""
+Request and tool metrics
+Records latency histograms, status codes, retries, cache hits and bytes transferred
+"""
+
+import functools
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Latency histogram bucket upper bounds in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Path segments after these collections are identifiers, even when not numeric
+_IDENTIFIER_COLLECTIONS = {'projects', 'users', 'watchers', 'download'}
+
+_NUMERIC_SEGMENT = re.compile(r'^\d+(\.\w+)?$')
+
+# Tools catch their exceptions and return a message with one of these prefixes instead
+ERROR_PREFIXES = ('Error:', 'System error:', 'Failed to ')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Collapse ids in an API path, e.g. /issues/12.json -> /issues/{id}.json"""
+    segments = endpoint.split('?')[0].strip('/').split('/')
+    templated = []
+    for i, segment in enumerate(segments):
+        previous = segments[i - 1] if i > 0 else ''
+        match = _NUMERIC_SEGMENT.match(segment)
+        if match:
+            templated.append('{id}' + (match.group(1) or ''))
+        elif previous in _IDENTIFIER_COLLECTIONS:
+            ext = segment[segment.rfind('.'):] if segment.endswith('.json') else ''
+            templated.append('{id}' + ext)
+        elif templated and templated[-1] == '{id}' and i >= 2 and segments[i - 2] == 'download':
+            # /attachments/download/{id}/{filename}
+            templated.append('{filename}')
+        else:
+            templated.append(segment)
+    return '/' + '/'.join(templated)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record a single observation"""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within buckets"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            in_bucket = self.counts[i]
+            if seen + in_bucket >= rank and in_bucket:
+                return min(lower + (bound - lower) * (rank - seen) / in_bucket, self.max)
+            seen += in_bucket
+            lower = bound
+        return self.max
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Bucket counts in Prometheus exposition order ("le" label, cumulative count)"""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((f"{bound:g}", running))
+        result.append(("+Inf", running + self.counts[-1]))
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe in-process metrics store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded metrics"""
+        with self._lock:
+            self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+            self.request_status: Dict[Tuple[str, str, str], int] = {}
+            self.request_retries: Dict[Tuple[str, str], int] = {}
+            self.bytes_received: Dict[Tuple[str, str], int] = {}
+            self.bytes_sent: Dict[Tuple[str, str], int] = {}
+            self.tool_latency: Dict[str, Histogram] = {}
+            self.tool_errors: Dict[str, int] = {}
+            self.tool_response_chars: Dict[str, int] = {}
+            self.cache_hits: Dict[str, int] = {}
+            self.cache_misses: Dict[str, int] = {}
+
+    def observe_request(self, method: str, endpoint: str, status: str, duration: float,
+                        received: int = 0, sent: int = 0):
+        """Record one HTTP request to Redmine"""
+        key = (method.upper(), endpoint_template(endpoint))
+        with self._lock:
+            self.request_latency.setdefault(key, Histogram()).observe(duration)
+            status_key = key + (str(status),)
+            self.request_status[status_key] = self.request_status.get(status_key, 0) + 1
+            self.bytes_received[key] = self.bytes_received.get(key, 0) + received
+            self.bytes_sent[key] = self.bytes_sent.get(key, 0) + sent
+
+    def record_retry(self, method: str, endpoint: str):
+        """Record a retried HTTP request"""
+        key = (method.upper(), endpoint_template(endpoint))
+        with self._lock:
+            self.request_retries[key] = self.request_retries.get(key, 0) + 1
+
+    def observe_tool(self, tool: str, duration: float, error: bool = False, response_chars: int = 0):
+        """Record one MCP tool call"""
+        with self._lock:
+            self.tool_latency.setdefault(tool, Histogram()).observe(duration)
+            if error:
+                self.tool_errors[tool] = self.tool_errors.get(tool, 0) + 1
+            self.tool_response_chars[tool] = self.tool_response_chars.get(tool, 0) + response_chars
+
+    def record_cache(self, cache: str, hit: bool):
+        """Record a cache lookup"""
+        with self._lock:
+            counter = self.cache_hits if hit else self.cache_misses
+            counter[cache] = counter.get(cache, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def histogram(name: str, help_text: str, series: Dict[Any, Histogram], labels: Callable[[Any], str]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(series.items()):
+                base = labels(key)
+                for le, count in hist.cumulative_counts():
+                    lines.append(f'{name}_bucket{{{base},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{base}}} {hist.sum:.6f}")
+                lines.append(f"{name}_count{{{base}}} {hist.count}")
+
+        def counter(name: str, help_text: str, series: Dict[Any, int], labels: Callable[[Any], str]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{{{labels(key)}}} {value}")
+
+        def endpoint_labels(key):
+            return f'method="{key[0]}",endpoint="{key[1]}"'
+
+        with self._lock:
+            histogram("redmine_mcp_request_duration_seconds", "Redmine API request latency",
+                      self.request_latency, endpoint_labels)
+            counter("redmine_mcp_requests_total", "Redmine API requests by status code",
+                    self.request_status, lambda k: f'{endpoint_labels(k)},status="{k[2]}"')
+            counter("redmine_mcp_request_retries_total", "Retried Redmine API requests",
+                    self.request_retries, endpoint_labels)
+            counter("redmine_mcp_response_bytes_total", "Bytes received from Redmine",
+                    self.bytes_received, endpoint_labels)
+            counter("redmine_mcp_request_bytes_total", "Bytes sent to Redmine",
+                    self.bytes_sent, endpoint_labels)
+            histogram("redmine_mcp_tool_duration_seconds", "MCP tool call latency",
+                      self.tool_latency, lambda k: f'tool="{k}"')
+            counter("redmine_mcp_tool_errors_total", "MCP tool calls that failed",
+                    self.tool_errors, lambda k: f'tool="{k}"')
+            counter("redmine_mcp_tool_response_chars_total", "Characters returned by MCP tools",
+                    self.tool_response_chars, lambda k: f'tool="{k}"')
+            counter("redmine_mcp_cache_hits_total", "Cache hits",
+                    self.cache_hits, lambda k: f'cache="{k}"')
+            counter("redmine_mcp_cache_misses_total", "Cache misses",
+                    self.cache_misses, lambda k: f'cache="{k}"')
+
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self) -> str:
+        """Format metrics as readable tables"""
+        with self._lock:
+            uptime = time.time() - self.started_at
+            result = f"Metrics (uptime {uptime:.0f}s)\n\n"
+
+            result += "Redmine API requests:\n"
+            result += f"{'Endpoint':<45} {'Count':>6} {'p50 ms':>8} {'p95 ms':>8} {'Max ms':>8} {'KB in':>8}\n"
+            result += f"{'-'*45} {'-'*6} {'-'*8} {'-'*8} {'-'*8} {'-'*8}\n"
+            for key, hist in sorted(self.request_latency.items(), key=lambda item: -item[1].sum):
+                endpoint = f"{key[0]} {key[1]}"[:45]
+                kb_in = self.bytes_received.get(key, 0) / 1024
+                result += (f"{endpoint:<45} {hist.count:>6} {hist.quantile(0.5) * 1000:>8.1f} "
+                           f"{hist.quantile(0.95) * 1000:>8.1f} {hist.max * 1000:>8.1f} {kb_in:>8.1f}\n")
+
+            statuses: Dict[str, int] = {}
+            for (_, _, status), count in self.request_status.items():
+                statuses[status] = statuses.get(status, 0) + count
+            if statuses:
+                result += "Status codes: " + ", ".join(f"{s}={c}" for s, c in sorted(statuses.items())) + "\n"
+            retries = sum(self.request_retries.values())
+            result += f"Retries: {retries}\n"
+
+            result += "\nMCP tools:\n"
+            result += f"{'Tool':<30} {'Count':>6} {'p50 ms':>8} {'p95 ms':>8} {'Max ms':>8} {'Errors':>6}\n"
+            result += f"{'-'*30} {'-'*6} {'-'*8} {'-'*8} {'-'*8} {'-'*6}\n"
+            for tool, hist in sorted(self.tool_latency.items(), key=lambda item: -item[1].sum):
+                result += (f"{tool[:30]:<30} {hist.count:>6} {hist.quantile(0.5) * 1000:>8.1f} "
+                           f"{hist.quantile(0.95) * 1000:>8.1f} {hist.max * 1000:>8.1f} "
+                           f"{self.tool_errors.get(tool, 0):>6}\n")
+
+            caches = sorted(set(self.cache_hits) | set(self.cache_misses))
+            if caches:
+                result += "\nCaches:\n"
+                for cache in caches:
+                    hits = self.cache_hits.get(cache, 0)
+                    misses = self.cache_misses.get(cache, 0)
+                    result += f"- {cache}: {hits} hits, {misses} misses\n"
+
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize metrics as a plain dict (latencies in milliseconds)"""
+        def latency(hist: Histogram) -> Dict[str, Any]:
+            return {'count': hist.count, 'p50_ms': round(hist.quantile(0.5) * 1000, 1),
+                    'p95_ms': round(hist.quantile(0.95) * 1000, 1), 'max_ms': round(hist.max * 1000, 1)}
+
+        with self._lock:
+            statuses: Dict[str, int] = {}
+            for (_, _, status), count in self.request_status.items():
+                statuses[status] = statuses.get(status, 0) + count
+            return {
+                'uptime_s': round(time.time() - self.started_at),
+                'requests': {f"{key[0]} {key[1]}": dict(latency(hist), kb_in=round(self.bytes_received.get(key, 0) / 1024, 1))
+                             for key, hist in sorted(self.request_latency.items())},
+                'status_codes': dict(sorted(statuses.items())),
+                'retries': sum(self.request_retries.values()),
+                'tools': {tool: dict(latency(hist), errors=self.tool_errors.get(tool, 0))
+                          for tool, hist in sorted(self.tool_latency.items())},
+                'caches': {cache: {'hits': self.cache_hits.get(cache, 0), 'misses': self.cache_misses.get(cache, 0)}
+                           for cache in sorted(set(self.cache_hits) | set(self.cache_misses))},
+            }
+
+
+def is_error_result(result: Any) -> bool:
+    """Whether a tool's output is an error message (text, or {"error": ...} in JSON mode)"""
+    if not isinstance(result, str):
+        return False
+    if result.startswith('{"error":'):
+        try:
+            result = json.loads(result)['error']
+        except (ValueError, KeyError, TypeError):
+            return True
+    return isinstance(result, str) and result.startswith(ERROR_PREFIXES)
+
+
+def timed_tool(func: Callable) -> Callable:
+    """Wrap an MCP tool function to record its latency, and as errors the calls that raise or
+    return an error message"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = True
+        response_chars = 0
+        try:
+            result = func(*args, **kwargs)
+            error = is_error_result(result)
+            if isinstance(result, str):
+                response_chars = len(result)
+            return result
+        finally:
+            get_metrics().observe_tool(func.__name__, time.perf_counter() - start, error, response_chars)
+    return wrapper
+
+
+# Global metrics instance
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get global metrics instance (singleton pattern)"""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
@@ -0,0 +1,87 @@
+"""
+Project index
+In-memory project hierarchy with id, identifier and name lookups
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class ProjectIndex:
+    """Projects keyed by id, with identifier/name maps and parent-child links
+
+    Entries are replaced only when a project's updated_on changes, so refreshing from a
+    new project listing touches just the projects that were added, changed or removed.
+    """
+
+    def __init__(self, projects: Iterable[Any] = ()):
+        self.projects: Dict[int, Any] = {}
+        self.by_identifier: Dict[str, int] = {}
+        self.by_name: Dict[str, int] = {}
+        self.children: Dict[Optional[int], List[int]] = {}
+        self.update(projects)
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def update(self, projects: Iterable[Any]) -> Tuple[int, int, int]:
+        """Merge a full project listing; returns (added, changed, removed) counts"""
+        seen = set()
+        added = changed = 0
+        for project in projects:
+            seen.add(project.id)
+            current = self.projects.get(project.id)
+            if current is None:
+                added += 1
+            elif current.updated_on != project.updated_on or current.updated_on is None:
+                changed += 1
+            else:
+                continue
+            self.projects[project.id] = project
+
+        removed = [project_id for project_id in self.projects if project_id not in seen]
+        for project_id in removed:
+            del self.projects[project_id]
+
+        if added or changed or removed:
+            self._rebuild_maps()
+        return added, changed, len(removed)
+
+    def _rebuild_maps(self):
+        self.by_identifier = {p.identifier: p.id for p in self.projects.values()}
+        self.by_name = {p.name.lower(): p.id for p in self.projects.values()}
+        self.children = {}
+        for project in sorted(self.projects.values(), key=lambda p: p.name.lower()):
+            parent_id = project.parent_id if project.parent_id in self.projects else None
+            self.children.setdefault(parent_id, []).append(project.id)
+
+    def resolve(self, ref: Union[int, str]) -> Optional[Any]:
+        """Find a project by id, identifier or name (case-insensitive)"""
+        if isinstance(ref, int) or (isinstance(ref, str) and ref.strip().isdigit()):
+            return self.projects.get(int(ref))
+        ref = ref.strip()
+        project_id = self.by_identifier.get(ref) or self.by_name.get(ref.lower())
+        return self.projects.get(project_id) if project_id else None
+
+    def subtree(self, project_id: int) -> List[int]:
+        """Ids of a project and all its descendants"""
+        ids = [project_id]
+        for child_id in self.children.get(project_id, []):
+            ids.extend(self.subtree(child_id))
+        return ids
+
+    def path(self, project_id: int) -> List[Any]:
+        """Ancestors of a project from the root down, ending with the project itself"""
+        path = []
+        project = self.projects.get(project_id)
+        while project is not None and project not in path:
+            path.append(project)
+            project = self.projects.get(project.parent_id)
+        return list(reversed(path))
+
+    def walk(self, root_id: Optional[int] = None) -> Iterator[Tuple[Any, int]]:
+        """Depth-first (project, depth) pairs, children sorted by name"""
+        stack = [(child_id, 0) for child_id in reversed(self.children.get(root_id, []))]
+        while stack:
+            project_id, depth = stack.pop()
+            yield self.projects[project_id], depth
+            stack.extend((child_id, depth + 1) for child_id in reversed(self.children.get(project_id, [])))
@@ -3,18 +3,115 @@ Redmine API client
 Responsible for HTTP communication with the Redmine system
 """
 
-import requests
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Union
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime
+import hashlib
 import json
 import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    # Advisory locking is unavailable (e.g. Windows); atomic renames still apply
+    fcntl = None
+
 from .config import get_config
+from .metrics import get_metrics
+from .project_index import ProjectIndex
+from .throttle import CircuitBreaker, RequestGovernor
 from .validators import RedmineValidator, validate_and_clean_data, RedmineValidationError
 
 
+# Bump whenever the on-disk layout of the enumeration cache changes
+CACHE_FORMAT_VERSION = 1
+
+# Enumeration cache lifetime in seconds (24 hours)
+CACHE_TTL = 86400
+
+# Cache files untouched for this long (30 days) are treated as orphaned
+CACHE_ORPHAN_AGE = 30 * 86400
+
+# Leftover temp files from interrupted writes are removed after one hour
+CACHE_TMP_ORPHAN_AGE = 3600
+
+# Project index lifetime in seconds before it is checked against Redmine again
+PROJECT_INDEX_TTL = 300
+
+# Responses fetched during warm-up are served once, if used within this many seconds
+PREFETCH_TTL = 300
+
+# Sections that can be requested with an issue through the `include` parameter
+ISSUE_INCLUDES = ('attachments', 'changesets', 'children', 'journals', 'relations', 'watchers')
+
+# RedmineIssue attributes that list calls can project with `fields` ("id" is always kept)
+ISSUE_ATTRIBUTES = ('subject', 'description', 'status', 'priority', 'project', 'tracker', 'author',
+                'assigned_to', 'created_on', 'updated_on', 'done_ratio')
+
+# Largest page Redmine returns for list endpoints
+MAX_PAGE_SIZE = 100
+
+# Minimum keep-alive connection pool size (requests' default)
+DEFAULT_POOL_SIZE = 10
+
+# Count queries kept in flight at once by count_issues_many (within the connection pool)
+COUNT_CONCURRENCY = 8
+
+# Concurrent writes of bulk_create_time_entries (paced by the client's rate limit)
+BULK_CONCURRENCY = 4
+
+# Responses that mean Redmine is overloaded: back off and retry
+BACKOFF_STATUSES = (429, 503)
+
+# Retries of a throttled request, and the backoff used when Redmine sends no Retry-After
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+MAX_BACKOFF = 30.0
+
+# Last good GET responses kept for stale-if-error serving, and the oldest copy still served
+STALE_CACHE_SIZE = 500
+STALE_MAX_AGE = 86400
+
+# Keys accepted for each row of bulk_create_time_entries (create_time_entry arguments)
+TIME_ENTRY_KEYS = ('issue_id', 'hours', 'activity_id', 'comments', 'spent_on', 'user_id')
+
+# Bytes read per chunk when streaming attachment downloads to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Mode of downloaded files, which may be hard-linked to other downloads of the same content
+READ_ONLY = 0o444
+
+# Bytes read from disk per chunk when streaming a file to /uploads.json
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Fields of an upload that create_issue/update_issue pass on to Redmine
+UPLOAD_KEYS = ('token', 'filename', 'content_type', 'description')
+
+# Issue pages export_issues requests ahead of the writer
+EXPORT_CONCURRENCY = 4
+
+# wait_for_issue_change polling: first interval, longest interval and growth per quiet tick (seconds)
+WAIT_MIN_INTERVAL = 1.0
+WAIT_MAX_INTERVAL = 15.0
+WAIT_BACKOFF = 1.5
+
+# Issue relation types, as Redmine orients them (issue_id <type> issue_to_id)
+RELATION_TYPES = ('relates', 'duplicates', 'duplicated', 'blocks', 'blocked', 'precedes', 'follows',
+                  'copied_to', 'copied_from')
+
+# Groupings supported by aggregate_time_entries
+TIME_ENTRY_GROUPS = ('user', 'activity', 'project', 'issue', 'day', 'week')
+
+
 @dataclass
 class RedmineIssue:
     """Redmine issue data structure"""
@@ -42,6 +139,7 @@ class RedmineProject:
     status: int
     created_on: Optional[str] = None
     updated_on: Optional[str] = None
+    parent_id: Optional[int] = None
 
 
 @dataclass
@@ -65,64 +163,287 @@ class RedmineAPIError(Exception):
         self.response_data = response_data
 
 
+class FileBody:
+    """Request body that streams a file in chunks with a known length
+
+    requests sends it with a Content-Length header rather than chunked encoding, and each
+    iteration reopens the file, so a retried request sends the whole file again. At most
+    one chunk is in memory at a time.
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.size = self.path.stat().st_size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[bytes]:
+        remaining = self.size
+        with open(self.path, 'rb') as f:
+            # Never send more than the announced length, even if the file grows meanwhile
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise RedmineAPIError(f"File {self.path} shrank while it was being uploaded")
+                remaining -= len(chunk)
+                yield chunk
+
+
+# Ages (seconds) of stale responses served to the current thread, see collect_stale_reads
+_stale_reads = threading.local()
+
+
+@contextmanager
+def collect_stale_reads() -> Iterator[List[float]]:
+    """Collect the ages of cached responses served in place of failed reads in this thread"""
+    previous = getattr(_stale_reads, 'ages', None)
+    _stale_reads.ages = ages = []
+    try:
+        yield ages
+    finally:
+        _stale_reads.ages = previous
+
+
 class RedmineClient:
     """Redmine API client"""
     
     def __init__(self):
+        # requests is imported lazily so that loading the server stays fast
+        import requests
+        
         self.config = get_config()
         self.session = requests.Session()
         self.session.headers.update(self.config.api_headers)
         self.session.timeout = self.config.redmine_timeout
         
-        # Cache settings
-        self.cache_dir = Path.home() / ".redmine_mcp"
-        self.cache_dir.mkdir(exist_ok=True)
+        # Rate limit and in-flight cap shared by every request, including concurrent fan-out
+        self.governor = RequestGovernor(self.config.max_rps, self.config.max_concurrency)
+        
+        # Circuits for reads and writes, and last good GET responses served while reads fail
+        self.breakers = {'read': CircuitBreaker('read'), 'write': CircuitBreaker('write')}
+        self._last_good: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._last_good_lock = threading.Lock()
         
-        # Create a unique cache file name based on the domain
-        domain_hash = hash(self.config.redmine_domain)
+        # Keep-alive pool large enough for the connections opened during warm-up or in flight
+        pool_size = max(DEFAULT_POOL_SIZE, self.config.warmup_connections, self.config.max_concurrency)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Cache settings (directory is created on first cache access)
+        self.cache_dir = Path(self.config.cache_dir)
+        
+        # Create a stable cache file name based on the domain and API user.
+        # hash() is randomized per process, so use a content digest that survives restarts
+        cache_key = hashlib.sha256(
+            f"{self.config.redmine_domain}\n{self.config.redmine_api_key}".encode('utf-8')
+        ).hexdigest()[:16]
         safe_domain = self.config.redmine_domain.replace('://', '_').replace('/', '_').replace(':', '_')
-        self._cache_file = self.cache_dir / f"cache_{safe_domain}_{abs(domain_hash)}.json"
+        self._cache_file = self.cache_dir / f"cache_{safe_domain}_{cache_key}.json"
+        self._lock_file = self._cache_file.with_suffix('.lock')
+        # The file lock only excludes other processes; threads of this client take the RLock,
+        # and each thread tracks its own nesting so only its outermost level takes the flock
+        self._cache_thread_lock = threading.RLock()
+        self._cache_lock_state = threading.local()
+        self._safe_domain = safe_domain
+        self._cache_dir_ready = False
         self._enum_cache: Optional[Dict[str, Any]] = None
+        
+        # One-shot responses fetched during warm-up, keyed by request
+        self._prefetched: Dict[tuple, tuple] = {}
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_state = threading.local()
+        
+        # Issue views cached per issue: base fields plus every include section fetched so far
+        self._issue_views: Dict[int, Dict[str, Any]] = {}
+        self._issue_view_lock = threading.Lock()
+        
+        # Project hierarchy, refreshed from the full project listing once PROJECT_INDEX_TTL passes
+        self._project_index: Optional[ProjectIndex] = None
+        self._project_index_checked_at = 0.0
+        self._project_index_lock = threading.Lock()
+        
+        # Per-attachment locks so concurrent downloads of one attachment do not share a .part file
+        self._download_locks: Dict[str, threading.Lock] = {}
+        self._download_locks_guard = threading.Lock()
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Perform HTTP request"""
-        url = f"{self.config.redmine_domain}/{endpoint.lstrip('/')}"
+    @staticmethod
+    def _request_key(method: str, endpoint: str, params: Optional[Dict[str, Any]]) -> tuple:
+        """Build a hashable key identifying a request"""
+        normalized = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return (method.upper(), '/' + endpoint.lstrip('/'), normalized)
+    
+    @contextmanager
+    def _prefetching(self):
+        """Store GET responses made in this thread for later one-shot use"""
+        self._prefetch_state.active = True
+        try:
+            yield
+        finally:
+            self._prefetch_state.active = False
+    
+    def _make_request(self, method: str, endpoint: str, stale_ok: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Perform HTTP request through the read or write circuit breaker
         
+        When a read fails because Redmine is down (timeout, connection error, 5xx) or its circuit
+        is open, the last good response to the same request is returned instead, if there is one
+        and `stale_ok`; its age is reported to collect_stale_reads.
+        """
+        key = self._request_key(method, endpoint, kwargs.get('params'))
+        is_read = method.upper() == 'GET'
+        breaker = self.breakers['read' if is_read else 'write']
+        
+        if not breaker.allow():
+            stale = self._stale_response(key) if is_read and stale_ok else None
+            if stale is not None:
+                return stale
+            raise self._circuit_open_error(breaker)
+        
+        failed = True
         try:
-            response = self.session.request(method, url, **kwargs)
-            response.raise_for_status()
-            
-            if response.content:
-                return response.json()
-            return {}
-            
-        except requests.exceptions.Timeout:
-            friendly_msg = RedmineValidator.get_friendly_error_message(
-                Exception("timeout"), "request"
-            )
-            raise RedmineAPIError(friendly_msg)
-        except requests.exceptions.ConnectionError as e:
-            friendly_msg = RedmineValidator.get_friendly_error_message(e, "connection")
-            raise RedmineAPIError(friendly_msg)
-        except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else None
-            error_data = None
+            data = self._send_request(method, endpoint, key, **kwargs)
+            failed = False
+        except RedmineAPIError as e:
+            # Client errors (4xx) mean Redmine is up; only outages count against the circuit
+            failed = not isinstance(e.status_code, int) or e.status_code >= 500
+            stale = self._stale_response(key) if failed and is_read and stale_ok else None
+            if stale is not None:
+                return stale
+            raise
+        finally:
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        
+        if is_read:
+            with self._last_good_lock:
+                self._last_good[key] = (time.monotonic(), data)
+                self._last_good.move_to_end(key)
+                if len(self._last_good) > STALE_CACHE_SIZE:
+                    self._last_good.popitem(last=False)
+        return data
+    
+    @staticmethod
+    def _circuit_open_error(breaker: CircuitBreaker) -> RedmineAPIError:
+        """Error for a request refused because its circuit is open"""
+        return RedmineAPIError(
+            f"Redmine is unavailable ({breaker.failures} failed {breaker.name}s); "
+            f"not retrying for another {breaker.retry_in():.0f} seconds", 503
+        )
+    
+    def _stale_response(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Last good response to a request, if any and not older than STALE_MAX_AGE"""
+        with self._last_good_lock:
+            cached = self._last_good.get(key)
+        age = time.monotonic() - cached[0] if cached else None
+        get_metrics().record_cache('stale_if_error', age is not None and age <= STALE_MAX_AGE)
+        if age is None or age > STALE_MAX_AGE:
+            return None
+        ages = getattr(_stale_reads, 'ages', None)
+        if ages is not None:
+            ages.append(age)
+        return cached[1]
+    
+    def _send_request(self, method: str, endpoint: str, key: tuple, **kwargs) -> Dict[str, Any]:
+        """Send a request, backing off and retrying while Redmine answers 429/503"""
+        import requests
+        
+        url = f"{self.config.redmine_domain}/{endpoint.lstrip('/')}"
+        
+        if method.upper() == 'GET':
+            with self._prefetch_lock:
+                prefetched = self._prefetched.pop(key, None)
+            if prefetched:
+                fresh = time.monotonic() - prefetched[0] <= PREFETCH_TTL
+                get_metrics().record_cache('prefetch', fresh)
+                if fresh:
+                    return prefetched[1]
+        else:
+            # Writes may change anything that was prefetched or cached
+            with self._prefetch_lock:
+                self._prefetched.clear()
+            with self._issue_view_lock:
+                self._issue_views.clear()
+            if endpoint.lstrip('/').startswith('projects'):
+                self._project_index_checked_at = 0.0
+        
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            status = 'error'
+            response = None
             try:
-                if e.response and e.response.content:
-                    error_data = e.response.json()
-            except:
-                pass
+                with self.governor.slot():
+                    start = time.perf_counter()
+                    response = self.session.request(method, url, **kwargs)
+                status = str(response.status_code)
+                
+                if response.status_code in BACKOFF_STATUSES:
+                    delay = self.governor.retry_after(response.headers.get('Retry-After'))
+                    if delay is None:
+                        delay = min(BACKOFF_BASE * 2 ** attempt, MAX_BACKOFF)
+                    self.governor.backoff(delay)
+                    # A 503 may come after a write was applied, so only reads are retried on it
+                    if attempt < MAX_RETRIES and (method.upper() == 'GET' or response.status_code == 429):
+                        attempt += 1
+                        get_metrics().record_retry(method, endpoint)
+                        continue
+                else:
+                    self.governor.succeeded()
+                response.raise_for_status()
+                
+                data = response.json() if response.content else {}
+                if method.upper() == 'GET' and getattr(self._prefetch_state, 'active', False):
+                    with self._prefetch_lock:
+                        self._prefetched[key] = (time.monotonic(), data)
+                return data
             
-            # Use user-friendly error message
-            context = "issue" if "/issues" in url else "project" if "/projects" in url else "request"
-            friendly_msg = RedmineValidator.get_friendly_error_message(e, context)
-            raise RedmineAPIError(friendly_msg, status_code, error_data)
-        except requests.exceptions.RequestException as e:
-            friendly_msg = RedmineValidator.get_friendly_error_message(e, "request")
-            raise RedmineAPIError(friendly_msg)
-        except json.JSONDecodeError as e:
-            friendly_msg = RedmineValidator.get_friendly_error_message(e, "response")
-            raise RedmineAPIError(friendly_msg)
+            except requests.exceptions.Timeout:
+                status = 'timeout'
+                friendly_msg = RedmineValidator.get_friendly_error_message(
+                    Exception("timeout"), "request"
+                )
+                raise RedmineAPIError(friendly_msg)
+            except requests.exceptions.ConnectionError as e:
+                friendly_msg = RedmineValidator.get_friendly_error_message(e, "connection")
+                raise RedmineAPIError(friendly_msg)
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                error_data = None
+                try:
+                    if e.response is not None and e.response.content:
+                        error_data = e.response.json()
+                except:
+                    pass
+                
+                # Use user-friendly error message
+                context = "issue" if "/issues" in url else "project" if "/projects" in url else "request"
+                friendly_msg = RedmineValidator.get_friendly_error_message(e, context)
+                raise RedmineAPIError(friendly_msg, status_code, error_data)
+            except requests.exceptions.RequestException as e:
+                friendly_msg = RedmineValidator.get_friendly_error_message(e, "request")
+                raise RedmineAPIError(friendly_msg)
+            except json.JSONDecodeError as e:
+                friendly_msg = RedmineValidator.get_friendly_error_message(e, "response")
+                raise RedmineAPIError(friendly_msg)
+            finally:
+                received, sent = self._transfer_sizes(response)
+                get_metrics().observe_request(method, endpoint, status, time.perf_counter() - start, received, sent)
+    
+    @staticmethod
+    def _transfer_sizes(response) -> tuple:
+        """Return (bytes received, bytes sent) for a response, 0 when unknown"""
+        if response is None:
+            return 0, 0
+        content = getattr(response, 'content', None)
+        received = len(content) if isinstance(content, bytes) else 0
+        body = getattr(getattr(response, 'request', None), 'body', None)
+        sent = len(body) if isinstance(body, (bytes, str, FileBody)) else 0
+        return received, sent
     
     def get_issue(self, issue_id: int, include: Optional[List[str]] = None) -> RedmineIssue:
         """Get a single issue"""
@@ -135,24 +456,100 @@ class RedmineClient:
         if 'issue' not in response:
             raise RedmineAPIError(f"Issue {issue_id} does not exist")
         
-        issue_data = response['issue']
+        return self._parse_issue(response['issue'])
+    
+    @staticmethod
+    def _parse_issue(issue_data: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> RedmineIssue:
+        """
+        Build a RedmineIssue from API data
+        
+        With `fields`, only those attributes are copied; the others stay empty ({} for
+        references, "" for text) so large values such as descriptions are released with
+        the response instead of being kept on every listed issue.
+        """
+        if fields is None:
+            return RedmineIssue(
+                id=issue_data['id'],
+                subject=issue_data['subject'],
+                description=issue_data.get('description', ''),
+                status=issue_data['status'],
+                priority=issue_data['priority'],
+                project=issue_data['project'],
+                tracker=issue_data['tracker'],
+                author=issue_data['author'],
+                assigned_to=issue_data.get('assigned_to'),
+                created_on=issue_data.get('created_on'),
+                updated_on=issue_data.get('updated_on'),
+                done_ratio=issue_data.get('done_ratio', 0)
+            )
+        
+        fields = set(fields)
+        
+        def pick(name, default):
+            return issue_data.get(name, default) if name in fields else default
+        
         return RedmineIssue(
             id=issue_data['id'],
-            subject=issue_data['subject'],
-            description=issue_data.get('description', ''),
-            status=issue_data['status'],
-            priority=issue_data['priority'],
-            project=issue_data['project'],
-            tracker=issue_data['tracker'],
-            author=issue_data['author'],
-            assigned_to=issue_data.get('assigned_to'),
-            created_on=issue_data.get('created_on'),
-            updated_on=issue_data.get('updated_on'),
-            done_ratio=issue_data.get('done_ratio', 0)
+            subject=pick('subject', ''),
+            description=pick('description', ''),
+            status=pick('status', {}),
+            priority=pick('priority', {}),
+            project=pick('project', {}),
+            tracker=pick('tracker', {}),
+            author=pick('author', {}),
+            assigned_to=pick('assigned_to', None),
+            created_on=pick('created_on', None),
+            updated_on=pick('updated_on', None),
+            done_ratio=pick('done_ratio', 0)
         )
     
     def get_issue_raw(self, issue_id: int, include: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Get raw API data for a single issue (including journals and attachments)"""
+        """
+        Get raw API data for a single issue (including journals and attachments)
+        
+        Include sections are cached per issue and merged across calls, so asking for
+        journals after attachments only downloads the journals. The result holds the
+        base fields plus exactly the requested sections.
+        """
+        wanted = list(dict.fromkeys(include or []))
+        ttl = self.config.issue_cache_ttl
+        
+        with self._issue_view_lock:
+            entry = self._issue_views.get(issue_id)
+            if entry and time.monotonic() - entry['fetched_at'] > ttl:
+                entry = None
+            missing = [name for name in wanted if not entry or name not in entry['includes']]
+        
+        if entry and not missing:
+            get_metrics().record_cache('issue_view', True)
+            return self._select_issue_view(entry['data'], wanted)
+        get_metrics().record_cache('issue_view', False)
+        
+        data = self._fetch_issue(issue_id, missing)
+        if entry and entry['data'].get('updated_on') != data.get('updated_on'):
+            # The issue changed since the cached sections were fetched; reload all of them
+            entry = None
+            if len(missing) < len(wanted):
+                missing = wanted
+                data = self._fetch_issue(issue_id, wanted)
+        
+        if entry:
+            view = dict(entry['data'])
+            view.update(data)
+            # Keep the oldest fetch time so the TTL bounds every section
+            new_entry = {'data': view, 'includes': entry['includes'] | set(missing),
+                         'fetched_at': entry['fetched_at']}
+        else:
+            view = data
+            new_entry = {'data': data, 'includes': set(missing), 'fetched_at': time.monotonic()}
+        if ttl > 0:
+            with self._issue_view_lock:
+                self._issue_views[issue_id] = new_entry
+        
+        return self._select_issue_view(view, wanted)
+    
+    def _fetch_issue(self, issue_id: int, include: List[str]) -> Dict[str, Any]:
+        """Fetch an issue with the given include sections"""
         params = {}
         if include:
             params['include'] = ','.join(include)
@@ -164,58 +561,399 @@ class RedmineClient:
         
         return response['issue']
     
-    def list_issues(self, project_id: Optional[int] = None, status_id: Optional[int] = None, 
-                   assigned_to_id: Optional[int] = None, tracker_id: Optional[int] = None,
-                   priority_id: Optional[int] = None, author_id: Optional[int] = None,
-                   created_on: Optional[str] = None, updated_on: Optional[str] = None,
-                   limit: int = 100, offset: int = 0, sort: Optional[str] = None,
-                   include: Optional[List[str]] = None) -> List[RedmineIssue]:
-        """List issues"""
-        # Validate query parameters
+    @staticmethod
+    def _select_issue_view(data: Dict[str, Any], include: List[str]) -> Dict[str, Any]:
+        """Copy of an issue view with base fields and only the requested include sections"""
+        excluded = set(ISSUE_INCLUDES) - set(include)
+        return {key: value for key, value in data.items() if key not in excluded}
+    
+    def _issue_query_params(self, project_id: Optional[int] = None, status_id: Optional[int] = None,
+                            assigned_to_id: Optional[int] = None, tracker_id: Optional[int] = None,
+                            priority_id: Optional[int] = None, author_id: Optional[int] = None,
+                            created_on: Optional[str] = None, updated_on: Optional[str] = None,
+                            limit: int = 100, offset: int = 0, sort: Optional[str] = None,
+                            include: Optional[List[str]] = None,
+                            subproject_id: Optional[str] = None,
+                            closed_on: Optional[str] = None) -> Dict[str, Any]:
+        """Validated query parameters for /issues.json (subproject_id="!*" excludes subprojects)"""
         query_params = {
             'project_id': project_id, 'status_id': status_id, 'assigned_to_id': assigned_to_id,
             'tracker_id': tracker_id, 'priority_id': priority_id, 'author_id': author_id,
-            'created_on': created_on, 'updated_on': updated_on, 'limit': limit, 
-            'offset': offset, 'sort': sort
+            'created_on': created_on, 'updated_on': updated_on, 'closed_on': closed_on, 'limit': limit, 
+            'offset': offset, 'sort': sort, 'subproject_id': subproject_id
         }
         
         try:
-            validated_params = validate_and_clean_data(query_params, "query")
+            params = validate_and_clean_data(query_params, "query")
         except RedmineValidationError as e:
             raise RedmineAPIError(f"Query parameter validation failed: {e}")
         
-        params = validated_params
-        
         # Add additional parameters
         if include:
             params['include'] = ','.join(include)
         
+        return params
+    
+    def list_issues(self, project_id: Optional[int] = None, status_id: Optional[int] = None, 
+                   assigned_to_id: Optional[int] = None, tracker_id: Optional[int] = None,
+                   priority_id: Optional[int] = None, author_id: Optional[int] = None,
+                   created_on: Optional[str] = None, updated_on: Optional[str] = None,
+                   limit: int = 100, offset: int = 0, sort: Optional[str] = None,
+                   include: Optional[List[str]] = None, subproject_id: Optional[str] = None,
+                   fields: Optional[Iterable[str]] = None) -> List[RedmineIssue]:
+        """List issues (with `fields`, only those ISSUE_ATTRIBUTES are kept on each issue)"""
+        params = self._issue_query_params(project_id, status_id, assigned_to_id, tracker_id, priority_id,
+                                          author_id, created_on, updated_on, limit, offset, sort, include,
+                                          subproject_id)
+        
         response = self._make_request('GET', '/issues.json', params=params)
         
+        return [self._parse_issue(issue_data, fields) for issue_data in response.get('issues', [])]
+    
+    def count_issues(self, **filters) -> int:
+        """Number of issues matching the list_issues filters, read from a limit=1 request's total_count"""
+        params = self._issue_query_params(limit=1, offset=0, **filters)
+        response = self._make_request('GET', '/issues.json', params=params)
+        return response.get('total_count', len(response.get('issues', [])))
+    
+    def count_issues_many(self, filter_sets: List[Dict[str, Any]],
+                          max_workers: int = COUNT_CONCURRENCY) -> List[int]:
+        """Count issues for several filter combinations, at most `max_workers` requests at a time"""
+        if not filter_sets:
+            return []
+        workers = min(max(max_workers, 1), len(filter_sets))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-count') as executor:
+            return list(executor.map(lambda filters: self.count_issues(**filters), filter_sets))
+    
+    def iter_issues(self, max_items: Optional[int] = None, page_size: int = MAX_PAGE_SIZE,
+                    fields: Optional[Iterable[str]] = None, stale_ok: bool = True,
+                    **filters) -> Iterator[RedmineIssue]:
+        """
+        Stream issues matching the list_issues filters, one page request at a time
+        
+        Only the current page is held in memory, and no further pages are requested once
+        the caller stops iterating or `max_items` issues have been yielded. With `stale_ok`
+        False an outage raises instead of returning the last good page (see _make_request).
+        """
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        offset = filters.pop('offset', 0)
+        yielded = 0
+        while max_items is None or yielded < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - yielded)
+            params = self._issue_query_params(limit=limit, offset=offset, **filters)
+            response = self._make_request('GET', '/issues.json', stale_ok=stale_ok, params=params)
+            page = response.get('issues', [])
+            for issue_data in page:
+                yield self._parse_issue(issue_data, fields)
+            yielded += len(page)
+            offset += len(page)
+            total = response.get('total_count')
+            if len(page) < limit or (total is not None and offset >= total):
+                return
+    
+    def iter_issue_pages(self, prefetch: int = EXPORT_CONCURRENCY, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream raw issue pages (MAX_PAGE_SIZE issues each) matching the list_issues filters, in order
+        
+        The first page reports total_count; the following pages are then requested up to
+        `prefetch` at a time ahead of the consumer, so reading overlaps with whatever the
+        consumer does with a page, and at most `prefetch` + 1 pages are held in memory.
+        """
+        filters.setdefault('sort', 'id')
+        params = self._issue_query_params(limit=MAX_PAGE_SIZE, offset=0, **filters)
+        
+        def fetch(offset: int) -> List[Dict[str, Any]]:
+            return self._make_request('GET', '/issues.json', params=dict(params, offset=offset)).get('issues', [])
+        
+        first = self._make_request('GET', '/issues.json', params=params)
+        page = first.get('issues', [])
+        yield page
+        total = first.get('total_count')
+        if len(page) < MAX_PAGE_SIZE:
+            return
+        if total is None:
+            # No total to plan ahead with; page until a short page
+            offset = len(page)
+            while len(page) == MAX_PAGE_SIZE:
+                page = fetch(offset)
+                offset += len(page)
+                if page:
+                    yield page
+            return
+        
+        offsets = iter(range(MAX_PAGE_SIZE, total, MAX_PAGE_SIZE))
+        with ThreadPoolExecutor(max_workers=max(prefetch, 1), thread_name_prefix='redmine-pages') as executor:
+            pending = deque(executor.submit(fetch, offset) for offset in islice(offsets, max(prefetch, 1)))
+            while pending:
+                page = pending.popleft().result()
+                for offset in islice(offsets, 1):
+                    pending.append(executor.submit(fetch, offset))
+                if page:
+                    yield page
+    
+    def export_issues(self, path: Union[str, Path], format: Optional[str] = None,
+                      columns: Optional[Iterable[str]] = None, custom_fields: Optional[Iterable[str]] = None,
+                      prefetch: int = EXPORT_CONCURRENCY, **filters) -> Dict[str, Any]:
+        """
+        Export issues matching the list_issues filters (default all statuses) to a CSV, Parquet or Arrow file
+        
+        Pages are streamed from iter_issue_pages into the writer, so memory stays constant for
+        any number of issues. Nested references become <name>_id and <name> columns, and custom
+        fields become "cf.<name>" columns (Parquet and Arrow need the optional pyarrow package).
+        
+        Returns:
+            Dict with 'path', 'format', 'rows', 'columns' and 'skipped_custom_fields'
+            (custom fields first seen after the columns were fixed)
+        """
+        from .export import write_issues
+        
+        filters.setdefault('status_id', '*')
+        return write_issues(self.iter_issue_pages(prefetch=prefetch, **filters), path, format=format,
+                            columns=columns, custom_fields=custom_fields)
+    
+    def get_issue_graph(self, roots: Iterable[int], max_depth: int = 3, max_nodes: int = 200,
+                        relation_types: Optional[Iterable[str]] = None, subtasks: bool = True,
+                        max_workers: int = COUNT_CONCURRENCY) -> Dict[str, Any]:
+        """
+        Breadth-first walk from `roots` over issue relations, parents and subtasks
+        
+        Each level is fetched with batched /issues.json requests sent concurrently: issue_id=...
+        for the issues on the frontier and parent_id=... for their subtasks (MAX_PAGE_SIZE IDs
+        per request). Subtasks arrive complete, so they are not fetched again when the walk
+        reaches them; the request count grows with depth rather than with the number of issues.
+        
+        Args:
+            roots: Issue IDs to start from
+            max_depth: Levels to expand beyond the roots
+            max_nodes: Most issues in the graph
+            relation_types: Relation types to follow (default all of RELATION_TYPES)
+            subtasks: Whether to follow parent and subtask links
+            max_workers: Requests in flight at once
+            
+        Returns:
+            Dict with 'nodes' ({id: issue data} in walk order), 'depth' ({id: levels from a root}),
+            'edges' ([from, type, to]; relations as Redmine orients them, 'subtask' from parent
+            to child), 'truncated' (limits left known links unexplored) and 'requests'
+        """
+        follow = set(relation_types) if relation_types is not None else set(RELATION_TYPES)
+        roots = list(dict.fromkeys(int(root) for root in roots))
+        truncated = len(roots) > max_nodes
+        depth = {root: 0 for root in roots[:max_nodes]}
+        frontier = list(depth)
+        nodes: Dict[int, Dict[str, Any]] = {}
+        received: Dict[int, Dict[str, Any]] = {}
+        children: Dict[int, List[int]] = {}
+        requests = 0
+        level = 0
+        
+        def neighbors(issue_id: int) -> List[int]:
+            data = nodes[issue_id]
+            linked = []
+            if subtasks:
+                if data.get('parent'):
+                    linked.append(data['parent']['id'])
+                linked.extend(children.get(issue_id, ()))
+            for relation in data.get('relations') or ():
+                if relation.get('relation_type') in follow:
+                    linked.append(relation['issue_to_id'] if relation['issue_id'] == issue_id else relation['issue_id'])
+            return linked
+        
+        workers = max(max_workers, 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-graph') as executor:
+            while frontier:
+                expand = level < max_depth
+                missing = [issue_id for issue_id in frontier if issue_id not in received]
+                batches = [('issue_id', missing[i:i + MAX_PAGE_SIZE]) for i in range(0, len(missing), MAX_PAGE_SIZE)]
+                if subtasks and expand:
+                    batches += [('parent_id', frontier[i:i + MAX_PAGE_SIZE])
+                                for i in range(0, len(frontier), MAX_PAGE_SIZE)]
+                
+                for field, (issues, sent) in zip(
+                        [field for field, _ in batches],
+                        executor.map(lambda batch: self._list_issues_by(*batch, include='relations'), batches)):
+                    requests += sent
+                    for data in issues:
+                        received[data['id']] = data
+                        if field == 'parent_id':
+                            children.setdefault(data['parent']['id'], []).append(data['id'])
+                
+                next_frontier = []
+                for issue_id in frontier:
+                    if issue_id not in received:
+                        # Deleted or not visible to this user
+                        del depth[issue_id]
+                        continue
+                    nodes[issue_id] = received[issue_id]
+                    for linked in neighbors(issue_id):
+                        if linked in depth:
+                            continue
+                        if not expand or len(depth) >= max_nodes:
+                            truncated = True
+                            continue
+                        depth[linked] = level + 1
+                        next_frontier.append(linked)
+                frontier = next_frontier
+                level += 1
+        
+        if roots and not any(root in nodes for root in roots):
+            raise RedmineAPIError(f"Issue(s) not found: {', '.join(f'#{root}' for root in roots)}")
+        
+        edges = []
+        seen = set()
+        for issue_id, data in nodes.items():
+            parent = (data.get('parent') or {}).get('id')
+            if subtasks and parent in nodes:
+                edges.append([parent, 'subtask', issue_id])
+            for relation in data.get('relations') or ():
+                edge = (relation['issue_id'], relation.get('relation_type'), relation['issue_to_id'])
+                if edge[1] in follow and edge[0] in nodes and edge[2] in nodes and edge not in seen:
+                    seen.add(edge)
+                    edges.append(list(edge))
+        
+        return {'nodes': nodes, 'depth': {issue_id: depth[issue_id] for issue_id in nodes}, 'edges': edges,
+                'truncated': truncated, 'requests': requests}
+    
+    def _list_issues_by(self, field: str, ids: List[int], **filters) -> tuple:
+        """All issues (any status) whose `field` is one of `ids`, with extra raw query `filters`;
+        returns (issues, requests)"""
+        params = {field: ','.join(str(issue_id) for issue_id in ids), 'status_id': '*', **filters,
+                  'limit': MAX_PAGE_SIZE, 'offset': 0}
         issues = []
-        for issue_data in response.get('issues', []):
-            issues.append(RedmineIssue(
-                id=issue_data['id'],
-                subject=issue_data['subject'],
-                description=issue_data.get('description', ''),
-                status=issue_data['status'],
-                priority=issue_data['priority'],
-                project=issue_data['project'],
-                tracker=issue_data['tracker'],
-                author=issue_data['author'],
-                assigned_to=issue_data.get('assigned_to'),
-                created_on=issue_data.get('created_on'),
-                updated_on=issue_data.get('updated_on'),
-                done_ratio=issue_data.get('done_ratio', 0)
-            ))
+        requests = 0
+        while True:
+            response = self._make_request('GET', '/issues.json', params=dict(params))
+            requests += 1
+            page = response.get('issues', [])
+            issues.extend(page)
+            params['offset'] += len(page)
+            total = response.get('total_count')
+            if len(page) < MAX_PAGE_SIZE or (total is not None and params['offset'] >= total):
+                return issues, requests
+    
+    def get_changes_since(self, since: str, seen: Iterable[int] = (), project_id: Optional[int] = None,
+                          limit: int = 50, max_workers: int = BULK_CONCURRENCY) -> Dict[str, Any]:
+        """
+        Issues updated at or after `since`, oldest first, with the journals written since then
         
-        return issues
+        Changed issues are listed with updated_on>=since page by page; only their journals are
+        then fetched, concurrently. The cached views of changed issues are dropped.
+        
+        Args:
+            since: UTC timestamp (YYYY-MM-DDTHH:MM:SSZ)
+            seen: Issue IDs already reported as updated exactly at `since`, skipped
+            project_id: Only this project and its subprojects (default every visible project)
+            limit: Most issues returned; the cursor then points at the last one
+            max_workers: Journal requests in flight at once
+            
+        Returns:
+            Dict with 'issues' (issue data, each with the new 'journals'), 'cursor' (updated_on of
+            the newest issue returned, or `since`), 'seen' (issue IDs updated exactly at the cursor)
+            and 'more' (whether more changes are waiting)
+        """
+        seen = set(seen)
+        changed = []
+        more = False
+        for issue in self.iter_issues(project_id=project_id, status_id='*', updated_on=f'>={since}',
+                                      sort='updated_on'):
+            if issue.updated_on == since and issue.id in seen:
+                continue
+            if len(changed) == limit:
+                more = True
+                break
+            changed.append(issue)
+        
+        if not changed:
+            return {'issues': [], 'cursor': since, 'seen': sorted(seen), 'more': False}
+        
+        self.invalidate(issue_ids=[issue.id for issue in changed])
+        workers = min(max(max_workers, 1), len(changed))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-changes') as executor:
+            issues = list(executor.map(lambda issue: self._fetch_issue(issue.id, ['journals']), changed))
+        for data in issues:
+            data['journals'] = [journal for journal in data.get('journals') or ()
+                                if (journal.get('created_on') or '') >= since]
+        
+        cursor = changed[-1].updated_on or since
+        at_cursor = {issue.id for issue in changed if issue.updated_on == cursor}
+        if cursor == since:
+            at_cursor |= seen
+        return {'issues': issues, 'cursor': cursor, 'seen': sorted(at_cursor), 'more': more}
+    
+    def wait_for_issue_change(self, issue_ids: Iterable[int], timeout: float = 60.0, since: Optional[str] = None,
+                              min_interval: float = WAIT_MIN_INTERVAL,
+                              max_interval: float = WAIT_MAX_INTERVAL) -> Dict[str, Any]:
+        """
+        Block until any of `issue_ids` changes, or `timeout` seconds pass
+        
+        The watched issues are read once to learn their updated_on, then probed with one
+        issue_id=...&updated_on>=... request per MAX_PAGE_SIZE issues per tick; the probe
+        usually comes back empty, so each tick costs one small response. Quiet ticks stretch
+        the interval from `min_interval` by WAIT_BACKOFF up to `max_interval`.
+        
+        Args:
+            issue_ids: Issues to watch
+            timeout: Seconds to wait at most
+            since: UTC timestamp (YYYY-MM-DDTHH:MM:SSZ) of the state the caller last saw; issues
+                updated after it count as changed right away (default: their state now)
+            min_interval: Seconds before the first probe
+            max_interval: Longest wait between probes
+            
+        Returns:
+            Dict with 'changed' (issue data of the changed issues), 'missing' (watched IDs the
+            first read did not return; not checked with `since`), 'timed_out', 'requests'
+            and 'elapsed' (seconds)
+        """
+        ids = list(dict.fromkeys(int(issue_id) for issue_id in issue_ids))
+        start = time.monotonic()
+        deadline = start + max(timeout, 0.0)
+        requests = 0
+        
+        def probe(mark: Optional[str]) -> List[Dict[str, Any]]:
+            nonlocal requests
+            filters = {'updated_on': f'>={mark}'} if mark else {}
+            found = []
+            for i in range(0, len(ids), MAX_PAGE_SIZE):
+                issues, sent = self._list_issues_by('issue_id', ids[i:i + MAX_PAGE_SIZE], **filters)
+                requests += sent
+                found.extend(issues)
+            return found
+        
+        if since is None:
+            known = {issue['id']: issue.get('updated_on') for issue in probe(None)}
+            if not known:
+                raise RedmineAPIError(f"Issue(s) not found: {', '.join(f'#{issue_id}' for issue_id in ids)}")
+            mark = max(updated_on or '' for updated_on in known.values()) or None
+        else:
+            known = {}
+            mark = since
+        
+        def changed_since_known(issue: Dict[str, Any]) -> bool:
+            if issue['id'] in known:
+                return issue.get('updated_on') != known[issue['id']]
+            return since is not None and (issue.get('updated_on') or '') > since
+        
+        changed = [issue for issue in probe(mark) if changed_since_known(issue)] if since is not None else []
+        interval = min_interval
+        while not changed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * WAIT_BACKOFF, max_interval)
+            changed = [issue for issue in probe(mark) if changed_since_known(issue)]
+        
+        if changed:
+            self.invalidate(issue_ids=[issue['id'] for issue in changed])
+        missing = [issue_id for issue_id in ids if issue_id not in known] if since is None else []
+        return {'changed': changed, 'missing': missing,
+                'timed_out': not changed, 'requests': requests, 'elapsed': time.monotonic() - start}
     
     def create_issue(self, project_id: int, subject: str, description: str = "",
                     tracker_id: Optional[int] = None, status_id: Optional[int] = None,
                     priority_id: Optional[int] = None, assigned_to_id: Optional[int] = None,
-                    parent_issue_id: Optional[int] = None, custom_fields: Optional[List[Dict]] = None) -> int:
-        """Create a new issue, return issue ID"""
+                    parent_issue_id: Optional[int] = None, custom_fields: Optional[List[Dict]] = None,
+                    uploads: Optional[List[Dict]] = None) -> int:
+        """Create a new issue, return issue ID; `uploads` are upload_file results to attach"""
         # Prepare validation data
         validation_data = {
             'project_id': project_id,
@@ -226,7 +964,8 @@ class RedmineClient:
             'priority_id': priority_id,
             'assigned_to_id': assigned_to_id,
             'parent_issue_id': parent_issue_id,
-            'custom_fields': custom_fields
+            'custom_fields': custom_fields,
+            'uploads': self._upload_refs(uploads)
         }
         
         # Validate data
@@ -277,6 +1016,8 @@ class RedmineClient:
             update_data['issue']['estimated_hours'] = kwargs['estimated_hours']
         if 'notes' in kwargs:
             update_data['issue']['notes'] = kwargs['notes']
+        if kwargs.get('uploads'):
+            update_data['issue']['uploads'] = self._upload_refs(kwargs['uploads'])
         
         if not update_data['issue']:
             raise RedmineAPIError("No fields provided to update")
@@ -311,7 +1052,11 @@ class RedmineClient:
         if 'project' not in response:
             raise RedmineAPIError(f"Project {project_id} does not exist")
         
-        project_data = response['project']
+        return self._parse_project(response['project'])
+    
+    @staticmethod
+    def _parse_project(project_data: Dict[str, Any]) -> RedmineProject:
+        """Build a RedmineProject from API data"""
         return RedmineProject(
             id=project_data['id'],
             name=project_data['name'],
@@ -319,7 +1064,8 @@ class RedmineClient:
             description=project_data.get('description', ''),
             status=project_data['status'],
             created_on=project_data.get('created_on'),
-            updated_on=project_data.get('updated_on')
+            updated_on=project_data.get('updated_on'),
+            parent_id=(project_data.get('parent') or {}).get('id')
         )
     
     def list_projects(self, limit: int = 100, offset: int = 0) -> List[RedmineProject]:
@@ -331,19 +1077,62 @@ class RedmineClient:
         
         response = self._make_request('GET', '/projects.json', params=params)
         
-        projects = []
-        for project_data in response.get('projects', []):
-            projects.append(RedmineProject(
-                id=project_data['id'],
-                name=project_data['name'],
-                identifier=project_data['identifier'],
-                description=project_data.get('description', ''),
-                status=project_data['status'],
-                created_on=project_data.get('created_on'),
-                updated_on=project_data.get('updated_on')
-            ))
+        return [self._parse_project(project_data) for project_data in response.get('projects', [])]
+    
+    def iter_projects(self, page_size: int = MAX_PAGE_SIZE) -> Iterator[RedmineProject]:
+        """Stream every visible project, one page request at a time"""
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        offset = 0
+        while True:
+            response = self._make_request('GET', '/projects.json', params={'limit': page_size, 'offset': offset})
+            page = response.get('projects', [])
+            for project_data in page:
+                yield self._parse_project(project_data)
+            offset += len(page)
+            total = response.get('total_count')
+            if len(page) < page_size or (total is not None and offset >= total):
+                return
+    
+    def get_project_index(self, refresh: bool = False) -> ProjectIndex:
+        """
+        Project hierarchy with id/identifier/name lookups
         
-        return projects
+        Built from the full (paginated) project listing and re-checked once PROJECT_INDEX_TTL
+        has passed or a project was written; only added, changed (by updated_on) or removed
+        projects are re-indexed.
+        """
+        with self._project_index_lock:
+            stale = time.monotonic() - self._project_index_checked_at > PROJECT_INDEX_TTL
+            if self._project_index is not None and not (stale or refresh):
+                get_metrics().record_cache('project_index', True)
+                return self._project_index
+            get_metrics().record_cache('project_index', False)
+            
+            projects = list(self.iter_projects())
+            if self._project_index is None:
+                self._project_index = ProjectIndex(projects)
+            else:
+                self._project_index.update(projects)
+            self._project_index_checked_at = time.monotonic()
+            return self._project_index
+    
+    def resolve_project(self, ref: Union[int, str]) -> RedmineProject:
+        """Find a project by id, identifier or name through the project index
+
+        Numeric ids the index does not know (archived projects, typos) are passed through for
+        Redmine to judge instead of re-listing every project page on each call.
+        """
+        project = self.get_project_index().resolve(ref)
+        if project is None and (isinstance(ref, int) or str(ref).strip().isdigit()):
+            project_id = int(ref)
+            return RedmineProject(id=project_id, name=f"Project {project_id}", identifier=str(project_id),
+                                  description='', status=1)
+        if project is None:
+            # The project may have been created since the index was last checked
+            project = self.get_project_index(refresh=True).resolve(ref)
+        if project is None:
+            raise RedmineAPIError(f"Project {ref} not found")
+        return project
     
     def create_project(self, name: str, identifier: str, description: str = "",
                       homepage: str = "", is_public: bool = True, parent_id: Optional[int] = None,
@@ -539,35 +1328,128 @@ class RedmineClient:
     
     def _load_enum_cache(self) -> Dict[str, Any]:
         """Load enumeration cache"""
+        metrics = get_metrics()
         if self._enum_cache is not None:
+            metrics.record_cache('enum', True)
             return self._enum_cache
-            
-        try:
-            if self._cache_file.exists():
-                with open(self._cache_file, 'r', encoding='utf-8') as f:
-                    self._enum_cache = json.load(f)
-                    
-                # Check domain match
-                cached_domain = self._enum_cache.get('domain')
-                if cached_domain != self.config.redmine_domain:
-                    # Domain mismatch, rebuild cache
-                    self._refresh_enum_cache()
-                    return self._enum_cache or {}
-                    
-                # Check if cache needs update (over 24 hours)
-                cache_time = self._enum_cache.get('cache_time', 0)
-                current_time = datetime.now().timestamp()
-                if current_time - cache_time > 86400:  # 24 hours
-                    self._refresh_enum_cache()
+        
+        self._prepare_cache_dir()
+        cache = self._read_cache_file()
+        if self._is_cache_valid(cache):
+            metrics.record_cache('enum', True)
+            self._enum_cache = cache
+            return self._enum_cache
+        
+        with self._cache_lock():
+            # Another process may have refreshed the cache while we waited for the lock
+            cache = self._read_cache_file()
+            if self._is_cache_valid(cache):
+                metrics.record_cache('enum', True)
+                self._enum_cache = cache
             else:
+                metrics.record_cache('enum', False)
                 self._refresh_enum_cache()
-                
-        except Exception:
-            # Cache read failed, rebuild
-            self._refresh_enum_cache()
-            
+        
         return self._enum_cache or {}
     
+    def _read_cache_file(self) -> Optional[Dict[str, Any]]:
+        """Read the cache file, return None if missing or unreadable"""
+        try:
+            with open(self._cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+    
+    def _is_cache_valid(self, cache: Optional[Dict[str, Any]]) -> bool:
+        """Check cache format version, domain match and age"""
+        if not cache:
+            return False
+        if cache.get('version') != CACHE_FORMAT_VERSION:
+            return False
+        if cache.get('domain') != self.config.redmine_domain:
+            return False
+        cache_time = cache.get('cache_time', 0)
+        return datetime.now().timestamp() - cache_time <= CACHE_TTL
+    
+    def _write_cache_file(self, data: Dict[str, Any]):
+        """Atomically write the cache file (temp file + rename)"""
+        self._prepare_cache_dir()
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{self._cache_file.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._cache_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _prepare_cache_dir(self):
+        """Create the cache directory and clean up orphaned files (once per client)"""
+        if self._cache_dir_ready:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cleanup_orphaned_cache_files(self._safe_domain)
+        self._cache_dir_ready = True
+    
+    def _cleanup_orphaned_cache_files(self, safe_domain: str):
+        """Remove stale cache files left behind by earlier runs"""
+        # Files from the old per-process hash() naming scheme (decimal suffix that is
+        # not a 16-character digest); anything else expires by age
+        legacy_pattern = re.compile(rf'^cache_{re.escape(safe_domain)}_(?![0-9a-f]{{16}}\.json$)\d+\.json$')
+        now = time.time()
+        
+        try:
+            entries = list(self.cache_dir.iterdir())
+        except OSError:
+            return
+        
+        for path in entries:
+            name = path.name
+            if path == self._cache_file:
+                continue
+            try:
+                age = now - path.stat().st_mtime
+                if name.startswith('.cache_') and name.endswith('.tmp'):
+                    if age > CACHE_TMP_ORPHAN_AGE:
+                        path.unlink()
+                elif name.startswith('cache_') and name.endswith('.json'):
+                    if legacy_pattern.match(name) or age > CACHE_ORPHAN_AGE:
+                        path.unlink()
+                        path.with_suffix('.lock').unlink(missing_ok=True)
+            except OSError:
+                # Another process may have removed or replaced the file
+                continue
+    
+    @contextmanager
+    def _cache_lock(self):
+        """Hold an exclusive lock on the cache, across threads and (advisory) processes;
+        re-entrant within a thread"""
+        with self._cache_thread_lock:
+            depth = getattr(self._cache_lock_state, 'depth', 0)
+            if fcntl is None or depth > 0:
+                self._cache_lock_state.depth = depth + 1
+                try:
+                    yield
+                finally:
+                    self._cache_lock_state.depth = depth
+                return
+            
+            self._prepare_cache_dir()
+            with open(self._lock_file, 'a') as lock_fd:
+                fcntl.flock(lock_fd.fileno(), fcntl.LOCK_EX)
+                self._cache_lock_state.depth = 1
+                try:
+                    yield
+                finally:
+                    self._cache_lock_state.depth = 0
+                    fcntl.flock(lock_fd.fileno(), fcntl.LOCK_UN)
+    
     def _refresh_enum_cache(self):
         """Refresh enumeration cache"""
         try:
@@ -590,6 +1472,7 @@ class RedmineClient:
                 user_by_login[user.login] = user.id
             
             self._enum_cache = {
+                'version': CACHE_FORMAT_VERSION,
                 'cache_time': datetime.now().timestamp(),
                 'domain': self.config.redmine_domain,
                 'priorities': {item['name']: item['id'] for item in priorities},
@@ -601,12 +1484,13 @@ class RedmineClient:
             }
             
             # Save to file
-            with open(self._cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._enum_cache, f, ensure_ascii=False, indent=2)
+            with self._cache_lock():
+                self._write_cache_file(self._enum_cache)
                 
         except Exception as e:
             # Cache refresh failed, use empty cache
             self._enum_cache = {
+                'version': CACHE_FORMAT_VERSION,
                 'cache_time': 0, 
                 'domain': self.config.redmine_domain,
                 'priorities': {}, 
@@ -688,7 +1572,8 @@ class RedmineClient:
     
     def refresh_cache(self):
         """Manually refresh cache"""
-        self._refresh_enum_cache()
+        with self._cache_lock():
+            self._refresh_enum_cache()
     
     def create_time_entry(self, issue_id: int, hours: float, activity_id: int, 
                          comments: str = "", spent_on: Optional[str] = None,
@@ -735,15 +1620,500 @@ class RedmineClient:
             
         return response['time_entry']['id']
     
+    def bulk_create_time_entries(self, entries: List[Dict[str, Any]],
+                                 max_workers: int = BULK_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Create many time entries concurrently (within the client's rate limit)
+        
+        Args:
+            entries: Rows of create_time_entry arguments (issue_id, hours, activity_id, comments, spent_on, user_id)
+            max_workers: Requests in flight at once
+            
+        Returns:
+            One result per row, in input order: {'row', 'id'} on success or {'row', 'error'}
+        """
+        def submit(row: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+            unknown = set(entry) - set(TIME_ENTRY_KEYS)
+            if unknown:
+                return {'row': row, 'error': f"Unknown field(s): {', '.join(sorted(unknown))}"}
+            missing = [key for key in ('issue_id', 'hours', 'activity_id') if entry.get(key) is None]
+            if missing:
+                return {'row': row, 'error': f"Missing field(s): {', '.join(missing)}"}
+            try:
+                if float(entry['hours']) <= 0:
+                    return {'row': row, 'error': "Hours must be greater than 0"}
+            except (TypeError, ValueError):
+                return {'row': row, 'error': "Hours must be a number"}
+            try:
+                return {'row': row, 'id': self.create_time_entry(**entry)}
+            except RedmineAPIError as e:
+                return {'row': row, 'error': str(e)}
+        
+        if not entries:
+            return []
+        workers = min(max(max_workers, 1), len(entries))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-bulk') as executor:
+            return list(executor.map(submit, range(len(entries)), entries))
+    
+    def iter_time_entries(self, project_id: Optional[int] = None, user_id: Union[int, str, None] = None,
+                          issue_id: Optional[int] = None, activity_id: Optional[int] = None,
+                          from_date: Optional[str] = None, to_date: Optional[str] = None,
+                          max_items: Optional[int] = None,
+                          page_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream time entries filtered by Redmine (project, user or "me", issue, activity,
+        spent_on date range), one page request at a time
+        """
+        try:
+            filters = validate_and_clean_data({
+                'project_id': project_id, 'issue_id': issue_id, 'activity_id': activity_id,
+                'user_id': user_id, 'from': from_date, 'to': to_date,
+            }, "query")
+        except RedmineValidationError as e:
+            raise RedmineAPIError(f"Query parameter validation failed: {e}")
+        
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        offset = 0
+        yielded = 0
+        while max_items is None or yielded < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - yielded)
+            response = self._make_request('GET', '/time_entries.json',
+                                          params={**filters, 'limit': limit, 'offset': offset})
+            page = response.get('time_entries', [])
+            yield from page
+            yielded += len(page)
+            offset += len(page)
+            total = response.get('total_count')
+            if len(page) < limit or (total is not None and offset >= total):
+                return
+    
+    def warm_up(self, connections: Optional[int] = None, prefetch_issues: Optional[bool] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Open pooled connections and load caches concurrently before serving requests
+        
+        Args:
+            connections: Number of keep-alive connections to open (default from config)
+            prefetch_issues: Whether to prefetch the current user's open issues (default from config)
+            timeout: Time budget in seconds; unfinished tasks keep running in the background
+            
+        Returns:
+            Dict with per-task status ('ok', 'timeout' or an error message) and elapsed seconds
+        """
+        connections = connections or self.config.warmup_connections
+        if prefetch_issues is None:
+            prefetch_issues = self.config.warmup_prefetch_issues
+        timeout = timeout or self.config.warmup_timeout
+        
+        def resolve_user():
+            with self._prefetching():
+                user = self.get_current_user()
+                if prefetch_issues:
+                    # Same query as the get_my_issues tool defaults
+                    self.list_issues(assigned_to_id=user['id'], status_id='o',
+                                     limit=20, sort='updated_on:desc')
+        
+        def open_connection():
+            self.session.head(self.config.redmine_domain, timeout=self.config.redmine_timeout)
+        
+        tasks = {'enum_cache': self._load_enum_cache, 'current_user': resolve_user}
+        # The tasks above open connections too; top up the pool to the requested size
+        for i in range(max(connections - len(tasks), 0)):
+            tasks[f'connection_{i + 1}'] = open_connection
+        
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='redmine-warmup')
+        futures = {executor.submit(func): name for name, func in tasks.items()}
+        done, _ = wait(futures, timeout=timeout)
+        executor.shutdown(wait=False)
+        
+        results = {}
+        for future, name in futures.items():
+            if future not in done:
+                results[name] = 'timeout'
+            elif future.exception() is not None:
+                results[name] = str(future.exception())
+            else:
+                results[name] = 'ok'
+        
+        return {'tasks': results, 'elapsed': time.monotonic() - start}
+    
+    def get_attachment(self, attachment_id: int) -> Dict[str, Any]:
+        """Get attachment metadata (filename, filesize, content_type, content_url, ...)"""
+        response = self._make_request('GET', f'/attachments/{attachment_id}.json')
+        if 'attachment' not in response:
+            raise RedmineAPIError(f"Attachment {attachment_id} does not exist")
+        return response['attachment']
+    
+    def download_attachment(self, attachment_id: int, max_bytes: Optional[int] = None,
+                            chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Stream an attachment to the spool directory (REDMINE_MCP_ATTACHMENT_DIR)
+        
+        The file is written in `chunk_size` pieces to `<id>/<filename>.part` and renamed when
+        complete. An interrupted download resumes with an HTTP Range request; a complete copy
+        is revalidated with its ETag, so unchanged attachments are not downloaded again.
+        Files are hard-linked by SHA-256 under `blobs/`, so identical content is stored once;
+        they are read-only, and a copy whose content no longer matches is downloaded again.
+        Concurrent downloads of the same attachment wait for each other (a lock on `<id>/`).
+        
+        Args:
+            attachment_id: Attachment ID
+            max_bytes: Size cap (default REDMINE_MCP_MAX_DOWNLOAD_MB); larger files are refused
+            chunk_size: Bytes read per chunk
+            
+        Returns:
+            Dict with id, filename, content_type, path, size, sha256 and status
+            ('downloaded', 'resumed', 'unchanged' or 'deduplicated')
+        """
+        max_bytes = max_bytes or int(self.config.max_download_mb * 1024 * 1024)
+        meta = self.get_attachment(attachment_id)
+        size = meta.get('filesize') or 0
+        if size > max_bytes:
+            raise RedmineAPIError(f"Attachment {attachment_id} is {size} bytes, over the {max_bytes} byte limit")
+        
+        filename = Path(str(meta.get('filename') or '')).name or f"attachment-{attachment_id}"
+        folder = Path(self.config.attachment_dir) / str(attachment_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        with self._download_lock(folder):
+            return self._spool_attachment(attachment_id, meta, folder / filename, max_bytes, chunk_size)
+    
+    @contextmanager
+    def _download_lock(self, folder: Path):
+        """Hold an exclusive lock on an attachment's spool folder, across threads and processes"""
+        with self._download_locks_guard:
+            lock = self._download_locks.setdefault(folder.name, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(folder / '.lock', 'a') as lock_fd:
+                fcntl.flock(lock_fd.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_fd.fileno(), fcntl.LOCK_UN)
+    
+    def _spool_attachment(self, attachment_id: int, meta: Dict[str, Any], target: Path, max_bytes: int,
+                          chunk_size: int) -> Dict[str, Any]:
+        """Download (or resume, or revalidate) one attachment into `target`; the folder lock is held"""
+        import requests
+        
+        filename = target.name
+        folder = target.parent
+        partial = folder / f"{filename}.part"
+        sidecar = folder / '.download.json'
+        try:
+            previous = json.loads(sidecar.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            previous = {}
+        
+        headers = {}
+        offset = 0
+        # A copy edited in place (or through a shared blob) must not be revalidated as unchanged
+        complete = (target.exists() and previous.get('size') == target.stat().st_size
+                    and previous.get('sha256') == self._file_digest(target, chunk_size).hexdigest())
+        if complete and previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        elif partial.exists() and previous.get('etag'):
+            # Without a validator the rest could come from a newer version; such a partial is rewritten
+            offset = partial.stat().st_size
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = previous['etag']
+        
+        endpoint = f'/attachments/download/{attachment_id}'
+        # Downloads bypass _make_request but share its read circuit, so an outage stops them too
+        breaker = self.breakers['read']
+        if not breaker.allow():
+            raise self._circuit_open_error(breaker)
+        failed = True
+        start = time.perf_counter()
+        status = 'error'
+        received = 0
+        try:
+            with self.governor.slot():
+                start = time.perf_counter()
+                response = self.session.get(f"{self.config.redmine_domain}{endpoint}", headers=headers,
+                                            stream=True, timeout=self.config.redmine_timeout)
+            status = str(response.status_code)
+            failed = response.status_code >= 500
+            try:
+                if response.status_code == 304:
+                    result_status = 'unchanged'
+                elif response.status_code == 416:
+                    # The partial file no longer fits the attachment; start over
+                    partial.unlink(missing_ok=True)
+                    result_status = None
+                else:
+                    response.raise_for_status()
+                    resumed = response.status_code == 206 and offset > 0
+                    etag = response.headers.get('ETag')
+                    if resumed:
+                        # Hash what is already on disk before appending the rest
+                        digest = self._file_digest(partial, chunk_size)
+                    else:
+                        digest, offset = hashlib.sha256(), 0
+                        # Keep the ETag before the body arrives so an interrupted download resumes against it
+                        sidecar.write_text(json.dumps({'etag': etag}), encoding='utf-8')
+                    with open(partial, 'ab' if resumed else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size):
+                            received += len(chunk)
+                            if offset + received > max_bytes:
+                                break
+                            f.write(chunk)
+                            digest.update(chunk)
+                    if offset + received > max_bytes:
+                        partial.unlink()
+                        raise RedmineAPIError(f"Attachment {attachment_id} exceeds the {max_bytes} byte limit")
+                    previous = {'etag': etag, 'sha256': digest.hexdigest(), 'size': offset + received}
+                    result_status = self._store_download(partial, target, previous['sha256'])
+                    if resumed:
+                        result_status = 'resumed'
+                    sidecar.write_text(json.dumps(previous), encoding='utf-8')
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            # Connection errors and timeouts (also mid-stream) count against the circuit; 4xx do not
+            failed = failed or not isinstance(e, requests.exceptions.HTTPError)
+            raise RedmineAPIError(RedmineValidator.get_friendly_error_message(e, "request"))
+        finally:
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            get_metrics().observe_request('GET', endpoint, status, time.perf_counter() - start, received)
+        
+        if result_status is None:
+            return self._spool_attachment(attachment_id, meta, target, max_bytes, chunk_size)
+        return {
+            'id': attachment_id, 'filename': filename, 'content_type': meta.get('content_type'),
+            'path': str(target), 'size': previous.get('size'), 'sha256': previous.get('sha256'),
+            'status': result_status,
+        }
+    
+    @staticmethod
+    def _file_digest(path: Path, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Any:
+        """SHA-256 of a file, read in `chunk_size` pieces"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest
+    
+    def _store_download(self, partial: Path, target: Path, sha256: str) -> str:
+        """
+        Move a finished download into place, sharing identical content through blobs/<sha256>
+        
+        Shared files are made read-only, since every download hard-linked to a blob sees a change
+        to any of them; a blob whose content no longer matches its hash is replaced, not reused.
+        """
+        blob = Path(self.config.attachment_dir) / 'blobs' / sha256
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target.unlink()
+        if blob.exists() and self._file_digest(blob).hexdigest() != sha256:
+            blob.unlink()
+        if blob.exists():
+            partial.unlink()
+            try:
+                os.link(blob, target)
+            except OSError:
+                import shutil
+                shutil.copyfile(blob, target)
+                target.chmod(READ_ONLY)
+            return 'deduplicated'
+        os.replace(partial, target)
+        target.chmod(READ_ONLY)
+        try:
+            os.link(target, blob)
+        except OSError:
+            pass
+        return 'downloaded'
+    
+    def upload_file(self, path: Union[str, Path], filename: Optional[str] = None,
+                    content_type: Optional[str] = None, description: Optional[str] = None,
+                    chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Stream a local file to /uploads.json and return the token that attaches it to an issue
+        
+        The file is sent as the raw request body in `chunk_size` pieces, so memory use does not
+        grow with the file size. Pass the result (or a list of them) as `uploads` to
+        create_issue or update_issue.
+        
+        Only files inside REDMINE_MCP_UPLOAD_DIR can be uploaded (symlinks are followed before
+        the check); without it uploads are disabled.
+        
+        Args:
+            path: Local file path, absolute or relative to REDMINE_MCP_UPLOAD_DIR
+            filename: Attachment name (default the file's name)
+            content_type: MIME type (default guessed from the filename)
+            description: Attachment description
+            chunk_size: Bytes read per chunk
+            
+        Returns:
+            Dict with path, token, filename, content_type, description and size
+        """
+        import mimetypes
+        
+        path = Path(path).expanduser()
+        source = self._upload_source(path)
+        if not source.is_file():
+            raise RedmineAPIError(f"File not found: {path}")
+        filename = filename or path.name
+        content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        body = FileBody(source, chunk_size)
+        
+        response = self._make_request(
+            'POST', '/uploads.json', params={'filename': filename}, data=body,
+            headers={'Content-Type': 'application/octet-stream'}
+        )
+        if 'upload' not in response or not response['upload'].get('token'):
+            raise RedmineAPIError("Failed to upload file: No upload token in response")
+        
+        return {
+            'path': str(path), 'token': response['upload']['token'], 'filename': filename,
+            'content_type': content_type, 'description': description, 'size': len(body),
+        }
+    
+    def _upload_source(self, path: Path) -> Path:
+        """Resolved location of a file to upload, refused unless it lies inside the upload directory"""
+        if self.config.upload_dir is None:
+            raise RedmineAPIError("File uploads are disabled; set REDMINE_MCP_UPLOAD_DIR to the directory "
+                                  "files may be uploaded from")
+        root = self.config.upload_dir.resolve()
+        source = (root / path).resolve()
+        if not source.is_relative_to(root):
+            raise RedmineAPIError(f"{path} is outside the upload directory (REDMINE_MCP_UPLOAD_DIR)")
+        return source
+    
+    def upload_files(self, paths: List[Union[str, Path]],
+                     max_workers: int = BULK_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Upload several files concurrently (within the client's rate limit)
+        
+        Returns:
+            One result per path, in input order: the upload_file result or {'path', 'error'}
+        """
+        def submit(path: Union[str, Path]) -> Dict[str, Any]:
+            try:
+                return self.upload_file(path)
+            except (RedmineAPIError, OSError) as e:
+                return {'path': str(path), 'error': str(e)}
+        
+        if not paths:
+            return []
+        workers = min(max(max_workers, 1), len(paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='redmine-upload') as executor:
+            return list(executor.map(submit, paths))
+    
+    @staticmethod
+    def _upload_refs(uploads: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Reduce upload results to the fields Redmine accepts in an issue's `uploads`"""
+        if not uploads:
+            return None
+        return [{key: upload[key] for key in UPLOAD_KEYS if upload.get(key)} for upload in uploads]
+    
+    def iter_feed(self, feed: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Stream entries of an Atom feed ("issues" or "activity"), parsed as they arrive
+        
+        Feeds authenticate with the Atom access key (REDMINE_MCP_FEED_KEY); without it
+        only public activity is listed.
+        """
+        import requests
+        from .change_feed import parse_atom_entries
+        
+        endpoint = f'/{feed}.atom'
+        params = dict(params or {})
+        if self.config.feed_key:
+            params['key'] = self.config.feed_key
+        
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            with self.governor.slot():
+                start = time.perf_counter()
+                response = self.session.get(f"{self.config.redmine_domain}{endpoint}", params=params,
+                                            stream=True, timeout=self.config.redmine_timeout)
+            status = str(response.status_code)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise RedmineAPIError(RedmineValidator.get_friendly_error_message(e, "request"))
+        finally:
+            get_metrics().observe_request('GET', endpoint, status, time.perf_counter() - start)
+        
+        try:
+            response.raw.decode_content = True
+            yield from parse_atom_entries(response.raw)
+        finally:
+            response.close()
+    
+    def invalidate(self, issue_ids: Iterable[int] = (), project_identifiers: Iterable[str] = (),
+                   everything: bool = False) -> int:
+        """
+        Drop cached data that changed in Redmine
+        
+        Removes the cached views of the given issues and warm-up responses that may include
+        them; projects the index does not know yet trigger a project index refresh. With
+        `everything`, all issue views are dropped and the index is re-checked.
+        
+        Returns:
+            Number of cached issue views dropped
+        """
+        issue_ids = set(issue_ids)
+        with self._issue_view_lock:
+            if everything:
+                dropped = len(self._issue_views)
+                self._issue_views.clear()
+            else:
+                dropped = sum(self._issue_views.pop(issue_id, None) is not None for issue_id in issue_ids)
+        
+        if everything or issue_ids:
+            endpoints = None if everything else {f'/issues/{issue_id}.json' for issue_id in issue_ids} | {'/issues.json'}
+            with self._prefetch_lock:
+                for key in [key for key in self._prefetched if endpoints is None or key[1] in endpoints]:
+                    del self._prefetched[key]
+        
+        index = self._project_index
+        if everything or (index is not None and any(index.resolve(ref) is None for ref in project_identifiers)):
+            self._project_index_checked_at = 0.0
+        return dropped
+    
     def test_connection(self) -> bool:
         """Test connection"""
         try:
-            response = self._make_request('GET', '/my/account.json')
+            response = self._make_request('GET', '/my/account.json', stale_ok=False)
             return 'user' in response
         except RedmineAPIError:
             return False
 
 
+def aggregate_time_entries(entries: Iterable[Dict[str, Any]], group_by: List[str]) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Sum hours of time entries per group (see TIME_ENTRY_GROUPS), consuming the entries as a stream
+    
+    Returns:
+        {group key tuple: {'hours': total, 'entries': count}}
+    """
+    from datetime import date, timedelta
+    
+    def key_part(entry: Dict[str, Any], group: str) -> str:
+        if group == 'day':
+            return entry.get('spent_on', '')
+        if group == 'week':
+            day = date.fromisoformat(entry['spent_on'])
+            return (day - timedelta(days=day.weekday())).isoformat()
+        ref = entry.get(group) or {}
+        if group == 'issue':
+            return f"#{ref['id']}" if ref.get('id') else '(no issue)'
+        return ref.get('name') or str(ref.get('id', ''))
+    
+    totals: Dict[tuple, Dict[str, Any]] = {}
+    for entry in entries:
+        key = tuple(key_part(entry, group) for group in group_by)
+        bucket = totals.setdefault(key, {'hours': 0.0, 'entries': 0})
+        bucket['hours'] += float(entry.get('hours') or 0)
+        bucket['entries'] += 1
+    return totals
+
+
 # Global client instance
 _client: Optional[RedmineClient] = None
 
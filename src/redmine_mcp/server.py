@@ -3,26 +3,111 @@ Redmine MCP Server Main Program
 Provides MCP tools integrated with the Redmine system
 """
 
+import argparse
+import functools
+import json
 import os
-from typing import Any
-from datetime import datetime
+import sys
+from typing import Any, Union
+from datetime import datetime, timedelta, timezone
 
-# Ensure configuration is loaded before FastMCP initialization
-# This handles all environment variable settings, including FASTMCP_LOG_LEVEL
+import anyio
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.utilities.logging import configure_logging
 from .config import get_config
-config = get_config()
+from .redmine_client import (
+    get_client, aggregate_time_entries, collect_stale_reads, RedmineAPIError, ISSUE_INCLUDES, RELATION_TYPES,
+    TIME_ENTRY_GROUPS
+)
+from .metrics import get_metrics, timed_tool
+from .formatters import (
+    format_issue, format_project_issues, format_my_issues, format_search_results, format_issue_counts, format_time_report,
+    format_issue_graph, format_changes, format_flow_report, journal_changes, parse_timestamp,
+    to_json, project_fields, table, issue_record, issue_detail_record, enumeration_record,
+    ISSUE_FIELDS, PROJECT_FIELDS, USER_FIELDS, ISSUE_COLUMNS, MY_ISSUE_COLUMNS, SEARCH_COLUMNS, PROJECT_COLUMNS, USER_COLUMNS
+)
+
+
+class InstrumentedFastMCP(FastMCP):
+    """FastMCP server that records latency metrics for every registered tool
+    
+    FastMCP calls plain (sync) tools on the event loop; tools registered with `blocking=True`,
+    which may wait for a long time, run in a worker thread instead so other calls (and
+    cancellation) are not held up. Cancelling such a call abandons the thread, which ends
+    on its own once the tool's bounded wait is over.
+    """
+    
+    def tool(self, *args, blocking: bool = False, **kwargs):
+        register = super().tool(*args, **kwargs)
+        
+        def decorator(fn):
+            timed = timed_tool(fn)
+            if not blocking:
+                return register(timed)
+            
+            @functools.wraps(fn)
+            async def run_in_thread(*call_args, **call_kwargs):
+                return await anyio.to_thread.run_sync(functools.partial(timed, *call_args, **call_kwargs),
+                                                      abandon_on_cancel=True)
+            return register(run_in_thread)
+        return decorator
+
+
+# Values accepted by the `format` argument of tools
+OUTPUT_FORMATS = ('text', 'json')
+
+
+def structured_output(fn=None, *, formats: tuple = OUTPUT_FORMATS):
+    """Resolve a tool's `format` argument (server default when omitted); in JSON mode
+    messages from the text code paths (errors, not-found hints) are returned as {"error": ...}.
+    Answers built from cached responses while Redmine was unreachable are marked stale.
+    Use as @structured_output, or @structured_output(formats=...) for tools with extra formats."""
+    if fn is None:
+        return functools.partial(structured_output, formats=formats)
+    
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        output_format = (kwargs.get('format') or get_config().output_format).lower()
+        if output_format not in formats:
+            return f"Error: format must be one of: {', '.join(formats)}"
+        kwargs['format'] = output_format
+        with collect_stale_reads() as stale_ages:
+            result = fn(*args, **kwargs)
+        if output_format == 'json' and isinstance(result, str) and not result.startswith('{'):
+            result = to_json({'error': result})
+        if stale_ages and isinstance(result, str):
+            age = round(max(stale_ages))
+            if output_format == 'json':
+                return to_json({**json.loads(result), 'stale': True, 'stale_age_seconds': age})
+            return f"{result}\n\n⚠ Redmine is unreachable: this answer uses cached data up to {age} seconds old"
+        return result
+    return wrapper
+
+
+def issue_columns(format: str, fields: list[str], default_columns: tuple) -> tuple:
+    """Issue attributes a list tool renders (JSON `fields`, else its table columns), so the
+    client only keeps those on each listed issue"""
+    if format == "json" and fields:
+        return tuple(fields)
+    return default_columns
+
+
+# Issue sections shown by get_issue unless the caller passes `include`
+DEFAULT_ISSUE_INCLUDES = ('attachments', 'journals')
 
-from mcp.server.fastmcp import FastMCP
-from .redmine_client import get_client, RedmineAPIError
 
 # Create FastMCP server instance
-mcp = FastMCP("Redmine MCP")
+mcp = InstrumentedFastMCP("Redmine MCP")
 
 
 @mcp.tool()
-def server_info() -> str:
-    """Get server information and status"""
+@structured_output
+def server_info(format: str = None) -> str:
+    """Get server information and status (format: "text" or "json")"""
     config = get_config()
+    if format == "json":
+        return to_json({'domain': config.redmine_domain, 'debug': config.debug_mode,
+                        'timeout': config.redmine_timeout})
     return f"""Redmine MCP server started
 - Redmine domain: {config.redmine_domain}
 - Debug mode: {config.debug_mode}
@@ -30,101 +115,86 @@ def server_info() -> str:
 
 
 @mcp.tool()
-def health_check() -> str:
-    """Health check tool to confirm server is running normally"""
+@structured_output
+def health_check(format: str = None) -> str:
+    """Health check tool to confirm server is running normally (format: "text" or "json")"""
     try:
         config = get_config()
         client = get_client()
         # Test connection
-        if client.test_connection():
+        connected = client.test_connection()
+        circuits = {name: breaker.state for name, breaker in client.breakers.items()}
+        if format == "json":
+            return to_json({'ok': connected, 'domain': config.redmine_domain, 'circuits': circuits})
+        if connected:
             return f"✓ Server is running normally, connected to {config.redmine_domain}"
         else:
-            return f"✗ Unable to connect to Redmine server: {config.redmine_domain}"
+            tripped = [f"{name} circuit {state}" for name, state in circuits.items() if state != 'closed']
+            return (f"✗ Unable to connect to Redmine server: {config.redmine_domain}" +
+                    (f" ({', '.join(tripped)})" if tripped else ""))
     except Exception as e:
         return f"✗ Server error: {str(e)}"
 
 
 @mcp.tool()
-def get_issue(issue_id: int, include_details: bool = True) -> str:
+@structured_output
+def get_issue(issue_id: int, include_details: bool = True, include: list[str] = None, journal_offset: int = 0,
+              journal_limit: int = None, since: str = None, max_chars: int = None,
+              format: str = None, fields: list[str] = None) -> str:
     """
     Get detailed information for a specified Redmine issue
     
     Args:
         issue_id: Issue ID
         include_details: Whether to include details (description, notes, attachments, etc.)
+        include: Sections to fetch and show, any of "attachments", "journals", "changesets",
+            "relations", "watchers", "children" (default: attachments and journals)
+        journal_offset: Number of notes to skip (for paging through long histories)
+        journal_limit: Maximum number of notes to show (default: all)
+        since: Only show notes created on or after this date (YYYY-MM-DD or ISO 8601 timestamp)
+        max_chars: Stop adding notes once the response reaches this many characters;
+            the response ends with the journal_offset to continue from
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, only return these top-level keys (e.g. ["subject", "status", "notes"])
     
     Returns:
         Detailed issue information in a readable format
     """
     try:
+        if journal_offset < 0:
+            return "Error: journal_offset cannot be negative"
+        if journal_limit is not None and journal_limit < 1:
+            return "Error: journal_limit must be at least 1"
+        if max_chars is not None and max_chars < 1:
+            return "Error: max_chars must be at least 1"
+        since_time = None
+        if since:
+            try:
+                since_time = parse_timestamp(since)
+            except ValueError:
+                return "Error: since format must be YYYY-MM-DD or an ISO 8601 timestamp"
+        
+        if include is None:
+            include = list(DEFAULT_ISSUE_INCLUDES)
+        unknown = [name for name in include if name not in ISSUE_INCLUDES]
+        if unknown:
+            return f"Error: Unknown include section(s): {', '.join(unknown)} (valid: {', '.join(ISSUE_INCLUDES)})"
+        
         client = get_client()
-        include_params = []
-        if include_details:
-            include_params = ['attachments', 'changesets', 'children', 'journals', 'relations', 'watchers']
+        # Only request the sections that will be rendered
+        include_params = include if include_details else []
         
         # Use new get_issue_raw method to get full data
         issue_data = client.get_issue_raw(issue_id, include=include_params)
         
-        # Format basic issue info
-        # Handle parent issue info
-        parent_info = "No parent issue"
-        if 'parent' in issue_data and issue_data['parent']:
-            parent_info = f"#{issue_data['parent']['id']} - {issue_data['parent'].get('subject', 'N/A')}"
-        
-        result = f"""Issue #{issue_data['id']}: {issue_data['subject']}
-
-Basic Info:
-- Project: {issue_data['project'].get('name', 'N/A')} (ID: {issue_data['project'].get('id', 'N/A')})
-- Tracker: {issue_data['tracker'].get('name', 'N/A')}
-- Status: {issue_data['status'].get('name', 'N/A')}
-- Priority: {issue_data['priority'].get('name', 'N/A')}
-- Author: {issue_data['author'].get('name', 'N/A')}
-- Assigned to: {issue_data.get('assigned_to', {}).get('name', 'Unassigned') if issue_data.get('assigned_to') else 'Unassigned'}
-- Parent issue: {parent_info}
-- Done ratio: {issue_data.get('done_ratio', 0)}%
-- Start date: {issue_data.get('start_date', 'Not set')}
-- Due date: {issue_data.get('due_date', 'Not set')}
-- Estimated hours: {issue_data.get('estimated_hours', 'Not set')} hours
-- Created on: {issue_data.get('created_on', 'N/A')}
-- Updated on: {issue_data.get('updated_on', 'N/A')}
-
-Description:
-{issue_data.get('description', 'No description')}"""
-
-        # Add attachment info
-        if include_details and 'attachments' in issue_data and issue_data['attachments']:
-            result += f"\n\nAttachments ({len(issue_data['attachments'])}):"
-            for attachment in issue_data['attachments']:
-                file_size = attachment.get('filesize', 0)
-                file_size_mb = file_size / (1024 * 1024) if file_size > 0 else 0
-                size_text = f"{file_size_mb:.2f} MB" if file_size_mb >= 1 else f"{file_size} bytes"
-                
-                result += f"""
-- Filename: {attachment.get('filename', 'N/A')}
-  Size: {size_text}
-  Type: {attachment.get('content_type', 'N/A')}
-  Uploaded by: {attachment.get('author', {}).get('name', 'N/A')}
-  Uploaded on: {attachment.get('created_on', 'N/A')}
-  Download link: {client.config.redmine_domain}/attachments/download/{attachment.get('id', '')}/{attachment.get('filename', '')}"""
-
-        # Add notes/history
-        if include_details and 'journals' in issue_data and issue_data['journals']:
-            # Filter records with note content
-            notes_journals = [j for j in issue_data['journals'] if j.get('notes', '').strip()]
-            
-            if notes_journals:
-                result += f"\n\nNotes/History ({len(notes_journals)}):"
-                for i, journal in enumerate(notes_journals, 1):
-                    author_name = journal.get('user', {}).get('name', 'N/A')
-                    created_on = journal.get('created_on', 'N/A')
-                    notes = journal.get('notes', '').strip()
-                    
-                    result += f"""
-
-#{i} - {author_name} ({created_on}):
-{notes}"""
-
-        return result
+        if format == "json":
+            record = issue_detail_record(issue_data, client.config.redmine_domain,
+                                         journal_offset=journal_offset, journal_limit=journal_limit,
+                                         since=since_time, max_chars=max_chars)
+            return to_json(project_fields(record, fields))
+        return format_issue(issue_data, client.config.redmine_domain, include_details,
+                            journal_offset=journal_offset, journal_limit=journal_limit,
+                            since=since_time, max_chars=max_chars)
         
     except RedmineAPIError as e:
         return f"Failed to get issue: {str(e)}"
@@ -133,7 +203,9 @@ Description:
 
 
 @mcp.tool()
-def update_issue_status(issue_id: int, status_id: int = None, status_name: str = None, notes: str = "") -> str:
+@structured_output
+def update_issue_status(issue_id: int, status_id: int = None, status_name: str = None, notes: str = "",
+                        format: str = None) -> str:
     """
     Update issue status
     
@@ -142,6 +214,7 @@ def update_issue_status(issue_id: int, status_id: int = None, status_name: str =
         status_id: New status ID (choose one with status_name)
         status_name: New status name (choose one with status_id)
         notes: Update notes (optional)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Update result message
@@ -170,6 +243,9 @@ def update_issue_status(issue_id: int, status_id: int = None, status_name: str =
         # Get updated issue info for confirmation
         updated_issue = client.get_issue(issue_id)
         
+        if format == "json":
+            return to_json({'updated': True, 'issue': issue_record(updated_issue)})
+        
         result = f"""Issue status updated successfully!
 
 Issue: #{issue_id} - {updated_issue.subject}
@@ -187,14 +263,19 @@ New status: {updated_issue.status.get('name', 'N/A')}"""
 
 
 @mcp.tool()
-def list_project_issues(project_id: int, status_filter: str = "open", limit: int = 20) -> str:
+@structured_output
+def list_project_issues(project_id: Union[int, str], status_filter: str = "open", limit: int = 20,
+                        include_subprojects: bool = True, format: str = None, fields: list[str] = None) -> str:
     """
     List issues for a project
     
     Args:
-        project_id: Project ID
+        project_id: Project ID, identifier or name
         status_filter: Status filter ("open", "closed", "all")
         limit: Maximum number of results (default 20, max 100)
+        include_subprojects: Also list issues of subprojects (default true)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each item (default: the text table's columns)
     
     Returns:
         List of project issues in table format
@@ -205,12 +286,18 @@ def list_project_issues(project_id: int, status_filter: str = "open", limit: int
         # Restrict limit range
         limit = min(max(limit, 1), 100)
         
+        # Resolve identifiers and names through the cached project index
+        project = client.resolve_project(project_id)
+        
         # Set parameters based on status filter
         params = {
-            'project_id': project_id,
+            'project_id': project.id,
             'limit': limit,
-            'sort': 'updated_on:desc'
+            'sort': 'updated_on:desc',
+            'fields': issue_columns(format, fields, ISSUE_COLUMNS)
         }
+        if not include_subprojects:
+            params['subproject_id'] = '!*'
         
         # Handle status filter
         if status_filter == "open":
@@ -222,33 +309,23 @@ def list_project_issues(project_id: int, status_filter: str = "open", limit: int
         # Get issue list
         issues = client.list_issues(**params)
         
+        subprojects = client.get_project_index().subtree(project.id)[1:] if include_subprojects else []
+        
+        if format == "json":
+            response = {'project_id': project.id, 'project': project.name, 'status_filter': status_filter}
+            if subprojects:
+                response['subproject_ids'] = subprojects
+            response['issues'] = table(issues, ISSUE_FIELDS, fields, ISSUE_COLUMNS)
+            return to_json(response)
+        
         if not issues:
             return f"No issues found in project {project_id} matching the criteria"
         
-        # Get project info
-        try:
-            project = client.get_project(project_id)
-            project_name = project.name
-        except:
-            project_name = f"Project {project_id}"
-        
-        # Format issue list
-        result = f"""Project: {project_name}
-Status filter: {status_filter}
-Found {len(issues)} issues:
-
-{"ID":<8} {"Title":<40} {"Status":<12} {"Assigned To":<15} {"Updated":<10}
-{"-"*8} {"-"*40} {"-"*12} {"-"*15} {"-"*10}"""
-
-        for issue in issues:
-            title = issue.subject[:37] + "..." if len(issue.subject) > 40 else issue.subject
-            status = issue.status.get('name', 'N/A')[:10]
-            assignee = issue.assigned_to.get('name', 'Unassigned')[:13] if issue.assigned_to else 'Unassigned'
-            updated = issue.updated_on[:10] if issue.updated_on else 'N/A'
-            
-            result += f"\n{issue.id:<8} {title:<40} {status:<12} {assignee:<15} {updated:<10}"
+        project_name = project.name
+        if subprojects:
+            project_name += f" (including {len(subprojects)} subprojects)"
         
-        return result
+        return format_project_issues(project_name, status_filter, issues)
         
     except RedmineAPIError as e:
         return f"Failed to list project issues: {str(e)}"
@@ -257,10 +334,14 @@ Found {len(issues)} issues:
 
 
 @mcp.tool()
-def get_issue_statuses() -> str:
+@structured_output
+def get_issue_statuses(format: str = None) -> str:
     """
     Get all available issue statuses
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Formatted status list
     """
@@ -268,6 +349,9 @@ def get_issue_statuses() -> str:
         client = get_client()
         statuses = client.get_issue_statuses()
         
+        if format == "json":
+            return to_json({'statuses': [enumeration_record(item, 'is_closed') for item in statuses]})
+        
         if not statuses:
             return "No issue statuses found"
         
@@ -288,10 +372,14 @@ def get_issue_statuses() -> str:
 
 
 @mcp.tool()
-def get_trackers() -> str:
+@structured_output
+def get_trackers(format: str = None) -> str:
     """
     Get all available trackers
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Formatted tracker list
     """
@@ -299,6 +387,9 @@ def get_trackers() -> str:
         client = get_client()
         trackers = client.get_trackers()
         
+        if format == "json":
+            return to_json({'trackers': [enumeration_record(item) for item in trackers]})
+        
         if not trackers:
             return "No trackers found"
         
@@ -319,10 +410,14 @@ def get_trackers() -> str:
 
 
 @mcp.tool()
-def get_priorities() -> str:
+@structured_output
+def get_priorities(format: str = None) -> str:
     """
     Get all available issue priorities
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Formatted priority list
     """
@@ -330,6 +425,9 @@ def get_priorities() -> str:
         client = get_client()
         priorities = client.get_priorities()
         
+        if format == "json":
+            return to_json({'priorities': [enumeration_record(item, 'is_default') for item in priorities]})
+        
         if not priorities:
             return "No issue priorities found"
         
@@ -350,10 +448,14 @@ def get_priorities() -> str:
 
 
 @mcp.tool()
-def get_time_entry_activities() -> str:
+@structured_output
+def get_time_entry_activities(format: str = None) -> str:
     """
     Get all available time tracking activities
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Formatted time tracking activity list
     """
@@ -361,6 +463,9 @@ def get_time_entry_activities() -> str:
         client = get_client()
         activities = client.get_time_entry_activities()
         
+        if format == "json":
+            return to_json({'activities': [enumeration_record(item, 'is_default') for item in activities]})
+        
         if not activities:
             return "No time tracking activities found"
         
@@ -381,10 +486,14 @@ def get_time_entry_activities() -> str:
 
 
 @mcp.tool()
-def get_document_categories() -> str:
+@structured_output
+def get_document_categories(format: str = None) -> str:
     """
     Get all available document categories
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Formatted document category list
     """
@@ -392,6 +501,9 @@ def get_document_categories() -> str:
         client = get_client()
         categories = client.get_document_categories()
         
+        if format == "json":
+            return to_json({'categories': [enumeration_record(item, 'is_default') for item in categories]})
+        
         if not categories:
             return "No document categories found"
         
@@ -411,28 +523,189 @@ def get_document_categories() -> str:
         return f"System error: {str(e)}"
 
 
+# issue_counts dimensions and the list_issues filter each one sets
+COUNT_DIMENSIONS = {
+    'project': 'project_id',
+    'status': 'status_id',
+    'tracker': 'tracker_id',
+    'priority': 'priority_id',
+    'assignee': 'assigned_to_id',
+}
+
+# Most count queries (grid cells) a single issue_counts call may issue
+MAX_COUNT_CELLS = 200
+
+STATUS_FILTERS = {'open': 'o', 'closed': 'c', 'all': '*'}
+
+
+def _count_dimension_values(client, dimension: str, project_id: int = None) -> list[tuple[str, int]]:
+    """(name, id) values of an issue_counts dimension, from the enum cache where possible;
+    with `project_id`, the project dimension only covers that project and its subprojects"""
+    if dimension == 'project':
+        index = client.get_project_index()
+        projects = [project for project, _ in index.walk(project_id)]
+        if project_id is not None and project_id in index.projects:
+            projects.insert(0, index.projects[project_id])
+        return [(project.name, project.id) for project in projects if project.status == 1]
+    if dimension == 'status':
+        values = client.get_available_statuses()
+    elif dimension == 'tracker':
+        values = client.get_available_trackers()
+    elif dimension == 'priority':
+        values = client.get_available_priorities()
+    else:
+        values = client.get_available_users()['by_name']
+    return sorted(values.items(), key=lambda item: item[1])
+
+
+def _select_values(values: list[tuple[str, int]], names: list[str], dimension: str) -> list[tuple[str, int]]:
+    """Restrict dimension values to the given names (case-insensitive)"""
+    if not names:
+        return values
+    by_name = {name.lower(): (name, value_id) for name, value_id in values}
+    unknown = [name for name in names if name.lower() not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown {dimension} value(s): {', '.join(unknown)}")
+    return [by_name[name.lower()] for name in names]
+
+
 @mcp.tool()
-def get_projects() -> str:
+@structured_output
+def issue_counts(rows: str = "status", columns: str = None, project_id: Union[int, str] = None,
+                 status_filter: str = "open", tracker_id: int = None, assigned_to_id: int = None,
+                 row_values: list[str] = None, column_values: list[str] = None, format: str = None) -> str:
     """
-    Get list of accessible projects
+    Count issues per project/status/tracker/priority/assignee without downloading issue lists
+    
+    Each cell is a limit=1 query that only reads Redmine's total_count; queries run concurrently.
+    
+    Args:
+        rows: Dimension for rows ("project", "status", "tracker", "priority", "assignee")
+        columns: Optional second dimension for columns (same choices, different from rows)
+        project_id: Only count issues in this project (ID, identifier or name) and its subprojects;
+            the project dimension then lists only those projects
+        status_filter: "open", "closed" or "all" (ignored for the status dimension)
+        tracker_id: Only count issues of this tracker
+        assigned_to_id: Only count issues assigned to this user
+        row_values: Only these row values, by name (e.g. ["Bug", "Feature"])
+        column_values: Only these column values, by name
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Count matrix; rows and columns without any issues are omitted
+    """
+    try:
+        dimensions = [rows] + ([columns] if columns else [])
+        unknown = [name for name in dimensions if name not in COUNT_DIMENSIONS]
+        if unknown:
+            return f"Error: Unknown dimension(s): {', '.join(unknown)}. Choose from: {', '.join(COUNT_DIMENSIONS)}"
+        if rows == columns:
+            return "Error: rows and columns must be different dimensions"
+        if status_filter not in STATUS_FILTERS:
+            return f"Error: status_filter must be one of: {', '.join(STATUS_FILTERS)}"
+        
+        client = get_client()
+        if project_id is not None:
+            project_id = client.resolve_project(project_id).id
+        
+        base = {'status_id': '*' if 'status' in dimensions else STATUS_FILTERS[status_filter]}
+        for key, value in (('project_id', project_id), ('tracker_id', tracker_id),
+                           ('assigned_to_id', assigned_to_id)):
+            if value is not None:
+                base[key] = value
+        
+        try:
+            row_items = _select_values(_count_dimension_values(client, rows, project_id), row_values, rows)
+            column_items = (_select_values(_count_dimension_values(client, columns, project_id), column_values,
+                                           columns) if columns else [('count', None)])
+        except ValueError as e:
+            return f"Error: {e}"
+        
+        if len(row_items) * len(column_items) > MAX_COUNT_CELLS:
+            return (f"Error: {len(row_items)} x {len(column_items)} cells exceeds the limit of {MAX_COUNT_CELLS}; "
+                    f"narrow it with row_values/column_values")
+        
+        # One query for the overall total, then one per cell; project cells exclude subprojects
+        # (which Redmine includes by default) so a parent's row does not also count its children
+        filter_sets = [base]
+        for _, row_id in row_items:
+            for _, column_id in column_items:
+                cell = dict(base)
+                if 'project' in dimensions:
+                    cell['subproject_id'] = '!*'
+                cell[COUNT_DIMENSIONS[rows]] = row_id
+                if columns:
+                    cell[COUNT_DIMENSIONS[columns]] = column_id
+                filter_sets.append(cell)
+        counts = client.count_issues_many(filter_sets)
+        total = counts[0]
+        width = len(column_items)
+        matrix = [counts[1 + i * width:1 + (i + 1) * width] for i in range(len(row_items))]
+        
+        # Omit empty rows and columns to keep the matrix compact
+        kept_columns = [j for j in range(width) if any(row[j] for row in matrix)] if columns else [0]
+        column_names = [column_items[j][0] for j in kept_columns]
+        table_rows = [(name, [row[j] for j in kept_columns])
+                      for (name, _), row in zip(row_items, matrix) if any(row)]
+        
+        if format == "json":
+            return to_json({
+                'by': dimensions, 'filters': base, 'total': total,
+                'columns': [rows, *column_names], 'rows': [[name, *cells] for name, cells in table_rows],
+            })
+        
+        scope = f"by {rows}" + (f" x {columns}" if columns else "")
+        filters = ["all statuses" if 'status' in dimensions else f"{status_filter} issues"]
+        if project_id is not None:
+            filters.append(f"project {project_id}")
+        if tracker_id is not None:
+            filters.append(f"tracker {tracker_id}")
+        if assigned_to_id is not None:
+            filters.append(f"assignee {assigned_to_id}")
+        scope += f" ({', '.join(filters)})"
+        
+        if not table_rows:
+            return f"Issue counts {scope}\nTotal: {total}\n\nNo issues in any {rows}"
+        return format_issue_counts(scope, total, rows.capitalize(), column_names if columns else ['Count'], table_rows)
+        
+    except RedmineAPIError as e:
+        return f"Failed to count issues: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+@mcp.tool()
+@structured_output
+def get_projects(format: str = None, fields: list[str] = None) -> str:
+    """
+    Get list of accessible projects as a tree (subprojects indented under their parent)
+    
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each item (default: the text table's columns)
     
     Returns:
         Formatted project list
     """
     try:
         client = get_client()
-        projects = client.list_projects(limit=50)
+        tree = list(client.get_project_index().walk())
+        
+        if format == "json":
+            return to_json({'projects': table((project for project, _ in tree), PROJECT_FIELDS, fields,
+                                              PROJECT_COLUMNS)})
         
-        if not projects:
+        if not tree:
             return "No accessible projects found"
         
-        result = f"Found {len(projects)} projects:\n\n"
+        result = f"Found {len(tree)} projects:\n\n"
         result += f"{'ID':<5} {'Identifier':<20} {'Name':<30} {'Status':<8}\n"
         result += f"{'-'*5} {'-'*20} {'-'*30} {'-'*8}\n"
         
-        for project in projects:
+        for project, depth in tree:
             status_text = "Active" if project.status == 1 else "Archived"
-            name = project.name[:27] + "..." if len(project.name) > 30 else project.name
+            name = "  " * depth + project.name
+            name = name[:27] + "..." if len(name) > 30 else name
             result += f"{project.id:<5} {project.identifier:<20} {name:<30} {status_text:<8}\n"
         
         return result
@@ -444,14 +717,18 @@ def get_projects() -> str:
 
 
 @mcp.tool()
-def search_issues(query: str, project_id: int = None, limit: int = 10) -> str:
+@structured_output
+def search_issues(query: str, project_id: Union[int, str] = None, limit: int = 10,
+                  format: str = None, fields: list[str] = None) -> str:
     """
     Search issues (search keyword in title or description)
     
     Args:
         query: Search keyword
-        project_id: Restrict search to specific project (optional)
+        project_id: Restrict search to specific project by ID, identifier or name (optional)
         limit: Maximum number of results (default 10, max 50)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each item (default: the text table's columns)
     
     Returns:
         List of issues matching search criteria
@@ -465,15 +742,18 @@ def search_issues(query: str, project_id: int = None, limit: int = 10) -> str:
         
         # Set search parameters
         params = {
-            'limit': limit * 3,  # Get more results for filtering
-            'sort': 'updated_on:desc'
+            'max_items': limit * 3,  # Get more results for filtering
+            'sort': 'updated_on:desc',
+            # The keyword is matched against subject and description whatever columns are shown
+            'fields': issue_columns(format, fields, SEARCH_COLUMNS) + ('subject', 'description')
         }
         
         if project_id:
+            project_id = client.resolve_project(project_id).id
             params['project_id'] = project_id
         
-        # Get issue list
-        all_issues = client.list_issues(**params)
+        # Stream issue pages; no further pages are fetched once enough issues match
+        all_issues = client.iter_issues(**params)
         
         # Filter by keyword locally (Redmine API does not have built-in search)
         query_lower = query.lower()
@@ -486,27 +766,15 @@ def search_issues(query: str, project_id: int = None, limit: int = 10) -> str:
                 if len(matching_issues) >= limit:
                     break
         
+        if format == "json":
+            return to_json({'query': query, 'project_id': project_id,
+                            'issues': table(matching_issues, ISSUE_FIELDS, fields, SEARCH_COLUMNS)})
+        
         if not matching_issues:
             search_scope = f"Project {project_id}" if project_id else "all accessible projects"
             return f"No issues containing '{query}' found in {search_scope}"
         
-        # Format result
-        result = f"Search keyword: '{query}'\n"
-        if project_id:
-            result += f"Search scope: Project {project_id}\n"
-        result += f"Found {len(matching_issues)} related issues:\n\n"
-        
-        result += f"{'ID':<8} {'Title':<35} {'Status':<12} {'Project':<15}\n"
-        result += f"{'-'*8} {'-'*35} {'-'*12} {'-'*15}\n"
-        
-        for issue in matching_issues:
-            title = issue.subject[:32] + "..." if len(issue.subject) > 35 else issue.subject
-            status = issue.status.get('name', 'N/A')[:10]
-            project_name = issue.project.get('name', 'N/A')[:13]
-            
-            result += f"{issue.id:<8} {title:<35} {status:<12} {project_name:<15}\n"
-        
-        return result
+        return format_search_results(query, matching_issues, project_id)
         
     except RedmineAPIError as e:
         return f"Failed to search issues: {str(e)}"
@@ -515,11 +783,12 @@ def search_issues(query: str, project_id: int = None, limit: int = 10) -> str:
 
 
 @mcp.tool()
+@structured_output
 def update_issue_content(issue_id: int, subject: str = None, description: str = None, 
                         priority_id: int = None, priority_name: str = None,
                         done_ratio: int = None, tracker_id: int = None, tracker_name: str = None,
                         parent_issue_id: int = None, remove_parent: bool = False, start_date: str = None, due_date: str = None,
-                        estimated_hours: float = None) -> str:
+                        estimated_hours: float = None, format: str = None) -> str:
     """
     Update issue content (title, description, priority, done ratio, tracker, dates, hours, etc.)
     
@@ -537,6 +806,7 @@ def update_issue_content(issue_id: int, subject: str = None, description: str =
         start_date: New start date YYYY-MM-DD format (optional)
         due_date: New due date YYYY-MM-DD format (optional)
         estimated_hours: New estimated hours (optional)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Update result message
@@ -624,6 +894,9 @@ def update_issue_content(issue_id: int, subject: str = None, description: str =
         # Get updated issue info
         updated_issue = client.get_issue(issue_id)
         
+        if format == "json":
+            return to_json({'updated': True, 'changes': changes, 'issue': issue_record(updated_issue)})
+        
         result = f"""Issue content updated successfully!
 
 Issue: #{issue_id} - {updated_issue.subject}
@@ -645,9 +918,10 @@ Current status:
 
 
 @mcp.tool()
+@structured_output
 def add_issue_note(issue_id: int, notes: str, private: bool = False, 
                    spent_hours: float = None, activity_name: str = None, 
-                   activity_id: int = None, spent_on: str = None) -> str:
+                   activity_id: int = None, spent_on: str = None, format: str = None) -> str:
     """
     Add a note to an issue, can also log time
     
@@ -659,6 +933,7 @@ def add_issue_note(issue_id: int, notes: str, private: bool = False,
         activity_name: Activity name (choose one with activity_id)
         activity_id: Activity ID (choose one with activity_name)
         spent_on: Log date YYYY-MM-DD format (optional, default today)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Add result message
@@ -709,6 +984,13 @@ def add_issue_note(issue_id: int, notes: str, private: bool = False,
         # Get issue info
         issue = client.get_issue(issue_id)
         
+        if format == "json":
+            response = {'added': True, 'private': private, 'issue': issue_record(issue)}
+            if time_entry_id:
+                response['time_entry'] = {'id': time_entry_id, 'hours': spent_hours, 'activity_id': final_activity_id,
+                                          'spent_on': spent_on or datetime.now().strftime('%Y-%m-%d')}
+            return to_json(response)
+        
         privacy_text = "Private" if private else "Public"
         result = f"""Note added successfully!
 
@@ -738,8 +1020,523 @@ Time entry added successfully!
         return f"System error: {str(e)}"
 
 
+# Most rows a single log_time_entries call may submit
+MAX_TIME_ENTRY_ROWS = 200
+
+
 @mcp.tool()
-def assign_issue(issue_id: int, user_id: int = None, user_name: str = None, user_login: str = None, notes: str = "") -> str:
+@structured_output
+def log_time_entries(entries: list[dict], format: str = None) -> str:
+    """
+    Log many time entries at once; rows are submitted concurrently and each gets its own result
+    
+    Args:
+        entries: Rows with issue_id, hours, activity_name or activity_id, and optional comments,
+            spent_on (YYYY-MM-DD, default today) and user_id
+            e.g. [{"issue_id": 12, "hours": 1.5, "activity_name": "Development", "spent_on": "2024-05-02"}]
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Per-row result (time entry ID or error); failed rows do not stop the others
+    """
+    try:
+        if not entries:
+            return "Error: No time entries given"
+        if len(entries) > MAX_TIME_ENTRY_ROWS:
+            return f"Error: {len(entries)} rows exceeds the limit of {MAX_TIME_ENTRY_ROWS} per call"
+        
+        client = get_client()
+        
+        # Resolve activity names up front; rows with unknown names fail on their own
+        rows = []
+        failed = {}
+        for row, entry in enumerate(entries):
+            entry = dict(entry)
+            activity_name = entry.pop('activity_name', None)
+            if activity_name and entry.get('activity_id') is None:
+                entry['activity_id'] = client.find_time_entry_activity_id_by_name(activity_name)
+                if not entry['activity_id']:
+                    failed[row] = f"Time tracking activity name not found: \"{activity_name}\""
+            rows.append(entry)
+        
+        pending = [row for row in range(len(rows)) if row not in failed]
+        results = {row: {'row': row, 'error': error} for row, error in failed.items()}
+        for index, result in zip(pending, client.bulk_create_time_entries([rows[row] for row in pending])):
+            results[index] = dict(result, row=index)
+        results = [results[row] for row in range(len(rows))]
+        created = sum(1 for result in results if 'id' in result)
+        
+        if format == "json":
+            return to_json({'created': created, 'failed': len(results) - created,
+                            'columns': ['row', 'id', 'error'],
+                            'rows': [[r['row'], r.get('id'), r.get('error')] for r in results]})
+        
+        result = f"Logged {created} of {len(results)} time entries\n\n"
+        for row_result, entry in zip(results, entries):
+            label = f"Row {row_result['row'] + 1}: #{entry.get('issue_id')} {entry.get('hours')}h"
+            if 'id' in row_result:
+                result += f"{label} -> time entry {row_result['id']}\n"
+            else:
+                result += f"{label} -> failed: {row_result['error']}\n"
+        return result.rstrip()
+        
+    except RedmineAPIError as e:
+        return f"Failed to log time entries: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+@mcp.tool()
+@structured_output
+def time_report(project_id: Union[int, str] = None, user_id: Union[int, str] = None, issue_id: int = None,
+                from_date: str = None, to_date: str = None, group_by: list[str] = None,
+                format: str = None) -> str:
+    """
+    Summarize logged hours, grouped by user/activity/project/issue/day/week
+    
+    Time entries are filtered by Redmine and streamed page by page; only the totals are kept.
+    
+    Args:
+        project_id: Only this project (ID, identifier or name) and its subprojects
+        user_id: Only this user (ID, or "me")
+        issue_id: Only this issue
+        from_date: Earliest spent_on date (YYYY-MM-DD)
+        to_date: Latest spent_on date (YYYY-MM-DD)
+        group_by: Groupings, outermost first (default ["user"]), e.g. ["user", "activity"]
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Hours and entry count per group, largest first
+    """
+    try:
+        group_by = group_by or ['user']
+        unknown = [group for group in group_by if group not in TIME_ENTRY_GROUPS]
+        if unknown:
+            return f"Error: Unknown group(s): {', '.join(unknown)}. Choose from: {', '.join(TIME_ENTRY_GROUPS)}"
+        if isinstance(user_id, str) and user_id.strip().isdigit():
+            user_id = int(user_id)
+        
+        client = get_client()
+        if project_id is not None:
+            project_id = client.resolve_project(project_id).id
+        
+        totals = aggregate_time_entries(
+            client.iter_time_entries(project_id=project_id, user_id=user_id, issue_id=issue_id,
+                                     from_date=from_date, to_date=to_date),
+            group_by,
+        )
+        rows = sorted(((key, round(bucket['hours'], 2), bucket['entries']) for key, bucket in totals.items()),
+                      key=lambda row: (-row[1], row[0]))
+        
+        filters = {key: value for key, value in (('project_id', project_id), ('user_id', user_id),
+                                                 ('issue_id', issue_id), ('from', from_date), ('to', to_date))
+                   if value is not None}
+        
+        if format == "json":
+            return to_json({
+                'by': group_by, 'filters': filters,
+                'total_hours': round(sum(hours for _, hours, _ in rows), 2),
+                'columns': [*group_by, 'hours', 'entries'],
+                'rows': [[*key, hours, count] for key, hours, count in rows],
+            })
+        
+        scope = f"by {' x '.join(group_by)}"
+        if filters:
+            scope += f" ({', '.join(f'{key} {value}' for key, value in filters.items())})"
+        if not rows:
+            return f"Time report {scope}\n\nNo time entries found"
+        return format_time_report(scope, [group.capitalize() for group in group_by], rows)
+        
+    except RedmineAPIError as e:
+        return f"Failed to build time report: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# Longest flow_metrics window (weeks)
+MAX_FLOW_WEEKS = 104
+
+
+@mcp.tool(blocking=True)
+@structured_output
+def flow_metrics(project_id: Union[int, str] = None, weeks: int = 12, transitions: bool = False,
+                 format: str = None) -> str:
+    """
+    Flow metrics: lead and cycle time percentiles, weekly throughput and the age of work in progress
+    
+    Open issues and issues closed in the window are loaded into arrays and the metrics computed
+    with vectorized operations (NumPy when installed). Runs off the event loop.
+    
+    Args:
+        project_id: Only this project (ID, identifier or name) and its subprojects; default all visible projects
+        weeks: Whole weeks in the window, ending with the current week (1-104, default 12)
+        transitions: Read each issue's status history for cycle time and WIP age (one request per
+            issue, skipped with a note above 200 issues); default False uses creation time only
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        p50/p85/p95 lead and cycle times in days, issues closed per week, and open issues per age bucket
+    """
+    try:
+        if not 1 <= weeks <= MAX_FLOW_WEEKS:
+            return f"Error: weeks must be between 1 and {MAX_FLOW_WEEKS}"
+        from .analytics import MAX_TRANSITION_ISSUES, flow_report, load_snapshot, window_start
+        
+        client = get_client()
+        if project_id is not None:
+            project_id = client.resolve_project(project_id).id
+        
+        now = datetime.now(timezone.utc)
+        start = window_start(weeks, now)
+        snapshot = load_snapshot(client, project_id=project_id, since=start.strftime('%Y-%m-%d'),
+                                 transitions=transitions)
+        report = flow_report(snapshot, weeks=weeks, now=now)
+        
+        if format == "json":
+            return to_json({
+                'project_id': project_id, 'weeks': weeks, 'closed': report.closed,
+                'lead_time_days': report.lead_time,
+                'cycle_time_days': report.cycle_time if report.transitions_read else None,
+                'cycle_time_issues': report.cycle_time_issues if report.transitions_read else None,
+                'throughput': {'columns': ['week', 'closed'],
+                               'rows': [list(row) for row in zip(report.week_starts, report.throughput)]},
+                'wip': report.wip,
+                'aging': {'columns': ['age', 'issues'],
+                          'rows': [list(row) for row in zip(report.aging_buckets, report.aging)]},
+                **({'note': f"cycle time skipped: {report.transitions_skipped} issues exceed the "
+                            f"{MAX_TRANSITION_ISSUES}-issue status history limit"}
+                   if report.transitions_skipped else {}),
+            })
+        
+        return format_flow_report(f"for project {project_id}" if project_id is not None else "for all projects",
+                                  report)
+        
+    except RedmineAPIError as e:
+        return f"Failed to compute flow metrics: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# Upper bounds for issue_graph, so one call cannot walk a whole Redmine instance
+MAX_GRAPH_DEPTH = 10
+MAX_GRAPH_NODES = 1000
+
+
+@mcp.tool()
+@structured_output
+def issue_graph(issue_ids: list[int], max_depth: int = 3, max_nodes: int = 200, relation_types: list[str] = None,
+                subtasks: bool = True, format: str = None) -> str:
+    """
+    Explore the issues linked to one or more issues through relations, parents and subtasks
+    
+    The graph is walked breadth first; every level is fetched with a few batched requests
+    sent concurrently, so a 200-issue tree takes a handful of requests.
+    
+    Args:
+        issue_ids: Issues to start from
+        max_depth: Links to follow away from the starting issues (1-10, default 3)
+        max_nodes: Most issues in the graph (1-1000, default 200)
+        relation_types: Relation types to follow, e.g. ["blocks", "blocked"]; default all
+            (relates, duplicates, duplicated, blocks, blocked, precedes, follows, copied_to, copied_from)
+        subtasks: Whether to follow parent and subtask links (default True)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Issues with their depth from the starting issues, and the links between them
+    """
+    try:
+        if not issue_ids:
+            return "Error: No issue IDs given"
+        if not 1 <= max_depth <= MAX_GRAPH_DEPTH:
+            return f"Error: max_depth must be between 1 and {MAX_GRAPH_DEPTH}"
+        if not 1 <= max_nodes <= MAX_GRAPH_NODES:
+            return f"Error: max_nodes must be between 1 and {MAX_GRAPH_NODES}"
+        unknown = [kind for kind in relation_types or () if kind not in RELATION_TYPES]
+        if unknown:
+            return f"Error: Unsupported relation type(s): {', '.join(unknown)}. Use one of: {', '.join(RELATION_TYPES)}"
+        
+        client = get_client()
+        graph = client.get_issue_graph(issue_ids, max_depth=max_depth, max_nodes=max_nodes,
+                                       relation_types=relation_types, subtasks=subtasks)
+        roots = [issue_id for issue_id in dict.fromkeys(issue_ids) if issue_id in graph['nodes']]
+        
+        if format == "json":
+            rows = [[issue_id, data.get('subject'), data.get('tracker', {}).get('name'),
+                     data.get('status', {}).get('name'), graph['depth'][issue_id]]
+                    for issue_id, data in graph['nodes'].items()]
+            return to_json({'roots': roots, 'truncated': graph['truncated'], 'requests': graph['requests'],
+                            'columns': ['id', 'subject', 'tracker', 'status', 'depth'], 'rows': rows,
+                            'edges': graph['edges']})
+        
+        return format_issue_graph(roots, graph)
+        
+    except RedmineAPIError as e:
+        return f"Failed to build issue graph: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# How far back changes_since looks on a session's first call without `since`
+CHANGES_LOOKBACK = timedelta(hours=24)
+
+# Most issues a single changes_since call returns
+MAX_CHANGES_PER_CALL = 100
+
+
+@functools.lru_cache(maxsize=None)
+def _change_cursors():
+    from .change_feed import ChangeCursors
+    return ChangeCursors()
+
+
+@mcp.tool()
+@structured_output
+def changes_since(since: str = None, project_id: Union[int, str] = None, session: str = "default",
+                  limit: int = 50, format: str = None) -> str:
+    """
+    List issues changed since the last call (or since a given time), with what changed
+    
+    Each session keeps a cursor, so repeated calls only return new changes: poll this instead
+    of re-listing issues. Only changed issues are fetched, with the journals written since.
+    
+    Args:
+        since: Start from this time (YYYY-MM-DD or ISO 8601 timestamp) instead of the session's cursor;
+            a session's first call defaults to the last 24 hours
+        project_id: Only this project (ID, identifier or name) and its subprojects; default all visible projects
+        session: Cursor name; use one per agent or task that polls independently
+        limit: Most issues per call, oldest change first (1-100, default 50); call again for the rest
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Changed issues with their new notes and field changes, and the cursor the next call starts from
+    """
+    try:
+        if not 1 <= limit <= MAX_CHANGES_PER_CALL:
+            return f"Error: limit must be between 1 and {MAX_CHANGES_PER_CALL}"
+        
+        client = get_client()
+        if project_id is not None:
+            project_id = client.resolve_project(project_id).id
+        key = f"{session}:{project_id or '*'}"
+        cursors = _change_cursors()
+        
+        cursor = cursors.get(key)
+        seen = ()
+        if since:
+            try:
+                moment = parse_timestamp(since)
+            except ValueError:
+                return "Error: since format must be YYYY-MM-DD or an ISO 8601 timestamp"
+            since = moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        elif cursor:
+            since, seen = cursor
+        else:
+            since = (datetime.now(timezone.utc) - CHANGES_LOOKBACK).strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        result = client.get_changes_since(since, seen=seen, project_id=project_id, limit=limit)
+        cursors.set(key, result['cursor'], result['seen'])
+        
+        if format == "json":
+            return to_json({
+                'since': since, 'cursor': result['cursor'], 'more': result['more'],
+                'columns': ['id', 'subject', 'tracker', 'status', 'updated_on', 'created'],
+                'rows': [[issue['id'], issue.get('subject'), issue.get('tracker', {}).get('name'),
+                          issue.get('status', {}).get('name'), issue.get('updated_on'),
+                          (issue.get('created_on') or '') >= since]
+                         for issue in result['issues']],
+                'journal_columns': ['issue_id', 'user', 'created_on', 'notes', 'changes'],
+                'journals': [[issue['id'], journal.get('user', {}).get('name'), journal.get('created_on'),
+                              (journal.get('notes') or '').strip() or None, journal_changes(journal)]
+                             for issue in result['issues'] for journal in issue.get('journals') or ()],
+            })
+        
+        return format_changes(since, result)
+        
+    except RedmineAPIError as e:
+        return f"Failed to list changes: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# Longest wait_for_change may block (kept under the ~60 s request timeout of common MCP clients;
+# call again to keep waiting), and most issues it may watch (one probe request per 100 per tick)
+MAX_WAIT_TIMEOUT = 50
+MAX_WATCHED_ISSUES = 500
+
+
+@mcp.tool(blocking=True)
+@structured_output
+def wait_for_change(issue_ids: list[int], timeout: int = 30, since: str = None, format: str = None) -> str:
+    """
+    Wait until any of the given issues changes, instead of polling get_issue in a loop
+    
+    All watched issues are checked with one small batched request per tick; the interval
+    grows from 1 to 15 seconds while nothing changes. Returns as soon as an issue changes.
+    The wait runs off the event loop, so other tool calls are served meanwhile.
+    
+    Args:
+        issue_ids: Issues to watch (at most 500)
+        timeout: Seconds to wait at most (0-50, default 30); call again with `since` to keep waiting
+        since: Time of the state you last saw (YYYY-MM-DD or ISO 8601 timestamp); issues updated
+            after it count as changed right away. Default: changes from now on
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        The changed issues with their status and update time, or a timeout notice
+    """
+    try:
+        if not issue_ids:
+            return "Error: No issue IDs given"
+        if len(issue_ids) > MAX_WATCHED_ISSUES:
+            return f"Error: {len(issue_ids)} issues exceeds the limit of {MAX_WATCHED_ISSUES} per call"
+        if not 0 <= timeout <= MAX_WAIT_TIMEOUT:
+            return f"Error: timeout must be between 0 and {MAX_WAIT_TIMEOUT} seconds"
+        if since:
+            try:
+                since = parse_timestamp(since).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            except ValueError:
+                return "Error: since format must be YYYY-MM-DD or an ISO 8601 timestamp"
+        
+        client = get_client()
+        result = client.wait_for_issue_change(issue_ids, timeout=timeout, since=since)
+        changed = result['changed']
+        watched = len(set(issue_ids))
+        
+        if format == "json":
+            return to_json({
+                'changed': len(changed), 'watched': watched, 'timed_out': result['timed_out'],
+                'elapsed': round(result['elapsed'], 1), 'requests': result['requests'],
+                'missing': result['missing'],
+                'columns': ['id', 'subject', 'status', 'assigned_to', 'updated_on'],
+                'rows': [[issue['id'], issue.get('subject'), issue.get('status', {}).get('name'),
+                          (issue.get('assigned_to') or {}).get('name'), issue.get('updated_on')]
+                         for issue in changed],
+            })
+        
+        if changed:
+            result_text = (f"{len(changed)} of {watched} watched issues changed after {result['elapsed']:.1f}s "
+                           f"({result['requests']} requests)\n\n")
+            for issue in changed:
+                result_text += (f"#{issue['id']} {issue.get('subject', '')}: {issue.get('status', {}).get('name', 'N/A')}, "
+                                f"updated {issue.get('updated_on', 'N/A')}\n")
+        else:
+            result_text = f"No changes to the {watched} watched issues within {timeout}s ({result['requests']} requests)\n"
+        if result['missing']:
+            result_text += f"\nNot found: {', '.join(f'#{issue_id}' for issue_id in result['missing'])}\n"
+        return result_text.rstrip()
+        
+    except RedmineAPIError as e:
+        return f"Failed to wait for changes: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# How download_attachment describes each download status reported by the client
+DOWNLOAD_STATUS_TEXT = {
+    'downloaded': "downloaded",
+    'resumed': "resumed an interrupted download",
+    'unchanged': "unchanged since the last download, local copy reused",
+    'deduplicated': "same content as an earlier download, stored once",
+}
+
+
+@mcp.tool()
+@structured_output
+def download_attachment(attachment_id: int, format: str = None) -> str:
+    """
+    Download an issue attachment to the local spool directory and return its path
+    
+    The file is streamed to disk in chunks (never held in memory), interrupted downloads
+    resume where they stopped, and unchanged attachments are not downloaded again.
+    
+    Args:
+        attachment_id: Attachment ID (listed by get_issue)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Local file path, size and SHA-256 of the attachment
+    """
+    try:
+        client = get_client()
+        result = client.download_attachment(attachment_id)
+        
+        if format == "json":
+            return to_json(result)
+        
+        return f"""Attachment saved: {result['filename']}
+- Path: {result['path']}
+- Size: {result['size']} bytes
+- Content type: {result['content_type'] or 'unknown'}
+- SHA-256: {result['sha256']}
+- Status: {DOWNLOAD_STATUS_TEXT[result['status']]}"""
+        
+    except RedmineAPIError as e:
+        return f"Failed to download attachment: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+# Most files a single attach_files or create_new_issue call may upload
+MAX_ATTACHMENT_FILES = 20
+
+
+@mcp.tool()
+@structured_output
+def attach_files(issue_id: int, paths: list[str], notes: str = "", format: str = None) -> str:
+    """
+    Upload local files and attach them to an issue
+    
+    Files are streamed to Redmine in chunks (never read into memory whole) and uploaded
+    concurrently; the ones that uploaded are then attached in a single issue update.
+    Only files inside REDMINE_MCP_UPLOAD_DIR can be uploaded; without it uploads are disabled.
+    
+    Args:
+        issue_id: Issue ID
+        paths: Paths of files inside REDMINE_MCP_UPLOAD_DIR, absolute or relative to it, e.g. ["bundle.tar.gz"]
+        notes: Note added with the attachments (optional)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
+    Returns:
+        Per-file result (attached size or error); failed files do not stop the others
+    """
+    try:
+        if not paths:
+            return "Error: No files given"
+        if len(paths) > MAX_ATTACHMENT_FILES:
+            return f"Error: {len(paths)} files exceeds the limit of {MAX_ATTACHMENT_FILES} per call"
+        
+        client = get_client()
+        results = client.upload_files(paths)
+        uploads = [result for result in results if 'token' in result]
+        if uploads:
+            update_data = {'uploads': uploads}
+            if notes.strip():
+                update_data['notes'] = notes.strip()
+            client.update_issue(issue_id, **update_data)
+        
+        if format == "json":
+            return to_json({'issue_id': issue_id, 'attached': len(uploads), 'failed': len(results) - len(uploads),
+                            'columns': ['path', 'filename', 'size', 'error'],
+                            'rows': [[r['path'], r.get('filename'), r.get('size'), r.get('error')] for r in results]})
+        
+        result = f"Attached {len(uploads)} of {len(results)} files to issue #{issue_id}\n\n"
+        for file_result in results:
+            if 'token' in file_result:
+                result += f"- {file_result['filename']} ({file_result['size']} bytes)\n"
+            else:
+                result += f"- {file_result['path']} -> failed: {file_result['error']}\n"
+        return result.rstrip()
+        
+    except RedmineAPIError as e:
+        return f"Failed to attach files: {str(e)}"
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+@mcp.tool()
+@structured_output
+def assign_issue(issue_id: int, user_id: int = None, user_name: str = None, user_login: str = None, notes: str = "",
+                 format: str = None) -> str:
     """
     Assign issue to user
     
@@ -749,6 +1546,7 @@ def assign_issue(issue_id: int, user_id: int = None, user_name: str = None, user
         user_name: User name to assign (choose one with user_id/user_login)
         user_login: User login to assign (choose one with user_id/user_name)
         notes: Assignment notes (optional)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Assignment result message
@@ -788,6 +1586,9 @@ def assign_issue(issue_id: int, user_id: int = None, user_name: str = None, user
         # Get updated issue info
         updated_issue = client.get_issue(issue_id)
         
+        if format == "json":
+            return to_json({'updated': True, 'issue': issue_record(updated_issue)})
+        
         assignee_name = "Unassigned"
         if updated_issue.assigned_to:
             assignee_name = updated_issue.assigned_to.get('name', f"User ID {user_id}")
@@ -810,10 +1611,12 @@ Currently assigned to: {assignee_name}"""
 
 
 @mcp.tool()
+@structured_output
 def create_new_issue(project_id: int, subject: str, description: str = "", 
                     tracker_id: int = None, tracker_name: str = None,
                     priority_id: int = None, priority_name: str = None,
-                    assigned_to_id: int = None, assigned_to_name: str = None, assigned_to_login: str = None) -> str:
+                    assigned_to_id: int = None, assigned_to_name: str = None, assigned_to_login: str = None,
+                    attachments: list[str] = None, format: str = None) -> str:
     """
     Create a new Redmine issue
     
@@ -828,6 +1631,9 @@ def create_new_issue(project_id: int, subject: str, description: str = "",
         assigned_to_id: User ID to assign (choose one with assigned_to_name/assigned_to_login)
         assigned_to_name: User name to assign (choose one with assigned_to_id/assigned_to_login)
         assigned_to_login: User login to assign (choose one with assigned_to_id/assigned_to_name)
+        attachments: Paths of files inside REDMINE_MCP_UPLOAD_DIR to attach (optional); the issue is not
+            created if any upload fails
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Creation result message
@@ -865,6 +1671,17 @@ def create_new_issue(project_id: int, subject: str, description: str = "",
                 users = client.get_available_users()
                 return f"User login not found: \"{assigned_to_login}\"\n\nAvailable users (login):\n" + "\n".join([f"- {login}" for login in users['by_login'].keys()])
         
+        # Upload attachments before creating the issue, so a failed upload leaves nothing behind
+        uploads = None
+        if attachments:
+            if len(attachments) > MAX_ATTACHMENT_FILES:
+                return f"Error: {len(attachments)} files exceeds the limit of {MAX_ATTACHMENT_FILES} per call"
+            uploads = client.upload_files(attachments)
+            failed = [upload for upload in uploads if 'error' in upload]
+            if failed:
+                return "Failed to upload attachments:\n" + "\n".join(
+                    f"- {upload['path']}: {upload['error']}" for upload in failed)
+        
         # Create issue
         new_issue_id = client.create_issue(
             project_id=project_id,
@@ -872,12 +1689,19 @@ def create_new_issue(project_id: int, subject: str, description: str = "",
             description=description,
             tracker_id=final_tracker_id,
             priority_id=final_priority_id,
-            assigned_to_id=final_assigned_to_id
+            assigned_to_id=final_assigned_to_id,
+            uploads=uploads
         )
         
         # Get created issue info
         new_issue = client.get_issue(new_issue_id)
         
+        if format == "json":
+            response = {'created': True, 'issue': issue_record(new_issue)}
+            if uploads:
+                response['attachments'] = [{'filename': u['filename'], 'size': u['size']} for u in uploads]
+            return to_json(response)
+        
         result = f"""New issue created successfully!
 
 Issue ID: #{new_issue_id}
@@ -888,6 +1712,9 @@ Status: {new_issue.status.get('name', 'N/A')}
 Priority: {new_issue.priority.get('name', 'N/A')}
 Assigned to: {new_issue.assigned_to.get('name', 'Unassigned') if new_issue.assigned_to else 'Unassigned'}"""
 
+        if uploads:
+            result += "\nAttachments: " + ", ".join(f"{u['filename']} ({u['size']} bytes)" for u in uploads)
+
         if description:
             result += f"\n\nDescription:\n{description}"
 
@@ -900,13 +1727,16 @@ Assigned to: {new_issue.assigned_to.get('name', 'Unassigned') if new_issue.assig
 
 
 @mcp.tool()
-def get_my_issues(status_filter: str = "open", limit: int = 20) -> str:
+@structured_output
+def get_my_issues(status_filter: str = "open", limit: int = 20, format: str = None, fields: list[str] = None) -> str:
     """
     Get list of issues assigned to me
     
     Args:
         status_filter: Status filter ("open", "closed", "all")
         limit: Maximum number of results (default 20, max 100)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each item (default: the text table's columns)
     
     Returns:
         My issue list
@@ -926,7 +1756,8 @@ def get_my_issues(status_filter: str = "open", limit: int = 20) -> str:
         params = {
             'assigned_to_id': user_id,
             'limit': limit,
-            'sort': 'updated_on:desc'
+            'sort': 'updated_on:desc',
+            'fields': issue_columns(format, fields, MY_ISSUE_COLUMNS)
         }
         
         # Handle status filter
@@ -938,26 +1769,14 @@ def get_my_issues(status_filter: str = "open", limit: int = 20) -> str:
         # Get issue list
         issues = client.list_issues(**params)
         
+        if format == "json":
+            return to_json({'user_id': user_id, 'status_filter': status_filter,
+                            'issues': table(issues, ISSUE_FIELDS, fields, MY_ISSUE_COLUMNS)})
+        
         if not issues:
             return f"No {status_filter} issues assigned to {user_name.strip()} found"
         
-        # Format result
-        result = f"""Issues assigned to {user_name.strip()}:
-Status filter: {status_filter}
-Found {len(issues)} issues:
-
-{"ID":<8} {"Title":<35} {"Project":<15} {"Status":<12} {"Updated":<10}
-{"-"*8} {"-"*35} {"-"*15} {"-"*12} {"-"*10}"""
-
-        for issue in issues:
-            title = issue.subject[:32] + "..." if len(issue.subject) > 35 else issue.subject
-            project_name = issue.project.get('name', 'N/A')[:13]
-            status = issue.status.get('name', 'N/A')[:10]
-            updated = issue.updated_on[:10] if issue.updated_on else 'N/A'
-            
-            result += f"\n{issue.id:<8} {title:<35} {project_name:<15} {status:<12} {updated:<10}"
-        
-        return result
+        return format_my_issues(user_name.strip(), status_filter, issues)
         
     except RedmineAPIError as e:
         return f"Failed to get my issues: {str(e)}"
@@ -966,7 +1785,8 @@ Found {len(issues)} issues:
 
 
 @mcp.tool()
-def close_issue(issue_id: int, notes: str = "", done_ratio: int = 100) -> str:
+@structured_output
+def close_issue(issue_id: int, notes: str = "", done_ratio: int = 100, format: str = None) -> str:
     """
     Close issue (set to completed status)
     
@@ -974,6 +1794,7 @@ def close_issue(issue_id: int, notes: str = "", done_ratio: int = 100) -> str:
         issue_id: Issue ID
         notes: Closing notes (optional)
         done_ratio: Completion percentage (default 100%)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
     
     Returns:
         Close result message
@@ -1008,6 +1829,9 @@ def close_issue(issue_id: int, notes: str = "", done_ratio: int = 100) -> str:
         # Get updated issue info
         updated_issue = client.get_issue(issue_id)
         
+        if format == "json":
+            return to_json({'closed': True, 'issue': issue_record(updated_issue)})
+        
         result = f"""Issue closed successfully!
 
 Issue: #{issue_id} - {updated_issue.subject}
@@ -1026,13 +1850,16 @@ Done ratio: {updated_issue.done_ratio}%"""
 
 
 @mcp.tool()
-def search_users(query: str, limit: int = 10) -> str:
+@structured_output
+def search_users(query: str, limit: int = 10, format: str = None, fields: list[str] = None) -> str:
     """
     Search users (by name or login)
     
     Args:
         query: Search keyword (name or login)
         limit: Maximum number of results (default 10, max 50)
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each user (default: login, name, mail, status)
     
     Returns:
         List of users matching search criteria
@@ -1046,6 +1873,9 @@ def search_users(query: str, limit: int = 10) -> str:
         
         users = client.search_users(query, limit)
         
+        if format == "json":
+            return to_json({'query': query, 'users': table(users, USER_FIELDS, fields, USER_COLUMNS)})
+        
         if not users:
             return f"No users matching \"{query}\" found"
         
@@ -1069,13 +1899,16 @@ def search_users(query: str, limit: int = 10) -> str:
 
 
 @mcp.tool()
-def list_users(limit: int = 20, status_filter: str = "active") -> str:
+@structured_output
+def list_users(limit: int = 20, status_filter: str = "active", format: str = None, fields: list[str] = None) -> str:
     """
     List all users
     
     Args:
         limit: Maximum number of results (default 20, max 100)
         status_filter: Status filter ("active", "locked", "all")
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+        fields: In JSON mode, columns to return for each user (default: login, name, mail, status)
     
     Returns:
         User list in table format
@@ -1093,6 +1926,9 @@ def list_users(limit: int = 20, status_filter: str = "active") -> str:
         
         users = client.list_users(limit=limit, status=status)
         
+        if format == "json":
+            return to_json({'users': table(users, USER_FIELDS, fields, USER_COLUMNS)})
+        
         if not users:
             return "No users found"
         
@@ -1117,12 +1953,14 @@ def list_users(limit: int = 20, status_filter: str = "active") -> str:
 
 
 @mcp.tool()
-def get_user(user_id: int) -> str:
+@structured_output
+def get_user(user_id: int, format: str = None) -> str:
     """
     Get detailed information for a specific user
     
     Args:
         user_id: User ID
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
         
     Returns:
         Detailed user information in a readable format
@@ -1131,6 +1969,18 @@ def get_user(user_id: int) -> str:
         client = get_client()
         user_data = client.get_user(user_id)
         
+        if format == "json":
+            record = {key: user_data[key] for key in ('id', 'login', 'firstname', 'lastname', 'mail',
+                                                      'created_on', 'last_login_on') if user_data.get(key)}
+            record['status'] = 'enabled' if user_data.get('status', 1) == 1 else 'disabled'
+            if user_data.get('groups'):
+                record['groups'] = [group.get('name') for group in user_data['groups']]
+            custom_fields = {field.get('name'): field['value'] for field in user_data.get('custom_fields') or []
+                             if field.get('value')}
+            if custom_fields:
+                record['custom_fields'] = custom_fields
+            return to_json(record)
+        
         # Format user info
         result = f"User #{user_id}: {user_data.get('firstname', '')} {user_data.get('lastname', '')}\n\n"
         result += "Basic Info:\n"
@@ -1164,10 +2014,14 @@ def get_user(user_id: int) -> str:
 
 
 @mcp.tool()
-def refresh_cache() -> str:
+@structured_output
+def refresh_cache(format: str = None) -> str:
     """
     Manually refresh enum and user cache
     
+    Args:
+        format: "text" (readable) or "json" (compact structured output); default is the server setting
+    
     Returns:
         Refresh result message
     """
@@ -1185,6 +2039,14 @@ def refresh_cache() -> str:
         else:
             cache_datetime = 'N/A'
         
+        if format == "json":
+            return to_json({
+                'refreshed': True, 'domain': domain, 'cache_time': cache_datetime,
+                'counts': {key: len(cache.get(key, {})) for key in
+                           ('priorities', 'statuses', 'trackers', 'users_by_name', 'users_by_login')},
+                'cache_file': str(client._cache_file),
+            })
+        
         result = f"""Cache refreshed successfully!
 
 Domain: {domain}
@@ -1207,10 +2069,93 @@ Cache location: {client._cache_file}"""
         return f"System error: {str(e)}"
 
 
+@mcp.tool()
+@structured_output(formats=OUTPUT_FORMATS + ('prometheus',))
+def metrics(format: str = None) -> str:
+    """
+    Get request and tool latency metrics for this server process
+    
+    Args:
+        format: "text" (tables), "json" (compact structured output) or "prometheus" (Prometheus
+            text format); default is the server setting
+    
+    Returns:
+        Latency percentiles per Redmine endpoint and per tool, status codes, retries and cache hits
+    """
+    try:
+        if format == "prometheus":
+            return get_metrics().render_prometheus()
+        if format == "json":
+            return to_json(get_metrics().summary())
+        return get_metrics().format_summary()
+    except Exception as e:
+        return f"System error: {str(e)}"
+
+
+async def metrics_endpoint(request):
+    """Serve metrics in Prometheus text format (HTTP transports only)"""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(get_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def warm_up():
+    """Run the warm-up phase, reporting to stderr (stdout carries the MCP protocol)"""
+    try:
+        report = get_client().warm_up()
+    except Exception as e:
+        print(f"Warm-up failed: {str(e)}", file=sys.stderr)
+        return
+    
+    task_summary = ", ".join(f"{name}={status}" for name, status in report['tasks'].items())
+    print(f"Warm-up finished in {report['elapsed']:.2f}s: {task_summary}", file=sys.stderr)
+
+
+def start_change_feed():
+    """Poll Redmine's Atom feeds in the background to invalidate changed issues and projects"""
+    from .change_feed import ChangeFeedPoller
+    
+    interval = get_config().change_feed_interval
+    poller = ChangeFeedPoller(get_client(), interval)
+    poller.start()
+    print(f"Change feed polling every {interval:g}s", file=sys.stderr)
+    return poller
+
+
 def main():
     """MCP server main entry point"""
-    # Run server via stdio
-    mcp.run('stdio')
+    parser = argparse.ArgumentParser(prog="redmine-mcp", description="Redmine MCP server")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report cold import-time cost of the server and exit")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Open connections and load caches before serving (same as REDMINE_MCP_WARMUP=true)")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default=None,
+                        help="MCP transport (default: REDMINE_MCP_TRANSPORT or stdio)")
+    parser.add_argument("--metrics-endpoint", action="store_true",
+                        help="Serve Prometheus metrics at /metrics in HTTP mode (same as REDMINE_MCP_METRICS_ENDPOINT=true)")
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        from .startup import profile_startup
+        print(profile_startup())
+        return
+    
+    # Configuration is loaded only once the server is going to run, so importing the server,
+    # --help and --profile-startup need no credentials; its log level is applied before serving
+    config = get_config()
+    mcp.settings.log_level = config.log_level
+    configure_logging(config.log_level)
+    transport = args.transport or config.transport
+    
+    if args.warmup or config.warmup_enabled:
+        warm_up()
+    
+    if config.change_feed_interval > 0:
+        start_change_feed()
+    
+    if transport != 'stdio' and (args.metrics_endpoint or config.metrics_endpoint):
+        mcp.custom_route("/metrics", methods=["GET"])(metrics_endpoint)
+    
+    mcp.run(transport)
 
 
 if __name__ == "__main__":
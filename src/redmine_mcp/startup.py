@@ -0,0 +1,133 @@
+"""
+Startup profiling
+Measures the cold import-time cost of the MCP server in a fresh interpreter
+"""
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# Module whose cold import defines server startup cost
+SERVER_MODULE = "redmine_mcp.server"
+
+# Third-party framework module the server cannot start without
+FRAMEWORK_MODULE = "mcp.server.fastmcp"
+
+
+@dataclass
+class ImportTiming:
+    """Import time of a single module (microseconds)"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    """Result of a cold startup measurement"""
+    module: str
+    wall_time_ms: float
+    timings: List[ImportTiming] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def cumulative_ms(self, module: str) -> Optional[float]:
+        """Cumulative import time of a module in milliseconds, None if not imported"""
+        # A package can be listed more than once while it is partially initialized;
+        # the shallowest entry covers the whole import
+        matches = [timing for timing in self.timings if timing.module == module]
+        if not matches:
+            return None
+        return min(matches, key=lambda timing: timing.depth).cumulative_us / 1000
+
+    @property
+    def total_ms(self) -> float:
+        """Cumulative import time of the profiled module in milliseconds"""
+        return self.cumulative_ms(self.module) or 0.0
+
+    @property
+    def own_ms(self) -> float:
+        """Import time spent outside the MCP framework (our code and our dependencies)"""
+        return self.total_ms - (self.cumulative_ms(FRAMEWORK_MODULE) or 0.0)
+
+    def imported(self, module: str) -> bool:
+        """Whether a module was loaded during startup"""
+        return any(timing.module == module for timing in self.timings)
+
+
+def _parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse `python -X importtime` output"""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        timings.append(ImportTiming(stripped, self_us, cumulative_us, depth))
+    return timings
+
+
+def measure_startup(module: str = SERVER_MODULE) -> StartupProfile:
+    """Import a module in a fresh interpreter and record per-module import times"""
+    env = dict(os.environ)
+    env.pop("PYTHONIMPORTTIME", None)
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env
+    )
+    wall_time_ms = (time.perf_counter() - start) * 1000
+
+    profile = StartupProfile(module=module, wall_time_ms=wall_time_ms,
+                             timings=_parse_importtime(completed.stderr))
+    if completed.returncode != 0:
+        error_lines = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        profile.error = error_lines[-1] if error_lines else f"exit code {completed.returncode}"
+    return profile
+
+
+def format_startup_profile(profile: StartupProfile, top: int = 15) -> str:
+    """Format a startup profile as a readable report"""
+    lines = [
+        f"Startup profile for {profile.module}",
+        f"- Process wall time: {profile.wall_time_ms:.1f} ms",
+        f"- Import time: {profile.total_ms:.1f} ms",
+        f"- Outside {FRAMEWORK_MODULE}: {profile.own_ms:.1f} ms",
+    ]
+    if profile.error:
+        lines.append(f"- Import failed: {profile.error}")
+
+    # Attribute self time to top-level packages so nested imports are not counted twice
+    packages: Dict[str, int] = {}
+    for timing in profile.timings:
+        root = timing.module.split(".")[0]
+        packages[root] = packages.get(root, 0) + timing.self_us
+
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    lines.append("")
+    lines.append(f"{'Package':<30} {'Self (ms)':>10}")
+    lines.append(f"{'-'*30} {'-'*10}")
+    for name, self_us in ranked:
+        lines.append(f"{name:<30} {self_us / 1000:>10.1f}")
+
+    return "\n".join(lines)
+
+
+def profile_startup(top: int = 15) -> str:
+    """Measure and format the cold startup cost of the MCP server"""
+    return format_startup_profile(measure_startup(), top=top)
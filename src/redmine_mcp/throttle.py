@@ -0,0 +1,142 @@
+"""
+Request throttling
+Token-bucket rate limit and in-flight cap shared by every Redmine request of a client,
+and circuit breakers that fail fast while Redmine is down
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+# Lowest rate (requests/second) adaptive backoff slows down to
+MIN_RATE = 0.5
+
+# Share of the configured rate regained after each successful request
+RECOVERY_STEP = 0.05
+
+# Consecutive failures that open a circuit, and seconds it stays open before a trial request
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+
+class RequestGovernor:
+    """Limits request rate and concurrency, and backs off when Redmine pushes back
+
+    Requests take a token from a bucket refilled at `rate` per second (holding up to one
+    second's worth) and a slot from a semaphore of `max_concurrency`. When Redmine answers
+    429/503, `backoff` pauses every caller and halves the rate; successful requests then
+    restore it step by step up to the configured maximum.
+    """
+
+    def __init__(self, max_rps: float = 0.0, max_concurrency: int = 8):
+        self.max_rps = max_rps
+        self.max_concurrency = max_concurrency
+        self.rate = max_rps
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._tokens = max(max_rps, 1.0)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _reserve(self) -> float:
+        """Take a token (possibly ahead of time); returns seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if not self.rate:
+                return wait
+            self._tokens = min(self._tokens + (now - self._refilled_at) * self.rate, max(self.rate, 1.0))
+            self._refilled_at = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """Hold an in-flight slot and a rate token for one request; yields the time spent waiting"""
+        start = time.monotonic()
+        with self._slots:
+            delay = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+            yield time.monotonic() - start
+
+    def backoff(self, delay: float):
+        """Pause all requests for `delay` seconds and halve the rate"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if self.rate:
+                self.rate = max(self.rate / 2, min(MIN_RATE, self.max_rps))
+
+    def succeeded(self):
+        """Recover part of the rate lost to backoff"""
+        if self.rate < self.max_rps:
+            with self._lock:
+                self.rate = min(self.max_rps, self.rate + self.max_rps * RECOVERY_STEP)
+
+    @staticmethod
+    def retry_after(value: Optional[str]) -> Optional[float]:
+        """Seconds from a Retry-After header given in seconds (HTTP dates are ignored)"""
+        try:
+            return max(float(value), 0.0) if value else None
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """Stops sending requests after repeated failures
+
+    Closed: requests pass and consecutive failures are counted. Open (after
+    `failure_threshold` failures): requests are refused until `reset_timeout` passes.
+    Half-open: a single trial request is let through; its success closes the circuit,
+    its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half-open"""
+        if self._opened_at is None:
+            return 'closed'
+        return 'open' if self.retry_in() > 0 else 'half-open'
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial request through"""
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self.retry_in() > 0 or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
@@ -4,7 +4,7 @@ Responsible for validating API request parameters and providing user-friendly er
 """
 
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 from dataclasses import dataclass
 
@@ -48,206 +48,44 @@ class RedmineValidator:
         re.compile(r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])T\d{2}:\d{2}:\d{2}Z?$'),  # ISO format
         re.compile(r'^>=\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$'),  # >=YYYY-MM-DD
         re.compile(r'^<=\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$'),  # <=YYYY-MM-DD
+        re.compile(r'^(>=|<=)\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])T\d{2}:\d{2}:\d{2}Z?$'),  # >=YYYY-MM-DDTHH:MM:SSZ
         re.compile(r'^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])\|\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$')  # date range
     ]
     
+    # Combined date filter pattern, matched once instead of trying each pattern in turn
+    DATE_FILTER_PATTERN = re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in DATE_PATTERNS))
+    
+    # Common sort fields
+    SORT_FIELDS = frozenset({
+        'id', 'subject', 'status', 'priority', 'author', 'assigned_to',
+        'created_on', 'updated_on', 'due_date', 'done_ratio', 'project'
+    })
+    
     @classmethod
     def validate_issue_data(cls, data: Dict[str, Any], is_update: bool = False) -> ValidationResult:
         """Validate issue data"""
-        errors = []
-        warnings = []
-        
-        # Required fields check (on create)
-        if not is_update:
-            if 'project_id' not in data:
-                errors.append("Project ID (project_id) is required")
-            if 'subject' not in data:
-                errors.append("Issue subject (subject) is required")
-            elif not isinstance(data.get('subject'), str) or not data.get('subject', '').strip():
-                errors.append("Issue subject (subject) is required")
-        
-        # Issue subject validation
-        if 'subject' in data:
-            subject = data['subject']
-            if not isinstance(subject, str):
-                errors.append("Issue subject must be a string")
-            elif len(subject.strip()) == 0:
-                errors.append("Issue subject cannot be empty")
-            elif len(subject) > cls.MAX_SUBJECT_LENGTH:
-                errors.append(f"Issue subject length cannot exceed {cls.MAX_SUBJECT_LENGTH} characters")
-        
-        # Issue description validation
-        if 'description' in data:
-            description = data['description']
-            if description is not None and not isinstance(description, str):
-                errors.append("Issue description must be a string")
-            elif description and len(description) > cls.MAX_DESCRIPTION_LENGTH:
-                errors.append(f"Issue description length cannot exceed {cls.MAX_DESCRIPTION_LENGTH} characters")
-        
-        # ID field validation
-        id_fields = ['project_id', 'tracker_id', 'status_id', 'priority_id', 'assigned_to_id', 'parent_issue_id']
-        for field in id_fields:
-            if field in data:
-                value = data[field]
-                if value is not None and (not isinstance(value, int) or value <= 0):
-                    errors.append(f"{field} must be a positive integer")
-        
-        # Done ratio validation
-        if 'done_ratio' in data:
-            done_ratio = data['done_ratio']
-            if not isinstance(done_ratio, int) or done_ratio < 0 or done_ratio > 100:
-                errors.append("Done ratio (done_ratio) must be an integer between 0 and 100")
-        
-        # Custom fields validation
-        if 'custom_fields' in data:
-            custom_fields = data['custom_fields']
-            if custom_fields is not None:
-                if not isinstance(custom_fields, list):
-                    errors.append("Custom fields (custom_fields) must be a list")
-                else:
-                    for i, field in enumerate(custom_fields):
-                        if not isinstance(field, dict):
-                            errors.append(f"Custom field [{i}] must be a dict")
-                        elif 'id' not in field:
-                            errors.append(f"Custom field [{i}] is missing required id field")
-        
-        return ValidationResult(is_valid=len(errors) == 0, errors=errors, warnings=warnings)
+        return VALIDATORS['issue'](data, is_update)
     
     @classmethod
     def validate_project_data(cls, data: Dict[str, Any], is_update: bool = False) -> ValidationResult:
         """Validate project data"""
-        errors = []
-        warnings = []
-        
-        # Required fields check (on create)
-        if not is_update:
-            if 'name' not in data or not data.get('name', '').strip():
-                errors.append("Project name (name) is required")
-            if 'identifier' not in data or not data.get('identifier', '').strip():
-                errors.append("Project identifier (identifier) is required")
-        
-        # Project name validation
-        if 'name' in data:
-            name = data['name']
-            if not isinstance(name, str):
-                errors.append("Project name must be a string")
-            elif len(name.strip()) == 0:
-                errors.append("Project name cannot be empty")
-            elif len(name) > cls.MAX_PROJECT_NAME_LENGTH:
-                errors.append(f"Project name length cannot exceed {cls.MAX_PROJECT_NAME_LENGTH} characters")
-        
-        # Project identifier validation
-        if 'identifier' in data:
-            identifier = data['identifier']
-            if not isinstance(identifier, str):
-                errors.append("Project identifier must be a string")
-            elif len(identifier.strip()) == 0:
-                errors.append("Project identifier cannot be empty")
-            elif len(identifier) < cls.MIN_PROJECT_IDENTIFIER_LENGTH:
-                errors.append(f"Project identifier length cannot be less than {cls.MIN_PROJECT_IDENTIFIER_LENGTH} characters")
-            elif len(identifier) > cls.MAX_PROJECT_IDENTIFIER_LENGTH:
-                errors.append(f"Project identifier length cannot exceed {cls.MAX_PROJECT_IDENTIFIER_LENGTH} characters")
-            elif not cls.PROJECT_IDENTIFIER_PATTERN.match(identifier):
-                errors.append("Project identifier can only contain lowercase letters, numbers, hyphens, and underscores")
-            elif identifier.lower() != identifier:
-                warnings.append("It is recommended to use lowercase letters for project identifier")
-        
-        # Project description validation
-        if 'description' in data:
-            description = data['description']
-            if description is not None and not isinstance(description, str):
-                errors.append("Project description must be a string")
-        
-        # Boolean field validation
-        bool_fields = ['is_public', 'inherit_members']
-        for field in bool_fields:
-            if field in data:
-                value = data[field]
-                if not isinstance(value, bool):
-                    errors.append(f"{field} must be a boolean (true/false)")
-        
-        # ID field validation
-        if 'parent_id' in data:
-            parent_id = data['parent_id']
-            if parent_id is not None and (not isinstance(parent_id, int) or parent_id <= 0):
-                errors.append("Parent project ID (parent_id) must be a positive integer")
-        
-        return ValidationResult(is_valid=len(errors) == 0, errors=errors, warnings=warnings)
+        return VALIDATORS['project'](data, is_update)
     
     @classmethod
     def validate_query_params(cls, params: Dict[str, Any]) -> ValidationResult:
         """Validate query parameters"""
-        errors = []
-        warnings = []
-        
-        # Pagination parameter validation
-        if 'limit' in params:
-            limit = params['limit']
-            if not isinstance(limit, int) or limit <= 0:
-                errors.append("Pagination limit (limit) must be a positive integer")
-            elif limit > 100:
-                warnings.append("It is recommended to keep pagination limit under 100 for performance")
-        
-        if 'offset' in params:
-            offset = params['offset']
-            if not isinstance(offset, int) or offset < 0:
-                errors.append("Pagination offset (offset) must be a non-negative integer")
-        
-        # ID filter parameter validation
-        id_fields = ['project_id', 'tracker_id', 'priority_id', 'assigned_to_id', 'author_id']
-        for field in id_fields:
-            if field in params:
-                value = params[field]
-                if value is not None and (not isinstance(value, int) or value <= 0):
-                    errors.append(f"{field} must be a positive integer")
-        
-        # Special handling for status_id (support Redmine special values)
-        if 'status_id' in params:
-            status_id = params['status_id']
-            if status_id is not None:
-                # Allow positive integer or Redmine special values ('o' for open, 'c' for closed)
-                if not (isinstance(status_id, int) and status_id > 0) and status_id not in ['o', 'c']:
-                    errors.append("status_id must be a positive integer or 'o'(open)/'c'(closed)")
-        
-        # Date filter parameter validation
-        date_fields = ['created_on', 'updated_on']
-        for field in date_fields:
-            if field in params:
-                date_value = params[field]
-                if date_value and not cls._is_valid_date_filter(date_value):
-                    errors.append(f"{field} date format is incorrect, supported formats: YYYY-MM-DD, >=YYYY-MM-DD, <=YYYY-MM-DD")
-        
-        # Sort parameter validation
-        if 'sort' in params:
-            sort_value = params['sort']
-            if sort_value is not None and not isinstance(sort_value, str):
-                errors.append("Sort parameter (sort) must be a string")
-            elif sort_value and not cls._is_valid_sort_field(sort_value):
-                warnings.append(f"Sort field '{sort_value}' may not be supported")
-        
-        return ValidationResult(is_valid=len(errors) == 0, errors=errors, warnings=warnings)
+        return VALIDATORS['query'](params)
     
     @classmethod
     def _is_valid_date_filter(cls, date_str: str) -> bool:
         """Validate date filter format"""
-        if not isinstance(date_str, str):
-            return False
-        
-        return any(pattern.match(date_str) for pattern in cls.DATE_PATTERNS)
+        return isinstance(date_str, str) and cls.DATE_FILTER_PATTERN.match(date_str) is not None
     
     @classmethod
     def _is_valid_sort_field(cls, sort_str: str) -> bool:
         """Validate sort field"""
         # Remove :desc or :asc suffix
-        field = sort_str.split(':')[0]
-        
-        # Common sort fields
-        valid_fields = [
-            'id', 'subject', 'status', 'priority', 'author', 'assigned_to',
-            'created_on', 'updated_on', 'due_date', 'done_ratio', 'project'
-        ]
-        
-        return field in valid_fields
+        return sort_str.split(':')[0] in cls.SORT_FIELDS
     
     @classmethod
     def get_friendly_error_message(cls, error: Exception, context: str = "") -> str:
@@ -285,27 +123,295 @@ class RedmineValidator:
         return f"Operation failed: {str(error)}"
 
 
+# A custom field check appends the messages for one value to the errors and warnings lists
+Check = Callable[[Any, List[str], List[str]], None]
+
+# Rules render their checks as Python source for CompiledValidator. `const` binds a value
+# (message, limit, pattern) to a name in the generated code; the value under test is `value`.
+Const = Callable[[Any], str]
+
+
+@dataclass(frozen=True)
+class Text:
+    """String field; `optional` ones may also be None or empty"""
+    label: str
+    max_length: Optional[int] = None
+    min_length: Optional[int] = None
+    pattern: Optional[re.Pattern] = None
+    pattern_message: Optional[str] = None
+    optional: bool = False
+    
+    def source(self, const: Const) -> List[str]:
+        not_string = f"errors.append({const(f'{self.label} must be a string')})"
+        too_long = f"errors.append({const(f'{self.label} length cannot exceed {self.max_length} characters')})"
+        if self.optional:
+            lines = ["if value is not None:", "    if not isinstance(value, str):", f"        {not_string}"]
+            if self.max_length is not None:
+                lines += [f"    elif len(value) > {self.max_length}:", f"        {too_long}"]
+            return lines
+        lines = ["if not isinstance(value, str):", f"    {not_string}",
+                 "elif not value.strip():", f"    errors.append({const(f'{self.label} cannot be empty')})"]
+        if self.min_length is not None:
+            message = const(f'{self.label} length cannot be less than {self.min_length} characters')
+            lines += [f"elif len(value) < {self.min_length}:", f"    errors.append({message})"]
+        if self.max_length is not None:
+            lines += [f"elif len(value) > {self.max_length}:", f"    {too_long}"]
+        if self.pattern is not None:
+            lines += [f"elif not {const(self.pattern.match)}(value):",
+                      f"    errors.append({const(self.pattern_message)})"]
+        return lines
+
+
+@dataclass(frozen=True)
+class PositiveId:
+    """Positive integer ID, or None; `choices` are other accepted values"""
+    message: str
+    choices: Tuple[Any, ...] = ()
+    
+    def source(self, const: Const) -> List[str]:
+        condition = "value is not None and (not isinstance(value, int) or value <= 0)"
+        if self.choices:
+            condition += f" and value not in {const(self.choices)}"
+        return [f"if {condition}:", f"    errors.append({const(self.message)})"]
+
+
+@dataclass(frozen=True)
+class IntRange:
+    """Integer from `low` to `high` (inclusive), with an optional soft upper bound that only warns"""
+    message: str
+    low: int
+    high: Optional[int] = None
+    warn_above: Optional[int] = None
+    warning: Optional[str] = None
+    
+    def source(self, const: Const) -> List[str]:
+        condition = f"not isinstance(value, int) or value < {self.low}"
+        if self.high is not None:
+            condition += f" or value > {self.high}"
+        lines = [f"if {condition}:", f"    errors.append({const(self.message)})"]
+        if self.warn_above is not None:
+            lines += [f"elif value > {self.warn_above}:", f"    warnings.append({const(self.warning)})"]
+        return lines
+
+
+@dataclass(frozen=True)
+class Boolean:
+    message: str
+    
+    def source(self, const: Const) -> List[str]:
+        return ["if not isinstance(value, bool):", f"    errors.append({const(self.message)})"]
+
+
+@dataclass(frozen=True)
+class DateFilter:
+    """Date filter in one of RedmineValidator.DATE_PATTERNS, or empty"""
+    message: str
+    
+    def source(self, const: Const) -> List[str]:
+        match = const(RedmineValidator.DATE_FILTER_PATTERN.match)
+        return [f"if value and not (isinstance(value, str) and {match}(value)):",
+                f"    errors.append({const(self.message)})"]
+
+
+@dataclass(frozen=True)
+class DictList:
+    """List of dicts that each have `key` (with a truthy value if `truthy`), or None
+    
+    Item messages are templates formatted with the item's {index}.
+    """
+    message: str
+    key: str
+    not_dict_message: str
+    missing_message: str
+    truthy: bool = False
+    
+    def source(self, const: Const) -> List[str]:
+        missing = f"not item.get({self.key!r})" if self.truthy else f"{self.key!r} not in item"
+        return ["if value is not None:",
+                "    if not isinstance(value, list):", f"        errors.append({const(self.message)})",
+                "    else:",
+                "        for index, item in enumerate(value):",
+                "            if not isinstance(item, dict):",
+                f"                errors.append({const(self.not_dict_message)}.format(index=index))",
+                f"            elif {missing}:",
+                f"                errors.append({const(self.missing_message)}.format(index=index))"]
+
+
+@dataclass(frozen=True)
+class Custom:
+    check: Check
+    
+    def source(self, const: Const) -> List[str]:
+        return [f"{const(self.check)}(value, errors, warnings)"]
+
+
+@dataclass(frozen=True)
+class Schema:
+    """Declarative validation rules for one kind of payload
+    
+    `fields` are (field, rule) pairs, applied in order to the fields present in a payload.
+    `required` are (field, message, text) triples checked on create; with `text` the value
+    must also be a non-blank string.
+    """
+    name: str
+    fields: Tuple[Tuple[str, Any], ...]
+    required: Tuple[Tuple[str, str, bool], ...] = ()
+
+
+class CompiledValidator:
+    """Validator compiled once from a Schema into straight-line Python
+    
+    Every rule is rendered inline with its limits and messages bound as constants, so a
+    payload is checked without per-field function calls, loops over rule lists or message
+    formatting unless a check fails. `validate_many` runs the same code inside its loop,
+    without a call or result object per payload.
+    """
+    
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        namespace: Dict[str, Any] = {}
+        
+        def const(value: Any) -> str:
+            name = f"_c{len(namespace)}"
+            namespace[name] = value
+            return name
+        
+        body = ["if not is_update:"] if schema.required else []
+        for field, message, text in schema.required:
+            body += [f"    if {field!r} not in data:", f"        errors.append({const(message)})"]
+            if text:
+                body += [f"    elif not isinstance(data[{field!r}], str) or not data[{field!r}].strip():",
+                         f"        errors.append({const(message)})"]
+        for field, rule in schema.fields:
+            body += [f"if {field!r} in data:", f"    value = data[{field!r}]"]
+            body += ["    " + line for line in rule.source(const)]
+        
+        self.source = "\n".join([
+            "def check(data, is_update=False):",
+            "    errors = []",
+            "    warnings = []",
+            *("    " + line for line in body),
+            "    return errors, warnings",
+            "",
+            "def validate_many(records, is_update=False):",
+            "    failed = {}",
+            "    for record_index, data in enumerate(records):",
+            "        errors = []",
+            "        warnings = []",
+            *("        " + line for line in body),
+            "        if errors:",
+            "            failed[record_index] = errors",
+            "    return failed",
+        ])
+        exec(compile(self.source, f"<{schema.name} validator>", "exec"), namespace)
+        self.check: Callable[..., Tuple[List[str], List[str]]] = namespace['check']
+        self.validate_many: Callable[..., Dict[int, List[str]]] = namespace['validate_many']
+    
+    def __call__(self, data: Dict[str, Any], is_update: bool = False) -> ValidationResult:
+        errors, warnings = self.check(data, is_update)
+        return ValidationResult(is_valid=not errors, errors=errors, warnings=warnings)
+
+
+def _sort(value, errors, warnings):
+    if value is not None and not isinstance(value, str):
+        errors.append("Sort parameter (sort) must be a string")
+    elif value and not RedmineValidator._is_valid_sort_field(value):
+        warnings.append(f"Sort field '{value}' may not be supported")
+
+
+ISSUE_SCHEMA = Schema(
+    name='issue',
+    required=(
+        ('project_id', "Project ID (project_id) is required", False),
+        ('subject', "Issue subject (subject) is required", True),
+    ),
+    fields=(
+        ('subject', Text("Issue subject", RedmineValidator.MAX_SUBJECT_LENGTH)),
+        ('description', Text("Issue description", RedmineValidator.MAX_DESCRIPTION_LENGTH, optional=True)),
+        *((field, PositiveId(f"{field} must be a positive integer"))
+          for field in ('project_id', 'tracker_id', 'status_id', 'priority_id', 'assigned_to_id', 'parent_issue_id')),
+        ('done_ratio', IntRange("Done ratio (done_ratio) must be an integer between 0 and 100", 0, 100)),
+        ('custom_fields', DictList("Custom fields (custom_fields) must be a list", 'id',
+                                   "Custom field [{index}] must be a dict",
+                                   "Custom field [{index}] is missing required id field")),
+        ('uploads', DictList("Uploads (uploads) must be a list", 'token',
+                             "Upload [{index}] is missing its token", "Upload [{index}] is missing its token",
+                             truthy=True)),
+    ),
+)
+
+PROJECT_SCHEMA = Schema(
+    name='project',
+    required=(
+        ('name', "Project name (name) is required", True),
+        ('identifier', "Project identifier (identifier) is required", True),
+    ),
+    fields=(
+        ('name', Text("Project name", RedmineValidator.MAX_PROJECT_NAME_LENGTH)),
+        ('identifier', Text(
+            "Project identifier", RedmineValidator.MAX_PROJECT_IDENTIFIER_LENGTH,
+            min_length=RedmineValidator.MIN_PROJECT_IDENTIFIER_LENGTH,
+            pattern=RedmineValidator.PROJECT_IDENTIFIER_PATTERN,
+            pattern_message="Project identifier can only contain lowercase letters, numbers, hyphens, and underscores")),
+        ('description', Text("Project description", optional=True)),
+        ('is_public', Boolean("is_public must be a boolean (true/false)")),
+        ('inherit_members', Boolean("inherit_members must be a boolean (true/false)")),
+        ('parent_id', PositiveId("Parent project ID (parent_id) must be a positive integer")),
+    ),
+)
+
+QUERY_SCHEMA = Schema(
+    name='query',
+    fields=(
+        ('limit', IntRange("Pagination limit (limit) must be a positive integer", 1, warn_above=100,
+                             warning="It is recommended to keep pagination limit under 100 for performance")),
+        ('offset', IntRange("Pagination offset (offset) must be a non-negative integer", 0)),
+        *((field, PositiveId(f"{field} must be a positive integer"))
+          for field in ('project_id', 'tracker_id', 'priority_id', 'assigned_to_id', 'author_id')),
+        # Also Redmine's special values ('o' open, 'c' closed, '*' all)
+        ('status_id', PositiveId("status_id must be a positive integer or 'o'(open)/'c'(closed)/'*'(all)",
+                                 choices=('o', 'c', '*'))),
+        # from/to bound time entry queries
+        *((field, DateFilter(f"{field} date format is incorrect, supported formats: "
+                                     "YYYY-MM-DD, >=YYYY-MM-DD, <=YYYY-MM-DD, >=YYYY-MM-DDTHH:MM:SSZ"))
+          for field in ('created_on', 'updated_on', 'closed_on', 'from', 'to')),
+        ('sort', Custom(_sort)),
+    ),
+)
+
+# Compiled validators by validation type
+VALIDATORS: Dict[str, CompiledValidator] = {
+    'issue': CompiledValidator(ISSUE_SCHEMA),
+    'project': CompiledValidator(PROJECT_SCHEMA),
+    'query': CompiledValidator(QUERY_SCHEMA),
+}
+
+
+def _validator(validation_type: str) -> CompiledValidator:
+    validator = VALIDATORS.get(validation_type)
+    if validator is None:
+        raise ValueError(f"Unsupported validation type: {validation_type}")
+    return validator
+
+
 def validate_and_clean_data(data: Dict[str, Any], validation_type: str) -> Dict[str, Any]:
     """Validate and clean data"""
-    if validation_type == "issue":
-        result = RedmineValidator.validate_issue_data(data)
-    elif validation_type == "project":
-        result = RedmineValidator.validate_project_data(data)
-    elif validation_type == "query":
-        result = RedmineValidator.validate_query_params(data)
-    else:
-        raise ValueError(f"Unsupported validation type: {validation_type}")
-    
-    if not result.is_valid:
+    errors = _validator(validation_type).check(data)[0]
+    if errors:
         raise RedmineValidationError(
-            f"Data validation failed: {'; '.join(result.errors)}",
-            errors=result.errors
+            f"Data validation failed: {'; '.join(errors)}",
+            errors=errors
         )
     
     # Return cleaned data (remove None values and empty strings)
-    cleaned_data = {}
-    for key, value in data.items():
-        if value is not None and value != "":
-            cleaned_data[key] = value
+    return {key: value for key, value in data.items() if value is not None and value != ""}
+
+
+def validate_many(records: Iterable[Dict[str, Any]], validation_type: str = "issue",
+                  is_update: bool = False) -> Dict[int, List[str]]:
+    """Validate many payloads of one type in a single pass
     
-    return cleaned_data
+    Returns:
+        Errors of each invalid payload keyed by its index; empty when all are valid
+    """
+    return _validator(validation_type).validate_many(records, is_update)
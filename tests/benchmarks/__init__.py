@@ -0,0 +1 @@
+# 效能基準測試套件
\ No newline at end of file
@@ -0,0 +1,793 @@
+"""
+離線 Redmine REST API 模擬伺服器
+以 asyncio 實作的 HTTP/1.1 伺服器，搭配合成資料產生器，可調整延遲、錯誤率與分頁大小
+
+直接執行：
+    uv run python tests/benchmarks/fake_redmine.py --port 3000 --issues 1000 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+
+STATUSES = [
+    {'id': 1, 'name': 'New', 'is_closed': False},
+    {'id': 2, 'name': 'In Progress', 'is_closed': False},
+    {'id': 3, 'name': 'Resolved', 'is_closed': False},
+    {'id': 4, 'name': 'Feedback', 'is_closed': False},
+    {'id': 5, 'name': 'Closed', 'is_closed': True},
+    {'id': 6, 'name': 'Rejected', 'is_closed': True},
+]
+
+TRACKERS = [
+    {'id': 1, 'name': 'Bug', 'default_status': {'id': 1, 'name': 'New'}},
+    {'id': 2, 'name': 'Feature', 'default_status': {'id': 1, 'name': 'New'}},
+    {'id': 3, 'name': 'Support', 'default_status': {'id': 1, 'name': 'New'}},
+]
+
+PRIORITIES = [
+    {'id': 1, 'name': 'Low', 'is_default': False},
+    {'id': 2, 'name': 'Normal', 'is_default': True},
+    {'id': 3, 'name': 'High', 'is_default': False},
+    {'id': 4, 'name': 'Urgent', 'is_default': False},
+]
+
+TIME_ENTRY_ACTIVITIES = [
+    {'id': 8, 'name': 'Design', 'is_default': False},
+    {'id': 9, 'name': 'Development', 'is_default': True},
+    {'id': 10, 'name': 'Testing', 'is_default': False},
+]
+
+DOCUMENT_CATEGORIES = [
+    {'id': 1, 'name': 'User documentation', 'is_default': False},
+    {'id': 2, 'name': 'Technical documentation', 'is_default': True},
+]
+
+_WORDS = (
+    "login error timeout report export import dashboard api cache user project "
+    "performance crash layout search filter email upload download permission sync"
+).split()
+
+_STATUS_FLOW = [1, 2, 3, 5]
+
+# 議題自訂欄位「Severity」的值，依議題 ID 輪替（不消耗亂數，資料集其餘部分不變）
+_SEVERITIES = ('Low', 'Medium', 'High')
+
+
+def _ref(item: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    """建立 Redmine 格式的 {id, name} 參照"""
+    return {key: item[key] for key in ('id', 'name', *keys) if key in item}
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@dataclass
+class FakeRedmineDataset:
+    """記憶體中的 Redmine 資料"""
+    projects: List[Dict[str, Any]] = field(default_factory=list)
+    users: List[Dict[str, Any]] = field(default_factory=list)
+    issues: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    time_entries: List[Dict[str, Any]] = field(default_factory=list)
+    uploads: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    current_user_id: int = 1
+    next_ids: Dict[str, int] = field(default_factory=dict)
+
+    def next_id(self, kind: str) -> int:
+        self.next_ids[kind] = self.next_ids.get(kind, 0) + 1
+        return self.next_ids[kind]
+
+    def user_ref(self, user_id: int) -> Dict[str, Any]:
+        user = next((u for u in self.users if u['id'] == user_id), None)
+        if user is None:
+            return {'id': user_id, 'name': f'User {user_id}'}
+        return {'id': user['id'], 'name': f"{user['firstname']} {user['lastname']}"}
+
+    def project_ref(self, project_id: int) -> Dict[str, Any]:
+        project = next((p for p in self.projects if p['id'] == project_id), None)
+        return _ref(project) if project else {'id': project_id, 'name': f'Project {project_id}'}
+
+    def find_project(self, id_or_identifier: str) -> Optional[Dict[str, Any]]:
+        for project in self.projects:
+            if str(project['id']) == id_or_identifier or project['identifier'] == id_or_identifier:
+                return project
+        return None
+
+
+def generate_dataset(projects: int = 5, users: int = 20, issues: int = 200,
+                     journals_per_issue: int = 5, attachments_per_issue: int = 1,
+                     seed: int = 42, start: Optional[datetime] = None,
+                     exact_counts: bool = False) -> FakeRedmineDataset:
+    """產生可重現的合成資料集
+
+    exact_counts 為 True 時，每個議題恰好有 journals_per_issue 筆歷程與 attachments_per_issue 個附件，
+    否則數量在 0 到兩倍之間隨機
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1, 9, 0, 0)
+    data = FakeRedmineDataset()
+
+    for _ in range(users):
+        user_id = data.next_id('user')
+        data.users.append({
+            'id': user_id, 'login': f'user{user_id}', 'firstname': f'First{user_id}',
+            'lastname': f'Last{user_id}', 'mail': f'user{user_id}@example.com', 'status': 1,
+            'admin': user_id == 1, 'created_on': _timestamp(start), 'last_login_on': _timestamp(start),
+        })
+
+    for _ in range(projects):
+        project_id = data.next_id('project')
+        parent = data.projects[rng.randrange(len(data.projects))] if data.projects and rng.random() < 0.4 else None
+        project = {
+            'id': project_id, 'name': f'Project {project_id}', 'identifier': f'project-{project_id}',
+            'description': f'Synthetic project {project_id}', 'status': 1, 'is_public': True,
+            'created_on': _timestamp(start), 'updated_on': _timestamp(start),
+        }
+        if parent:
+            project['parent'] = _ref(parent)
+        data.projects.append(project)
+
+    for _ in range(issues):
+        issue_id = data.next_id('issue')
+        project = data.projects[rng.randrange(len(data.projects))]
+        author = rng.randint(1, users)
+        created = start + timedelta(hours=rng.randint(0, 24 * 180))
+        moment = created
+        status_index = 0
+        journals = []
+        journal_count = journals_per_issue if exact_counts else rng.randint(0, journals_per_issue * 2)
+        for _ in range(journal_count):
+            moment += timedelta(hours=rng.randint(1, 72))
+            details = []
+            if status_index < len(_STATUS_FLOW) - 1 and rng.random() < 0.35:
+                old_status = _STATUS_FLOW[status_index]
+                status_index += 1
+                details.append({'property': 'attr', 'name': 'status_id',
+                                'old_value': str(old_status), 'new_value': str(_STATUS_FLOW[status_index])})
+            journals.append({
+                'id': data.next_id('journal'), 'user': data.user_ref(rng.randint(1, users)),
+                'notes': ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 40))),
+                'created_on': _timestamp(moment), 'private_notes': False, 'details': details,
+            })
+        status = STATUSES[_STATUS_FLOW[status_index] - 1]
+        attachments = []
+        attachment_count = attachments_per_issue if exact_counts else rng.randint(0, attachments_per_issue * 2)
+        for _ in range(attachment_count):
+            attachment_id = data.next_id('attachment')
+            attachments.append({
+                'id': attachment_id, 'filename': f'file{attachment_id}.log',
+                'filesize': rng.randint(100, 5_000_000), 'content_type': 'text/plain',
+                'description': '', 'author': data.user_ref(author), 'created_on': _timestamp(created),
+            })
+        issue = {
+            'id': issue_id, 'project': _ref(project), 'tracker': _ref(rng.choice(TRACKERS)),
+            'status': _ref(status, 'is_closed'), 'priority': _ref(rng.choice(PRIORITIES)),
+            'author': data.user_ref(author),
+            'subject': f"{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS)} issue {issue_id}",
+            'description': ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(10, 120))),
+            'start_date': created.strftime('%Y-%m-%d'), 'due_date': None,
+            'done_ratio': 100 if status['is_closed'] else rng.choice([0, 10, 30, 50, 80]),
+            'is_private': False, 'estimated_hours': rng.choice([None, 1.0, 4.0, 8.0]),
+            'created_on': _timestamp(created), 'updated_on': _timestamp(moment),
+            'closed_on': _timestamp(moment) if status['is_closed'] else None,
+            'journals': journals, 'attachments': attachments, 'changesets': [],
+            'relations': [], 'watchers': [data.user_ref(author)],
+            'custom_fields': [{'id': 1, 'name': 'Severity', 'value': _SEVERITIES[issue_id % len(_SEVERITIES)]},
+                              {'id': 2, 'name': 'Components', 'multiple': True,
+                               'value': ['api', 'web'][:issue_id % 3]}],
+        }
+        if rng.random() < 0.7:
+            issue['assigned_to'] = data.user_ref(rng.randint(1, users))
+        if data.issues and rng.random() < 0.2:
+            parent_id = rng.choice(list(data.issues))
+            issue['parent'] = {'id': parent_id}
+        if data.issues and rng.random() < 0.2:
+            other = rng.choice(list(data.issues))
+            relation = {'id': data.next_id('relation'), 'issue_id': issue_id, 'issue_to_id': other,
+                        'relation_type': rng.choice(['relates', 'blocks', 'precedes']), 'delay': None}
+            issue['relations'].append(relation)
+            data.issues[other]['relations'].append(relation)
+        data.issues[issue_id] = issue
+
+    return data
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, errors: Optional[List[str]] = None):
+        super().__init__(status)
+        self.status = status
+        self.errors = errors or []
+
+
+_REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 206: 'Partial Content', 304: 'Not Modified',
+            401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed', 406: 'Not Acceptable', 416: 'Range Not Satisfiable', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+_ISSUE_INCLUDES = ('journals', 'attachments', 'changesets', 'relations', 'watchers', 'children')
+
+
+class FakeRedmineApp:
+    """實作客戶端所用 Redmine REST API 子集的請求路由"""
+
+    def __init__(self, dataset: FakeRedmineDataset, api_key: str = 'test_api_key',
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 max_page_size: int = 100, seed: int = 0):
+        self.data = dataset
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self.request_headers: Dict[str, str] = {}
+        self.routes = [
+            ('GET', r'/issues\.json', self.list_issues),
+            ('POST', r'/issues\.json', self.create_issue),
+            ('GET', r'/issues/(\d+)\.json', self.get_issue),
+            ('PUT', r'/issues/(\d+)\.json', self.update_issue),
+            ('DELETE', r'/issues/(\d+)\.json', self.delete_issue),
+            ('POST', r'/issues/(\d+)/watchers\.json', self.add_watcher),
+            ('DELETE', r'/issues/(\d+)/watchers/(\d+)\.json', self.remove_watcher),
+            ('GET', r'/projects\.json', self.list_projects),
+            ('POST', r'/projects\.json', self.create_project),
+            ('GET', r'/projects/([^/]+)\.json', self.get_project),
+            ('PUT', r'/projects/([^/]+)\.json', self.update_project),
+            ('DELETE', r'/projects/([^/]+)\.json', self.delete_project),
+            ('PUT', r'/projects/([^/]+)/(archive|unarchive)\.json', self.archive_project),
+            ('GET', r'/users\.json', self.list_users),
+            ('GET', r'/users/(\d+|current)\.json', self.get_user),
+            ('GET', r'/my/account\.json', self.my_account),
+            ('GET', r'/issue_statuses\.json', lambda q, b: {'issue_statuses': STATUSES}),
+            ('GET', r'/trackers\.json', lambda q, b: {'trackers': TRACKERS}),
+            ('GET', r'/enumerations/issue_priorities\.json', lambda q, b: {'issue_priorities': PRIORITIES}),
+            ('GET', r'/enumerations/time_entry_activities\.json',
+             lambda q, b: {'time_entry_activities': TIME_ENTRY_ACTIVITIES}),
+            ('GET', r'/enumerations/document_categories\.json',
+             lambda q, b: {'document_categories': DOCUMENT_CATEGORIES}),
+            ('GET', r'/time_entries\.json', self.list_time_entries),
+            ('POST', r'/time_entries\.json', self.create_time_entry),
+            ('GET', r'/attachments/(\d+)\.json', self.get_attachment),
+            ('GET', r'/attachments/download/(\d+)(?:/[^/]+)?', self.download_attachment),
+            ('POST', r'/uploads\.json', self.create_upload),
+        ]
+        self.routes = [(method, re.compile(f'^{pattern}$'), handler) for method, pattern, handler in self.routes]
+
+    async def handle(self, method: str, target: str, headers: Dict[str, str],
+                     body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """處理單一請求，回傳 (狀態碼, 標頭, 內容)"""
+        self.request_count += 1
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        parts = urlsplit(target)
+        path = parts.path
+        query = {key: values[-1] for key, values in parse_qs(parts.query, keep_blank_values=True).items()}
+
+        if method == 'HEAD' and path == '/':
+            return 200, {'Content-Type': 'text/html'}, b''
+
+        try:
+            if self.error_rate and self.rng.random() < self.error_rate:
+                # 模擬過載：要求客戶端立即退避重試
+                return 503, {'Content-Type': 'application/json', 'Retry-After': '0'}, b''
+            if headers.get('x-redmine-api-key') != self.api_key:
+                raise _HTTPError(401)
+            # 上傳檔案以原始位元組傳送，其餘請求為 JSON
+            if headers.get('content-type') == 'application/octet-stream':
+                payload = body
+            else:
+                payload = json.loads(body) if body else {}
+            self.request_headers = headers
+            result = self.dispatch(method, path, query, payload)
+        except _HTTPError as e:
+            data = json.dumps({'errors': e.errors}).encode() if e.errors else b''
+            return e.status, {'Content-Type': 'application/json'}, data
+
+        if isinstance(result, tuple):
+            return result
+        if result is None:
+            return 204, {}, b''
+        status = 201 if method == 'POST' else 200
+        return status, {'Content-Type': 'application/json'}, json.dumps(result).encode()
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str], payload: Dict[str, Any]):
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method == method:
+                return handler(query, payload, *match.groups())
+        raise _HTTPError(405 if path_matched else 404)
+
+    # -- helpers ---------------------------------------------------------
+
+    def _page(self, items: List[Any], query: Dict[str, str]) -> Tuple[List[Any], int, int]:
+        offset = max(int(query.get('offset') or 0), 0)
+        limit = min(max(int(query.get('limit') or 25), 1), self.max_page_size)
+        return items[offset:offset + limit], offset, limit
+
+    @staticmethod
+    def _match_date(value: Optional[str], condition: str) -> bool:
+        if not value:
+            return False
+        if condition.startswith('>='):
+            return value >= condition[2:]
+        if condition.startswith('<='):
+            return value[:len(condition) - 2] <= condition[2:]
+        if condition.startswith('><'):
+            low, _, high = condition[2:].partition('|')
+            return value >= low and value[:len(high)] <= high
+        return value[:len(condition)] == condition
+
+    def _issue(self, issue_id: int) -> Dict[str, Any]:
+        issue = self.data.issues.get(issue_id)
+        if issue is None:
+            raise _HTTPError(404)
+        return issue
+
+    def _issue_view(self, issue: Dict[str, Any], includes: List[str]) -> Dict[str, Any]:
+        view = {key: value for key, value in issue.items() if key not in _ISSUE_INCLUDES}
+        for name in includes:
+            if name == 'children':
+                view['children'] = [
+                    {'id': child['id'], 'tracker': child['tracker'], 'subject': child['subject']}
+                    for child in self.data.issues.values() if child.get('parent', {}).get('id') == issue['id']
+                ]
+            elif name in _ISSUE_INCLUDES:
+                view[name] = issue[name]
+        return view
+
+    # -- issues ----------------------------------------------------------
+
+    def list_issues(self, query, payload):
+        issues = list(self.data.issues.values())
+
+        if 'issue_id' in query:
+            wanted = {int(i) for i in query['issue_id'].split(',') if i.strip()}
+            issues = [i for i in issues if i['id'] in wanted]
+        if 'parent_id' in query:
+            wanted = {int(i) for i in query['parent_id'].split(',') if i.strip()}
+            issues = [i for i in issues if i.get('parent', {}).get('id') in wanted]
+        if 'project_id' in query:
+            project = self.data.find_project(query['project_id'])
+            if project is None:
+                raise _HTTPError(404)
+            project_ids = {project['id']}
+            if query.get('subproject_id') != '!*':
+                changed = True
+                while changed:
+                    children = {p['id'] for p in self.data.projects if p.get('parent', {}).get('id') in project_ids}
+                    changed = not children <= project_ids
+                    project_ids |= children
+            issues = [i for i in issues if i['project']['id'] in project_ids]
+
+        status = query.get('status_id', 'o')
+        if status == 'o':
+            issues = [i for i in issues if not i['status']['is_closed']]
+        elif status == 'c':
+            issues = [i for i in issues if i['status']['is_closed']]
+        elif status != '*':
+            wanted = {int(s) for s in status.split('|')}
+            issues = [i for i in issues if i['status']['id'] in wanted]
+
+        for field_name, key in (('tracker_id', 'tracker'), ('priority_id', 'priority'),
+                                ('author_id', 'author'), ('assigned_to_id', 'assigned_to')):
+            if field_name in query:
+                value = query[field_name]
+                if value == 'me':
+                    value = str(self.data.current_user_id)
+                issues = [i for i in issues if str((i.get(key) or {}).get('id')) == value]
+
+        for field_name in ('created_on', 'updated_on', 'closed_on'):
+            if query.get(field_name):
+                issues = [i for i in issues if self._match_date(i.get(field_name), query[field_name])]
+
+        sort = query.get('sort') or 'id:desc'
+        for part in reversed(sort.split(',')):
+            name, _, direction = part.partition(':')
+            def sort_key(issue, name=name):
+                value = issue.get(name)
+                if isinstance(value, dict):
+                    value = value.get('id')
+                return (value is None, value if value is not None else 0)
+            issues.sort(key=sort_key, reverse=direction == 'desc')
+
+        includes = [i for i in (query.get('include') or '').split(',') if i]
+        page, offset, limit = self._page(issues, query)
+        return {'issues': [self._issue_view(i, includes) for i in page],
+                'total_count': len(issues), 'offset': offset, 'limit': limit}
+
+    def get_issue(self, query, payload, issue_id):
+        includes = [i for i in (query.get('include') or '').split(',') if i]
+        return {'issue': self._issue_view(self._issue(int(issue_id)), includes)}
+
+    def create_issue(self, query, payload):
+        fields = payload.get('issue') or {}
+        if not fields.get('subject') or 'project_id' not in fields:
+            raise _HTTPError(422, ['Subject cannot be blank'])
+        now = _timestamp(datetime.utcnow())
+        issue_id = self.data.next_id('issue')
+        tracker = next((t for t in TRACKERS if t['id'] == fields.get('tracker_id')), TRACKERS[0])
+        priority = next((p for p in PRIORITIES if p['id'] == fields.get('priority_id')), PRIORITIES[1])
+        issue = {
+            'id': issue_id, 'project': self.data.project_ref(int(fields['project_id'])),
+            'tracker': _ref(tracker), 'status': _ref(STATUSES[0], 'is_closed'), 'priority': _ref(priority),
+            'author': self.data.user_ref(self.data.current_user_id), 'subject': fields['subject'],
+            'description': fields.get('description', ''), 'start_date': None, 'due_date': None,
+            'done_ratio': 0, 'is_private': False, 'estimated_hours': None,
+            'created_on': now, 'updated_on': now, 'closed_on': None,
+            'journals': [], 'attachments': [], 'changesets': [], 'relations': [], 'watchers': [],
+        }
+        if fields.get('assigned_to_id'):
+            issue['assigned_to'] = self.data.user_ref(int(fields['assigned_to_id']))
+        if fields.get('parent_issue_id'):
+            issue['parent'] = {'id': int(fields['parent_issue_id'])}
+        self._attach_uploads(issue, fields.get('uploads') or [])
+        self.data.issues[issue_id] = issue
+        return {'issue': self._issue_view(issue, [])}
+
+    def update_issue(self, query, payload, issue_id):
+        issue = self._issue(int(issue_id))
+        fields = payload.get('issue') or {}
+        details = []
+        for key, value in fields.items():
+            if key == 'status_id':
+                status = next((s for s in STATUSES if s['id'] == int(value)), None)
+                if status is None:
+                    raise _HTTPError(422, ['Status is invalid'])
+                details.append({'property': 'attr', 'name': 'status_id',
+                                'old_value': str(issue['status']['id']), 'new_value': str(value)})
+                issue['status'] = _ref(status, 'is_closed')
+                issue['closed_on'] = _timestamp(datetime.utcnow()) if status['is_closed'] else None
+            elif key == 'priority_id':
+                issue['priority'] = _ref(next((p for p in PRIORITIES if p['id'] == int(value)), PRIORITIES[1]))
+            elif key == 'tracker_id':
+                issue['tracker'] = _ref(next((t for t in TRACKERS if t['id'] == int(value)), TRACKERS[0]))
+            elif key == 'assigned_to_id':
+                if value:
+                    issue['assigned_to'] = self.data.user_ref(int(value))
+                else:
+                    issue.pop('assigned_to', None)
+            elif key == 'parent_issue_id':
+                if value:
+                    issue['parent'] = {'id': int(value)}
+                else:
+                    issue.pop('parent', None)
+            elif key in ('subject', 'description', 'done_ratio', 'start_date', 'due_date', 'estimated_hours'):
+                issue[key] = value
+            elif key == 'uploads':
+                for attachment in self._attach_uploads(issue, value):
+                    details.append({'property': 'attachment', 'name': str(attachment['id']),
+                                    'old_value': None, 'new_value': attachment['filename']})
+        now = _timestamp(datetime.utcnow())
+        issue['updated_on'] = now
+        if fields.get('notes') or details:
+            issue['journals'].append({
+                'id': self.data.next_id('journal'), 'user': self.data.user_ref(self.data.current_user_id),
+                'notes': fields.get('notes', ''), 'created_on': now,
+                'private_notes': bool(fields.get('private_notes')), 'details': details,
+            })
+        return None
+
+    def delete_issue(self, query, payload, issue_id):
+        self._issue(int(issue_id))
+        del self.data.issues[int(issue_id)]
+        return None
+
+    def add_watcher(self, query, payload, issue_id):
+        issue = self._issue(int(issue_id))
+        watcher = self.data.user_ref(int(payload.get('user_id', 0)))
+        if watcher not in issue['watchers']:
+            issue['watchers'].append(watcher)
+        return None
+
+    def remove_watcher(self, query, payload, issue_id, user_id):
+        issue = self._issue(int(issue_id))
+        issue['watchers'] = [w for w in issue['watchers'] if w['id'] != int(user_id)]
+        return None
+
+    # -- projects --------------------------------------------------------
+
+    def list_projects(self, query, payload):
+        page, offset, limit = self._page(self.data.projects, query)
+        return {'projects': page, 'total_count': len(self.data.projects), 'offset': offset, 'limit': limit}
+
+    def get_project(self, query, payload, project_id):
+        project = self.data.find_project(project_id)
+        if project is None:
+            raise _HTTPError(404)
+        return {'project': project}
+
+    def create_project(self, query, payload):
+        fields = payload.get('project') or {}
+        if not fields.get('name') or not fields.get('identifier'):
+            raise _HTTPError(422, ['Name cannot be blank'])
+        if self.data.find_project(fields['identifier']):
+            raise _HTTPError(422, ['Identifier has already been taken'])
+        now = _timestamp(datetime.utcnow())
+        project = {
+            'id': self.data.next_id('project'), 'name': fields['name'], 'identifier': fields['identifier'],
+            'description': fields.get('description', ''), 'status': 1,
+            'is_public': fields.get('is_public', True), 'created_on': now, 'updated_on': now,
+        }
+        if fields.get('parent_id'):
+            project['parent'] = self.data.project_ref(int(fields['parent_id']))
+        self.data.projects.append(project)
+        return {'project': project}
+
+    def update_project(self, query, payload, project_id):
+        project = self.data.find_project(project_id)
+        if project is None:
+            raise _HTTPError(404)
+        for key, value in (payload.get('project') or {}).items():
+            if key in ('name', 'description', 'is_public', 'homepage'):
+                project[key] = value
+        project['updated_on'] = _timestamp(datetime.utcnow())
+        return None
+
+    def delete_project(self, query, payload, project_id):
+        project = self.data.find_project(project_id)
+        if project is None:
+            raise _HTTPError(404)
+        self.data.projects.remove(project)
+        return None
+
+    def archive_project(self, query, payload, project_id, action):
+        project = self.data.find_project(project_id)
+        if project is None:
+            raise _HTTPError(404)
+        project['status'] = 9 if action == 'archive' else 1
+        return None
+
+    # -- users -----------------------------------------------------------
+
+    def list_users(self, query, payload):
+        users = self.data.users
+        if query.get('status'):
+            users = [u for u in users if str(u['status']) == query['status']]
+        if query.get('name'):
+            needle = query['name'].lower()
+            users = [u for u in users if any(needle in str(u[key]).lower()
+                                             for key in ('login', 'firstname', 'lastname', 'mail'))]
+        page, offset, limit = self._page(users, query)
+        return {'users': page, 'total_count': len(users), 'offset': offset, 'limit': limit}
+
+    def get_user(self, query, payload, user_id):
+        user_id = self.data.current_user_id if user_id == 'current' else int(user_id)
+        user = next((u for u in self.data.users if u['id'] == user_id), None)
+        if user is None:
+            raise _HTTPError(404)
+        return {'user': dict(user, groups=[], custom_fields=[])}
+
+    def my_account(self, query, payload):
+        return self.get_user(query, payload, 'current')
+
+    # -- attachments -----------------------------------------------------
+
+    def _attachment(self, attachment_id: int) -> Dict[str, Any]:
+        for issue in self.data.issues.values():
+            for attachment in issue['attachments']:
+                if attachment['id'] == attachment_id:
+                    return attachment
+        raise _HTTPError(404)
+
+    def get_attachment(self, query, payload, attachment_id):
+        attachment = self._attachment(int(attachment_id))
+        return {'attachment': dict(attachment, content_url=f"/attachments/download/{attachment['id']}/"
+                                                          f"{attachment['filename']}")}
+
+    def download_attachment(self, query, payload, attachment_id):
+        """回傳原始檔案內容，支援 ETag（If-None-Match / If-Range）與 Range 續傳"""
+        attachment = self._attachment(int(attachment_id))
+        line = f"attachment {attachment['id']} line\n".encode()
+        content = (line * (attachment['filesize'] // len(line) + 1))[:attachment['filesize']]
+        etag = f'"{attachment["id"]}-{attachment["filesize"]}"'
+        headers = self.request_headers
+        if headers.get('if-none-match') == etag:
+            return 304, {'ETag': etag}, b''
+        match = re.match(r'bytes=(\d+)-$', headers.get('range', ''))
+        if match and headers.get('if-range', etag) == etag:
+            start = int(match.group(1))
+            if start >= len(content):
+                return 416, {'Content-Range': f'bytes */{len(content)}'}, b''
+            return 206, {'ETag': etag, 'Content-Type': attachment['content_type'],
+                         'Content-Range': f'bytes {start}-{len(content) - 1}/{len(content)}'}, content[start:]
+        return 200, {'ETag': etag, 'Content-Type': attachment['content_type']}, content
+
+    def create_upload(self, query, payload):
+        """接收原始檔案內容，回傳之後附加到議題用的 token"""
+        if not isinstance(payload, bytes):
+            raise _HTTPError(406)
+        upload_id = self.data.next_id('upload')
+        digest = hashlib.sha256(payload).hexdigest()
+        token = f"{upload_id}.{digest[:32]}"
+        self.data.uploads[token] = {'filesize': len(payload), 'digest': digest}
+        return {'upload': {'id': upload_id, 'token': token}}
+
+    def _attach_uploads(self, issue: Dict[str, Any], uploads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        attachments = []
+        for upload in uploads:
+            stored = self.data.uploads.pop(upload.get('token'), None)
+            if stored is None:
+                raise _HTTPError(422, ['Attachment is invalid'])
+            attachments.append({
+                'id': self.data.next_id('attachment'), 'filename': upload.get('filename') or 'upload',
+                'filesize': stored['filesize'], 'content_type': upload.get('content_type') or 'application/octet-stream',
+                'description': upload.get('description') or '', 'digest': stored['digest'],
+                'author': self.data.user_ref(self.data.current_user_id), 'created_on': _timestamp(datetime.utcnow()),
+            })
+        issue['attachments'].extend(attachments)
+        return attachments
+
+    # -- time entries ----------------------------------------------------
+
+    def list_time_entries(self, query, payload):
+        entries = self.data.time_entries
+        if 'project_id' in query:
+            project = self.data.find_project(query['project_id'])
+            entries = [e for e in entries if project and e['project']['id'] == project['id']]
+        for field_name, key in (('user_id', 'user'), ('issue_id', 'issue'), ('activity_id', 'activity')):
+            if field_name in query:
+                value = str(self.data.current_user_id) if query[field_name] == 'me' else query[field_name]
+                entries = [e for e in entries if str((e.get(key) or {}).get('id')) == value]
+        if query.get('from'):
+            entries = [e for e in entries if e['spent_on'] >= query['from']]
+        if query.get('to'):
+            entries = [e for e in entries if e['spent_on'] <= query['to']]
+        if query.get('spent_on'):
+            entries = [e for e in entries if self._match_date(e['spent_on'], query['spent_on'])]
+        page, offset, limit = self._page(entries, query)
+        return {'time_entries': page, 'total_count': len(entries), 'offset': offset, 'limit': limit}
+
+    def create_time_entry(self, query, payload):
+        fields = payload.get('time_entry') or {}
+        if not fields.get('hours') or float(fields['hours']) <= 0:
+            raise _HTTPError(422, ['Hours is invalid'])
+        issue = self._issue(int(fields['issue_id'])) if fields.get('issue_id') else None
+        activity = next((a for a in TIME_ENTRY_ACTIVITIES if a['id'] == fields.get('activity_id')), None)
+        if activity is None:
+            raise _HTTPError(422, ['Activity cannot be blank'])
+        now = _timestamp(datetime.utcnow())
+        entry = {
+            'id': self.data.next_id('time_entry'),
+            'project': issue['project'] if issue else self.data.project_ref(int(fields.get('project_id', 1))),
+            'issue': {'id': issue['id']} if issue else None,
+            'user': self.data.user_ref(int(fields.get('user_id') or self.data.current_user_id)),
+            'activity': _ref(activity), 'hours': float(fields['hours']),
+            'comments': fields.get('comments', ''), 'spent_on': fields.get('spent_on') or now[:10],
+            'created_on': now, 'updated_on': now,
+        }
+        self.data.time_entries.append(entry)
+        return {'time_entry': entry}
+
+
+class FakeRedmineServer:
+    """在背景事件迴圈執行緒上執行 FakeRedmineApp"""
+
+    def __init__(self, app: FakeRedmineApp, host: str = '127.0.0.1', port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, response_headers, response_body = await self.app.handle(method, target, headers, body)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                head = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}',
+                        f'Content-Length: {len(response_body)}',
+                        f'Connection: {"keep-alive" if keep_alive else "close"}']
+                head += [f'{name}: {value}' for name, value in response_headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(response_body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        # 關閉仍保持連線（keep-alive）的處理器
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+
+    def start(self) -> 'FakeRedmineServer':
+        self._thread = threading.Thread(target=self._run, name='fake-redmine', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'FakeRedmineServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="離線 Redmine REST API 模擬伺服器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--api-key', default='test_api_key')
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--issues', type=int, default=200)
+    parser.add_argument('--journals', type=int, default=5, help='每個議題平均的歷程數')
+    parser.add_argument('--latency', type=float, default=0.0, help='每個請求的基本延遲（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='額外隨機延遲（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回應 503 的請求比例')
+    parser.add_argument('--page-size', type=int, default=100, help='最大分頁大小')
+    args = parser.parse_args()
+
+    dataset = generate_dataset(projects=args.projects, users=args.users, issues=args.issues,
+                               journals_per_issue=args.journals)
+    app = FakeRedmineApp(dataset, api_key=args.api_key, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, max_page_size=args.page_size)
+    server = FakeRedmineServer(app, host=args.host, port=args.port).start()
+    print(f"模擬 Redmine 已啟動：{server.url}（API 金鑰：{args.api_key}）")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+MCP 工具負載測試
+啟動離線模擬 Redmine，以指定並行度呼叫每個 MCP 工具，回報 p50/p95/p99 延遲與每秒請求數
+
+直接執行：
+    uv run python tests/benchmarks/load_test.py --concurrency 8 --iterations 50 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import inspect
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 添加 src 與本目錄到 Python 路徑（直接執行時）
+_here = Path(__file__).parent
+sys.path.insert(0, str(_here.parent.parent / "src"))
+sys.path.insert(0, str(_here))
+
+from fake_redmine import FakeRedmineApp, FakeRedmineDataset, FakeRedmineServer, generate_dataset
+
+
+# 工具回傳這些前綴時視為失敗
+FAILURE_PREFIXES = ("Failed", "System error", "Error", "✗")
+
+Scenario = Callable[[random.Random, FakeRedmineDataset], Dict[str, Any]]
+
+
+def _issue_id(rng: random.Random, data: FakeRedmineDataset) -> int:
+    return rng.choice(list(data.issues))
+
+
+def _project_id(rng: random.Random, data: FakeRedmineDataset) -> int:
+    return rng.choice(data.projects)['id']
+
+
+def _upload_path(rng: random.Random, data: FakeRedmineDataset) -> str:
+    """負載測試上傳用的小型暫存檔（所有呼叫共用）"""
+    path = Path(tempfile.gettempdir()) / 'redmine-mcp-load-upload.log'
+    if not path.exists():
+        path.write_bytes(b'load test upload line\n' * 4096)
+    return str(path)
+
+
+# 每個 MCP 工具的參數產生器；新增工具時須在此補上情境
+SCENARIOS: Dict[str, Scenario] = {
+    'server_info': lambda rng, data: {},
+    'health_check': lambda rng, data: {},
+    'metrics': lambda rng, data: {},
+    'get_issue': lambda rng, data: {'issue_id': _issue_id(rng, data)},
+    'issue_graph': lambda rng, data: {'issue_ids': [_issue_id(rng, data)], 'max_depth': rng.randint(1, 3)},
+    # 每個 session 首次呼叫回顧 24 小時，其後只取得其他情境剛寫入的變更
+    'changes_since': lambda rng, data: {'session': f"load-{rng.randrange(4)}", 'limit': rng.randint(1, 10)},
+    # timeout 0 只讀取一次基準狀態，不會阻塞負載測試
+    'wait_for_change': lambda rng, data: {'issue_ids': rng.sample(list(data.issues), 5), 'timeout': 0},
+    'flow_metrics': lambda rng, data: {'weeks': rng.randint(4, 52), 'transitions': rng.random() < 0.5},
+    'download_attachment': lambda rng, data: {'attachment_id': rng.choice(
+        [a['id'] for issue in data.issues.values() for a in issue['attachments']])},
+    'attach_files': lambda rng, data: {'issue_id': _issue_id(rng, data), 'paths': [_upload_path(rng, data)]},
+    'update_issue_status': lambda rng, data: {'issue_id': _issue_id(rng, data), 'status_name': 'In Progress'},
+    # 專案以 ID 或識別碼指定，兩種都經由專案索引解析
+    'list_project_issues': lambda rng, data: {'project_id': rng.choice(data.projects)[rng.choice(['id', 'identifier'])],
+                                              'status_filter': rng.choice(['open', 'closed', 'all'])},
+    'get_issue_statuses': lambda rng, data: {},
+    'get_trackers': lambda rng, data: {},
+    'get_priorities': lambda rng, data: {},
+    'get_time_entry_activities': lambda rng, data: {},
+    'get_document_categories': lambda rng, data: {},
+    'get_projects': lambda rng, data: {},
+    'search_issues': lambda rng, data: {'query': rng.choice(['login', 'error', 'cache', 'sync'])},
+    'issue_counts': lambda rng, data: {'rows': rng.choice(['status', 'tracker', 'priority']),
+                                       'columns': rng.choice([None, 'project'])},
+    'update_issue_content': lambda rng, data: {'issue_id': _issue_id(rng, data), 'done_ratio': 50},
+    'add_issue_note': lambda rng, data: {'issue_id': _issue_id(rng, data), 'notes': 'benchmark note',
+                                         'spent_hours': 0.5, 'activity_name': 'Development'},
+    'log_time_entries': lambda rng, data: {'entries': [
+        {'issue_id': _issue_id(rng, data), 'hours': 0.25 * rng.randint(1, 8), 'activity_name': 'Development'}
+        for _ in range(rng.randint(1, 5))
+    ]},
+    'time_report': lambda rng, data: {'group_by': rng.choice([['user'], ['activity'], ['project', 'day']])},
+    'assign_issue': lambda rng, data: {'issue_id': _issue_id(rng, data), 'user_login': 'user2'},
+    'create_new_issue': lambda rng, data: {'project_id': _project_id(rng, data),
+                                           'subject': 'Benchmark issue', 'tracker_name': 'Bug'},
+    'get_my_issues': lambda rng, data: {},
+    'close_issue': lambda rng, data: {'issue_id': _issue_id(rng, data)},
+    'search_users': lambda rng, data: {'query': 'user1'},
+    'list_users': lambda rng, data: {},
+    'get_user': lambda rng, data: {'user_id': rng.choice(data.users)['id']},
+    'refresh_cache': lambda rng, data: {},
+}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """最近秩（nearest-rank）百分位數"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class ToolResult:
+    """單一工具的負載測試結果"""
+    tool: str
+    latencies: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def rps(self) -> float:
+        return self.calls / self.wall_time if self.wall_time else 0.0
+
+
+@dataclass
+class LoadTestReport:
+    """負載測試報告"""
+    concurrency: int
+    results: Dict[str, ToolResult] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    redmine_requests: int = 0
+
+    def format(self) -> str:
+        lines = [f"Load test (concurrency {self.concurrency}, {self.redmine_requests} Redmine requests)", ""]
+        lines.append(f"{'Tool':<28} {'Calls':>6} {'Errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+        lines.append(f"{'-'*28} {'-'*6} {'-'*6} {'-'*8} {'-'*8} {'-'*8} {'-'*8}")
+        for name, result in self.results.items():
+            lines.append(
+                f"{name:<28} {result.calls:>6} {len(result.errors):>6} "
+                f"{percentile(result.latencies, 0.50) * 1000:>8.1f} "
+                f"{percentile(result.latencies, 0.95) * 1000:>8.1f} "
+                f"{percentile(result.latencies, 0.99) * 1000:>8.1f} {result.rps:>8.1f}"
+            )
+        if self.skipped:
+            lines.append("")
+            lines.append(f"Skipped (no scenario): {', '.join(self.skipped)}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def redmine_environment(domain: str, api_key: str, cache_dir: str, max_rps: float = 0.0):
+    """暫時將全域配置與客戶端指向指定的 Redmine（預設不限速，以量測客戶端本身）"""
+    from redmine_mcp import config as config_module, redmine_client
+
+    env = {'REDMINE_DOMAIN': domain, 'REDMINE_API_KEY': api_key, 'REDMINE_MCP_CACHE_DIR': cache_dir,
+           'REDMINE_MCP_MAX_RPS': str(max_rps), 'REDMINE_MCP_UPLOAD_DIR': tempfile.gettempdir()}
+    original_env = {key: os.environ.get(key) for key in env}
+    original = (config_module._config, redmine_client._client)
+    os.environ.update(env)
+    config_module._config = None
+    redmine_client._client = None
+    try:
+        yield
+    finally:
+        for key, value in original_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        config_module._config, redmine_client._client = original
+
+
+def run_load_test(concurrency: int = 4, iterations: int = 20, tools: Optional[List[str]] = None,
+                  issues: int = 200, projects: int = 5, users: int = 20, journals_per_issue: int = 5,
+                  latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                  page_size: int = 100, max_rps: float = 0.0, seed: int = 1) -> LoadTestReport:
+    """啟動模擬伺服器並對每個工具執行負載測試"""
+    dataset = generate_dataset(projects=projects, users=users, issues=issues,
+                               journals_per_issue=journals_per_issue, seed=seed)
+    app = FakeRedmineApp(dataset, latency=latency, jitter=jitter, error_rate=error_rate,
+                         max_page_size=page_size, seed=seed)
+    rng = random.Random(seed)
+    report = LoadTestReport(concurrency=concurrency)
+
+    with FakeRedmineServer(app) as fake, tempfile.TemporaryDirectory() as cache_dir, \
+            redmine_environment(fake.url, app.api_key, cache_dir, max_rps):
+        from redmine_mcp import server
+
+        registered = [tool.name for tool in asyncio.run(server.mcp.list_tools())]
+        selected = [name for name in registered if tools is None or name in tools]
+        report.skipped = [name for name in selected if name not in SCENARIOS]
+
+        for name in selected:
+            if name not in SCENARIOS:
+                continue
+            func = getattr(server, name)
+            calls = [SCENARIOS[name](rng, dataset) for _ in range(iterations)]
+            result = ToolResult(tool=name)
+
+            def invoke(kwargs, func=func, result=result):
+                start = time.perf_counter()
+                output = func(**kwargs)
+                if inspect.iscoroutine(output):
+                    # Blocking tools are registered as coroutines that wait in a worker thread
+                    output = asyncio.run(output)
+                result.latencies.append(time.perf_counter() - start)
+                if isinstance(output, str) and output.startswith(FAILURE_PREFIXES):
+                    result.errors.append(output.splitlines()[0])
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(invoke, calls))
+            result.wall_time = time.perf_counter() - start
+            report.results[name] = result
+
+    report.redmine_requests = app.request_count
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 工具負載測試（離線模擬 Redmine）")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=20, help='每個工具的呼叫次數')
+    parser.add_argument('--tools', nargs='*', help='只測試指定工具')
+    parser.add_argument('--issues', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=5)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--journals', type=int, default=5, help='每個議題平均的歷程數')
+    parser.add_argument('--latency', type=float, default=0.0, help='每個請求的基本延遲（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='額外隨機延遲（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回應 503 的請求比例')
+    parser.add_argument('--page-size', type=int, default=100, help='最大分頁大小')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='客戶端速率上限（0 為不限速）')
+    args = parser.parse_args()
+
+    report = run_load_test(concurrency=args.concurrency, iterations=args.iterations, tools=args.tools,
+                           issues=args.issues, projects=args.projects, users=args.users,
+                           journals_per_issue=args.journals, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, page_size=args.page_size,
+                           max_rps=args.max_rps)
+    print(report.format())
+
+
+if __name__ == '__main__':
+    main()
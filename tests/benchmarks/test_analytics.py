@@ -0,0 +1,71 @@
+"""
+流程指標計算基準測試
+以合成的議題快照比較 NumPy 向量化計算與純 Python 計算，結果須一致；加速倍數只回報不斷言，避免共用機器上的計時誤差造成失敗
+"""
+
+import math
+import random
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from redmine_mcp import analytics
+from redmine_mcp.analytics import FlowSnapshot, flow_report
+
+
+ISSUES = 200_000
+
+pytestmark = pytest.mark.skipif(analytics.np is None, reason="numpy is not installed")
+
+
+def synthetic_snapshot(count, seed=3):
+    """過去兩年內建立的議題，約七成已關閉，半數有狀態變更紀錄"""
+    rng = random.Random(seed)
+    now = time.time()
+    created, started, closed, is_closed = [], [], [], []
+    for _ in range(count):
+        born = now - rng.uniform(0, 730) * analytics.DAY
+        begin = born + rng.uniform(0, 20) * analytics.DAY if rng.random() < 0.5 else math.nan
+        done = rng.random() < 0.7
+        created.append(born)
+        started.append(begin)
+        closed.append(min(born + rng.expovariate(1 / 15) * analytics.DAY, now) if done else math.nan)
+        is_closed.append(done)
+    return dict(ids=list(range(1, count + 1)), created=created, started=started, closed=closed,
+                is_closed=is_closed, transitions_read=True)
+
+
+def best_of(runs, fn):
+    """執行數次，回傳結果與最短耗時（排除首次執行的暖機成本）"""
+    best = math.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def test_vectorized_flow_report_matches_reference(monkeypatch):
+    """測試向量化計算與純 Python 結果相同，並回報兩者的耗時"""
+    np = analytics.np
+    columns = synthetic_snapshot(ISSUES)
+    arrays = FlowSnapshot(**{name: np.asarray(value, dtype=bool if name == 'is_closed' else None)
+                             if isinstance(value, list) else value for name, value in columns.items()})
+    lists = FlowSnapshot(**columns)
+    now = datetime.now(timezone.utc)
+
+    vectorized, vectorized_seconds = best_of(3, lambda: flow_report(arrays, weeks=52, now=now))
+    monkeypatch.setattr(analytics, 'np', None)
+    reference, reference_seconds = best_of(3, lambda: flow_report(lists, weeks=52, now=now))
+
+    assert vectorized.throughput == reference.throughput
+    assert vectorized.aging == reference.aging
+    assert vectorized.closed == reference.closed and vectorized.wip == reference.wip
+    for key, value in reference.lead_time.items():
+        assert vectorized.lead_time[key] == pytest.approx(value, abs=0.01)
+    for key, value in reference.cycle_time.items():
+        assert vectorized.cycle_time[key] == pytest.approx(value, abs=0.01)
+
+    print(f"\nflow_report over {ISSUES} issues: numpy {vectorized_seconds * 1000:.1f} ms, "
+          f"python {reference_seconds * 1000:.1f} ms ({reference_seconds / vectorized_seconds:.1f}x)")
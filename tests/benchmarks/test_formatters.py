@@ -0,0 +1,151 @@
+"""
+輸出格式化熱路徑基準測試
+透過離線模擬 Redmine 錄製 1、100、1000 筆歷程（及議題）的回應，重播給各格式化函式，
+記錄每次呼叫的時間與記憶體配置；耗時或配置隨資料量超線性成長時測試失敗
+"""
+
+import time
+import tracemalloc
+
+import pytest
+
+from redmine_mcp.formatters import (
+    format_issue, format_project_issues, format_my_issues, format_search_results,
+    to_json, table, issue_detail_record, ISSUE_FIELDS, ISSUE_COLUMNS
+)
+from tests.benchmarks.fake_redmine import FakeRedmineApp, FakeRedmineServer, generate_dataset
+from tests.benchmarks.load_test import redmine_environment
+
+
+SIZES = (1, 100, 1000)
+
+# 每筆資料的平均耗時在資料量放大 10 倍後允許的最大成長倍數（線性約為 1，平方約為 10）
+MAX_PER_ITEM_GROWTH = 3.0
+
+# 單次呼叫的峰值配置上限：輸出大小的倍數加上固定額度
+MAX_PEAK_OUTPUT_RATIO = 5.0
+# JSON 輸出須先建立中介 dict 與 list，允許較高的倍數
+MAX_JSON_PEAK_OUTPUT_RATIO = 8.0
+PEAK_ALLOWANCE_BYTES = 64 * 1024
+
+ISSUE_INCLUDES = ['attachments', 'changesets', 'children', 'journals', 'relations', 'watchers']
+
+# 目前錄製的結果，測試結束後輸出報告
+_results = {}
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    """經由 HTTP 從模擬伺服器錄製各種大小的回應"""
+    payloads = {'issue': {}, 'issues': {}}
+
+    for size in SIZES:
+        dataset = generate_dataset(projects=1, users=20, issues=1, journals_per_issue=size,
+                                   attachments_per_issue=max(1, size // 10), seed=size, exact_counts=True)
+        app = FakeRedmineApp(dataset)
+        with FakeRedmineServer(app) as server, \
+                redmine_environment(server.url, app.api_key, str(tmp_path_factory.mktemp("cache"))):
+            from redmine_mcp.redmine_client import get_client
+            payloads['issue'][size] = get_client().get_issue_raw(1, include=ISSUE_INCLUDES)
+
+    dataset = generate_dataset(projects=5, users=20, issues=max(SIZES), journals_per_issue=0, seed=1)
+    app = FakeRedmineApp(dataset)
+    with FakeRedmineServer(app) as server, \
+            redmine_environment(server.url, app.api_key, str(tmp_path_factory.mktemp("cache"))):
+        from redmine_mcp.redmine_client import get_client
+        client = get_client()
+        issues = []
+        while len(issues) < max(SIZES):
+            page = client.list_issues(limit=100, offset=len(issues), sort='id')
+            if not page:
+                break
+            issues.extend(page)
+    for size in SIZES:
+        payloads['issues'][size] = issues[:size]
+
+    return payloads
+
+
+FORMATTERS = {
+    'get_issue': ('issue', lambda payload: format_issue(payload, 'https://redmine.example.com')),
+    'list_project_issues': ('issues', lambda issues: format_project_issues('Project 1', 'all', issues)),
+    'get_my_issues': ('issues', lambda issues: format_my_issues('First1 Last1', 'all', issues)),
+    'search_issues': ('issues', lambda issues: format_search_results('issue', issues)),
+    'get_issue_json': ('issue', lambda payload: to_json(issue_detail_record(payload, 'https://redmine.example.com'))),
+    'list_project_issues_json': ('issues', lambda issues: to_json(
+        {'issues': table(issues, ISSUE_FIELDS, None, ISSUE_COLUMNS)})),
+}
+
+
+def measure(render, payload, repeat=5):
+    """回傳 (最短單次耗時秒數, 峰值配置位元組, 輸出長度)"""
+    output = render(payload)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(payload)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        render(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, len(output)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report():
+    """輸出基準報告（使用 -s 顯示）"""
+    yield
+    print(f"\n{'Formatter':<22} {'Size':>6} {'Time ms':>9} {'Peak KB':>9} {'Output KB':>10}")
+    print(f"{'-'*22} {'-'*6} {'-'*9} {'-'*9} {'-'*10}")
+    for (name, size), (seconds, peak, length) in sorted(_results.items()):
+        print(f"{name:<22} {size:>6} {seconds * 1000:>9.3f} {peak / 1024:>9.1f} {length / 1024:>10.1f}")
+
+
+@pytest.mark.parametrize("name", sorted(FORMATTERS))
+def test_formatter_scales_linearly(recorded, name):
+    """測試格式化耗時與配置隨資料量線性成長"""
+    kind, render = FORMATTERS[name]
+
+    for size in SIZES:
+        seconds, peak, length = measure(render, recorded[kind][size])
+        _results[(name, size)] = (seconds, peak, length)
+        ratio = MAX_JSON_PEAK_OUTPUT_RATIO if name.endswith('_json') else MAX_PEAK_OUTPUT_RATIO
+        assert peak <= length * ratio + PEAK_ALLOWANCE_BYTES, \
+            f"{name} allocated {peak} bytes for {length} characters of output"
+
+    per_item_small = _results[(name, SIZES[-2])][0] / SIZES[-2]
+    per_item_large = _results[(name, SIZES[-1])][0] / SIZES[-1]
+    assert per_item_large <= per_item_small * MAX_PER_ITEM_GROWTH, \
+        f"{name} per-item time grew {per_item_large / per_item_small:.1f}x from {SIZES[-2]} to {SIZES[-1]} items"
+
+
+def test_recorded_payload_sizes(recorded):
+    """測試錄製的回應確實包含指定數量的歷程與議題"""
+    for size in SIZES:
+        assert len(recorded['issue'][size]['journals']) == size
+        assert len(recorded['issues'][size]) == size
+
+
+def test_get_issue_renders_every_note(recorded):
+    """測試議題格式化包含所有非空備註與附件"""
+    payload = recorded['issue'][1000]
+    output = format_issue(payload, 'https://redmine.example.com')
+
+    notes = [j for j in payload['journals'] if j['notes'].strip()]
+    assert f"Notes/History ({len(notes)}):" in output
+    assert f"\n#{len(notes)} - " in output
+    assert output.count("Download link: https://redmine.example.com/attachments/download/") == \
+        len(payload['attachments'])
+
+
+def test_json_output_is_smaller_than_tables(recorded):
+    """測試議題列表的 JSON 輸出比對齊表格精簡"""
+    issues = recorded['issues'][100]
+    text = FORMATTERS['list_project_issues'][1](issues)
+    compact = FORMATTERS['list_project_issues_json'][1](issues)
+
+    assert len(compact) < len(text)
@@ -0,0 +1,307 @@
+"""
+離線模擬 Redmine 與負載測試冒煙測試
+確認模擬伺服器可被真實客戶端使用，且每個 MCP 工具都有負載測試情境
+"""
+
+import pytest
+
+from tests.benchmarks.fake_redmine import FakeRedmineApp, FakeRedmineServer, generate_dataset
+from tests.benchmarks.load_test import SCENARIOS, percentile, redmine_environment, run_load_test
+
+
+@pytest.fixture
+def fake_redmine(tmp_path):
+    """啟動模擬伺服器並將全域客戶端指向它"""
+    dataset = generate_dataset(projects=3, users=5, issues=30, journals_per_issue=3, seed=7)
+    app = FakeRedmineApp(dataset)
+    with FakeRedmineServer(app) as server, redmine_environment(server.url, app.api_key, str(tmp_path)):
+        from redmine_mcp.redmine_client import get_client
+        yield dataset, app, get_client()
+
+
+def test_percentile():
+    """測試最近秩百分位數"""
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.95) == 0.0
+
+
+def test_fake_server_issues(fake_redmine):
+    """測試議題查詢、分頁與更新"""
+    dataset, app, client = fake_redmine
+
+    issue_id = next(iter(dataset.issues))
+    issue = client.get_issue_raw(issue_id, include=['journals'])
+    assert issue['id'] == issue_id
+    assert len(issue['journals']) == len(dataset.issues[issue_id]['journals'])
+
+    first_page = client.list_issues(status_id='o', limit=10, offset=0)
+    second_page = client.list_issues(status_id='o', limit=10, offset=10)
+    assert len(first_page) == 10
+    assert {i.id for i in first_page}.isdisjoint(i.id for i in second_page)
+
+    client.update_issue(issue_id, done_ratio=80)
+    assert dataset.issues[issue_id]['done_ratio'] == 80
+
+
+def test_fake_server_rejects_bad_key(fake_redmine):
+    """測試錯誤的 API 金鑰回應 401"""
+    dataset, app, client = fake_redmine
+    app.api_key = 'other_key'
+
+    with pytest.raises(Exception):
+        client.get_issue(next(iter(dataset.issues)))
+
+
+def test_client_retries_overloaded_server(fake_redmine):
+    """測試伺服器間歇回應 503 時，讀取請求退避重試後成功"""
+    from redmine_mcp.metrics import get_metrics
+
+    dataset, app, client = fake_redmine
+    app.error_rate = 0.4
+    get_metrics().reset()
+
+    for issue_id in list(dataset.issues)[:20]:
+        assert client.get_issue_raw(issue_id)['id'] == issue_id
+    assert sum(get_metrics().request_retries.values()) > 0
+
+
+def test_tools_serve_stale_data_when_redmine_is_down(fake_redmine):
+    """測試 Redmine 故障時工具回傳標示為過期的快取結果"""
+    import json
+    from redmine_mcp.server import get_my_issues
+
+    dataset, app, client = fake_redmine
+    fresh = get_my_issues(format="text")
+    app.error_rate = 1.0
+
+    stale = get_my_issues(format="text")
+    assert stale.startswith(fresh)
+    assert "Redmine is unreachable" in stale
+    data = json.loads(get_my_issues(format="json"))
+    assert data['stale'] is True and 'issues' in data
+
+
+def test_attachment_download_resume_and_revalidate(fake_redmine):
+    """測試附件串流下載、續傳、ETag 重新驗證與大小上限"""
+    import hashlib
+    import json
+    from pathlib import Path
+    from redmine_mcp.redmine_client import RedmineAPIError
+
+    dataset, app, client = fake_redmine
+    attachment = max((a for issue in dataset.issues.values() for a in issue['attachments']),
+                     key=lambda a: a['filesize'])
+
+    first = client.download_attachment(attachment['id'], chunk_size=4096)
+    content = Path(first['path']).read_bytes()
+    assert first['status'] == 'downloaded' and len(content) == attachment['filesize']
+    assert first['sha256'] == hashlib.sha256(content).hexdigest()
+
+    assert client.download_attachment(attachment['id'])['status'] == 'unchanged'
+
+    # 模擬中斷：只留下前半段的暫存檔
+    target = Path(first['path'])
+    partial = target.with_name(target.name + '.part')
+    partial.write_bytes(content[:len(content) // 2])
+    target.unlink()
+    resumed = client.download_attachment(attachment['id'])
+    assert resumed['status'] == 'resumed' and resumed['sha256'] == first['sha256']
+    assert json.loads((target.parent / '.download.json').read_text())['size'] == len(content)
+
+    with pytest.raises(RedmineAPIError, match="limit"):
+        client.download_attachment(attachment['id'], max_bytes=10)
+
+
+def test_upload_files_and_attach(fake_redmine, tmp_path):
+    """測試檔案串流上傳、並行上傳與附加到新建及既有議題"""
+    import hashlib
+
+    dataset, app, client = fake_redmine
+    bundle = tmp_path / 'bundle.txt'
+    bundle.write_bytes(b'log line\n' * 200_000)
+    notes = tmp_path / 'notes.txt'
+    notes.write_text('notes')
+
+    upload = client.upload_file(bundle, chunk_size=4096)
+    assert upload['size'] == bundle.stat().st_size and upload['content_type'] == 'text/plain'
+    issue_id = client.create_issue(project_id=dataset.projects[0]['id'], subject='Upload', uploads=[upload])
+    attachment = dataset.issues[issue_id]['attachments'][0]
+    assert attachment['filename'] == 'bundle.txt'
+    assert attachment['digest'] == hashlib.sha256(bundle.read_bytes()).hexdigest()
+
+    results = client.upload_files([notes, tmp_path / 'missing.log', bundle])
+    assert [('token' in r, r['path']) for r in results] == [
+        (True, str(notes)), (False, str(tmp_path / 'missing.log')), (True, str(bundle))]
+    client.update_issue(issue_id, uploads=[r for r in results if 'token' in r])
+    assert [a['filename'] for a in dataset.issues[issue_id]['attachments']] == ['bundle.txt', 'notes.txt', 'bundle.txt']
+
+
+def test_issue_graph_batches_each_level(fake_redmine):
+    """測試議題關聯圖逐層批次抓取：約 200 個節點的子任務樹只需少數請求"""
+    import copy
+
+    dataset, app, client = fake_redmine
+    template = dataset.issues[min(dataset.issues)]
+    root = max(dataset.issues) + 1
+    levels = [[root]]
+    next_id = root
+    for _ in range(3):
+        level = []
+        for parent in levels[-1]:
+            for _ in range(5):
+                next_id += 1
+                level.append(next_id)
+                issue = copy.deepcopy(template)
+                issue.update(id=next_id, parent={'id': parent}, relations=[])
+                dataset.issues[next_id] = issue
+        levels.append(level)
+    dataset.issues[root] = dict(copy.deepcopy(template), id=root, relations=[])
+    dataset.issues[root].pop('parent', None)
+    relation = {'id': 9999, 'issue_id': levels[3][0], 'issue_to_id': levels[3][-1], 'relation_type': 'blocks'}
+    dataset.issues[levels[3][0]]['relations'].append(relation)
+    dataset.issues[levels[3][-1]]['relations'].append(relation)
+
+    graph = client.get_issue_graph([root], max_depth=3, max_nodes=500)
+    assert len(graph['nodes']) == 156
+    assert [graph['depth'][level[0]] for level in levels] == [0, 1, 2, 3]
+    assert [levels[3][0], 'blocks', levels[3][-1]] in graph['edges']
+    assert sum(1 for edge in graph['edges'] if edge[1] == 'subtask') == 155
+    assert not graph['truncated']
+    # 根節點 1 次、每層子任務各 1 次（125 個子任務分 2 頁）
+    assert graph['requests'] <= 6
+
+    limited = client.get_issue_graph([root], max_depth=3, max_nodes=20)
+    assert len(limited['nodes']) == 20 and limited['truncated']
+
+
+def test_changes_since_pages_through_deltas(fake_redmine):
+    """測試變更摘要以游標逐批取得全部變更，之後只回傳新的變更"""
+    dataset, app, client = fake_redmine
+    since = min(issue['updated_on'] for issue in dataset.issues.values())
+
+    reported = []
+    cursor, seen, more = since, [], True
+    while more:
+        result = client.get_changes_since(cursor, seen=seen, limit=7)
+        reported += [issue['id'] for issue in result['issues']]
+        cursor, seen, more = result['cursor'], result['seen'], result['more']
+    assert sorted(reported) == sorted(dataset.issues)
+
+    issue_id = min(dataset.issues)
+    client.update_issue(issue_id, notes='Deployed to staging')
+    before = app.request_count
+    result = client.get_changes_since(cursor, seen=seen)
+    assert [issue['id'] for issue in result['issues']] == [issue_id]
+    assert [journal['notes'] for journal in result['issues'][0]['journals']] == ['Deployed to staging']
+    # 一次列出變更的議題，再只抓取該議題的歷程
+    assert app.request_count - before == 2
+
+    result = client.get_changes_since(result['cursor'], seen=result['seen'])
+    assert result['issues'] == [] and not result['more']
+
+
+def test_wait_for_change_probes_in_one_request(fake_redmine):
+    """測試等待變更時每次探測只送出一個批次請求，並在議題變更後立即返回"""
+    import threading
+
+    dataset, app, client = fake_redmine
+    watched = sorted(dataset.issues)[:50]
+    target = watched[-1]
+
+    quiet = client.wait_for_issue_change(watched, timeout=0.3, min_interval=0.05)
+    assert quiet['timed_out'] and quiet['changed'] == []
+    # 基準讀取 1 次，其後每次探測 1 次
+    assert 2 <= quiet['requests'] <= 6
+
+    # 更新時間以秒為單位，等到下一秒再更新才能與基準區分
+    timer = threading.Timer(1.1, client.update_issue, args=(target,), kwargs={'notes': 'Done'})
+    timer.start()
+    try:
+        result = client.wait_for_issue_change(watched, timeout=10, min_interval=0.05, max_interval=0.2)
+    finally:
+        timer.join()
+    assert [issue['id'] for issue in result['changed']] == [target]
+    assert not result['timed_out'] and result['elapsed'] < 5
+
+
+def test_export_issues_streams_every_page(tmp_path):
+    """測試匯出以預先抓取的分頁串流寫入 CSV，攤平巢狀欄位與自訂欄位"""
+    import csv
+
+    from redmine_mcp.export import main as export_main
+
+    dataset = generate_dataset(projects=3, users=5, issues=450, journals_per_issue=0, seed=11)
+    app = FakeRedmineApp(dataset)
+    app.latency = 0.01
+    with FakeRedmineServer(app) as server, redmine_environment(server.url, app.api_key, str(tmp_path)):
+        from redmine_mcp.redmine_client import get_client
+
+        path = tmp_path / 'issues.csv'
+        result = get_client().export_issues(path, prefetch=3)
+        before = app.request_count
+        assert export_main([str(tmp_path / 'open.csv'), '--status', 'o', '--columns', 'id,status']) == 0
+        assert app.request_count - before >= 1
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert result['rows'] == len(rows) == 450
+    assert [int(row['id']) for row in rows] == sorted(dataset.issues)
+    first = dataset.issues[int(rows[0]['id'])]
+    assert rows[0]['status'] == first['status']['name'] and rows[0]['project_id'] == str(first['project']['id'])
+    assert result['columns'][-2:] == ['cf.Severity', 'cf.Components']
+    assert {row['cf.Severity'] for row in rows} == {'Low', 'Medium', 'High'}
+    assert {row['cf.Components'] for row in rows} == {'', 'api', 'api, web'}
+    assert not (tmp_path / 'issues.csv.part').exists()
+
+    with open(tmp_path / 'open.csv', newline='', encoding='utf-8') as f:
+        assert next(csv.reader(f)) == ['id', 'status', 'cf.Severity', 'cf.Components']
+
+
+def test_flow_metrics_from_fake_server(tmp_path):
+    """測試流程指標讀取開啟與期間內關閉的議題，並由歷程取得第一次狀態變更"""
+    from datetime import datetime, timedelta
+
+    from redmine_mcp.analytics import flow_report, load_snapshot
+
+    dataset = generate_dataset(projects=2, users=5, issues=60, journals_per_issue=3, seed=5,
+                               start=datetime.utcnow() - timedelta(days=200))
+    app = FakeRedmineApp(dataset)
+    with FakeRedmineServer(app) as server, redmine_environment(server.url, app.api_key, str(tmp_path)):
+        from redmine_mcp.redmine_client import get_client
+
+        snapshot = load_snapshot(get_client(), since='2000-01-01', transitions=True)
+    report = flow_report(snapshot, weeks=104)
+
+    closed = [issue for issue in dataset.issues.values() if issue['status']['is_closed']]
+    assert report.closed == len(closed) and sum(report.throughput) == len(closed)
+    assert report.wip == len(dataset.issues) - len(closed) == sum(report.aging)
+    # 關閉的議題必定經過狀態變更，因此全部都有週期時間
+    assert report.transitions_read and report.cycle_time_issues == len(closed)
+    assert report.cycle_time['p50'] <= report.lead_time['p50']
+
+
+def test_every_tool_has_scenario():
+    """測試每個註冊的 MCP 工具都有負載測試情境"""
+    import asyncio
+    from redmine_mcp.server import mcp
+
+    registered = {tool.name for tool in asyncio.run(mcp.list_tools())}
+    assert registered - set(SCENARIOS) == set()
+
+
+def test_load_test_smoke():
+    """以小型資料集執行完整負載測試"""
+    report = run_load_test(concurrency=4, iterations=3, issues=30, projects=3, users=5, journals_per_issue=2)
+
+    assert not report.skipped
+    assert set(report.results) == set(SCENARIOS)
+    for name, result in report.results.items():
+        assert result.calls == 3, name
+        assert result.errors == [], name
+    assert report.redmine_requests > 0
+
+    text = report.format()
+    assert 'p95 ms' in text
+    assert 'get_issue' in text
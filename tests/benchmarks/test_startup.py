@@ -0,0 +1,103 @@
+"""
+伺服器啟動時間基準測試
+冷啟動變慢時測試失敗（預算可透過 REDMINE_MCP_STARTUP_BUDGET_MS 調整）
+"""
+
+import os
+import pytest
+
+from redmine_mcp.startup import measure_startup, format_startup_profile, _parse_importtime
+
+
+# 伺服器自身（不含 MCP 框架）匯入時間預算（毫秒）
+STARTUP_BUDGET_MS = float(os.getenv("REDMINE_MCP_STARTUP_BUDGET_MS", "300"))
+
+
+@pytest.fixture(scope="module")
+def startup_profile(tmp_path_factory):
+    """在全新的直譯器中量測伺服器冷啟動"""
+    cache_dir = tmp_path_factory.mktemp("startup") / "cache"
+    env = {
+        'REDMINE_DOMAIN': 'https://test.redmine.com',
+        'REDMINE_API_KEY': 'test_api_key',
+        'REDMINE_MCP_CACHE_DIR': str(cache_dir),
+    }
+    original = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        profile = measure_startup()
+    finally:
+        for key, value in original.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return profile, cache_dir
+
+
+def test_parse_importtime():
+    """測試解析 -X importtime 輸出"""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   child\n"
+        "import time:       200 |        300 | parent\n"
+    )
+    timings = _parse_importtime(output)
+    
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ('child', 100, 100, 1),
+        ('parent', 200, 300, 0),
+    ]
+
+
+def test_server_import_succeeds(startup_profile):
+    """測試伺服器可在全新直譯器中匯入"""
+    profile, _ = startup_profile
+    
+    assert profile.error is None
+    assert 'redmine_mcp.server' in format_startup_profile(profile)
+
+
+def test_heavy_modules_are_lazy(startup_profile):
+    """測試匯入伺服器時不載入 requests 也不建立快取目錄"""
+    profile, cache_dir = startup_profile
+    
+    assert not profile.imported('requests')
+    assert not cache_dir.exists()
+
+
+def test_cold_start_within_budget(startup_profile):
+    """測試伺服器自身匯入時間不超過預算"""
+    profile, _ = startup_profile
+    
+    assert profile.own_ms <= STARTUP_BUDGET_MS, format_startup_profile(profile)
+
+
+def test_server_import_reads_no_config(monkeypatch):
+    """測試匯入伺服器時不載入配置（未設定 Redmine 連線資訊也能匯入）"""
+    monkeypatch.delenv('REDMINE_DOMAIN', raising=False)
+    monkeypatch.delenv('REDMINE_API_KEY', raising=False)
+    
+    profile = measure_startup()
+    
+    assert profile.error is None
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["--profile-startup"]])
+def test_cli_options_before_config(monkeypatch, capsys, argv):
+    """測試 --help 與 --profile-startup 不需載入配置（未設定 Redmine 連線資訊也能執行）"""
+    from redmine_mcp import server, startup
+
+    def no_config():
+        raise AssertionError("configuration loaded")
+
+    monkeypatch.setattr(server, 'get_config', no_config)
+    monkeypatch.setattr(startup, 'profile_startup', lambda: "startup profile")
+    monkeypatch.setattr('sys.argv', ['redmine-mcp', *argv])
+    
+    try:
+        server.main()
+    except SystemExit as e:
+        assert e.code == 0
+    
+    assert capsys.readouterr().out.strip()
@@ -0,0 +1,170 @@
+"""
+驗證器吞吐量基準測試
+以產生的議題資料（含無效資料）比較編譯後的驗證器與原本逐欄位檢查的實作，
+記錄每秒驗證筆數與相對於原本實作的倍數；結果不一致時測試失敗
+（倍數只列入報告，不作為判定條件，以免在負載較高的 CI 機器上因量測誤差而失敗）
+"""
+
+import gc
+import random
+import time
+
+import pytest
+
+from redmine_mcp.validators import RedmineValidator, RedmineValidationError, validate_and_clean_data, validate_many
+
+
+RECORDS = 20000
+
+_results = {}
+
+
+def reference_validate_issue_data(data, is_update=False):
+    """原本的議題驗證實作（每次呼叫依序檢查各欄位並重建欄位清單），作為比較基準"""
+    errors = []
+    if not is_update:
+        if 'project_id' not in data:
+            errors.append("Project ID (project_id) is required")
+        if 'subject' not in data:
+            errors.append("Issue subject (subject) is required")
+        elif not isinstance(data.get('subject'), str) or not data.get('subject', '').strip():
+            errors.append("Issue subject (subject) is required")
+    if 'subject' in data:
+        subject = data['subject']
+        if not isinstance(subject, str):
+            errors.append("Issue subject must be a string")
+        elif len(subject.strip()) == 0:
+            errors.append("Issue subject cannot be empty")
+        elif len(subject) > RedmineValidator.MAX_SUBJECT_LENGTH:
+            errors.append(f"Issue subject length cannot exceed {RedmineValidator.MAX_SUBJECT_LENGTH} characters")
+    if 'description' in data:
+        description = data['description']
+        if description is not None and not isinstance(description, str):
+            errors.append("Issue description must be a string")
+        elif description and len(description) > RedmineValidator.MAX_DESCRIPTION_LENGTH:
+            errors.append(f"Issue description length cannot exceed {RedmineValidator.MAX_DESCRIPTION_LENGTH} characters")
+    id_fields = ['project_id', 'tracker_id', 'status_id', 'priority_id', 'assigned_to_id', 'parent_issue_id']
+    for field in id_fields:
+        if field in data:
+            value = data[field]
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                errors.append(f"{field} must be a positive integer")
+    if 'done_ratio' in data:
+        done_ratio = data['done_ratio']
+        if not isinstance(done_ratio, int) or done_ratio < 0 or done_ratio > 100:
+            errors.append("Done ratio (done_ratio) must be an integer between 0 and 100")
+    if 'custom_fields' in data:
+        custom_fields = data['custom_fields']
+        if custom_fields is not None:
+            if not isinstance(custom_fields, list):
+                errors.append("Custom fields (custom_fields) must be a list")
+            else:
+                for i, field in enumerate(custom_fields):
+                    if not isinstance(field, dict):
+                        errors.append(f"Custom field [{i}] must be a dict")
+                    elif 'id' not in field:
+                        errors.append(f"Custom field [{i}] is missing required id field")
+    return errors
+
+
+def reference_validate_and_clean(data):
+    """原本的 validate_and_clean_data：驗證、建立結果物件，再逐一複製欄位"""
+    errors = reference_validate_issue_data(data)
+    if errors:
+        raise RedmineValidationError(f"Data validation failed: {'; '.join(errors)}", errors=errors)
+    cleaned_data = {}
+    for key, value in data.items():
+        if value is not None and value != "":
+            cleaned_data[key] = value
+    return cleaned_data
+
+
+@pytest.fixture(scope="module")
+def records():
+    """產生議題建立資料，約一成含有錯誤"""
+    rng = random.Random(7)
+    bad_values = {'subject': ['', 123, 'x' * 300], 'tracker_id': [0, 'two'], 'done_ratio': [150, None],
+                  'custom_fields': ['x', [{'value': 1}]]}
+    payloads = []
+    for i in range(RECORDS):
+        payload = {
+            'project_id': rng.randint(1, 20), 'subject': f'Issue {i}', 'description': 'Steps to reproduce ' * 5,
+            'tracker_id': rng.randint(1, 3), 'status_id': None, 'priority_id': rng.randint(1, 5),
+            'assigned_to_id': rng.choice([None, rng.randint(1, 50)]), 'parent_issue_id': None,
+            'done_ratio': rng.choice([0, 50, 100]), 'custom_fields': [{'id': 1, 'value': 'a'}],
+        }
+        if rng.random() < 0.1:
+            field = rng.choice(sorted(bad_values))
+            payload[field] = rng.choice(bad_values[field])
+        payloads.append(payload)
+    return payloads
+
+
+def throughput(runs, records, repeat=7):
+    """回傳各實作的每秒驗證筆數（取最快的一次）；各實作輪流執行，
+    並如 timeit 般暫停垃圾回收，使量測不受先前測試留下的物件影響"""
+    best = {name: float('inf') for name in runs}
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, run in runs.items():
+                start = time.perf_counter()
+                run(records)
+                best[name] = min(best[name], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return {name: len(records) / seconds for name, seconds in best.items()}
+
+
+def run_reference(records):
+    failed = {}
+    for index, record in enumerate(records):
+        try:
+            reference_validate_and_clean(record)
+        except RedmineValidationError as e:
+            failed[index] = e.errors
+    return failed
+
+
+def run_single(records):
+    failed = {}
+    for index, record in enumerate(records):
+        try:
+            validate_and_clean_data(record, "issue")
+        except RedmineValidationError as e:
+            failed[index] = e.errors
+    return failed
+
+
+def run_batch(records):
+    return validate_many(records, "issue")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report():
+    """輸出基準報告（使用 -s 顯示）"""
+    yield
+    if not _results:
+        return
+    reference = next(iter(_results.values()))
+    print(f"\n{'Validator':<28} {'Validations/s':>14} {'vs reference':>13}")
+    print(f"{'-'*28} {'-'*14} {'-'*13}")
+    for name, rate in _results.items():
+        print(f"{name:<28} {rate:>14,.0f} {rate / reference:>12.2f}x")
+
+
+def test_compiled_validators_match_reference(records):
+    """測試編譯後的驗證器與原本實作回報相同的錯誤"""
+    expected = run_reference(records)
+    assert expected
+    assert run_single(records) == expected
+    assert run_batch(records) == expected
+
+
+def test_validation_throughput(records):
+    """量測原本實作、單筆與批次驗證的每秒驗證筆數（倍數見報告，通常批次約 2 倍）"""
+    _results.update(throughput({'reference (per record)': run_reference, 'validate_and_clean_data': run_single,
+                                'validate_many': run_batch}, records))
+
+    assert all(rate > 0 for rate in _results.values())
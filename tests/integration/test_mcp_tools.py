@@ -2,11 +2,15 @@
 MCP Tool Tests
 """
 
+import asyncio
+import json
 import os
+import time
 import pytest
 from unittest.mock import patch, Mock
-from redmine_mcp.server import get_issue, update_issue_status, update_issue_content, list_project_issues, health_check, get_trackers, get_priorities, get_time_entry_activities, get_document_categories
-from redmine_mcp.redmine_client import RedmineIssue, RedmineProject
+from redmine_mcp.server import get_issue, update_issue_status, update_issue_content, list_project_issues, health_check, get_trackers, get_priorities, get_time_entry_activities, get_document_categories, issue_counts, log_time_entries, time_report, download_attachment, attach_files, issue_graph, changes_since, wait_for_change, flow_metrics, search_issues, metrics
+from redmine_mcp.project_index import ProjectIndex
+from redmine_mcp.redmine_client import RedmineClient, RedmineIssue, RedmineProject, RedmineAPIError
 
 
 class TestMCPTools:
@@ -26,6 +30,7 @@ class TestMCPTools:
         """Test health check success"""
         mock_client = Mock()
         mock_client.test_connection.return_value = True
+        mock_client.breakers = {'read': Mock(state='closed'), 'write': Mock(state='closed')}
         mock_get_client.return_value = mock_client
         
         with patch.dict(os.environ, {
@@ -42,6 +47,7 @@ class TestMCPTools:
         """Test health check connection failed"""
         mock_client = Mock()
         mock_client.test_connection.return_value = False
+        mock_client.breakers = {'read': Mock(state='open'), 'write': Mock(state='closed')}
         mock_get_client.return_value = mock_client
         
         with patch.dict(os.environ, {
@@ -51,6 +57,7 @@ class TestMCPTools:
             result = health_check()
         
         assert "✗ Unable to connect to Redmine server" in result
+        assert "(read circuit open)" in result
     
     @patch('redmine_mcp.server.get_client')
     def test_get_issue_success(self, mock_get_client):
@@ -171,7 +178,456 @@ class TestMCPTools:
         assert "This is the first note" in result
         assert "Jane Smith" in result
         assert "This is the second note" in result
-    
+
+    @patch('redmine_mcp.server.get_client')
+    def test_get_issue_requests_only_selected_sections(self, mock_get_client):
+        """Test get issue only requests the include sections it renders"""
+        mock_client = Mock()
+        mock_client.get_issue_raw.return_value = {
+            'id': 123, 'subject': 'Test Issue', 'status': {'name': 'New'},
+            'priority': {'name': 'Normal'}, 'project': {'name': 'Test Project', 'id': 1},
+            'tracker': {'name': 'Bug'}, 'author': {'name': 'Test User'},
+            'watchers': [{'id': 1, 'name': 'Watcher One'}]
+        }
+        mock_client.config.redmine_domain = 'https://test.redmine.com'
+        mock_get_client.return_value = mock_client
+
+        result = get_issue(123, include=['watchers'])
+
+        mock_client.get_issue_raw.assert_called_once_with(123, include=['watchers'])
+        assert "Watchers (1):\n- Watcher One" in result
+        assert get_issue(123, include=['bogus']).startswith("Error: Unknown include section(s): bogus")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_get_issue_paginates_notes(self, mock_get_client):
+        """Test get issue note window and continuation offset"""
+        mock_client = Mock()
+        mock_client.get_issue_raw.return_value = {
+            'id': 123, 'subject': 'Test Issue', 'status': {'name': 'New'},
+            'priority': {'name': 'Normal'}, 'project': {'name': 'Test Project', 'id': 1},
+            'tracker': {'name': 'Bug'}, 'author': {'name': 'Test User'},
+            'journals': [
+                {'user': {'name': 'User'}, 'notes': f'Note {i}', 'created_on': f'2024-01-{i:02d}T10:00:00Z'}
+                for i in range(1, 11)
+            ]
+        }
+        mock_client.config.redmine_domain = 'https://test.redmine.com'
+        mock_get_client.return_value = mock_client
+
+        result = get_issue(123, journal_offset=2, journal_limit=3)
+        assert "Notes/History (3-5 of 10):" in result
+        assert "#3 - User (2024-01-03T10:00:00Z):\nNote 3" in result
+        assert "Note 6" not in result
+        assert "Continue with journal_offset=5" in result
+
+        result = get_issue(123, since='2024-01-09')
+        assert "Notes/History since 2024-01-09T00:00:00Z (2):" in result
+        assert "#9 - User" in result and "Note 8" not in result
+
+        assert get_issue(123, since='last week').startswith("Error:")
+        assert get_issue(123, journal_offset=-1).startswith("Error:")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_get_issue_json_output(self, mock_get_client):
+        """Test get issue structured output with note paging"""
+        mock_client = Mock()
+        mock_client.get_issue_raw.return_value = {
+            'id': 123, 'subject': 'Test Issue', 'status': {'name': 'New'},
+            'priority': {'name': 'Normal'}, 'project': {'name': 'Test Project', 'id': 1},
+            'tracker': {'name': 'Bug'}, 'author': {'name': 'Test User'}, 'description': '',
+            'journals': [
+                {'user': {'name': 'User'}, 'notes': f'Note {i}', 'created_on': f'2024-01-{i:02d}T10:00:00Z'}
+                for i in range(1, 6)
+            ]
+        }
+        mock_client.config.redmine_domain = 'https://test.redmine.com'
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(get_issue(123, format="json", journal_limit=2))
+        assert data['id'] == 123 and data['status'] == 'New' and data['project_id'] == 1
+        assert 'description' not in data and 'assigned_to' not in data
+        assert [row[0] for row in data['notes']['rows']] == [1, 2]
+        assert data['notes_total'] == 5 and data['next_journal_offset'] == 2
+
+        data = json.loads(get_issue(123, format="json", fields=["status"]))
+        assert data == {'id': 123, 'status': 'New'}
+
+    @patch('redmine_mcp.server.get_client')
+    def test_list_project_issues_json_output(self, mock_get_client):
+        """Test list project issues structured output with field projection"""
+        mock_client = Mock()
+        mock_client.resolve_project.return_value = RedmineProject(
+            id=1, name='Test Project', identifier='test-project', description='', status=1
+        )
+        mock_client.get_project_index.return_value.subtree.return_value = [1]
+        mock_client.list_issues.return_value = [
+            RedmineIssue(id=101, subject='First Issue', description='Desc1', status={'name': 'New'},
+                         priority={'name': 'Normal'}, project={'name': 'Test Project', 'id': 1},
+                         tracker={'name': 'Bug'}, author={'name': 'User1'}, updated_on='2024-01-01')
+        ]
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(list_project_issues("test-project", "open", 20, format="json"))
+        mock_client.resolve_project.assert_called_with("test-project")
+        assert data['project_id'] == 1 and data['project'] == 'Test Project'
+        assert data['issues'] == {'columns': ['id', 'subject', 'status', 'assigned_to', 'updated_on'],
+                                  'rows': [[101, 'First Issue', 'New', None, '2024-01-01']]}
+
+        data = json.loads(list_project_issues(1, "open", 20, format="json", fields=["tracker"]))
+        assert data['issues'] == {'columns': ['id', 'tracker'], 'rows': [[101, 'Bug']]}
+
+        mock_client.list_issues.return_value = []
+        assert json.loads(list_project_issues(1, format="json"))['issues']['rows'] == []
+
+    @patch('redmine_mcp.server.get_client')
+    def test_search_issues_json_fields_without_subject(self, mock_get_client):
+        """Test JSON search still matches on subject when the requested fields leave it out"""
+        issues = [{'id': 1, 'subject': 'Login fails', 'description': '', 'status': {'name': 'New'}},
+                  {'id': 2, 'subject': 'Other', 'description': 'unrelated', 'status': {'name': 'New'}}]
+        mock_client = Mock()
+        mock_client.iter_issues.side_effect = lambda fields=None, **params: (
+            RedmineClient._parse_issue(issue, fields) for issue in issues)
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(search_issues("login", format="json", fields=["status"]))
+
+        assert data['issues'] == {'columns': ['id', 'status'], 'rows': [[1, 'New']]}
+
+    @patch('redmine_mcp.server.get_client')
+    def test_issue_counts_matrix(self, mock_get_client):
+        """Test issue counts fan out one count query per cell and omit empty rows"""
+        mock_client = Mock()
+        mock_client.get_available_trackers.return_value = {'Bug': 1, 'Feature': 2, 'Support': 3}
+        mock_client.get_available_statuses.return_value = {'New': 1, 'Closed': 5}
+        # total, then (Bug, New), (Bug, Closed), (Feature, New), ...
+        mock_client.count_issues_many.return_value = [9, 4, 1, 0, 0, 2, 2]
+        mock_client.resolve_project.return_value.id = 3
+        mock_get_client.return_value = mock_client
+
+        result = issue_counts(rows="tracker", columns="status", project_id="backend")
+
+        filter_sets = mock_client.count_issues_many.call_args[0][0]
+        assert filter_sets[0] == {'status_id': '*', 'project_id': 3}
+        assert filter_sets[1] == {'status_id': 1, 'project_id': 3, 'tracker_id': 1}
+        assert len(filter_sets) == 7
+        assert "Issue counts by tracker x status (all statuses, project 3)\nTotal: 9" in result
+        assert "Bug" in result and "Support" in result and "Feature" not in result
+
+        data = json.loads(issue_counts(rows="tracker", columns="status", format="json"))
+        assert data['columns'] == ['tracker', 'New', 'Closed']
+        assert data['rows'] == [['Bug', 4, 1], ['Support', 2, 2]]
+
+        assert issue_counts(rows="tracker", row_values=["Epic"]).startswith("Error: Unknown tracker value(s): Epic")
+        assert issue_counts(rows="status", columns="status").startswith("Error:")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_issue_counts_project_dimension_within_project(self, mock_get_client):
+        """Test the project dimension is limited to the project_id subtree"""
+        projects = [RedmineProject(id=1, name='Platform', identifier='platform', description='', status=1),
+                    RedmineProject(id=2, name='Web', identifier='web', description='', status=1, parent_id=1),
+                    RedmineProject(id=5, name='Marketing', identifier='marketing', description='', status=1)]
+        mock_client = Mock()
+        mock_client.get_project_index.return_value = ProjectIndex(projects)
+        mock_client.resolve_project.return_value = projects[0]
+        mock_client.count_issues_many.side_effect = lambda filter_sets: [1] * len(filter_sets)
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(issue_counts(rows="project", project_id="platform", format="json"))
+
+        filter_sets = mock_client.count_issues_many.call_args[0][0]
+        assert [cell['project_id'] for cell in filter_sets] == [1, 1, 2]
+        assert data['rows'] == [['Platform', 1], ['Web', 1]]
+
+    @patch('redmine_mcp.server.get_client')
+    def test_issue_counts_project_rows_exclude_subprojects(self, mock_get_client):
+        """Test a parent project's row does not also count its subprojects' issues"""
+        projects = [RedmineProject(id=1, name='Platform', identifier='platform', description='', status=1),
+                    RedmineProject(id=2, name='Web', identifier='web', description='', status=1, parent_id=1)]
+        own_issues = {1: 2, 2: 3}
+        subtree = {1: [1, 2], 2: [2]}
+
+        def count(filters):
+            # Like Redmine, project_id includes subprojects unless subproject_id="!*"
+            if 'project_id' not in filters:
+                return sum(own_issues.values())
+            scope = [filters['project_id']] if filters.get('subproject_id') == '!*' else subtree[filters['project_id']]
+            return sum(own_issues[project] for project in scope)
+
+        mock_client = Mock()
+        mock_client.get_project_index.return_value = ProjectIndex(projects)
+        mock_client.count_issues_many.side_effect = lambda filter_sets: [count(cell) for cell in filter_sets]
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(issue_counts(rows="project", format="json"))
+        filter_sets = mock_client.count_issues_many.call_args[0][0]
+        assert 'subproject_id' not in filter_sets[0]
+        assert all(cell['subproject_id'] == '!*' for cell in filter_sets[1:])
+        assert data['total'] == 5
+        assert data['rows'] == [['Platform', 2], ['Web', 3]]
+        assert sum(row[1] for row in data['rows']) == data['total']
+
+    @patch('redmine_mcp.server.get_client')
+    def test_log_time_entries_per_row_results(self, mock_get_client):
+        """Test bulk time logging resolves activity names and reports each row"""
+        mock_client = Mock()
+        mock_client.find_time_entry_activity_id_by_name.side_effect = lambda name: {'Development': 9}.get(name)
+        mock_client.bulk_create_time_entries.side_effect = lambda rows: [
+            {'row': i, 'id': 100 + i} if row['hours'] > 0 else {'row': i, 'error': "Hours must be greater than 0"}
+            for i, row in enumerate(rows)
+        ]
+        mock_get_client.return_value = mock_client
+
+        result = log_time_entries([
+            {'issue_id': 1, 'hours': 1.5, 'activity_name': 'Development'},
+            {'issue_id': 2, 'hours': 1, 'activity_name': 'Meetings'},
+            {'issue_id': 3, 'hours': 0, 'activity_id': 9},
+        ])
+
+        submitted = mock_client.bulk_create_time_entries.call_args[0][0]
+        assert submitted == [{'issue_id': 1, 'hours': 1.5, 'activity_id': 9}, {'issue_id': 3, 'hours': 0, 'activity_id': 9}]
+        assert result.startswith("Logged 1 of 3 time entries")
+        assert "Row 1: #1 1.5h -> time entry 100" in result
+        assert 'Row 2: #2 1h -> failed: Time tracking activity name not found: "Meetings"' in result
+        assert "Row 3: #3 0h -> failed: Hours must be greater than 0" in result
+
+        data = json.loads(log_time_entries([{'issue_id': 1, 'hours': 2, 'activity_id': 9}], format="json"))
+        assert data == {'created': 1, 'failed': 0, 'columns': ['row', 'id', 'error'], 'rows': [[0, 100, None]]}
+
+    @patch('redmine_mcp.server.get_client')
+    def test_time_report_groups_hours(self, mock_get_client):
+        """Test time report streams entries and sums hours per group"""
+        mock_client = Mock()
+        mock_client.resolve_project.return_value.id = 3
+        mock_client.iter_time_entries.side_effect = lambda **filters: iter([
+            {'user': {'id': 1, 'name': 'Alice'}, 'activity': {'id': 9, 'name': 'Development'}, 'hours': 2.0,
+             'spent_on': '2024-05-02'},
+            {'user': {'id': 2, 'name': 'Bob'}, 'activity': {'id': 9, 'name': 'Development'}, 'hours': 3.5,
+             'spent_on': '2024-05-03'},
+            {'user': {'id': 1, 'name': 'Alice'}, 'activity': {'id': 10, 'name': 'QA'}, 'hours': 0.5,
+             'spent_on': '2024-05-03'},
+        ])
+        mock_get_client.return_value = mock_client
+
+        result = time_report(project_id="backend", from_date="2024-05-01")
+
+        assert mock_client.iter_time_entries.call_args.kwargs['project_id'] == 3
+        assert "Time report by user (project_id 3, from 2024-05-01)\nTotal: 6.00 hours in 3 entries" in result
+        assert result.index("Bob") < result.index("Alice")
+
+        data = json.loads(time_report(group_by=["activity"], format="json"))
+        assert data['total_hours'] == 6.0
+        assert data['rows'] == [['Development', 5.5, 2], ['QA', 0.5, 1]]
+        assert time_report(group_by=["month"]).startswith("Error: Unknown group(s): month")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_download_attachment(self, mock_get_client):
+        """Test attachment download reports the spooled file"""
+        mock_client = Mock()
+        mock_client.download_attachment.return_value = {
+            'id': 7, 'filename': 'trace.log', 'content_type': 'text/plain', 'path': '/spool/7/trace.log',
+            'size': 2048, 'sha256': 'ab12', 'status': 'unchanged',
+        }
+        mock_get_client.return_value = mock_client
+
+        result = download_attachment(7)
+        assert "Attachment saved: trace.log" in result
+        assert "- Path: /spool/7/trace.log" in result
+        assert "local copy reused" in result
+        assert json.loads(download_attachment(7, format="json"))['sha256'] == 'ab12'
+
+        mock_client.download_attachment.side_effect = RedmineAPIError("Attachment 7 is 5000 bytes, over the limit")
+        assert download_attachment(7).startswith("Failed to download attachment: Attachment 7 is 5000 bytes")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_attach_files(self, mock_get_client):
+        """Test uploaded files are attached in one update and failed uploads are reported"""
+        mock_client = Mock()
+        uploaded = {'path': '/logs/a.log', 'token': '1.x', 'filename': 'a.log', 'content_type': 'text/plain',
+                    'description': None, 'size': 2048}
+        mock_client.upload_files.return_value = [uploaded, {'path': '/logs/b.log', 'error': 'File not found: /logs/b.log'}]
+        mock_get_client.return_value = mock_client
+
+        result = attach_files(12, ['/logs/a.log', '/logs/b.log'], notes="Logs attached")
+        assert result.startswith("Attached 1 of 2 files to issue #12")
+        assert "- a.log (2048 bytes)" in result
+        assert "- /logs/b.log -> failed: File not found" in result
+        mock_client.update_issue.assert_called_once_with(12, uploads=[uploaded], notes="Logs attached")
+
+        data = json.loads(attach_files(12, ['/logs/a.log', '/logs/b.log'], format="json"))
+        assert data['attached'] == 1 and data['failed'] == 1
+        assert attach_files(12, []) == "Error: No files given"
+
+    @patch('redmine_mcp.server.get_client')
+    def test_issue_graph(self, mock_get_client):
+        """Test the issue graph lists each issue with its outgoing links"""
+        mock_client = Mock()
+        mock_client.get_issue_graph.return_value = {
+            'nodes': {
+                12: {'id': 12, 'subject': 'Release', 'tracker': {'name': 'Feature'}, 'status': {'name': 'New'}},
+                15: {'id': 15, 'subject': 'Migrate', 'tracker': {'name': 'Task'}, 'status': {'name': 'Closed'}},
+            },
+            'depth': {12: 0, 15: 1}, 'edges': [[12, 'blocks', 15]], 'truncated': True, 'requests': 2,
+        }
+        mock_get_client.return_value = mock_client
+
+        result = issue_graph([12], max_depth=1, relation_types=['blocks'])
+        assert result.startswith("Issue graph from #12 (2 issues, depth 1, 2 requests)")
+        assert "#12 [Feature] Release (New)\n  -> blocks #15" in result
+        assert "  #15 [Task] Migrate (Closed)" in result
+        assert "Graph truncated" in result
+        mock_client.get_issue_graph.assert_called_once_with([12], max_depth=1, max_nodes=200,
+                                                            relation_types=['blocks'], subtasks=True)
+
+        data = json.loads(issue_graph([12], format="json"))
+        assert data['roots'] == [12] and data['truncated'] is True
+        assert data['rows'][1] == [15, 'Migrate', 'Task', 'Closed', 1]
+        assert data['edges'] == [[12, 'blocks', 15]]
+        assert issue_graph([12], relation_types=['parent']).startswith("Error: Unsupported relation type(s): parent")
+        assert issue_graph([12], max_depth=0).startswith("Error: max_depth must be between")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_changes_since_keeps_session_cursor(self, mock_get_client):
+        """Test changes_since continues from the session cursor on the next call"""
+        mock_client = Mock()
+        issue = {'id': 12, 'subject': 'Login fails', 'tracker': {'name': 'Bug'}, 'status': {'name': 'In Progress'},
+                 'created_on': '2024-04-01T08:00:00Z', 'updated_on': '2024-05-02T08:00:00Z',
+                 'journals': [{'user': {'name': 'Alice'}, 'created_on': '2024-05-02T08:00:00Z', 'notes': 'Fixing now',
+                               'details': [{'property': 'attr', 'name': 'status_id', 'old_value': '1', 'new_value': '2'}]}]}
+        mock_client.get_changes_since.return_value = {'issues': [issue], 'cursor': '2024-05-02T08:00:00Z',
+                                                      'seen': [12], 'more': False}
+        mock_get_client.return_value = mock_client
+
+        result = changes_since(since="2024-05-01", session="integration")
+        assert result.startswith("Changes since 2024-05-01T00:00:00Z: 1 issues (cursor 2024-05-02T08:00:00Z)")
+        assert "#12 [Bug] Login fails (In Progress), updated 2024-05-02T08:00:00Z" in result
+        assert '2024-05-02T08:00:00Z Alice: status_id 1 -> 2; note: "Fixing now"' in result
+
+        data = json.loads(changes_since(session="integration", format="json"))
+        mock_client.get_changes_since.assert_called_with('2024-05-02T08:00:00Z', seen=(12,), project_id=None,
+                                                         limit=50)
+        assert data['rows'] == [[12, 'Login fails', 'Bug', 'In Progress', '2024-05-02T08:00:00Z', False]]
+        assert data['journals'] == [[12, 'Alice', '2024-05-02T08:00:00Z', 'Fixing now', [['status_id', '1', '2']]]]
+        assert changes_since(since="yesterday").startswith("Error: since format")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_wait_for_change(self, mock_get_client):
+        """Test wait_for_change reports changed issues or a timeout"""
+        mock_client = Mock()
+        mock_client.wait_for_issue_change.return_value = {
+            'changed': [{'id': 12, 'subject': 'Deploy', 'status': {'name': 'Resolved'},
+                         'updated_on': '2024-05-02T08:00:00Z'}],
+            'missing': [99], 'timed_out': False, 'requests': 4, 'elapsed': 7.25,
+        }
+        mock_get_client.return_value = mock_client
+
+        result = asyncio.run(wait_for_change([12, 13, 99], timeout=30, since="2024-05-01T10:00:00+02:00"))
+        assert result.startswith("1 of 3 watched issues changed after 7.2s (4 requests)")
+        assert "#12 Deploy: Resolved, updated 2024-05-02T08:00:00Z" in result
+        assert "Not found: #99" in result
+        mock_client.wait_for_issue_change.assert_called_once_with([12, 13, 99], timeout=30,
+                                                                  since='2024-05-01T08:00:00Z')
+
+        mock_client.wait_for_issue_change.return_value = {'changed': [], 'missing': [], 'timed_out': True,
+                                                          'requests': 6, 'elapsed': 30.0}
+        assert asyncio.run(wait_for_change([12], timeout=30)) == "No changes to the 1 watched issues within 30s (6 requests)"
+        data = json.loads(asyncio.run(wait_for_change([12], timeout=30, format="json")))
+        assert data['timed_out'] is True and data['rows'] == []
+        assert asyncio.run(wait_for_change([12], timeout=51)).startswith("Error: timeout must be between")
+
+    @patch('redmine_mcp.server.get_client')
+    def test_wait_for_change_runs_off_the_event_loop(self, mock_get_client):
+        """Test the event loop keeps running other work while wait_for_change waits"""
+        def slow_wait(issue_ids, timeout, since):
+            time.sleep(0.3)
+            return {'changed': [], 'missing': [], 'timed_out': True, 'requests': 2, 'elapsed': 0.3}
+        mock_client = Mock()
+        mock_client.wait_for_issue_change.side_effect = slow_wait
+        mock_get_client.return_value = mock_client
+
+        async def main():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            result = await wait_for_change([12], timeout=1)
+            ticker.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(main())
+        assert result.startswith("No changes to the 1 watched issues")
+        assert ticks >= 10
+
+    @patch('redmine_mcp.server.get_client')
+    def test_flow_metrics(self, mock_get_client):
+        """Test flow metrics from open and recently closed issues"""
+        from datetime import datetime, timedelta, timezone
+
+        now = datetime.now(timezone.utc)
+        stamp = lambda days: (now - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        pages = {'o': [[{'id': 1, 'created_on': stamp(2)}]],
+                 'c': [[{'id': 2, 'created_on': stamp(10), 'closed_on': stamp(0)}]]}
+        mock_client = Mock()
+        mock_client.iter_issue_pages.side_effect = lambda status_id, **filters: iter(pages[status_id])
+        mock_get_client.return_value = mock_client
+
+        result = asyncio.run(flow_metrics(weeks=4))
+        assert result.startswith("Flow metrics for all projects, last 4 weeks")
+        assert "Closed: 1 issues" in result
+        assert "Lead time (created -> closed): p50 10.0d, p85 10.0d, p95 10.0d" in result
+        assert "Cycle time: not computed" in result
+        assert "Work in progress: 1 open issues, age since created:" in result
+        mock_client.get_issue_raw.assert_not_called()
+        assert 'closed_on' in mock_client.iter_issue_pages.call_args_list[1][1]
+
+        data = json.loads(asyncio.run(flow_metrics(weeks=4, format="json")))
+        assert data['closed'] == 1 and data['wip'] == 1 and data['cycle_time_days'] is None
+        assert [row[1] for row in data['throughput']['rows']] == [0, 0, 0, 1]
+        assert data['aging']['rows'][1] == ['1-3d', 1] and 'note' not in data
+        assert asyncio.run(flow_metrics(weeks=0)).startswith("Error: weeks must be between")
+
+        # Above the history limit cycle time is skipped with a note rather than silently
+        with patch('redmine_mcp.analytics.MAX_TRANSITION_ISSUES', 1):
+            result = asyncio.run(flow_metrics(weeks=4, transitions=True))
+            assert "Cycle time: skipped, 2 issues exceed the status history limit" in result
+            data = json.loads(asyncio.run(flow_metrics(weeks=4, transitions=True, format="json")))
+            assert data['note'] == "cycle time skipped: 2 issues exceed the 1-issue status history limit"
+            assert data['cycle_time_days'] is None
+        mock_client.get_issue_raw.assert_not_called()
+
+        mock_client.get_issue_raw.return_value = {'journals': []}
+        result = asyncio.run(flow_metrics(weeks=4, transitions=True))
+        assert "Work in progress: 1 open issues, age since work started:" in result
+
+    @patch('redmine_mcp.server.get_client')
+    def test_json_output_wraps_errors(self, mock_get_client):
+        """Test errors are returned as JSON objects in JSON mode"""
+        mock_client = Mock()
+        mock_client.get_issue_raw.side_effect = Exception("boom")
+        mock_get_client.return_value = mock_client
+
+        data = json.loads(get_issue(123, format="json"))
+        assert data['error'].startswith("System error:")
+        assert get_issue(123, format="xml").startswith("Error: format must be one of")
+
+    def test_metrics_follows_server_format(self):
+        """Test metrics uses the server's default format and counts tools that return errors"""
+        from redmine_mcp.metrics import get_metrics
+
+        get_metrics().reset()
+        with patch('redmine_mcp.server.get_client', side_effect=Exception("boom")):
+            get_issue(123)
+        with patch('redmine_mcp.server.get_config') as mock_get_config:
+            mock_get_config.return_value.output_format = 'json'
+            data = json.loads(metrics())
+        assert data['tools']['get_issue']['errors'] == 1
+        assert metrics(format="prometheus").startswith("#")
+        assert metrics(format="xml").startswith("Error: format must be one of: text, json, prometheus")
+
     @patch('redmine_mcp.server.get_client')
     def test_get_trackers_success(self, mock_get_client):
         """Test get tracker list success"""
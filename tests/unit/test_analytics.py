@@ -0,0 +1,77 @@
+"""
+流程指標分析模組測試
+"""
+
+import math
+from datetime import datetime, timezone
+
+import pytest
+from redmine_mcp import analytics
+from redmine_mcp.analytics import FlowSnapshot, first_transition, flow_report, histogram, percentiles, window_start
+
+
+NOW = datetime(2024, 5, 15, 12, 0, tzinfo=timezone.utc)  # 星期三
+
+
+def issue(issue_id, created_on, closed_on=None):
+    return {'id': issue_id, 'created_on': created_on, 'closed_on': closed_on}
+
+
+def snapshot():
+    """兩個開啟議題（一個已開始處理）與三個已關閉議題（一個在統計期間之前關閉）"""
+    open_issues = [issue(1, '2024-05-14T12:00:00Z'), issue(2, '2024-04-01T00:00:00Z')]
+    closed_issues = [
+        issue(3, '2024-05-01T00:00:00Z', '2024-05-03T00:00:00Z'),
+        issue(4, '2024-05-01T00:00:00Z', '2024-05-14T00:00:00Z'),
+        issue(5, '2024-01-01T00:00:00Z', '2024-02-01T00:00:00Z'),
+    ]
+    started = {2: analytics.epoch('2024-05-10T12:00:00Z'), 3: analytics.epoch('2024-05-02T00:00:00Z'),
+               1: math.nan, 4: math.nan, 5: math.nan}
+    return FlowSnapshot.from_issues(open_issues, closed_issues, started)
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """以 NumPy 與純 Python 兩種實作各執行一次"""
+    if request.param == 'numpy':
+        if analytics.np is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(analytics, 'np', None)
+    return request.param
+
+
+class TestFlowMetrics:
+    """流程指標計算測試"""
+
+    def test_percentiles_and_histogram(self, backend):
+        """測試線性內插百分位數（與 numpy.percentile 相同）及直方圖分組"""
+        assert percentiles([1.0, 2.0, 3.0, 4.0, math.nan], (50, 85)) == {'p50': 2.5, 'p85': pytest.approx(3.55)}
+        assert percentiles([math.nan]) == {}
+        assert histogram([0.5, 1.0, 2.9, 100.0, math.nan], (0, 1, 3)) == [1, 2, 1]
+
+    def test_flow_report(self, backend):
+        """測試前置時間、週期時間、每週產出與在製品年齡"""
+        report = flow_report(snapshot(), weeks=2, now=NOW)
+
+        assert report.week_starts == ['2024-05-06', '2024-05-13']
+        assert report.throughput == [0, 1]
+        assert report.closed == 1
+        assert report.lead_time == {'p50': 13.0, 'p85': 13.0, 'p95': 13.0}
+        assert report.cycle_time == {} and report.cycle_time_issues == 0
+        assert report.wip == 2
+        # 議題 1 建立 1 天（1-3d），議題 2 自開始處理起 5 天（3-7d）
+        assert report.aging == [0, 1, 1, 0, 0, 0, 0, 0]
+
+        wide = flow_report(snapshot(), weeks=3, now=NOW)
+        assert wide.throughput == [1, 0, 1] and wide.closed == 2
+        assert wide.cycle_time == {'p50': 1.0, 'p85': 1.0, 'p95': 1.0} and wide.cycle_time_issues == 1
+
+    def test_window_and_transitions(self):
+        """測試統計期間起點與第一次狀態變更時間"""
+        assert window_start(1, NOW) == datetime(2024, 5, 13, tzinfo=timezone.utc)
+        journals = [{'created_on': '2024-05-01T00:00:00Z', 'details': []},
+                    {'created_on': '2024-05-02T00:00:00Z',
+                     'details': [{'property': 'attr', 'name': 'status_id', 'old_value': '1', 'new_value': '2'}]}]
+        assert first_transition(journals) == analytics.epoch('2024-05-02T00:00:00Z')
+        assert math.isnan(first_transition([]))
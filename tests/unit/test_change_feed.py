@@ -0,0 +1,155 @@
+"""
+變更訂閱（Atom）模組測試
+"""
+
+import io
+import threading
+from types import SimpleNamespace
+
+from redmine_mcp import change_feed
+from redmine_mcp.change_feed import ChangeCursors, ChangeFeedPoller, parse_atom_entries
+
+
+def atom(*entries):
+    """產生 Atom 文件，entries 為 (連結, 更新時間)"""
+    body = "".join(
+        f"<entry><title>t</title><link rel='alternate' href='https://redmine.example.com{link}'/>"
+        f"<id>https://redmine.example.com{link}</id><updated>{updated}</updated></entry>"
+        for link, updated in entries
+    )
+    return f"<?xml version='1.0' encoding='UTF-8'?><feed xmlns='http://www.w3.org/2005/Atom'>{body}</feed>".encode()
+
+
+class FakeFeedClient:
+    """依名稱回傳預先設定的訂閱內容與議題更新時間，並記錄失效呼叫"""
+
+    def __init__(self):
+        self.feeds = {'activity': []}
+        self.issues = {}  # 議題 ID -> updated_on
+        self.invalidated = []
+
+    def iter_feed(self, name, params):
+        return parse_atom_entries(io.BytesIO(atom(*self.feeds[name])))
+
+    def iter_issues(self, max_items=None, status_id=None, sort=None, fields=None, stale_ok=True, updated_on=None):
+        assert status_id == '*' and sort == 'updated_on:desc' and stale_ok is False
+        since = updated_on[2:] if updated_on else ''
+        issues = sorted(((updated, issue_id) for issue_id, updated in self.issues.items() if updated >= since),
+                        reverse=True)
+        return (SimpleNamespace(id=issue_id, updated_on=updated) for updated, issue_id in issues[:max_items])
+
+    def invalidate(self, **kwargs):
+        self.invalidated.append(kwargs)
+
+
+class TestParseAtom:
+    """Atom 串流解析測試"""
+
+    def test_entries_and_links(self):
+        """測試解析議題與專案連結"""
+        entries = list(parse_atom_entries(io.BytesIO(atom(
+            ('/issues/12#change-40', '2024-05-02T10:00:00Z'),
+            ('/projects/web/wiki/Home', '2024-05-01T09:00:00Z'),
+        ))))
+
+        assert [e.updated for e in entries] == ['2024-05-02T10:00:00Z', '2024-05-01T09:00:00Z']
+        assert entries[0].issue_id == 12 and entries[0].project_identifier is None
+        assert entries[1].issue_id is None and entries[1].project_identifier == 'web'
+
+
+class TestChangeFeedPoller:
+    """變更訂閱輪詢與高水位標記測試"""
+
+    def test_first_poll_sets_high_water(self):
+        """測試第一次輪詢只記錄目前位置，不使任何快取失效"""
+        client = FakeFeedClient()
+        client.issues = {1: '2024-05-02T10:00:00Z'}
+        poller = ChangeFeedPoller(client, interval=60)
+
+        assert poller.poll_once() == {'issues': [], 'projects': [], 'overflow': False}
+        assert poller.high_water['issues'] == '2024-05-02T10:00:00Z'
+        assert client.invalidated == []
+
+    def test_only_new_entries_invalidate(self):
+        """測試只有高水位之後的變更會使快取失效，且同一筆不重複回報"""
+        client = FakeFeedClient()
+        client.issues = {1: '2024-05-02T10:00:00Z', 2: '2024-05-01T10:00:00Z'}
+        poller = ChangeFeedPoller(client, interval=60)
+        poller.poll_once()
+
+        client.issues.update({3: '2024-05-03T10:00:00Z', 4: '2024-05-02T10:00:00Z'})
+        client.feeds['activity'] = [('/projects/mobile/news/1', '2024-05-03T11:00:00Z')]
+        result = poller.poll_once()
+
+        assert result == {'issues': [3, 4], 'projects': ['mobile'], 'overflow': False}
+        assert client.invalidated == [{'issue_ids': {3, 4}, 'project_identifiers': {'mobile'}}]
+
+        client.invalidated.clear()
+        assert poller.poll_once()['issues'] == []
+        assert client.invalidated == []
+
+    def test_edited_old_issue_invalidates(self):
+        """測試編輯舊議題（建立時間早於高水位）也會使該議題快取失效"""
+        client = FakeFeedClient()
+        client.issues = {1: '2024-05-02T10:00:00Z', 2: '2024-01-01T10:00:00Z'}
+        poller = ChangeFeedPoller(client, interval=60)
+        poller.poll_once()
+
+        client.issues[2] = '2024-05-04T08:00:00Z'
+        assert poller.poll_once() == {'issues': [2], 'projects': [], 'overflow': False}
+        assert poller.high_water['issues'] == '2024-05-04T08:00:00Z'
+
+    def test_overflow_invalidates_everything(self, monkeypatch):
+        """測試所有項目都比高水位新且可能還有更多時（可能漏掉變更），全部快取失效"""
+        client = FakeFeedClient()
+        client.feeds['activity'] = [('/projects/web/news/1', '2024-05-01T10:00:00Z')]
+        client.issues = {1: '2024-05-01T10:00:00Z'}
+        poller = ChangeFeedPoller(client, interval=60)
+        poller.poll_once()
+
+        client.feeds['activity'] = [('/projects/web/news/3', '2024-05-03T10:00:00Z'),
+                                    ('/projects/web/news/2', '2024-05-02T10:00:00Z')]
+        assert poller.poll_once()['overflow'] is True
+        assert client.invalidated == [{'everything': True}]
+
+        monkeypatch.setattr(change_feed, 'ISSUE_PROBE_LIMIT', 2)
+        client.invalidated.clear()
+        client.issues.update({7: '2024-05-05T10:00:00Z', 8: '2024-05-06T10:00:00Z', 9: '2024-05-07T10:00:00Z'})
+        assert poller.poll_once()['overflow'] is True
+        assert client.invalidated == [{'everything': True}]
+
+    def test_start_polls_in_background_thread(self):
+        """測試第一次輪詢在背景執行緒進行，不延遲啟動"""
+        client = FakeFeedClient()
+        polled = threading.Event()
+        threads = []
+
+        def iter_feed(name, params):
+            threads.append(threading.current_thread().name)
+            polled.set()
+            return iter(())
+        client.iter_feed = iter_feed
+        poller = ChangeFeedPoller(client, interval=60)
+        poller.start()
+        try:
+            assert polled.wait(5)
+        finally:
+            poller.stop()
+
+        assert threads == ['redmine-change-feed']
+        assert poller.high_water['issues'] == ''
+
+
+class TestChangeCursors:
+    """changes_since 工作階段游標測試"""
+
+    def test_cursor_per_session_with_lru_limit(self):
+        """測試每個工作階段各自保存游標，超過上限時移除最久未使用者"""
+        cursors = ChangeCursors(max_sessions=2)
+        cursors.set('a', '2024-05-01T10:00:00Z', [3, 1])
+        cursors.set('b', '2024-05-02T10:00:00Z')
+        assert cursors.get('a') == ('2024-05-01T10:00:00Z', (1, 3))
+
+        cursors.set('c', '2024-05-03T10:00:00Z')
+        assert cursors.get('b') is None
+        assert cursors.get('a') is not None and cursors.get('c') is not None
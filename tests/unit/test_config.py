@@ -84,6 +84,51 @@ class TestRedmineConfig:
             
             assert 'https://test.redmine.com' in repr_str
             assert 'secret_api_key' not in repr_str  # 敏感資訊應該被隱藏
+    
+    def test_cache_dir_setting(self, tmp_path):
+        """測試快取目錄設定"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key',
+            'REDMINE_MCP_CACHE_DIR': str(tmp_path / 'cache')
+        }):
+            config = RedmineConfig()
+            assert config.cache_dir == tmp_path / 'cache'
+    
+    def test_issue_cache_ttl_setting(self):
+        """測試議題快取 TTL 設定"""
+        env = {'REDMINE_DOMAIN': 'https://test.redmine.com', 'REDMINE_API_KEY': 'test_api_key'}
+        with patch.dict(os.environ, env):
+            assert RedmineConfig().issue_cache_ttl == 60
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_ISSUE_CACHE_TTL': '0'}):
+            assert RedmineConfig().issue_cache_ttl == 0
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_ISSUE_CACHE_TTL': '-1'}):
+            with pytest.raises(ValueError, match="REDMINE_MCP_ISSUE_CACHE_TTL"):
+                RedmineConfig()
+    
+    def test_output_format_setting(self):
+        """測試預設輸出格式設定"""
+        env = {'REDMINE_DOMAIN': 'https://test.redmine.com', 'REDMINE_API_KEY': 'test_api_key'}
+        with patch.dict(os.environ, env):
+            assert RedmineConfig().output_format == 'text'
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_OUTPUT_FORMAT': 'JSON'}):
+            assert RedmineConfig().output_format == 'json'
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_OUTPUT_FORMAT': 'xml'}):
+            with pytest.raises(ValueError, match="REDMINE_MCP_OUTPUT_FORMAT"):
+                RedmineConfig()
+    
+    def test_throttle_settings(self):
+        """測試請求速率與並行上限設定"""
+        env = {'REDMINE_DOMAIN': 'https://test.redmine.com', 'REDMINE_API_KEY': 'test_api_key'}
+        with patch.dict(os.environ, env):
+            config = RedmineConfig()
+            assert config.max_rps == 10.0 and config.max_concurrency == 8
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_MAX_RPS': '0', 'REDMINE_MCP_MAX_CONCURRENCY': '2'}):
+            config = RedmineConfig()
+            assert config.max_rps == 0.0 and config.max_concurrency == 2
+        with patch.dict(os.environ, {**env, 'REDMINE_MCP_MAX_CONCURRENCY': '0'}):
+            with pytest.raises(ValueError, match="REDMINE_MCP_MAX_CONCURRENCY"):
+                RedmineConfig()
 
 
 class TestConfigSingleton:
@@ -0,0 +1,96 @@
+"""
+議題匯出模組測試
+"""
+
+import csv
+import importlib.util
+
+import pytest
+from redmine_mcp.export import IssueRows, export_format, write_issues
+
+
+def make_issue(issue_id, custom_fields=()):
+    return {
+        'id': issue_id, 'subject': f'Issue {issue_id}', 'project': {'id': 1, 'name': 'Web'},
+        'status': {'id': 2, 'name': 'In Progress'}, 'assigned_to': None, 'estimated_hours': 1.5,
+        'custom_fields': [{'id': i, 'name': name, 'value': value} for i, (name, value) in enumerate(custom_fields)],
+    }
+
+
+class TestIssueRows:
+    """議題資料攤平測試"""
+
+    def test_flattens_references_and_custom_fields(self):
+        """測試巢狀參照攤平為 ID 與名稱欄位，多值自訂欄位以逗號合併"""
+        rows = IssueRows(columns=['id', 'status_id', 'status', 'assigned_to', 'estimated_hours'])
+        first = [make_issue(1, [('Severity', 'High'), ('Components', ['api', 'web'])])]
+        rows.start(first)
+
+        assert rows.header == ['id', 'status_id', 'status', 'assigned_to', 'estimated_hours',
+                               'cf.Severity', 'cf.Components']
+        assert rows.types == ['int64', 'int64', 'string', 'string', 'float64', 'string', 'string']
+        assert rows.rows(first) == [[1, 2, 'In Progress', None, 1.5, 'High', 'api, web']]
+
+    def test_custom_fields_fixed_after_first_page(self):
+        """測試自訂欄位於第一頁後固定，之後才出現的欄位列為略過"""
+        rows = IssueRows(columns=['id'])
+        rows.start([make_issue(1, [('Severity', '')])])
+
+        assert rows.rows([make_issue(2, [('Severity', 'Low'), ('Team', 'Core')])]) == [[2, 'Low']]
+        assert rows.skipped_custom_fields == {'Team'}
+
+    def test_unknown_column_and_format(self):
+        """測試未知欄位與無法判斷的格式"""
+        with pytest.raises(ValueError, match="Unknown export column"):
+            IssueRows(columns=['id', 'nope'])
+        with pytest.raises(ValueError, match="Cannot tell the export format"):
+            export_format('issues.xlsx')
+        assert export_format('issues.PARQUET') == 'parquet'
+        assert export_format('issues.dat', 'csv') == 'csv'
+
+
+class TestWriteIssues:
+    """串流寫入測試"""
+
+    def test_csv_written_page_by_page(self, tmp_path):
+        """測試逐頁寫入 CSV，完成後才換成正式檔名"""
+        pages = iter([[make_issue(1), make_issue(2)], [make_issue(3)]])
+        path = tmp_path / 'issues.csv'
+        result = write_issues(pages, path, columns=['id', 'project', 'subject'])
+
+        assert result == {'path': str(path), 'format': 'csv', 'rows': 3,
+                          'columns': ['id', 'project', 'subject'], 'skipped_custom_fields': []}
+        with open(path, newline='', encoding='utf-8') as f:
+            assert list(csv.reader(f)) == [['id', 'project', 'subject'], ['1', 'Web', 'Issue 1'],
+                                           ['2', 'Web', 'Issue 2'], ['3', 'Web', 'Issue 3']]
+
+    def test_failed_export_leaves_no_file(self, tmp_path):
+        """測試讀取中途失敗時移除未完成的檔案"""
+        def pages():
+            yield [make_issue(1)]
+            raise RuntimeError("connection lost")
+
+        with pytest.raises(RuntimeError):
+            write_issues(pages(), tmp_path / 'issues.csv')
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.skipif(importlib.util.find_spec('pyarrow') is None, reason="pyarrow is not installed")
+    def test_parquet_round_trip(self, tmp_path):
+        """測試以 Arrow record batch 寫入 Parquet 並保留欄位型別"""
+        import pyarrow.parquet as pq
+
+        path = tmp_path / 'issues.parquet'
+        write_issues(iter([[make_issue(1, [('Severity', 'High')])], [make_issue(2)]]), path,
+                     columns=['id', 'status', 'estimated_hours'])
+        table = pq.read_table(path)
+
+        assert table.column_names == ['id', 'status', 'estimated_hours', 'cf.Severity']
+        assert table.column('id').to_pylist() == [1, 2]
+        assert table.column('cf.Severity').to_pylist() == ['High', None]
+
+    @pytest.mark.skipif(importlib.util.find_spec('pyarrow') is not None, reason="pyarrow is installed")
+    def test_parquet_requires_pyarrow(self, tmp_path):
+        """測試未安裝 pyarrow 時提示安裝方式"""
+        with pytest.raises(ImportError, match=r"redmine-mcp\[parquet\]"):
+            write_issues(iter([[make_issue(1)]]), tmp_path / 'issues.parquet')
+        assert list(tmp_path.iterdir()) == []
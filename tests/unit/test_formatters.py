@@ -0,0 +1,222 @@
+"""
+工具輸出格式化模組測試
+"""
+
+import json
+
+import pytest
+from redmine_mcp.formatters import (
+    format_issue, format_project_issues, format_my_issues, format_search_results, format_issue_counts,
+    format_time_report,
+    to_json, project_fields, table, issue_record, issue_detail_record, enumeration_record,
+    ISSUE_FIELDS, ISSUE_COLUMNS
+)
+from redmine_mcp.redmine_client import RedmineIssue
+
+
+def make_issue(issue_id=1, subject="Test issue", assigned_to=None, updated_on="2024-01-02T10:00:00Z"):
+    return RedmineIssue(
+        id=issue_id, subject=subject, description="", status={'id': 1, 'name': 'New'},
+        priority={'id': 2, 'name': 'Normal'}, project={'id': 1, 'name': 'Test Project'},
+        tracker={'id': 1, 'name': 'Bug'}, author={'id': 1, 'name': 'Author'},
+        assigned_to=assigned_to, updated_on=updated_on
+    )
+
+
+@pytest.fixture
+def issue_data():
+    return {
+        'id': 7, 'subject': 'Crash on login',
+        'project': {'id': 1, 'name': 'Test Project'}, 'tracker': {'id': 1, 'name': 'Bug'},
+        'status': {'id': 1, 'name': 'New'}, 'priority': {'id': 2, 'name': 'Normal'},
+        'author': {'id': 1, 'name': 'Author'}, 'parent': {'id': 3, 'subject': 'Epic'},
+        'done_ratio': 30, 'description': 'Steps to reproduce',
+        'attachments': [{'id': 5, 'filename': 'log.txt', 'filesize': 2 * 1024 * 1024,
+                         'content_type': 'text/plain', 'author': {'name': 'Author'},
+                         'created_on': '2024-01-01T00:00:00Z'}],
+        'journals': [
+            {'user': {'name': 'Alice'}, 'created_on': '2024-01-02T00:00:00Z', 'notes': ' First note '},
+            {'user': {'name': 'Bob'}, 'created_on': '2024-01-03T00:00:00Z', 'notes': ''},
+            {'user': {'name': 'Carol'}, 'created_on': '2024-01-04T00:00:00Z', 'notes': 'Second note'},
+        ],
+    }
+
+
+class TestFormatIssue:
+    """議題詳情格式化測試"""
+
+    def test_format_issue_details(self, issue_data):
+        """測試包含附件與備註的完整輸出"""
+        result = format_issue(issue_data, 'https://redmine.example.com')
+
+        assert result.startswith("Issue #7: Crash on login\n\nBasic Info:\n")
+        assert "- Parent issue: #3 - Epic" in result
+        assert "- Assigned to: Unassigned" in result
+        assert "Description:\nSteps to reproduce\n\nAttachments (1):\n- Filename: log.txt" in result
+        assert "  Size: 2.00 MB" in result
+        assert "  Download link: https://redmine.example.com/attachments/download/5/log.txt" in result
+        assert "Notes/History (2):\n\n#1 - Alice (2024-01-02T00:00:00Z):\nFirst note" in result
+        assert result.endswith("#2 - Carol (2024-01-04T00:00:00Z):\nSecond note")
+
+    def test_format_issue_without_details(self, issue_data):
+        """測試不包含詳細資訊時省略附件與備註"""
+        result = format_issue(issue_data, 'https://redmine.example.com', include_details=False)
+
+        assert result.endswith("Description:\nSteps to reproduce")
+        assert "Attachments" not in result
+        assert "Notes/History" not in result
+
+
+class TestFormatIssueTables:
+    """議題列表格式化測試"""
+
+    def test_format_project_issues(self):
+        """測試專案議題表格與標題截斷"""
+        issues = [make_issue(1, "x" * 50, assigned_to={'id': 2, 'name': 'Alice'}), make_issue(2, updated_on=None)]
+        lines = format_project_issues('Test Project', 'open', issues).split("\n")
+
+        assert lines[:3] == ["Project: Test Project", "Status filter: open", "Found 2 issues:"]
+        assert lines[6].startswith(f"1        {'x' * 37}...")
+        assert "Alice" in lines[6]
+        assert "Unassigned" in lines[7] and "N/A" in lines[7]
+        assert len(lines) == 8
+
+    def test_format_my_issues(self):
+        """測試我的議題表格"""
+        result = format_my_issues('Alice Smith', 'all', [make_issue()])
+
+        assert result.startswith("Issues assigned to Alice Smith:\nStatus filter: all\nFound 1 issues:")
+        assert result.split("\n")[-1].startswith("1        Test issue")
+
+    def test_format_search_results(self):
+        """測試搜尋結果表格（結尾保留換行）"""
+        result = format_search_results('crash', [make_issue()], project_id=3)
+
+        assert result.startswith("Search keyword: 'crash'\nSearch scope: Project 3\nFound 1 related issues:\n\n")
+        assert result.endswith("Test Project   \n")
+        assert "Search scope" not in format_search_results('crash', [make_issue()])
+
+    def test_format_issue_counts(self):
+        """測試計數矩陣欄寬依內容調整"""
+        lines = format_issue_counts('by tracker x status (open issues)', 7, 'Tracker', ['New', 'In Progress'],
+                                    [('Bug', [3, 1]), ('Feature', [0, 3])]).split("\n")
+
+        assert lines[:2] == ["Issue counts by tracker x status (open issues)", "Total: 7"]
+        assert lines[3] == "Tracker   New In Progress"
+        assert lines[5] == "Bug         3           1"
+        assert lines[6] == "Feature     0           3"
+
+    def test_format_time_report(self):
+        """測試工時報表欄寬與總計"""
+        lines = format_time_report('by user x activity', ['User', 'Activity'],
+                                   [(('Alice', 'Development'), 6.5, 4), (('Bob', 'QA'), 1.25, 1)]).split("\n")
+
+        assert lines[:2] == ["Time report by user x activity", "Total: 7.75 hours in 5 entries"]
+        assert lines[3] == "User  Activity       Hours Entries"
+        assert lines[5] == "Alice Development     6.50       4"
+        assert lines[6] == "Bob   QA              1.25       1"
+
+
+class TestFormatIssueBudget:
+    """議題備註分頁與字數預算測試"""
+
+    @pytest.fixture
+    def long_issue(self, issue_data):
+        issue_data['journals'] = [
+            {'user': {'name': 'User'}, 'notes': 'x' * 100, 'created_on': f'2024-02-{i:02d}T00:00:00Z'}
+            for i in range(1, 21)
+        ]
+        return issue_data
+
+    def test_max_chars_stops_at_budget(self, long_issue):
+        """測試超出字數預算時停止並提供接續位置"""
+        full = format_issue(long_issue, 'https://redmine.example.com')
+        result = format_issue(long_issue, 'https://redmine.example.com', max_chars=len(full) // 2)
+
+        assert len(result) <= len(full) // 2
+        assert "Continue with journal_offset=" in result
+        next_offset = int(result.rsplit("journal_offset=", 1)[1])
+        assert f"#{next_offset} - User" in result
+        assert f"#{next_offset + 1} - User" not in result
+
+    def test_max_chars_always_shows_one_note(self, long_issue):
+        """測試預算過小時仍至少顯示一筆備註"""
+        result = format_issue(long_issue, 'https://redmine.example.com', journal_offset=19, max_chars=10)
+
+        assert "Notes/History (20-20 of 20):\n\n#20 - User" in result
+        assert "Continue with" not in result
+
+    def test_offset_past_end(self, long_issue):
+        """測試偏移量超過備註數量"""
+        result = format_issue(long_issue, 'https://redmine.example.com', journal_offset=50)
+
+        assert result.endswith("Notes/History (0 of 20 after offset 50)")
+
+    def test_optional_sections(self, issue_data):
+        """測試子議題、關聯與變更集區段"""
+        issue_data['children'] = [{'id': 8, 'tracker': {'name': 'Task'}, 'subject': 'Child'}]
+        issue_data['relations'] = [{'issue_id': 7, 'issue_to_id': 9, 'relation_type': 'blocks', 'delay': None}]
+        issue_data['changesets'] = [{'revision': 'abc123', 'user': {'name': 'Dev'},
+                                     'committed_on': '2024-01-05T00:00:00Z', 'comments': 'Fix crash\nDetails'}]
+        result = format_issue(issue_data, 'https://redmine.example.com')
+
+        assert "Subtasks (1):\n- #8 [Task] Child" in result
+        assert "Relations (1):\n- blocks #9" in result
+        assert "Changesets (1):\n- rabc123 by Dev (2024-01-05T00:00:00Z): Fix crash" in result
+
+
+class TestStructuredRecords:
+    """結構化（JSON）輸出測試"""
+
+    def test_issue_record_drops_empty_values(self):
+        """測試議題摘要省略空值"""
+        record = issue_record(make_issue())
+
+        assert record['status'] == 'New' and record['project'] == 'Test Project'
+        assert 'assigned_to' not in record
+
+    def test_project_fields_keeps_id(self):
+        """測試欄位投影保留 id 並忽略不存在的欄位"""
+        record = issue_record(make_issue(assigned_to={'id': 2, 'name': 'Alice'}))
+
+        assert project_fields(record, ['assigned_to', 'missing']) == {'id': 1, 'assigned_to': 'Alice'}
+        assert project_fields(record, None) is record
+
+    def test_table_is_columnar(self):
+        """測試列表以欄位與資料列輸出，預設欄位與文字表格相同"""
+        issues = [make_issue(1), make_issue(2, assigned_to={'id': 2, 'name': 'Alice'})]
+
+        assert table(issues, ISSUE_FIELDS, None, ISSUE_COLUMNS) == {
+            'columns': ['id', 'subject', 'status', 'assigned_to', 'updated_on'],
+            'rows': [[1, 'Test issue', 'New', None, '2024-01-02T10:00:00Z'],
+                     [2, 'Test issue', 'New', 'Alice', '2024-01-02T10:00:00Z']],
+        }
+        assert table(issues, ISSUE_FIELDS, ['priority', 'bogus'], ISSUE_COLUMNS) == {
+            'columns': ['id', 'priority'], 'rows': [[1, 'Normal'], [2, 'Normal']]}
+
+    def test_issue_detail_record(self, issue_data):
+        """測試議題詳情記錄的附件與備註編號"""
+        record = issue_detail_record(issue_data, 'https://redmine.example.com')
+
+        assert record['parent_id'] == 3
+        assert record['attachments'][0]['url'] == 'https://redmine.example.com/attachments/download/5/log.txt'
+        assert record['notes']['columns'] == ['n', 'user', 'created_on', 'notes']
+        assert [row[:2] for row in record['notes']['rows']] == [[1, 'Alice'], [2, 'Carol']]
+        assert record['notes_total'] == 2 and 'next_journal_offset' not in record
+
+    def test_issue_detail_record_budget(self, issue_data):
+        """測試字數預算與接續位置"""
+        issue_data['journals'] = [{'user': {'name': 'User'}, 'notes': 'x' * 200,
+                                   'created_on': '2024-02-01T00:00:00Z'} for _ in range(10)]
+        full = to_json(issue_detail_record(issue_data, 'https://redmine.example.com'))
+        record = issue_detail_record(issue_data, 'https://redmine.example.com', max_chars=len(full) // 2)
+
+        assert len(to_json(record)) <= len(full) // 2
+        assert record['next_journal_offset'] == len(record['notes']['rows'])
+
+    def test_to_json_is_compact(self):
+        """測試輸出為精簡 JSON 且保留非 ASCII 字元"""
+        text = to_json(enumeration_record({'id': 1, 'name': '新建', 'is_closed': False}, 'is_closed'))
+
+        assert text == '{"id":1,"name":"新建"}'
+        assert json.loads(text) == {'id': 1, 'name': '新建'}
@@ -0,0 +1,149 @@
+"""
+指標收集模組測試
+"""
+
+import os
+import pytest
+from unittest.mock import patch, Mock
+import requests
+from redmine_mcp.metrics import (
+    endpoint_template, Histogram, MetricsRegistry, timed_tool, get_metrics
+)
+from redmine_mcp.redmine_client import RedmineClient, RedmineAPIError
+
+
+class TestEndpointTemplate:
+    """端點樣板化測試"""
+    
+    @pytest.mark.parametrize('endpoint, expected', [
+        ('/issues/12.json', '/issues/{id}.json'),
+        ('issues.json', '/issues.json'),
+        ('/projects/my-project.json', '/projects/{id}.json'),
+        ('/projects/3/archive.json', '/projects/{id}/archive.json'),
+        ('/issues/1/watchers/5.json', '/issues/{id}/watchers/{id}.json'),
+        ('/attachments/download/7/log.txt', '/attachments/download/{id}/{filename}'),
+        ('/enumerations/issue_priorities.json', '/enumerations/issue_priorities.json'),
+    ])
+    def test_endpoint_template(self, endpoint, expected):
+        """測試將路徑中的 ID 收斂為樣板"""
+        assert endpoint_template(endpoint) == expected
+
+
+class TestHistogram:
+    """延遲直方圖測試"""
+    
+    def test_observe_and_quantile(self):
+        """測試觀測值與分位數估計"""
+        hist = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 2.0):
+            hist.observe(value)
+        
+        assert hist.count == 4
+        assert hist.max == 2.0
+        assert hist.cumulative_counts() == [('0.1', 2), ('1', 3), ('+Inf', 4)]
+        assert 0 < hist.quantile(0.5) <= 0.1
+        assert hist.quantile(0.99) == 2.0
+    
+    def test_empty_quantile(self):
+        """測試空直方圖的分位數"""
+        assert Histogram().quantile(0.95) == 0.0
+
+
+class TestMetricsRegistry:
+    """指標註冊表測試"""
+    
+    def test_render_prometheus(self):
+        """測試 Prometheus 文字格式輸出"""
+        registry = MetricsRegistry()
+        registry.observe_request('get', '/issues/1.json', '200', 0.02, received=512)
+        registry.observe_request('GET', '/issues/2.json', '404', 0.01)
+        registry.record_retry('GET', '/issues/2.json')
+        registry.observe_tool('get_issue', 0.03, response_chars=100)
+        registry.record_cache('enum', True)
+        
+        text = registry.render_prometheus()
+        
+        assert 'redmine_mcp_request_duration_seconds_count{method="GET",endpoint="/issues/{id}.json"} 2' in text
+        assert 'redmine_mcp_requests_total{method="GET",endpoint="/issues/{id}.json",status="404"} 1' in text
+        assert 'redmine_mcp_request_retries_total{method="GET",endpoint="/issues/{id}.json"} 1' in text
+        assert 'redmine_mcp_response_bytes_total{method="GET",endpoint="/issues/{id}.json"} 512' in text
+        assert 'redmine_mcp_tool_duration_seconds_count{tool="get_issue"} 1' in text
+        assert 'redmine_mcp_cache_hits_total{cache="enum"} 1' in text
+    
+    def test_format_summary(self):
+        """測試可讀摘要輸出"""
+        registry = MetricsRegistry()
+        registry.observe_request('GET', '/issues/1.json', '200', 0.02)
+        registry.observe_tool('get_issue', 0.03, error=True)
+        
+        summary = registry.format_summary()
+        
+        assert 'GET /issues/{id}.json' in summary
+        assert 'get_issue' in summary
+        assert 'Status codes: 200=1' in summary
+
+
+class TestInstrumentation:
+    """請求與工具計時測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        get_metrics().reset()
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    @patch('requests.Session.request')
+    def test_make_request_records_metrics(self, mock_request):
+        """測試 API 請求記錄延遲、狀態碼與傳輸量"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"issue": {}}'
+        mock_response.json.return_value = {'issue': {}}
+        mock_request.return_value = mock_response
+        
+        self.client._make_request('GET', '/issues/5.json')
+        
+        key = ('GET', '/issues/{id}.json')
+        assert get_metrics().request_latency[key].count == 1
+        assert get_metrics().request_status[key + ('200',)] == 1
+        assert get_metrics().bytes_received[key] == len(b'{"issue": {}}')
+    
+    @patch('requests.Session.request')
+    def test_make_request_records_timeout(self, mock_request):
+        """測試逾時請求也會被記錄"""
+        mock_request.side_effect = requests.exceptions.Timeout()
+        
+        with pytest.raises(RedmineAPIError):
+            self.client._make_request('GET', '/issues/5.json')
+        
+        assert get_metrics().request_status[('GET', '/issues/{id}.json', 'timeout')] == 1
+    
+    def test_timed_tool(self):
+        """測試工具包裝器記錄延遲與回應長度"""
+        @timed_tool
+        def sample_tool(value: int) -> str:
+            """範例工具"""
+            return "x" * value
+        
+        assert sample_tool(5) == "xxxxx"
+        assert sample_tool.__name__ == 'sample_tool'
+        assert get_metrics().tool_latency['sample_tool'].count == 1
+        assert get_metrics().tool_response_chars['sample_tool'] == 5
+        assert 'sample_tool' not in get_metrics().tool_errors
+    
+    def test_timed_tool_counts_error_results(self):
+        """測試工具回傳錯誤訊息（文字或 JSON）時也記為錯誤"""
+        @timed_tool
+        def failing_tool(message: str) -> str:
+            """範例工具"""
+            return message
+        
+        failing_tool("System error: boom")
+        failing_tool('{"error":"Failed to get issue: 404"}')
+        failing_tool("Issue #1: Failed to reproduce")
+        failing_tool('{"error_rate":0}')
+        
+        assert get_metrics().tool_errors['failing_tool'] == 2
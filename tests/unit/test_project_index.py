@@ -0,0 +1,61 @@
+"""
+專案索引模組測試
+"""
+
+import pytest
+from redmine_mcp.project_index import ProjectIndex
+from redmine_mcp.redmine_client import RedmineProject
+
+
+def make_project(project_id, name, parent_id=None, updated_on='2024-01-01T00:00:00Z'):
+    return RedmineProject(id=project_id, name=name, identifier=name.lower().replace(' ', '-'), description='',
+                          status=1, updated_on=updated_on, parent_id=parent_id)
+
+
+@pytest.fixture
+def index():
+    return ProjectIndex([
+        make_project(1, 'Platform'),
+        make_project(2, 'Web', parent_id=1),
+        make_project(3, 'Api', parent_id=1),
+        make_project(4, 'Auth', parent_id=3),
+        make_project(5, 'Marketing'),
+    ])
+
+
+class TestProjectIndex:
+    """專案階層索引測試"""
+
+    def test_resolve_by_id_identifier_and_name(self, index):
+        """測試以 ID、識別碼或名稱（不分大小寫）查找專案"""
+        assert index.resolve(2).name == 'Web'
+        assert index.resolve('3').name == 'Api'
+        assert index.resolve('marketing').id == 5
+        assert index.resolve('AUTH').id == 4
+        assert index.resolve('missing') is None
+
+    def test_subtree_and_path(self, index):
+        """測試子專案展開與祖先路徑"""
+        assert sorted(index.subtree(1)) == [1, 2, 3, 4]
+        assert index.subtree(5) == [5]
+        assert [p.name for p in index.path(4)] == ['Platform', 'Api', 'Auth']
+
+    def test_walk_is_depth_first_by_name(self, index):
+        """測試樹狀走訪順序與深度"""
+        assert [(p.name, depth) for p, depth in index.walk()] == [
+            ('Marketing', 0), ('Platform', 0), ('Api', 1), ('Auth', 2), ('Web', 1)
+        ]
+
+    def test_update_only_reindexes_changes(self, index):
+        """測試增量更新只計入新增、變更與移除的專案"""
+        unchanged = index.projects[2]
+        projects = [p for p in index.projects.values() if p.id != 5]
+        projects[0] = make_project(1, 'Core Platform', updated_on='2024-02-01T00:00:00Z')
+        projects.append(make_project(6, 'Mobile', parent_id=1))
+
+        assert index.update(projects) == (1, 1, 1)
+        assert index.projects[2] is unchanged
+        assert index.resolve('core platform').id == 1
+        assert index.resolve('Marketing') is None
+        assert 6 in index.subtree(1)
+        assert index.update(projects) == (0, 0, 0)
@@ -3,13 +3,20 @@ Redmine 客戶端測試
 """
 
 import os
+import json
+import threading
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, Mock
 import requests
 from redmine_mcp.redmine_client import (
     RedmineClient, RedmineAPIError, RedmineIssue, RedmineProject,
-    get_client, reload_client
+    get_client, reload_client, aggregate_time_entries, collect_stale_reads, FileBody, CACHE_FORMAT_VERSION
 )
+from redmine_mcp.config import RedmineConfig
+from redmine_mcp.project_index import ProjectIndex
+from redmine_mcp.throttle import RequestGovernor
 
 
 class TestRedmineClient:
@@ -239,4 +246,1065 @@ class TestClientSingleton:
             client2 = reload_client()
             
             assert client1 is not client2
-            assert client1.config.redmine_domain == client2.config.redmine_domain
\ No newline at end of file
+            assert client1.config.redmine_domain == client2.config.redmine_domain
+
+
+class TestEnumCacheFile:
+    """列舉快取檔案讀寫測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def _use_tmp_cache(self, tmp_path):
+        self.client.cache_dir = tmp_path
+        self.client._cache_file = tmp_path / 'cache_test.json'
+        self.client._lock_file = tmp_path / 'cache_test.lock'
+    
+    def _valid_cache(self, **overrides):
+        cache = {
+            'version': CACHE_FORMAT_VERSION,
+            'cache_time': time.time(),
+            'domain': 'https://test.redmine.com',
+            'priorities': {'Normal': 2},
+            'statuses': {}, 'trackers': {}, 'time_entry_activities': {},
+            'users_by_name': {}, 'users_by_login': {}
+        }
+        cache.update(overrides)
+        return cache
+    
+    def test_write_cache_file_is_atomic_and_compact(self, tmp_path):
+        """測試快取寫入為壓縮格式且不留下暫存檔"""
+        self._use_tmp_cache(tmp_path)
+        
+        self.client._write_cache_file(self._valid_cache())
+        
+        content = self.client._cache_file.read_text(encoding='utf-8')
+        assert '\n' not in content
+        assert json.loads(content)['version'] == CACHE_FORMAT_VERSION
+        assert [p.name for p in tmp_path.iterdir()] == ['cache_test.json']
+    
+    def test_load_valid_cache_without_refresh(self, tmp_path):
+        """測試有效快取直接載入，不觸發重建"""
+        self._use_tmp_cache(tmp_path)
+        self.client._write_cache_file(self._valid_cache())
+        
+        with patch.object(self.client, '_refresh_enum_cache') as mock_refresh:
+            cache = self.client._load_enum_cache()
+        
+        mock_refresh.assert_not_called()
+        assert cache['priorities'] == {'Normal': 2}
+    
+    @pytest.mark.parametrize('overrides', [
+        {'version': CACHE_FORMAT_VERSION - 1},
+        {'domain': 'https://other.redmine.com'},
+        {'cache_time': 0},
+    ])
+    def test_invalid_cache_triggers_refresh(self, tmp_path, overrides):
+        """測試版本、網域不符或過期時重建快取"""
+        self._use_tmp_cache(tmp_path)
+        self.client._write_cache_file(self._valid_cache(**overrides))
+        
+        with patch.object(self.client, '_refresh_enum_cache') as mock_refresh:
+            self.client._load_enum_cache()
+        
+        mock_refresh.assert_called_once()
+    
+    def test_truncated_cache_file_triggers_refresh(self, tmp_path):
+        """測試損毀的快取檔案會重建"""
+        self._use_tmp_cache(tmp_path)
+        self.client._cache_file.write_text('{"version": 1, "cache_', encoding='utf-8')
+        
+        with patch.object(self.client, '_refresh_enum_cache') as mock_refresh:
+            self.client._load_enum_cache()
+        
+        mock_refresh.assert_called_once()
+    
+    def test_cache_rechecked_after_acquiring_lock(self, tmp_path):
+        """測試等待鎖期間其他程序已更新快取時不重複重建"""
+        self._use_tmp_cache(tmp_path)
+        fresh = self._valid_cache()
+        
+        with patch.object(self.client, '_read_cache_file', side_effect=[None, fresh]), \
+             patch.object(self.client, '_refresh_enum_cache') as mock_refresh:
+            cache = self.client._load_enum_cache()
+        
+        mock_refresh.assert_not_called()
+        assert cache is fresh
+    
+    def test_cache_lock_excludes_other_threads(self, tmp_path):
+        """測試快取鎖在同一執行緒內可重入，但其他執行緒須等待"""
+        self._use_tmp_cache(tmp_path)
+        active, overlaps = [], []
+        
+        def hold(_):
+            with self.client._cache_lock():
+                with self.client._cache_lock():
+                    active.append(1)
+                    overlaps.append(len(active))
+                    time.sleep(0.02)
+                    active.pop()
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(hold, range(8)))
+        
+        assert max(overlaps) == 1 and len(overlaps) == 8
+
+
+
+class TestCacheFileNaming:
+    """快取檔案命名與清理測試"""
+    
+    def _make_client(self, cache_dir, domain='https://test.redmine.com', api_key='test_api_key'):
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': domain,
+            'REDMINE_API_KEY': api_key,
+            'REDMINE_MCP_CACHE_DIR': str(cache_dir)
+        }), patch('redmine_mcp.redmine_client.get_config', return_value=RedmineConfig()):
+            return RedmineClient()
+    
+    def test_cache_file_name_is_stable(self, tmp_path):
+        """測試快取檔名在重新啟動後保持一致"""
+        first = self._make_client(tmp_path)
+        second = self._make_client(tmp_path)
+        
+        assert first._cache_file == second._cache_file
+        assert first._cache_file.parent == tmp_path
+        assert first._cache_file.name.startswith('cache_https_test.redmine.com_')
+    
+    def test_cache_file_name_differs_per_domain_and_user(self, tmp_path):
+        """測試不同網域或 API 使用者的快取檔名不同"""
+        names = {
+            self._make_client(tmp_path)._cache_file.name,
+            self._make_client(tmp_path, domain='http://localhost:3000')._cache_file.name,
+            self._make_client(tmp_path, api_key='other_api_key')._cache_file.name,
+        }
+        
+        assert len(names) == 3
+    
+    def test_orphaned_cache_files_are_removed(self, tmp_path):
+        """測試清理舊命名、過期檔案與殘留暫存檔"""
+        legacy = tmp_path / 'cache_https_test.redmine.com_8123456789012345678.json'
+        expired = tmp_path / 'cache_https_other.redmine.com_0123456789abcdef.json'
+        expired_lock = tmp_path / 'cache_https_other.redmine.com_0123456789abcdef.lock'
+        leftover_tmp = tmp_path / '.cache_https_test.redmine.com_x.json.abc.tmp'
+        recent = tmp_path / 'cache_https_other.redmine.com_fedcba9876543210.json'
+        for path in (legacy, expired, expired_lock, leftover_tmp, recent):
+            path.write_text('{}', encoding='utf-8')
+        old = time.time() - 60 * 86400
+        for path in (expired, leftover_tmp):
+            os.utime(path, (old, old))
+        
+        client = self._make_client(tmp_path)
+        assert legacy.exists()  # 建構客戶端時不觸碰快取目錄
+        client._prepare_cache_dir()
+        
+        assert not legacy.exists()
+        assert not expired.exists()
+        assert not expired_lock.exists()
+        assert not leftover_tmp.exists()
+        assert recent.exists()
+
+
+class TestWarmUp:
+    """預熱模式測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def _mock_response(self, data):
+        mock_response = Mock()
+        mock_response.json.return_value = data
+        mock_response.content = b'content'
+        return mock_response
+    
+    @patch('requests.Session.request')
+    def test_prefetched_response_served_once(self, mock_request):
+        """測試預取的回應只會被使用一次"""
+        mock_request.return_value = self._mock_response({'user': {'id': 1}})
+        
+        with self.client._prefetching():
+            self.client.get_current_user()
+        self.client.get_current_user()
+        assert mock_request.call_count == 1
+        
+        self.client.get_current_user()
+        assert mock_request.call_count == 2
+    
+    @patch('requests.Session.request')
+    def test_write_discards_prefetched_responses(self, mock_request):
+        """測試寫入操作會清除預取的回應"""
+        mock_request.return_value = self._mock_response({'user': {'id': 1}})
+        
+        with self.client._prefetching():
+            self.client.get_current_user()
+        self.client.update_issue(1, subject='新標題')
+        self.client.get_current_user()
+        
+        assert mock_request.call_count == 3
+    
+    @patch('requests.Session.head')
+    @patch('requests.Session.request')
+    def test_warm_up_runs_all_tasks(self, mock_request, mock_head):
+        """測試預熱會載入快取、解析目前用戶並開啟連線"""
+        mock_request.return_value = self._mock_response({'user': {'id': 1}, 'issues': []})
+        
+        with patch.object(self.client, '_load_enum_cache') as mock_load:
+            report = self.client.warm_up(connections=4, prefetch_issues=True, timeout=5)
+        
+        assert report['tasks'] == {
+            'enum_cache': 'ok', 'current_user': 'ok',
+            'connection_1': 'ok', 'connection_2': 'ok'
+        }
+        mock_load.assert_called_once()
+        assert mock_head.call_count == 2
+        # 目前用戶與議題列表都已預取
+        assert len(self.client._prefetched) == 2
+    
+    def test_warm_up_respects_time_budget(self):
+        """測試預熱超過時間預算時回報逾時"""
+        release = threading.Event()
+        
+        with patch.object(self.client, '_load_enum_cache', side_effect=lambda: release.wait(5)), \
+             patch.object(self.client, 'get_current_user', side_effect=RedmineAPIError("連線失敗")):
+            report = self.client.warm_up(connections=1, timeout=0.1)
+        release.set()
+        
+        assert report['tasks'] == {'enum_cache': 'timeout', 'current_user': '連線失敗'}
+        assert report['elapsed'] < 2
+
+
+class TestIssueViewCache:
+    """議題 include 區段快取測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.updated_on = '2024-01-01T00:00:00Z'
+    
+    def _fake_request(self, method, endpoint, params=None, **kwargs):
+        """依 include 參數回傳對應區段"""
+        issue = {'id': 1, 'subject': '測試議題', 'updated_on': self.updated_on}
+        for name in (params or {}).get('include', '').split(','):
+            if name:
+                issue[name] = [f'{name}-data']
+        return {'issue': issue}
+    
+    def test_partial_views_merge(self):
+        """測試先取附件再取歷程時只下載歷程"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            first = self.client.get_issue_raw(1, include=['attachments'])
+            second = self.client.get_issue_raw(1, include=['attachments', 'journals'])
+            third = self.client.get_issue_raw(1, include=['journals'])
+        
+        assert mock_request.call_count == 2
+        assert mock_request.call_args_list[1].kwargs['params'] == {'include': 'journals'}
+        assert first['attachments'] == ['attachments-data'] and 'journals' not in first
+        assert second['attachments'] == ['attachments-data'] and second['journals'] == ['journals-data']
+        # 只回傳要求的區段
+        assert 'attachments' not in third and third['journals'] == ['journals-data']
+    
+    def test_changed_issue_reloads_all_sections(self):
+        """測試議題更新後重新下載所有要求的區段"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            self.client.get_issue_raw(1, include=['attachments'])
+            self.updated_on = '2024-02-01T00:00:00Z'
+            result = self.client.get_issue_raw(1, include=['attachments', 'journals'])
+        
+        assert mock_request.call_count == 3
+        assert mock_request.call_args_list[2].kwargs['params'] == {'include': 'attachments,journals'}
+        assert result['updated_on'] == '2024-02-01T00:00:00Z'
+    
+    @patch('requests.Session.request')
+    def test_write_clears_issue_views(self, mock_request):
+        """測試寫入操作會清除議題快取"""
+        mock_response = Mock()
+        mock_response.json.return_value = {'issue': {'id': 1, 'subject': '測試議題'}}
+        mock_response.content = b'content'
+        mock_request.return_value = mock_response
+        
+        self.client.get_issue_raw(1, include=['journals'])
+        self.client.get_issue_raw(1, include=['journals'])
+        assert mock_request.call_count == 1
+        
+        self.client.update_issue(1, subject='新標題')
+        self.client.get_issue_raw(1, include=['journals'])
+        assert mock_request.call_count == 3
+    
+    def test_cache_disabled_with_zero_ttl(self):
+        """測試 TTL 為 0 時不使用快取"""
+        self.client.config.issue_cache_ttl = 0
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            self.client.get_issue_raw(1, include=['journals'])
+            self.client.get_issue_raw(1, include=['journals'])
+        
+        assert mock_request.call_count == 2
+
+
+class TestIssueListing:
+    """議題列表欄位投影與串流分頁測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.total = 250
+    
+    def _fake_request(self, method, endpoint, params=None, **kwargs):
+        """依 limit/offset 回傳議題分頁"""
+        offset, limit = params['offset'], params['limit']
+        issues = [{'id': i, 'subject': f'議題{i}', 'description': 'x' * 1000, 'status': {'id': 1, 'name': '新建'},
+                   'priority': {'id': 2, 'name': '正常'}, 'project': {'id': 1, 'name': '專案1'},
+                   'tracker': {'id': 1, 'name': 'Bug'}, 'author': {'id': 1, 'name': '用戶1'}}
+                  for i in range(offset + 1, min(offset + limit, self.total) + 1)]
+        return {'issues': issues, 'total_count': self.total, 'offset': offset, 'limit': limit}
+    
+    def test_fields_projection(self):
+        """測試只保留指定欄位，描述不保留"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request):
+            issue = self.client.list_issues(limit=1, fields=['subject', 'status'])[0]
+            full = self.client.list_issues(limit=1)[0]
+        
+        assert issue.id == 1 and issue.subject == '議題1' and issue.status['name'] == '新建'
+        assert issue.description == '' and issue.project == {} and issue.assigned_to is None
+        assert full.description == 'x' * 1000
+    
+    def test_iter_issues_pages(self):
+        """測試逐頁串流直到 total_count"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            ids = [issue.id for issue in self.client.iter_issues(fields=['subject'])]
+        
+        assert ids == list(range(1, 251))
+        assert [c.kwargs['params']['offset'] for c in mock_request.call_args_list] == [0, 100, 200]
+    
+    def test_count_issues_reads_total_count(self):
+        """測試計數只請求一筆並讀取 total_count"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            assert self.client.count_issues(project_id=1, status_id='*') == 250
+            counts = self.client.count_issues_many([{'status_id': 'o'}, {'tracker_id': 2}], max_workers=2)
+        
+        assert counts == [250, 250]
+        assert all(c.kwargs['params']['limit'] == 1 for c in mock_request.call_args_list)
+        assert mock_request.call_args_list[0].kwargs['params']['status_id'] == '*'
+    
+    def test_iter_issues_stops_early(self):
+        """測試 max_items 與提前停止迭代時不再請求後續分頁"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            issues = list(self.client.iter_issues(max_items=150))
+            assert len(issues) == 150
+            assert mock_request.call_args_list[-1].kwargs['params']['limit'] == 50
+            
+            mock_request.reset_mock()
+            for issue in self.client.iter_issues():
+                if issue.id == 10:
+                    break
+            assert mock_request.call_count == 1
+
+
+class TestProjectIndexCache:
+    """專案索引快取測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.projects = [
+            {'id': i, 'name': f'專案{i}', 'identifier': f'project-{i}', 'status': 1,
+             'updated_on': '2024-01-01T00:00:00Z', **({'parent': {'id': 1}} if i > 1 else {})}
+            for i in range(1, 151)
+        ]
+    
+    def _fake_request(self, method, endpoint, params=None, **kwargs):
+        """依 limit/offset 回傳專案分頁"""
+        if method != 'GET':
+            return {}
+        offset, limit = params['offset'], params['limit']
+        return {'projects': self.projects[offset:offset + limit], 'total_count': len(self.projects)}
+    
+    def test_index_paginates_and_is_cached(self):
+        """測試索引讀取所有分頁並快取"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            index = self.client.get_project_index()
+            assert self.client.get_project_index() is index
+        
+        assert len(index) == 150
+        assert mock_request.call_count == 2
+        assert len(index.subtree(1)) == 150
+    
+    def test_resolve_project_refreshes_on_miss(self):
+        """測試找不到專案時重新整理索引一次"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            assert self.client.resolve_project('project-7').id == 7
+            self.projects.append({'id': 151, 'name': '新專案', 'identifier': 'new', 'status': 1})
+            assert self.client.resolve_project('new').id == 151
+            with pytest.raises(RedmineAPIError, match="not found"):
+                self.client.resolve_project('missing')
+        
+        # 初次建立 2 頁，兩次未命中各重新整理 2 頁
+        assert mock_request.call_count == 6
+    
+    def test_resolve_unknown_numeric_project_passes_through(self):
+        """測試索引中沒有的數字 ID 直接交給 Redmine 判斷，不重新整理索引"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            assert self.client.resolve_project(999).id == 999
+            assert self.client.resolve_project('998').id == 998
+        
+        assert mock_request.call_count == 2
+    
+    def test_project_write_marks_index_stale(self):
+        """測試寫入專案後下次查詢重新檢查索引"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request):
+            self.client.get_project_index()
+        with patch.object(self.client.session, 'request') as mock_request:
+            mock_request.return_value = Mock(status_code=204, content=b'', json=Mock(return_value={}))
+            self.client._make_request('PUT', '/projects/2.json', json={'project': {'name': '改名'}})
+        
+        self.projects[1]['name'] = '改名'
+        self.projects[1]['updated_on'] = '2024-02-01T00:00:00Z'
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            assert self.client.get_project_index().resolve(2).name == '改名'
+            assert mock_request.call_count == 2
+
+
+class TestTimeEntries:
+    """工時批次記錄與串流彙總測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.entries = [
+            {'id': i, 'project': {'id': 1, 'name': '專案1'}, 'issue': {'id': 10 + i % 3},
+             'user': {'id': 1 + i % 2, 'name': f'用戶{1 + i % 2}'}, 'activity': {'id': 9, 'name': '開發'},
+             'hours': 0.5, 'spent_on': f'2024-05-{1 + i % 10:02d}'}
+            for i in range(1, 231)
+        ]
+    
+    def _fake_request(self, method, endpoint, params=None, **kwargs):
+        """依 limit/offset 回傳工時分頁"""
+        offset, limit = params['offset'], params['limit']
+        return {'time_entries': self.entries[offset:offset + limit], 'total_count': len(self.entries)}
+    
+    def test_bulk_create_reports_each_row(self):
+        """測試批次建立保留輸入順序，失敗列不影響其他列"""
+        def create(issue_id, hours, activity_id, **kwargs):
+            if issue_id == 3:
+                raise RedmineAPIError("Issue not found")
+            return 100 + issue_id
+        
+        rows = [
+            {'issue_id': 1, 'hours': 1, 'activity_id': 9},
+            {'issue_id': 2, 'hours': 0, 'activity_id': 9},
+            {'issue_id': 3, 'hours': 1, 'activity_id': 9},
+            {'issue_id': 4, 'hours': 2, 'activity_id': 9, 'spent_on': '2024-05-02'},
+            {'issue_id': 5, 'hours': 1},
+        ]
+        with patch.object(self.client, 'create_time_entry', side_effect=create) as mock_create:
+            results = self.client.bulk_create_time_entries(rows, max_workers=3)
+        
+        assert [r['row'] for r in results] == [0, 1, 2, 3, 4]
+        assert results[0]['id'] == 101 and results[3]['id'] == 104
+        assert 'greater than 0' in results[1]['error']
+        assert results[2]['error'] == "Issue not found"
+        assert 'activity_id' in results[4]['error']
+        assert mock_create.call_count == 3
+    
+    def test_iter_time_entries_filters_and_pages(self):
+        """測試工時串流分頁並傳遞伺服器端篩選"""
+        with patch.object(self.client, '_make_request', side_effect=self._fake_request) as mock_request:
+            entries = list(self.client.iter_time_entries(project_id=1, user_id='me', from_date='2024-05-01',
+                                                         to_date='2024-05-31'))
+        
+        assert len(entries) == 230
+        params = mock_request.call_args_list[0].kwargs['params']
+        assert params['from'] == '2024-05-01' and params['to'] == '2024-05-31' and params['user_id'] == 'me'
+        assert [c.kwargs['params']['offset'] for c in mock_request.call_args_list] == [0, 100, 200]
+        
+        with pytest.raises(RedmineAPIError):
+            next(self.client.iter_time_entries(from_date='May 1st'))
+    
+    def test_aggregate_time_entries(self):
+        """測試依使用者與日期/週彙總工時"""
+        by_user = aggregate_time_entries(self.entries, ['user'])
+        assert by_user[('用戶1',)] == {'hours': 57.5, 'entries': 115}
+        
+        by_week = aggregate_time_entries(self.entries, ['issue', 'week'])
+        assert ('#10', '2024-04-29') in by_week
+        assert sum(bucket['entries'] for bucket in by_week.values()) == 230
+
+
+class TestRequestThrottling:
+    """請求節流與 429/503 退避重試測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.client.governor = RequestGovernor(max_rps=0)
+    
+    @staticmethod
+    def _response(status_code, retry_after=None):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = {'Retry-After': retry_after} if retry_after else {}
+        response.content = b'{"issue": {"id": 1}}'
+        response.json.return_value = {'issue': {'id': 1}}
+        if status_code >= 400:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        return response
+    
+    def test_retries_throttled_reads(self):
+        """測試 429/503 依 Retry-After 退避後重試讀取請求"""
+        responses = [self._response(429, '0'), self._response(503, '0'), self._response(200)]
+        with patch.object(self.client.session, 'request', side_effect=responses) as mock_request, \
+                patch.object(self.client.governor, 'backoff') as mock_backoff:
+            assert self.client._make_request('GET', '/issues/1.json') == {'issue': {'id': 1}}
+        
+        assert mock_request.call_count == 3
+        assert [c.args[0] for c in mock_backoff.call_args_list] == [0.0, 0.0]
+    
+    def test_writes_not_retried_on_503(self):
+        """測試寫入請求遇到 503 不重試，遇到 429 才重試"""
+        with patch.object(self.client.session, 'request', side_effect=[self._response(503, '0')]) as mock_request:
+            with pytest.raises(RedmineAPIError):
+                self.client._make_request('PUT', '/issues/1.json', json={})
+        assert mock_request.call_count == 1
+        
+        responses = [self._response(429, '0'), self._response(200)]
+        with patch.object(self.client.session, 'request', side_effect=responses) as mock_request:
+            self.client._make_request('PUT', '/issues/1.json', json={})
+        assert mock_request.call_count == 2
+    
+    def test_gives_up_after_max_retries(self):
+        """測試超過重試次數後回報錯誤"""
+        responses = [self._response(503, '0') for _ in range(4)]
+        with patch.object(self.client.session, 'request', side_effect=responses) as mock_request:
+            with pytest.raises(RedmineAPIError):
+                self.client._make_request('GET', '/issues/1.json')
+        assert mock_request.call_count == 4
+
+    
+    def test_stale_if_error(self):
+        """測試 Redmine 無法連線時讀取請求回傳上次成功的回應並記錄其時間"""
+        ok = self._response(200)
+        with patch.object(self.client.session, 'request', side_effect=[ok, requests.exceptions.Timeout()]):
+            fresh = self.client._make_request('GET', '/issues/1.json')
+            with collect_stale_reads() as ages:
+                stale = self.client._make_request('GET', '/issues/1.json')
+        
+        assert stale == fresh and len(ages) == 1 and ages[0] < 5
+        
+        with patch.object(self.client.session, 'request', side_effect=requests.exceptions.Timeout()):
+            with pytest.raises(RedmineAPIError):
+                self.client._make_request('GET', '/issues/2.json')
+            with pytest.raises(RedmineAPIError):
+                self.client._make_request('GET', '/issues/1.json', stale_ok=False)
+    
+    def test_iter_issues_without_stale_responses(self):
+        """測試 stale_ok=False 時列出議題不會以上次成功的回應代替（變更探測需看到失敗）"""
+        with patch.object(self.client.session, 'request',
+                          side_effect=[self._response(200), requests.exceptions.Timeout()]):
+            assert list(self.client.iter_issues(status_id='*')) == []
+            with pytest.raises(RedmineAPIError):
+                list(self.client.iter_issues(status_id='*', stale_ok=False))
+    
+    def test_circuit_opens_and_fails_fast(self):
+        """測試連續失敗後斷路器斷開，不再送出請求；讀取改用快取，寫入立即失敗"""
+        with patch.object(self.client.session, 'request', return_value=self._response(200)):
+            self.client._make_request('GET', '/issues/1.json')
+        
+        with patch.object(self.client.session, 'request',
+                          side_effect=requests.exceptions.ConnectionError()) as mock_request:
+            for _ in range(5):
+                with pytest.raises(RedmineAPIError):
+                    self.client._make_request('GET', '/projects.json')
+            assert self.client.breakers['read'].state == 'open'
+            
+            assert self.client._make_request('GET', '/issues/1.json') == {'issue': {'id': 1}}
+            with pytest.raises(RedmineAPIError, match="Redmine is unavailable"):
+                self.client._make_request('GET', '/projects.json')
+            assert mock_request.call_count == 5
+        
+        # 寫入使用獨立的斷路器，4xx 錯誤不計為失敗
+        assert self.client.breakers['write'].state == 'closed'
+        with patch.object(self.client.session, 'request', return_value=self._response(404)):
+            for _ in range(6):
+                with pytest.raises(RedmineAPIError):
+                    self.client._make_request('PUT', '/issues/9.json', json={})
+        assert self.client.breakers['write'].state == 'closed'
+
+
+class TestCacheInvalidation:
+    """依變更訂閱使快取失效測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        self.client._issue_views = {1: {}, 2: {}, 3: {}}
+        self.client._prefetched = {
+            ('GET', '/issues/2.json', ()): (0, {}),
+            ('GET', '/issues.json', ()): (0, {}),
+            ('GET', '/my/account.json', ()): (0, {}),
+        }
+    
+    def test_invalidate_changed_issues_only(self):
+        """測試只移除變更議題的快取，未知專案才重新檢查專案索引"""
+        self.client._project_index = ProjectIndex([RedmineProject(id=1, name='Web', identifier='web',
+                                                                  description='', status=1)])
+        self.client._project_index_checked_at = time.monotonic()
+        
+        assert self.client.invalidate(issue_ids=[2, 7], project_identifiers=['web']) == 1
+        assert set(self.client._issue_views) == {1, 3}
+        assert [key[1] for key in self.client._prefetched] == ['/my/account.json']
+        assert self.client._project_index_checked_at > 0
+        
+        self.client.invalidate(project_identifiers=['mobile'])
+        assert self.client._project_index_checked_at == 0
+    
+    def test_invalidate_everything(self):
+        """測試全部失效"""
+        assert self.client.invalidate(everything=True) == 3
+        assert self.client._issue_views == {} and self.client._prefetched == {}
+    
+    def test_iter_feed_streams_atom(self):
+        """測試以 Atom 存取金鑰串流讀取訂閱"""
+        import io
+        response = Mock()
+        response.status_code = 200
+        response.raw = io.BytesIO(
+            b"<feed xmlns='http://www.w3.org/2005/Atom'><entry><id>https://test.redmine.com/issues/5</id>"
+            b"<updated>2024-05-02T10:00:00Z</updated></entry></feed>"
+        )
+        with patch.object(self.client.session, 'get', return_value=response) as mock_get, \
+                patch.object(self.client.config, 'feed_key', 'atom_key'):
+            entries = list(self.client.iter_feed('issues', {'sort': 'updated_on:desc'}))
+        
+        assert [e.issue_id for e in entries] == [5]
+        assert mock_get.call_args.kwargs['params'] == {'sort': 'updated_on:desc', 'key': 'atom_key'}
+        assert mock_get.call_args.kwargs['stream'] is True
+
+
+class TestAttachmentDownload:
+    """附件串流下載與內容去重測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    @staticmethod
+    def _response(content):
+        response = Mock()
+        response.status_code = 200
+        response.headers = {'ETag': '"abc"'}
+        response.iter_content.side_effect = lambda size: (content[i:i + size] for i in range(0, len(content), size))
+        return response
+    
+    def test_identical_content_is_stored_once(self, tmp_path):
+        """測試內容相同的附件以硬連結共用同一份檔案"""
+        content = b'x' * 10000
+        meta = {'filename': '../report.txt', 'filesize': len(content), 'content_type': 'text/plain'}
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get', side_effect=lambda *a, **k: self._response(content)):
+            first = self.client.download_attachment(1, chunk_size=1024)
+            second = self.client.download_attachment(2, chunk_size=1024)
+        
+        assert first['status'] == 'downloaded' and second['status'] == 'deduplicated'
+        assert first['path'] == str(tmp_path / '1' / 'report.txt')
+        assert os.path.samefile(first['path'], second['path'])
+        assert not (tmp_path / '2' / 'report.txt.part').exists()
+    
+    def test_interrupted_first_download_resumes_with_if_range(self, tmp_path):
+        """測試第一次下載中斷時已保存 ETag，續傳時帶 If-Range 以免接上不同版本"""
+        content = b'y' * 4096
+        meta = {'filename': 'log.txt', 'filesize': len(content), 'content_type': 'text/plain'}
+        broken = self._response(content)
+        
+        def interrupted(size):
+            yield content[:1024]
+            raise requests.exceptions.ConnectionError("connection reset")
+        broken.iter_content.side_effect = interrupted
+        rest = self._response(content[1024:])
+        rest.status_code = 206
+        
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get', side_effect=[broken, rest]) as mock_get:
+            with pytest.raises(RedmineAPIError):
+                self.client.download_attachment(4, chunk_size=1024)
+            result = self.client.download_attachment(4, chunk_size=1024)
+        
+        assert mock_get.call_args.kwargs['headers'] == {'Range': 'bytes=1024-', 'If-Range': '"abc"'}
+        assert result['status'] == 'resumed' and (tmp_path / '4' / 'log.txt').read_bytes() == content
+    
+    def test_concurrent_downloads_of_one_attachment_are_serialized(self, tmp_path):
+        """測試同一附件的並行下載依序進行，不會同時寫入同一個暫存檔"""
+        content = b'z' * 4096
+        meta = {'filename': 'data.bin', 'filesize': len(content), 'content_type': 'application/octet-stream'}
+        active, overlaps = [], []
+        
+        def slow(*args, **kwargs):
+            response = self._response(content)
+            
+            def chunks(size):
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.05)
+                yield content
+                active.pop()
+            response.iter_content.side_effect = chunks
+            return response
+        
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get', side_effect=slow):
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                results = list(executor.map(lambda _: self.client.download_attachment(5), range(3)))
+        
+        assert max(overlaps) == 1
+        assert all(result['sha256'] == results[0]['sha256'] for result in results)
+    
+    def test_edited_copy_is_downloaded_again(self, tmp_path):
+        """測試共用內容的檔案為唯讀，被就地修改後不會回報為未變更，且不會再共用損壞的內容"""
+        content = b'a' * 4096
+        meta = {'filename': 'notes.txt', 'filesize': len(content), 'content_type': 'text/plain'}
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get', side_effect=lambda *a, **k: self._response(content)) as mock_get:
+            first = self.client.download_attachment(1, chunk_size=1024)
+            second = self.client.download_attachment(2, chunk_size=1024)
+            assert os.stat(first['path']).st_mode & 0o222 == 0
+            
+            # 使用者解除唯讀後就地修改（大小不變），連同共用的 blob 一起被改動
+            os.chmod(first['path'], 0o644)
+            with open(first['path'], 'r+b') as f:
+                f.write(b'b')
+            
+            again = self.client.download_attachment(1, chunk_size=1024)
+            assert 'If-None-Match' not in mock_get.call_args.kwargs['headers']
+            other = self.client.download_attachment(2, chunk_size=1024)
+        
+        assert second['status'] == 'deduplicated'
+        assert again['status'] == 'downloaded' and other['status'] == 'deduplicated'
+        assert open(first['path'], 'rb').read() == open(second['path'], 'rb').read() == content
+        assert (tmp_path / 'blobs' / first['sha256']).read_bytes() == content
+    
+    def test_range_not_satisfiable_without_partial(self, tmp_path):
+        """測試沒有暫存檔時收到 416 也會重新下載，而非拋出 FileNotFoundError"""
+        content = b'c' * 2048
+        meta = {'filename': 'a.txt', 'filesize': len(content), 'content_type': 'text/plain'}
+        rejected = self._response(b'')
+        rejected.status_code = 416
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get', side_effect=[rejected, self._response(content)]):
+            result = self.client.download_attachment(6)
+        
+        assert result['status'] == 'downloaded' and (tmp_path / '6' / 'a.txt').read_bytes() == content
+    
+    def test_downloads_use_read_circuit(self, tmp_path):
+        """測試下載失敗計入讀取斷路器，斷路器開啟後不再送出下載請求"""
+        meta = {'filename': 'a.txt', 'filesize': 10, 'content_type': 'text/plain'}
+        breaker = self.client.breakers['read']
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get',
+                             side_effect=requests.exceptions.ConnectionError("down")) as mock_get:
+            for _ in range(breaker.failure_threshold):
+                with pytest.raises(RedmineAPIError):
+                    self.client.download_attachment(7)
+            assert breaker.state == 'open'
+            with pytest.raises(RedmineAPIError, match="Redmine is unavailable"):
+                self.client.download_attachment(7)
+        
+        assert mock_get.call_count == breaker.failure_threshold
+    
+    def test_size_cap_checked_before_download(self, tmp_path):
+        """測試超過大小上限的附件不會開始下載"""
+        meta = {'filename': 'big.iso', 'filesize': 5000, 'content_type': 'application/octet-stream'}
+        with patch.object(self.client.config, 'attachment_dir', tmp_path), \
+                patch.object(self.client, 'get_attachment', return_value=meta), \
+                patch.object(self.client.session, 'get') as mock_get:
+            with pytest.raises(RedmineAPIError, match="over the 1000 byte limit"):
+                self.client.download_attachment(3, max_bytes=1000)
+        mock_get.assert_not_called()
+
+
+class TestFileUpload:
+    """檔案串流上傳測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def test_file_body_streams_in_chunks_and_restarts(self, tmp_path):
+        """測試上傳內容分塊讀取、長度已知，且重試時可從頭再送一次"""
+        path = tmp_path / 'bundle.log'
+        path.write_bytes(b'0123456789' * 1000)
+        body = FileBody(path, chunk_size=4096)
+        
+        chunks = list(body)
+        assert len(body) == 10000
+        assert [len(c) for c in chunks] == [4096, 4096, 1808]
+        assert b''.join(body) == path.read_bytes()
+    
+    def test_upload_streams_file_body(self, tmp_path):
+        """測試上傳以原始位元組串流傳送檔案，並回傳 token"""
+        path = tmp_path / 'trace.txt'
+        path.write_text('trace')
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.json.return_value = {'upload': {'id': 7, 'token': '7.abc'}}
+        mock_response.content = b'{...}'
+        
+        with patch.object(self.client.config, 'upload_dir', tmp_path), \
+                patch.object(self.client.session, 'request', return_value=mock_response) as mock_request:
+            upload = self.client.upload_file(path, description='Trace')
+        
+        args, kwargs = mock_request.call_args
+        assert args == ('POST', 'https://test.redmine.com/uploads.json')
+        assert kwargs['params'] == {'filename': 'trace.txt'}
+        assert kwargs['headers'] == {'Content-Type': 'application/octet-stream'}
+        assert isinstance(kwargs['data'], FileBody)
+        assert upload == {'path': str(path), 'token': '7.abc', 'filename': 'trace.txt',
+                          'content_type': 'text/plain', 'description': 'Trace', 'size': 5}
+    
+    def test_uploads_attached_on_update(self):
+        """測試更新議題時只送出 Redmine 接受的上傳欄位"""
+        upload = {'path': '/tmp/a.log', 'token': '1.x', 'filename': 'a.log', 'content_type': 'text/plain',
+                  'description': None, 'size': 3}
+        with patch.object(self.client, '_make_request', return_value={}) as mock_request:
+            self.client.update_issue(5, uploads=[upload])
+        
+        assert mock_request.call_args[1]['json'] == {
+            'issue': {'uploads': [{'token': '1.x', 'filename': 'a.log', 'content_type': 'text/plain'}]}
+        }
+    
+    def test_missing_file_is_not_uploaded(self, tmp_path):
+        """測試不存在的檔案在送出請求前即回報錯誤"""
+        with patch.object(self.client.config, 'upload_dir', tmp_path), \
+                patch.object(self.client.session, 'request') as mock_request:
+            with pytest.raises(RedmineAPIError, match="File not found"):
+                self.client.upload_file(tmp_path / 'missing.log')
+        mock_request.assert_not_called()
+    
+    def test_uploads_limited_to_upload_dir(self, tmp_path):
+        """測試只能上傳上傳目錄內的檔案（跟隨符號連結後檢查），未設定目錄時停用上傳"""
+        root = tmp_path / 'uploads'
+        root.mkdir()
+        secret = tmp_path / 'secret.txt'
+        secret.write_text('secret')
+        (root / 'link.txt').symlink_to(secret)
+        
+        with patch.object(self.client.session, 'request') as mock_request:
+            with pytest.raises(RedmineAPIError, match="uploads are disabled"):
+                self.client.upload_file(secret)
+            with patch.object(self.client.config, 'upload_dir', root):
+                for path in (secret, root / '..' / 'secret.txt', root / 'link.txt', 'link.txt', '/etc/hostname'):
+                    with pytest.raises(RedmineAPIError, match="outside the upload directory"):
+                        self.client.upload_file(path)
+        mock_request.assert_not_called()
+
+
+class TestIssueGraph:
+    """議題關聯圖測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+        blocks = {'id': 1, 'issue_id': 1, 'issue_to_id': 3, 'relation_type': 'blocks'}
+        relates = {'id': 2, 'issue_id': 4, 'issue_to_id': 1, 'relation_type': 'relates'}
+        self.issues = {
+            1: {'id': 1, 'subject': 'Root', 'relations': [blocks, relates]},
+            2: {'id': 2, 'subject': 'Child', 'parent': {'id': 1}, 'relations': []},
+            3: {'id': 3, 'subject': 'Blocked', 'relations': [blocks]},
+            4: {'id': 4, 'subject': 'Related', 'relations': [relates]},
+        }
+    
+    def fake_request(self, method, endpoint, params=None, **kwargs):
+        """依 issue_id 或 parent_id 篩選假資料"""
+        field = 'issue_id' if 'issue_id' in params else 'parent_id'
+        wanted = {int(i) for i in params[field].split(',')}
+        if field == 'issue_id':
+            issues = [self.issues[i] for i in sorted(wanted) if i in self.issues]
+        else:
+            issues = [i for i in self.issues.values() if i.get('parent', {}).get('id') in wanted]
+        return {'issues': issues, 'total_count': len(issues)}
+    
+    def test_walks_relations_and_subtasks_level_by_level(self):
+        """測試逐層走訪關聯與子任務，並以批次請求抓取每層"""
+        with patch.object(self.client, '_make_request', side_effect=self.fake_request) as mock_request:
+            graph = self.client.get_issue_graph([1], max_depth=1)
+        
+        assert graph['depth'] == {1: 0, 2: 1, 3: 1, 4: 1}
+        assert graph['edges'] == [[1, 'blocks', 3], [4, 'relates', 1], [1, 'subtask', 2]]
+        assert not graph['truncated']
+        # 根節點與其子任務各一次，再一次抓取關聯議題（子任務已取得不重抓）
+        assert graph['requests'] == mock_request.call_count == 3
+        last = mock_request.call_args[1]['params']
+        assert last['issue_id'] == '3,4' and last['status_id'] == '*' and last['include'] == 'relations'
+    
+    def test_limits_and_relation_filter(self):
+        """測試節點上限、關聯類型篩選與找不到起點"""
+        with patch.object(self.client, '_make_request', side_effect=self.fake_request):
+            limited = self.client.get_issue_graph([1], max_nodes=2, relation_types=['blocks'], subtasks=False)
+            with pytest.raises(RedmineAPIError, match="not found"):
+                self.client.get_issue_graph([99])
+        
+        assert list(limited['nodes']) == [1, 3]
+        assert limited['edges'] == [[1, 'blocks', 3]]
+        assert not limited['truncated']
+
+
+class TestChangesSince:
+    """變更摘要測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def make_issue(self, issue_id, updated_on):
+        return {'id': issue_id, 'subject': f'Issue {issue_id}', 'description': '', 'status': {}, 'priority': {},
+                'project': {}, 'tracker': {}, 'author': {}, 'updated_on': updated_on}
+    
+    def fake_request(self, method, endpoint, params=None, **kwargs):
+        """列表依更新時間排序；單一議題回傳新舊歷程各一筆"""
+        if endpoint == '/issues.json':
+            issues = [self.make_issue(2, '2024-05-01T10:00:00Z'), self.make_issue(5, '2024-05-01T10:00:00Z'),
+                      self.make_issue(4, '2024-05-01T11:00:00Z')]
+            return {'issues': issues, 'total_count': len(issues)}
+        issue_id = int(endpoint.split('/')[2].split('.')[0])
+        return {'issue': dict(self.make_issue(issue_id, None), journals=[
+            {'id': 1, 'notes': 'old', 'created_on': '2024-04-30T09:00:00Z'},
+            {'id': 2, 'notes': 'new', 'created_on': '2024-05-01T10:00:00Z'},
+        ])}
+    
+    def test_skips_seen_issues_and_old_journals(self):
+        """測試略過游標時間點已回報的議題，只保留游標之後的歷程，並限制筆數"""
+        with patch.object(self.client, '_make_request', side_effect=self.fake_request) as mock_request:
+            result = self.client.get_changes_since('2024-05-01T10:00:00Z', seen=[2], limit=1)
+        
+        assert [issue['id'] for issue in result['issues']] == [5]
+        assert [j['notes'] for j in result['issues'][0]['journals']] == ['new']
+        assert result['cursor'] == '2024-05-01T10:00:00Z'
+        assert result['seen'] == [2, 5]
+        assert result['more'] is True
+        params = mock_request.call_args_list[0][1]['params']
+        assert params['updated_on'] == '>=2024-05-01T10:00:00Z'
+        assert params['status_id'] == '*' and params['sort'] == 'updated_on'
+
+
+class TestWaitForIssueChange:
+    """等待議題變更測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def test_probes_batched_until_change(self):
+        """測試先讀取基準，之後以單一批次 updated_on 探測並逐次拉長間隔"""
+        baseline = {'issues': [{'id': 1, 'updated_on': '2024-05-01T10:00:00Z'},
+                               {'id': 2, 'updated_on': '2024-05-01T12:00:00Z'}]}
+        unchanged = {'issues': [{'id': 2, 'updated_on': '2024-05-01T12:00:00Z'}]}
+        changed = {'issues': [{'id': 1, 'updated_on': '2024-05-01T13:00:00Z'},
+                              {'id': 2, 'updated_on': '2024-05-01T12:00:00Z'}]}
+        
+        with patch.object(self.client, '_make_request',
+                          side_effect=[baseline, unchanged, unchanged, changed]) as mock_request, \
+                patch('redmine_mcp.redmine_client.time.sleep') as mock_sleep:
+            result = self.client.wait_for_issue_change([1, 2, 3], timeout=60, min_interval=1, max_interval=2)
+        
+        assert [issue['id'] for issue in result['changed']] == [1]
+        assert result['missing'] == [3] and not result['timed_out'] and result['requests'] == 4
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 1.5, 2]
+        probe = mock_request.call_args[1]['params']
+        assert probe['issue_id'] == '1,2,3' and probe['updated_on'] == '>=2024-05-01T12:00:00Z'
+        assert 'updated_on' not in mock_request.call_args_list[0][1]['params']
+    
+    def test_since_reports_earlier_changes_at_once(self):
+        """測試指定 since 時，之後更新過的議題立即視為變更"""
+        response = {'issues': [{'id': 4, 'updated_on': '2024-05-02T09:00:00Z'}]}
+        with patch.object(self.client, '_make_request', return_value=response), \
+                patch('redmine_mcp.redmine_client.time.sleep') as mock_sleep:
+            result = self.client.wait_for_issue_change([4], timeout=60, since='2024-05-01T00:00:00Z')
+        
+        assert [issue['id'] for issue in result['changed']] == [4]
+        assert result['requests'] == 1
+        mock_sleep.assert_not_called()
+
+
+
+class TestIssuePages:
+    """議題分頁串流測試"""
+    
+    def setup_method(self):
+        """每個測試前的設置"""
+        with patch.dict(os.environ, {
+            'REDMINE_DOMAIN': 'https://test.redmine.com',
+            'REDMINE_API_KEY': 'test_api_key'
+        }):
+            self.client = RedmineClient()
+    
+    def test_pages_prefetched_in_order(self):
+        """測試依 total_count 預先抓取後續分頁，並依序回傳"""
+        def fake_request(method, endpoint, params=None, **kwargs):
+            offset = params['offset']
+            ids = range(offset + 1, min(offset + 100, 250) + 1)
+            return {'issues': [{'id': i} for i in ids], 'total_count': 250}
+        
+        with patch.object(self.client, '_make_request', side_effect=fake_request) as mock_request:
+            pages = list(self.client.iter_issue_pages(prefetch=2, status_id='*'))
+        
+        assert [len(page) for page in pages] == [100, 100, 50]
+        assert [issue['id'] for page in pages for issue in page] == list(range(1, 251))
+        assert sorted(call[1]['params']['offset'] for call in mock_request.call_args_list) == [0, 100, 200]
+        assert mock_request.call_args_list[0][1]['params']['sort'] == 'id'
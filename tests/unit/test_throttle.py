@@ -0,0 +1,115 @@
+"""
+請求節流模組測試
+"""
+
+import threading
+import time
+
+from redmine_mcp.throttle import CircuitBreaker, RequestGovernor, MIN_RATE
+
+
+class TestRequestGovernor:
+    """速率限制與並行上限測試"""
+
+    def test_rate_limit_spaces_requests(self):
+        """測試超過突發量後依速率排隊"""
+        governor = RequestGovernor(max_rps=50, max_concurrency=4)
+        start = time.monotonic()
+        for _ in range(60):
+            with governor.slot():
+                pass
+
+        # 突發 50 筆後，其餘 10 筆以每秒 50 筆送出
+        assert time.monotonic() - start >= 0.18
+
+    def test_unlimited_rate(self):
+        """測試速率為 0 時不等待"""
+        governor = RequestGovernor(max_rps=0, max_concurrency=4)
+        start = time.monotonic()
+        for _ in range(1000):
+            with governor.slot() as waited:
+                assert waited < 0.05
+        assert time.monotonic() - start < 0.5
+
+    def test_concurrency_cap(self):
+        """測試同時進行的請求數不超過上限"""
+        governor = RequestGovernor(max_rps=0, max_concurrency=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def request():
+            with governor.slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak[0] == 2
+
+    def test_backoff_pauses_and_recovers(self):
+        """測試退避時暫停所有請求並減半速率，成功後逐步恢復"""
+        governor = RequestGovernor(max_rps=8, max_concurrency=4)
+        governor.backoff(0.1)
+        assert governor.rate == 4
+
+        with governor.slot() as waited:
+            assert waited >= 0.09
+
+        for _ in range(5):
+            governor.backoff(0)
+        assert governor.rate == MIN_RATE
+
+        for _ in range(100):
+            governor.succeeded()
+        assert governor.rate == 8
+
+    def test_retry_after(self):
+        """測試解析 Retry-After 秒數"""
+        assert RequestGovernor.retry_after('3') == 3.0
+        assert RequestGovernor.retry_after('Wed, 21 Oct 2015 07:28:00 GMT') is None
+        assert RequestGovernor.retry_after(None) is None
+
+
+class TestCircuitBreaker:
+    """斷路器狀態轉換測試"""
+
+    def test_opens_after_threshold(self):
+        """測試連續失敗達門檻後斷開並拒絕請求"""
+        breaker = CircuitBreaker('read', failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        breaker.record_success()
+        assert breaker.failures == 0
+
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state == 'open'
+        assert not breaker.allow()
+        assert 59 < breaker.retry_in() <= 60
+
+    def test_half_open_trial(self):
+        """測試逾時後只放行一個試探請求，成功則恢復、失敗則再次斷開"""
+        breaker = CircuitBreaker('write', failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.state == 'half-open'
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == 'open'
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == 'closed' and breaker.allow()
@@ -4,8 +4,8 @@
 
 import pytest
 from redmine_mcp.validators import (
-    RedmineValidator, RedmineValidationError, ValidationResult,
-    validate_and_clean_data
+    RedmineValidator, RedmineValidationError, ValidationResult, CompiledValidator, Schema, Text, IntRange,
+    validate_and_clean_data, validate_many
 )
 
 
@@ -174,7 +174,8 @@ class TestRedmineValidator:
             '>=2024-01-01',
             '<=2024-12-31',
             '2024-01-01|2024-12-31',
-            '2024-01-01T10:30:00Z'
+            '2024-01-01T10:30:00Z',
+            '>=2024-01-01T10:30:00Z'
         ]
         
         for date in valid_dates:
@@ -244,4 +245,47 @@ class TestValidateAndCleanData:
         data = {'test': 'data'}
         
         with pytest.raises(ValueError, match="不支援的驗證類型"):
-            validate_and_clean_data(data, "invalid_type")
\ No newline at end of file
+            validate_and_clean_data(data, "invalid_type")
+
+
+class TestCompiledValidators:
+    """由宣告式規則編譯的驗證器與批次驗證測試"""
+    
+    def test_validate_many_keys_errors_by_index(self):
+        """測試批次驗證只回傳無效資料的錯誤，並以索引對應"""
+        records = [
+            {'project_id': 1, 'subject': 'Fine'},
+            {'project_id': 0, 'subject': 'Bad project'},
+            {'project_id': 2, 'subject': 'Fine too', 'done_ratio': 40},
+            {'subject': '   '},
+        ]
+        
+        assert validate_many(records) == {
+            1: ["project_id must be a positive integer"],
+            3: ["Project ID (project_id) is required", "Issue subject (subject) is required",
+                "Issue subject cannot be empty"],
+        }
+        assert validate_many([{'subject': 'Only a subject'}], is_update=True) == {}
+        assert validate_many([{'limit': 0}, {'limit': 500}], "query") == {0: ["Pagination limit (limit) must be a positive integer"]}
+    
+    def test_schema_compiles_to_matching_checks(self):
+        """測試自訂規則編譯後的單筆與批次結果一致，且警告不影響有效性"""
+        validator = CompiledValidator(Schema(
+            name='page',
+            required=(('title', "Title is required", True),),
+            fields=(
+                ('title', Text("Title", max_length=5)),
+                ('size', IntRange("Size must be 1-50", 1, 50, warn_above=20, warning="Large page")),
+            ),
+        ))
+        
+        result = validator({'title': 'Home', 'size': 30})
+        assert result.is_valid and result.warnings == ["Large page"]
+        assert validator({'title': 'Too long', 'size': 0}).errors == [
+            "Title length cannot exceed 5 characters", "Size must be 1-50"]
+        assert validator.validate_many([{'title': 'Ok'}, {'size': 3}]) == {1: ["Title is required"]}
+    
+    def test_validate_many_rejects_unknown_type(self):
+        """測試不支援的驗證類型"""
+        with pytest.raises(ValueError, match="Unsupported validation type"):
+            validate_many([{}], "invalid_type")